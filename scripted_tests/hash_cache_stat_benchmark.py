@@ -0,0 +1,71 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+
+#! /usr/bin/env python3
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from deadline.job_attachments.caches import HashCache
+from deadline.job_attachments.progress_tracker import ProgressStatus, ProgressTracker
+from deadline.job_attachments.upload import S3AssetManager
+
+"""
+A benchmark measuring the cost of creating the manifest of files that are all unchanged since they
+were hashed, which only needs one os.stat per file to validate its hash cache entry.
+
+Creates a tree of small files, creates its manifest once to fill an empty hash cache, and then
+creates it again and reports the time taken per file by this second, stat-only pass.
+
+Example usage:
+
+  python3 hash_cache_stat_benchmark.py --num-files 200000
+"""
+
+
+def create_manifest(
+    asset_manager: S3AssetManager, input_paths: list[Path], root: str, cache_dir: str
+) -> tuple[float, ProgressTracker]:
+    progress_tracker = ProgressTracker(
+        status=ProgressStatus.PREPARING_IN_PROGRESS,
+        total_files=len(input_paths),
+        total_bytes=0,
+    )
+    start_time = time.perf_counter()
+    with HashCache(cache_dir, bulk_mode=True) as hash_cache:
+        asset_manager._create_manifest_file(input_paths, root, hash_cache, progress_tracker)
+    return time.perf_counter() - start_time, progress_tracker
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-files", type=int, default=200000, help="Number of files.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root_dir, tempfile.TemporaryDirectory() as cache_dir:
+        print(f"Creating {args.num_files} files...")
+        input_paths = []
+        for i in range(args.num_files):
+            file_path = Path(root_dir) / f"dir{i // 1000}" / f"file{i}.txt"
+            file_path.parent.mkdir(exist_ok=True)
+            file_path.write_text(str(i))
+            input_paths.append(file_path)
+
+        asset_manager = S3AssetManager()
+
+        elapsed, progress_tracker = create_manifest(asset_manager, input_paths, root_dir, cache_dir)
+        print(f"First pass (hashing all files): {elapsed:.2f} seconds")
+        print(
+            f"  Hashed: {progress_tracker.processed_files}, cached: {progress_tracker.skipped_files}"
+        )
+
+        elapsed, progress_tracker = create_manifest(asset_manager, input_paths, root_dir, cache_dir)
+        print(f"Second pass (all files unchanged): {elapsed:.2f} seconds")
+        print(
+            f"  Hashed: {progress_tracker.processed_files}, cached: {progress_tracker.skipped_files}"
+        )
+        print(f"  Per file: {elapsed / args.num_files * 1e6:.1f} microseconds")
+        print(
+            f"  Hash cache size: {os.path.getsize(os.path.join(cache_dir, 'hash_cache.db'))} bytes"
+        )
@@ -0,0 +1,98 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+
+#! /usr/bin/env python3
+import argparse
+import multiprocessing
+import resource
+import sys
+import time
+from typing import Tuple
+
+from deadline.job_attachments.asset_manifests import HashAlgorithm
+from deadline.job_attachments.asset_manifests.decode import decode_manifest
+from deadline.job_attachments.asset_manifests.v2023_03_03 import AssetManifest, ManifestPath
+
+"""
+A benchmark comparing the decoding of manifests validated against their schema (as manifests from
+untrusted sources are) against the decoding of trusted manifests (as manifests from the Job
+Attachments S3 bucket and the manifest cache are), which only checks the fields of the manifest.
+
+Decodes a manifest of each of the given numbers of paths with each mode, in a fresh process for
+each run so that the peak memory usage (RSS) of the runs can be compared, and reports the time
+taken by the first decode (which loads the schema), the average time of the following decodes,
+and the peak RSS of the process before (once the manifest string is received) and after decoding.
+
+Example usage:
+
+  python3 manifest_decode_benchmark.py --num-paths 1000 10000 100000 --repeat 5
+"""
+
+
+def _get_max_rss_mib() -> float:
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, and in KiB elsewhere.
+    return max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024
+
+
+def _make_manifest_str(num_paths: int) -> str:
+    paths = [
+        ManifestPath(
+            path=f"dir{i % 100}/subdir{i % 7}/file{i}.exr",
+            hash=f"{i:032x}",
+            size=i,
+            mtime=1700000000000000 + i,
+        )
+        for i in range(num_paths)
+    ]
+    manifest = AssetManifest(
+        hash_alg=HashAlgorithm.XXH128, paths=paths, total_size=sum(path.size for path in paths)
+    )
+    return manifest.encode()
+
+
+def _run(manifest_str: str, repeat: int, trusted: bool) -> Tuple[float, float, float, float]:
+    rss_before = _get_max_rss_mib()
+
+    start_time = time.perf_counter()
+    decode_manifest(manifest_str, trusted=trusted)
+    first_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        decode_manifest(manifest_str, trusted=trusted)
+    average_time = (time.perf_counter() - start_time) / repeat
+
+    return (first_time, average_time, rss_before, _get_max_rss_mib())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--num-paths",
+        type=int,
+        nargs="+",
+        default=[1000, 10000, 100000],
+        help="Numbers of paths of the decoded manifests.",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Number of decodes after the first one."
+    )
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    print(
+        f"{'Paths':>8} {'Mode':>9} {'First (s)':>10} {'Average (s)':>12} "
+        f"{'RSS before (MiB)':>17} {'Peak RSS (MiB)':>15}"
+    )
+    for num_paths in args.num_paths:
+        manifest_str = _make_manifest_str(num_paths)
+        for trusted in (False, True):
+            # Each run is in its own process, so that the peak RSS is only that of the run.
+            with context.Pool(1) as pool:
+                first_time, average_time, rss_before, rss_after = pool.apply(
+                    _run, (manifest_str, args.repeat, trusted)
+                )
+            print(
+                f"{num_paths:>8} {'trusted' if trusted else 'validated':>9} {first_time:>10.3f} "
+                f"{average_time:>12.3f} {rss_before:>17.1f} {rss_after:>15.1f}"
+            )
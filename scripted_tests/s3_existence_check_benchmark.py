@@ -0,0 +1,105 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+
+#! /usr/bin/env python3
+import argparse
+import os
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+from moto import mock_aws
+
+from deadline.job_attachments.asset_manifests import HashAlgorithm
+from deadline.job_attachments.asset_manifests.v2023_03_03 import AssetManifest, ManifestPath
+from deadline.job_attachments.upload import S3AssetUploader
+
+"""
+A benchmark comparing the per-file head-object existence check against the bulk ListObjectsV2
+existence check used by S3AssetUploader.upload_input_files, against a mocked (moto) S3 bucket.
+
+Creates a manifest of small local files whose CAS objects are (mostly) already in the bucket,
+then runs upload_input_files with an empty S3 check cache using each strategy, and reports the
+number of S3 requests made per operation and the wall-clock time. Since moto serves requests
+in-process, use --latency-ms to simulate the round-trip time of real S3 requests.
+
+Example usage:
+
+  python3 s3_existence_check_benchmark.py --num-files 20000 --uploaded-ratio 0.9 --latency-ms 20
+"""
+
+BUCKET_NAME = "benchmark-bucket"
+CAS_PREFIX = "Root/Data"
+
+
+def run(num_files: int, uploaded_ratio: float, latency_ms: float, bulk: bool) -> None:
+    with tempfile.TemporaryDirectory() as root_dir, tempfile.TemporaryDirectory() as cache_dir:
+        root = Path(root_dir)
+        paths = []
+        for i in range(num_files):
+            file_name = f"file{i}.txt"
+            (root / file_name).write_text("x")
+            paths.append(ManifestPath(path=file_name, hash=f"{i:032x}"[::-1], size=1, mtime=1))
+        manifest = AssetManifest(hash_alg=HashAlgorithm.XXH128, paths=paths, total_size=num_files)
+
+        uploader = S3AssetUploader()
+        uploader._s3.create_bucket(
+            Bucket=BUCKET_NAME,
+            CreateBucketConfiguration={"LocationConstraint": uploader._s3.meta.region_name},
+        )
+        for path in paths[: int(num_files * uploaded_ratio)]:
+            uploader._s3.put_object(
+                Bucket=BUCKET_NAME, Key=f"{CAS_PREFIX}/{path.hash}.xxh128", Body=b"x"
+            )
+
+        request_counts: Counter = Counter()
+
+        def count_request(model, **kwargs):
+            request_counts[model.name] += 1
+            if latency_ms:
+                time.sleep(latency_ms / 1000)
+
+        events = uploader._s3.meta.events
+        events.register("before-call.s3", count_request)
+        # Always use the per-file check, or always use the bulk check.
+        uploader.bulk_existence_check_threshold = 1 if bulk else num_files + 1
+
+        start_time = time.perf_counter()
+        uploader.upload_input_files(
+            manifest=manifest,
+            s3_bucket=BUCKET_NAME,
+            source_root=root,
+            s3_cas_prefix=CAS_PREFIX,
+            s3_check_cache_dir=cache_dir,
+        )
+        elapsed = time.perf_counter() - start_time
+        events.unregister("before-call.s3", count_request)
+
+        print(f"{'Bulk listing' if bulk else 'Per-file head-object'} existence check:")
+        print(f"  Time: {elapsed:.2f} seconds")
+        for operation, count in sorted(request_counts.items()):
+            print(f"  {operation}: {count} request(s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-files", type=int, default=10000, help="Number of files.")
+    parser.add_argument(
+        "--uploaded-ratio",
+        type=float,
+        default=0.9,
+        help="Ratio of the files that already exist in the S3 bucket.",
+    )
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=0.0,
+        help="Simulated latency added to every S3 request, in milliseconds.",
+    )
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-west-2")
+    for bulk in (False, True):
+        # Start each run with a fresh mocked bucket.
+        with mock_aws():
+            run(args.num_files, args.uploaded_ratio, args.latency_ms, bulk)
@@ -0,0 +1,98 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+
+#! /usr/bin/env python3
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from moto import mock_aws
+
+from deadline.job_attachments.models import JobAttachmentS3Settings
+from deadline.job_attachments.upload import S3AssetManager
+
+"""
+A benchmark comparing the number of bytes read from disk by S3AssetManager.hash_and_upload_assets
+with and without single-read upload, against a mocked (moto) S3 bucket.
+
+Creates a set of new files (not in the hash cache nor in S3), then hashes and uploads them with an
+empty hash cache and S3 check cache in each mode, and reports the number of bytes that the process
+read (as counted by the kernel in /proc/self/io, so this only runs on Linux) and the wall-clock time.
+Without single-read upload every new file is read twice, once to hash it and once to upload it.
+
+Example usage:
+
+  python3 single_read_upload_benchmark.py --num-files 20 --file-size-mb 20
+"""
+
+BUCKET_NAME = "benchmark-bucket"
+
+
+def get_bytes_read() -> int:
+    with open("/proc/self/io") as io_file:
+        for line in io_file:
+            if line.startswith("rchar:"):
+                return int(line.split()[1])
+    raise RuntimeError("Failed to read the number of bytes read from /proc/self/io")
+
+
+def run(num_files: int, file_size: int, single_read_upload: bool) -> None:
+    with tempfile.TemporaryDirectory() as root_dir, tempfile.TemporaryDirectory() as cache_dir:
+        root = Path(root_dir)
+        input_paths = []
+        for i in range(num_files):
+            file_path = root / f"file{i}.bin"
+            file_path.write_bytes(os.urandom(file_size))
+            input_paths.append(str(file_path))
+
+        asset_manager = S3AssetManager(
+            farm_id="farm-benchmark",
+            queue_id="queue-benchmark",
+            job_attachment_settings=JobAttachmentS3Settings(
+                s3BucketName=BUCKET_NAME, rootPrefix="Root"
+            ),
+        )
+        s3 = asset_manager.asset_uploader._s3
+        s3.create_bucket(
+            Bucket=BUCKET_NAME,
+            CreateBucketConfiguration={"LocationConstraint": s3.meta.region_name},
+        )
+        upload_group = asset_manager.prepare_paths_for_upload(
+            input_paths=input_paths, output_paths=[], referenced_paths=[]
+        )
+
+        bytes_read_before = get_bytes_read()
+        start_time = time.perf_counter()
+        asset_manager.hash_and_upload_assets(
+            asset_groups=upload_group.asset_groups,
+            total_input_files=upload_group.total_input_files,
+            total_input_bytes=upload_group.total_input_bytes,
+            hash_cache_dir=cache_dir,
+            s3_check_cache_dir=cache_dir,
+            single_read_upload=single_read_upload,
+        )
+        elapsed = time.perf_counter() - start_time
+        bytes_read = get_bytes_read() - bytes_read_before
+
+        total_size = num_files * file_size
+        print(f"{'Single-read' if single_read_upload else 'Default'} hash and upload:")
+        print(f"  Time: {elapsed:.2f} seconds")
+        print(f"  Bytes read: {bytes_read} ({bytes_read / total_size:.2f}x the input size)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-files", type=int, default=20, help="Number of files.")
+    parser.add_argument(
+        "--file-size-mb", type=float, default=20, help="Size of each file, in megabytes."
+    )
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-west-2")
+    # Keep the objects uploaded to moto in memory, so that they don't count as bytes read from disk.
+    os.environ.setdefault("MOTO_S3_DEFAULT_KEY_BUFFER_SIZE", str(2**40))
+    for single_read_upload in (False, True):
+        # Start each run with a fresh mocked bucket.
+        with mock_aws():
+            run(args.num_files, int(args.file_size_mb * 1024 * 1024), single_read_upload)
@@ -0,0 +1,107 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+
+#! /usr/bin/env python3
+import argparse
+import os
+import tempfile
+import time
+from collections import Counter
+from unittest.mock import patch
+
+import boto3
+from moto import mock_aws
+
+from deadline.job_attachments import download
+from deadline.job_attachments._aws.aws_clients import get_s3_client
+from deadline.job_attachments.asset_manifests import HashAlgorithm
+from deadline.job_attachments.asset_manifests.v2023_03_03 import AssetManifest, ManifestPath
+
+"""
+A benchmark comparing the download of many small files through the TransferManager (one future and
+one thread pool task per file) against the small-object fast path of download_files_from_manifests
+(one GetObject request per file, with the files batched across the download workers), against a
+mocked (moto) S3 bucket.
+
+Uploads the given number of small objects to the bucket, then downloads them with each strategy and
+reports the number of S3 requests made per operation, the wall-clock time and the time per file.
+Since moto serves requests in-process, use --latency-ms to simulate the round-trip time of real S3
+requests.
+
+Example usage:
+
+  python3 small_object_download_benchmark.py --num-files 5000 --file-size 1024 --latency-ms 5
+"""
+
+BUCKET_NAME = "benchmark-bucket"
+CAS_PREFIX = "Root/Data"
+
+
+def run(num_files: int, file_size: int, latency_ms: float, fast_path: bool) -> None:
+    session = boto3.Session(region_name=os.environ["AWS_DEFAULT_REGION"])
+    s3_client = get_s3_client(session=session)
+    s3_client.create_bucket(
+        Bucket=BUCKET_NAME,
+        CreateBucketConfiguration={"LocationConstraint": session.region_name},
+    )
+    paths = []
+    for i in range(num_files):
+        file_hash = f"{i:032x}"[::-1]
+        s3_client.put_object(
+            Bucket=BUCKET_NAME, Key=f"{CAS_PREFIX}/{file_hash}.xxh128", Body=b"x" * file_size
+        )
+        paths.append(
+            ManifestPath(path=f"dir{i % 100}/file{i}.json", hash=file_hash, size=file_size, mtime=1)
+        )
+    manifest = AssetManifest(
+        hash_alg=HashAlgorithm.XXH128, paths=paths, total_size=num_files * file_size
+    )
+
+    request_counts: Counter = Counter()
+
+    def count_request(model, **kwargs):
+        request_counts[model.name] += 1
+        if latency_ms:
+            time.sleep(latency_ms / 1000)
+
+    s3_client.meta.events.register("before-call.s3", count_request)
+    # Without the fast path, every object is downloaded through the TransferManager in its own task.
+    small_object_max_size = download.S3_DOWNLOAD_SMALL_OBJECT_MAX_SIZE if fast_path else -1
+
+    with tempfile.TemporaryDirectory() as download_dir, patch.object(
+        download, "S3_DOWNLOAD_SMALL_OBJECT_MAX_SIZE", small_object_max_size
+    ):
+        start_time = time.perf_counter()
+        summary = download.download_files_from_manifests(
+            s3_bucket=BUCKET_NAME,
+            manifests_by_root={download_dir: manifest},
+            cas_prefix=CAS_PREFIX,
+            session=session,
+        )
+        elapsed = time.perf_counter() - start_time
+    s3_client.meta.events.unregister("before-call.s3", count_request)
+
+    print(f"{'Small-object fast path' if fast_path else 'TransferManager'}:")
+    print(f"  Downloaded {summary.processed_files} files in {elapsed:.2f} seconds")
+    print(f"  Time per file: {elapsed / num_files * 1000:.3f} ms")
+    for operation, count in sorted(request_counts.items()):
+        print(f"  {operation}: {count} request(s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-files", type=int, default=5000, help="Number of files.")
+    parser.add_argument("--file-size", type=int, default=1024, help="Size of each file in bytes.")
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=0.0,
+        help="Simulated latency added to every S3 request, in milliseconds.",
+    )
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-west-2")
+    for fast_path in (False, True):
+        # Start each run with a fresh mocked bucket and client.
+        get_s3_client.cache_clear()
+        with mock_aws():
+            run(args.num_files, args.file_size, args.latency_ms, fast_path)
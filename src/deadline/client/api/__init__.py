@@ -5,6 +5,7 @@ __all__ = [
     "logout",
     "create_job_from_job_bundle",
     "wait_for_create_job_to_complete",
+    "clean_caches_in_time_budget",
     "get_boto3_session",
     "get_boto3_client",
     "AwsAuthenticationStatus",
@@ -64,6 +65,7 @@ from ._telemetry import (
 from ._submit_job_bundle import (
     create_job_from_job_bundle,
     wait_for_create_job_to_complete,
+    clean_caches_in_time_budget,
 )
 from ._get_storage_profile_for_queue import get_storage_profile_for_queue
 
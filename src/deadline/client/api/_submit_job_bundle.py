@@ -34,6 +34,7 @@ from ..job_bundle.parameters import (
     JobParameter,
 )
 from ..job_bundle.submission import AssetReferences, split_parameter_args
+from ...job_attachments.caches import clean_caches
 from ...job_attachments.exceptions import MisconfiguredInputsError
 from ...job_attachments.models import (
     JobAttachmentsFileSystem,
@@ -284,18 +285,37 @@ def create_job_from_job_bundle(
                 print_function_callback("Job submission canceled.")
                 return None
 
-            _, asset_manifests = _hash_attachments(
-                asset_manager=asset_manager,
-                asset_groups=upload_group.asset_groups,
-                total_input_files=upload_group.total_input_files,
-                total_input_bytes=upload_group.total_input_bytes,
-                print_function_callback=print_function_callback,
-                hashing_progress_callback=hashing_progress_callback,
-            )
+            # Share the local caches across all the asset roots, and the hashing and upload phases.
+            with asset_manager.open_cache_session(
+                hash_cache_dir=config_file.get_cache_directory(),
+                s3_check_cache_dir=config_file.get_cache_directory(),
+            ):
+                if config_file.str2bool(
+                    get_setting("settings.pipeline_hashing_and_upload", config=config)
+                ):
+                    attachment_settings = _hash_and_upload_attachments(  # type: ignore
+                        asset_manager,
+                        upload_group,
+                        print_function_callback,
+                        hashing_progress_callback,
+                        upload_progress_callback,
+                    )
+                else:
+                    _, asset_manifests = _hash_attachments(
+                        asset_manager=asset_manager,
+                        asset_groups=upload_group.asset_groups,
+                        total_input_files=upload_group.total_input_files,
+                        total_input_bytes=upload_group.total_input_bytes,
+                        print_function_callback=print_function_callback,
+                        hashing_progress_callback=hashing_progress_callback,
+                    )
 
-            attachment_settings = _upload_attachments(  # type: ignore
-                asset_manager, asset_manifests, print_function_callback, upload_progress_callback
-            )
+                    attachment_settings = _upload_attachments(  # type: ignore
+                        asset_manager,
+                        asset_manifests,
+                        print_function_callback,
+                        upload_progress_callback,
+                    )
             attachment_settings["fileSystem"] = JobAttachmentsFileSystem(
                 job_attachments_file_system
             )
@@ -354,6 +374,8 @@ def create_job_from_job_bundle(
         if not success:
             raise DeadlineOperationError(status_message)
 
+        clean_caches_in_time_budget(config)
+
         print_function_callback("Submitted job bundle:")
         print_function_callback(f"   {job_bundle_dir}")
         print_function_callback(status_message + f"\n{job_id}\n")
@@ -404,6 +426,30 @@ def wait_for_create_job_to_complete(
     )
 
 
+def clean_caches_in_time_budget(config: Optional[ConfigParser] = None) -> None:
+    """
+    Cleans the local job attachments caches within the configured time budget, if there is one.
+    Called at the end of each job submission, from both the CLI and the submitter GUI.
+    Cleaning the caches is best-effort, so errors are logged rather than failing the submission.
+    """
+    try:
+        time_budget_ms = int(
+            get_setting("settings.cache_maintenance_time_budget_ms", config=config)
+        )
+        if time_budget_ms <= 0:
+            return
+        max_age_days = float(get_setting("settings.cache_max_age_days", config=config))
+        max_size_mb = float(get_setting("settings.cache_max_size_mb", config=config))
+        clean_caches(
+            config_file.get_cache_directory(),
+            max_age_days=max_age_days or None,
+            max_size_mb=max_size_mb or None,
+            time_budget_seconds=time_budget_ms / 1000,
+        )
+    except Exception as e:
+        logger.warning(f"Failed to clean the local job attachments caches: {e}")
+
+
 @api.record_success_fail_telemetry_event(metric_name="cli_asset_upload")  # type: ignore
 def _upload_attachments(
     asset_manager: S3AssetManager,
@@ -436,3 +482,50 @@ def _upload_attachments(
     print_function_callback(textwrap.indent(str(upload_summary), "    "))
 
     return attachment_settings.to_dict()
+
+
+@api.record_success_fail_telemetry_event(metric_name="cli_asset_upload")  # type: ignore
+def _hash_and_upload_attachments(
+    asset_manager: S3AssetManager,
+    upload_group: AssetUploadGroup,
+    print_function_callback: Callable = lambda msg: None,
+    hashing_progress_callback: Optional[Callable] = None,
+    upload_progress_callback: Optional[Callable] = None,
+    config: Optional[ConfigParser] = None,
+) -> Dict[str, Any]:
+    """
+    Starts the pipelined job attachments hashing and upload, where each file is uploaded as soon as
+    it is hashed, and handles the progress reporting callbacks.
+    Returns the attachment settings from the upload.
+    """
+
+    def _default_update_progress(progress_metadata: Dict[str, str]) -> bool:
+        return True
+
+    if not hashing_progress_callback:
+        hashing_progress_callback = _default_update_progress
+    if not upload_progress_callback:
+        upload_progress_callback = _default_update_progress
+
+    hashing_summary, upload_summary, _, attachment_settings = asset_manager.hash_and_upload_assets(
+        asset_groups=upload_group.asset_groups,
+        total_input_files=upload_group.total_input_files,
+        total_input_bytes=upload_group.total_input_bytes,
+        hash_cache_dir=config_file.get_cache_directory(),
+        s3_check_cache_dir=config_file.get_cache_directory(),
+        on_preparing_to_submit=hashing_progress_callback,
+        on_uploading_assets=upload_progress_callback,
+        single_read_upload=config_file.str2bool(
+            get_setting("settings.single_read_upload", config=config)
+        ),
+    )
+    telemetry_client = api.get_deadline_cloud_library_telemetry_client(config=config)
+    telemetry_client.record_hashing_summary(hashing_summary)
+    telemetry_client.record_upload_summary(upload_summary)
+
+    print_function_callback("Hashing Summary:")
+    print_function_callback(textwrap.indent(str(hashing_summary), "    "))
+    print_function_callback("Upload Summary:")
+    print_function_callback(textwrap.indent(str(upload_summary), "    "))
+
+    return attachment_settings.to_dict()
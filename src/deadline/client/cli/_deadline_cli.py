@@ -13,6 +13,7 @@ from .. import version
 from ..config import get_setting, get_setting_default
 from ._common import _PROMPT_WHEN_COMPLETE
 from ._groups.bundle_group import cli_bundle
+from ._groups.cache_group import cli_cache
 from ._groups.config_group import cli_config
 from ._groups.auth_group import cli_auth
 from ._groups.farm_group import cli_farm
@@ -80,4 +81,5 @@ main.add_command(cli_queue)
 main.add_command(cli_worker)
 
 main.add_command(cli_attachment)
+main.add_command(cli_cache)
 main.add_command(cli_manifest)
@@ -0,0 +1,101 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+
+"""
+All the `deadline cache` commands:
+    * stats
+    * clean
+"""
+from __future__ import annotations
+
+import dataclasses
+from datetime import datetime
+from typing import Optional
+
+import click
+
+from deadline.job_attachments._utils import _human_readable_file_size
+from deadline.job_attachments.caches import clean_caches, get_cache_stats
+
+from ...config import config_file
+from .._common import _handle_error
+from .click_logger import ClickLogger
+
+
+@click.group(name="cache")
+@_handle_error
+def cli_cache():
+    """
+    Commands to manage the local Job Attachments caches.
+    """
+
+
+@cli_cache.command(name="stats")
+@click.option("--json", default=None, is_flag=True, help="Output is printed as JSON for scripting.")
+@_handle_error
+def cache_stats(json: bool):
+    """
+    Show the size and number of entries of the local Job Attachments caches.
+    """
+    logger: ClickLogger = ClickLogger(is_json=json)
+
+    all_stats = get_cache_stats(config_file.get_cache_directory())
+    if not all_stats:
+        logger.echo(f"No caches found in {config_file.get_cache_directory()}")
+    for stats in all_stats:
+        logger.echo(f"{stats.cache_name}: {stats.file_path}")
+        logger.echo(f"    Size: {_human_readable_file_size(stats.file_size)}")
+        logger.echo(f"    Entries: {stats.entry_count}")
+        logger.echo(f"    Expired entries: {stats.expired_entry_count}")
+        if stats.oldest_access_time is not None:
+            logger.echo(f"    Oldest entry: {datetime.fromtimestamp(stats.oldest_access_time)}")
+    logger.json({"caches": [dataclasses.asdict(stats) for stats in all_stats]})
+
+
+@cli_cache.command(name="clean")
+@click.option(
+    "--max-age-days",
+    type=float,
+    default=None,
+    help="Evict the entries that were not used in this many days. Defaults to the 'settings.cache_max_age_days' setting. Zero disables it.",
+)
+@click.option(
+    "--max-size-mb",
+    type=float,
+    default=None,
+    help="Evict the least recently used entries until each cache fits in this many MiB. Defaults to the 'settings.cache_max_size_mb' setting. Zero disables it.",
+)
+@click.option(
+    "--vacuum/--no-vacuum",
+    default=True,
+    help="Whether to rebuild the cache files to release the space of the evicted entries.",
+)
+@click.option("--json", default=None, is_flag=True, help="Output is printed as JSON for scripting.")
+@_handle_error
+def cache_clean(
+    max_age_days: Optional[float], max_size_mb: Optional[float], vacuum: bool, json: bool
+):
+    """
+    Delete the expired and least recently used entries of the local Job Attachments caches.
+    """
+    logger: ClickLogger = ClickLogger(is_json=json)
+
+    if max_age_days is None:
+        max_age_days = float(config_file.get_setting("settings.cache_max_age_days"))
+    if max_size_mb is None:
+        max_size_mb = float(config_file.get_setting("settings.cache_max_size_mb"))
+
+    results = clean_caches(
+        config_file.get_cache_directory(),
+        max_age_days=max_age_days or None,
+        max_size_mb=max_size_mb or None,
+        vacuum=vacuum,
+    )
+    if not results:
+        logger.echo(f"No caches found in {config_file.get_cache_directory()}")
+    for result in results:
+        logger.echo(
+            f"{result.cache_name}: evicted {result.evicted_entry_count} entries, "
+            f"{_human_readable_file_size(result.file_size_before)} -> "
+            f"{_human_readable_file_size(result.file_size_after)}"
+        )
+    logger.json({"caches": [dataclasses.asdict(result) for result in results]})
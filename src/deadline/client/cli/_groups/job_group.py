@@ -283,6 +283,7 @@ def _download_job_output(
         step_id=step_id,
         task_id=task_id,
         session=queue_role_session,
+        manifest_cache_dir=config_file.get_cache_directory(),
     )
 
     output_paths_by_root = job_output_downloader.get_output_paths_by_root()
@@ -89,6 +89,12 @@ def cli_manifest():
     help="Rehash all files to compare using file hashes.",
 )
 @click.option("--diff", default=None, help="File Path to Asset Manifest to diff against.")
+@click.option(
+    "--binary-sidecar",
+    default=False,
+    is_flag=True,
+    help="Also write a binary sidecar next to the manifest, which makes loading the manifest locally (such as to diff against it) faster.",
+)
 @click.option("--json", default=None, is_flag=True, help="Output is printed as JSON for scripting.")
 @_handle_error
 def manifest_snapshot(
@@ -100,6 +106,7 @@ def manifest_snapshot(
     include_exclude_config: str,
     diff: str,
     force_rehash: bool,
+    binary_sidecar: bool,
     json: bool,
     **args,
 ):
@@ -126,6 +133,7 @@ def manifest_snapshot(
         diff=diff,
         force_rehash=force_rehash,
         logger=logger,
+        write_sidecar=binary_sidecar,
     )
     if manifest_out:
         logger.json(dataclasses.asdict(manifest_out))
@@ -125,6 +125,112 @@ SETTINGS: Dict[str, Dict[str, Any]] = {
             "This multiplier is used to calculate the size threshold. (Small files are defined as those smaller than or equal to the chunk size multiplied by this factor.)"
         ),
     },
+    "settings.s3_bulk_existence_check_threshold": {
+        "default": "5000",
+        "description": (
+            "When uploading job attachments, the number of files missing from the local S3 check cache at which the Job Attachments "
+            "bucket is listed in bulk (with one ListObjectsV2 request per 1,000 objects) to find the files that are already uploaded, "
+            "instead of sending one HeadObject request per file. Set this above the size of the largest submission to always check per file."
+        ),
+    },
+    "settings.pipeline_hashing_and_upload": {
+        "default": "false",
+        "description": (
+            "When submitting jobs, upload each job attachment file as soon as its hash is computed, "
+            "instead of hashing all the files before uploading any of them."
+        ),
+    },
+    "settings.single_read_upload": {
+        "default": "false",
+        "description": (
+            "When uploading job attachment files as soon as they are hashed, hash the files that are not in the "
+            "local hash cache while uploading them, so that each file is read from disk only once. "
+            "This only applies to files up to the multipart upload chunk size (8 MB). Larger files are still "
+            "read twice, once to be hashed and once to be uploaded, since a file's CAS key is only known once "
+            "it has been read in full."
+        ),
+    },
+    "settings.hashing_engine": {
+        "default": "AUTO",
+        "description": (
+            "How job attachment files are hashed. THREAD hashes files in a pool of threads, PROCESS hashes batches of "
+            "files in a pool of worker processes, which is faster for many small files, and AUTO picks PROCESS when "
+            "there are many small files to hash and THREAD otherwise."
+        ),
+    },
+    "settings.hash_file_buffer_size_kb": {
+        "default": "1024",
+        "description": (
+            "The size, in KiB, of the buffer that job attachment files are read into to be hashed. "
+            "Files smaller than the buffer are read with a single read call."
+        ),
+    },
+    "settings.hash_file_mmap_threshold_mb": {
+        "default": "0",
+        "description": (
+            "The size, in MiB, from which job attachment files are hashed from a memory map instead of being read "
+            "into a buffer. Zero disables memory mapping. Only files on local file systems (on Linux and Windows) are "
+            "memory mapped, and only enable this for files that are not modified while being hashed, since a file "
+            "truncated while it is memory mapped can crash the process."
+        ),
+    },
+    "settings.cache_max_age_days": {
+        "default": "90",
+        "description": (
+            "When cleaning the local job attachments caches, evict the entries that were not used in this many days. "
+            "Zero disables evicting entries by age."
+        ),
+    },
+    "settings.cache_max_size_mb": {
+        "default": "1024",
+        "description": (
+            "When cleaning the local job attachments caches, evict the least recently used entries of each cache "
+            "until it fits in this many MiB. Zero disables evicting entries by size."
+        ),
+    },
+    "settings.cache_maintenance_time_budget_ms": {
+        "default": "0",
+        "description": (
+            "The time, in milliseconds, to spend cleaning the local job attachments caches at the end of each job "
+            "submission, as with 'deadline cache clean --no-vacuum'. Zero disables cleaning the caches automatically."
+        ),
+    },
+    "settings.manifest_cache_max_size_mb": {
+        "default": "256",
+        "description": (
+            "The size, in MiB, that the least recently used manifests are evicted from the local manifest cache "
+            "to fit in, each time it is used. Zero disables evicting manifests by size."
+        ),
+    },
+    "settings.object_cache_enabled": {
+        "default": "false",
+        "description": (
+            "When downloading job attachments, keep the downloaded files in a local object cache that is shared by "
+            "all the sessions on this host, so that each file is downloaded only once."
+        ),
+    },
+    "settings.object_cache_dir": {
+        "default": "",
+        "description": (
+            "The directory of the local object cache of downloaded job attachments. "
+            "If this is not set, a directory in the user's home directory is used."
+        ),
+    },
+    "settings.object_cache_max_size_mb": {
+        "default": "10240",
+        "description": (
+            "The size, in MiB, that the least recently used files are evicted from the local object cache "
+            "of downloaded job attachments to fit in, after each download."
+        ),
+    },
+    "settings.object_cache_use_hardlinks": {
+        "default": "false",
+        "description": (
+            "Hard link the downloaded job attachments to the local object cache instead of copying them. "
+            "Only enable this if the downloaded files are not modified, since they share their contents, "
+            "permissions and modification times with the cached files."
+        ),
+    },
 }
 
 
@@ -82,6 +82,7 @@ class SubmitJobProgressDialog(QDialog):
     # These signals are sent when the background threads succeed.
     hashing_thread_succeeded = Signal(SummaryStatistics, list)
     upload_thread_succeeded = Signal(SummaryStatistics, dict)
+    hash_and_upload_thread_succeeded = Signal(SummaryStatistics, SummaryStatistics, dict)
     create_job_thread_succeeded = Signal(bool, str)
 
     # These signals are sent when the progress reporting callbacks are called
@@ -182,6 +183,8 @@ class SubmitJobProgressDialog(QDialog):
         self.upload_thread_succeeded.connect(self.handle_upload_thread_succeeded)
         self.upload_thread_exception.connect(self.handle_thread_exception)
 
+        self.hash_and_upload_thread_succeeded.connect(self.handle_hash_and_upload_thread_succeeded)
+
         self.create_job_thread_succeeded.connect(self.handle_create_job_thread_succeeded)
         self.create_job_thread_exception.connect(self.handle_thread_exception)
 
@@ -366,6 +369,61 @@ class SubmitJobProgressDialog(QDialog):
             # Send the exception to the dialog
             self.hashing_thread_exception.emit(e)
 
+    @api.record_success_fail_telemetry_event(metric_name="gui_asset_upload")  # type: ignore
+    def _hash_and_upload_background_thread(
+        self,
+        asset_groups: list[AssetRootGroup],
+        total_input_files: int,
+        total_input_bytes: int,
+    ) -> None:
+        """
+        This function gets started in a background thread to start the pipelined
+        hashing and upload of any job attachments.
+        """
+        try:
+
+            def _update_hash_progress(hashing_metadata: ProgressReportMetadata) -> bool:
+                self.hashing_thread_progress_report.emit(hashing_metadata)
+                return self._continue_submission
+
+            def _update_upload_progress(upload_metadata: ProgressReportMetadata) -> bool:
+                self.upload_thread_progress_report.emit(upload_metadata)
+                return self._continue_submission
+
+            logger.info("Hashing and uploading job attachments files...")
+
+            # This thread is only started if self._asset_manager is set.
+            hashing_summary, upload_summary, _, attachment_settings = cast(
+                S3AssetManager, self._asset_manager
+            ).hash_and_upload_assets(
+                asset_groups=asset_groups,
+                total_input_files=total_input_files,
+                total_input_bytes=total_input_bytes,
+                hash_cache_dir=config_file.get_cache_directory(),
+                s3_check_cache_dir=config_file.get_cache_directory(),
+                manifest_write_dir=self._job_bundle_dir,
+                on_preparing_to_submit=_update_hash_progress,
+                on_uploading_assets=_update_upload_progress,
+                single_read_upload=config_file.str2bool(
+                    config_file.get_setting("settings.single_read_upload")
+                ),
+            )
+
+            logger.info("Finished hashing and uploading job attachments files.")
+
+            self.hash_and_upload_thread_succeeded.emit(
+                hashing_summary, upload_summary, attachment_settings.to_dict()
+            )
+        except AssetSyncCancelledError as e:
+            # If it wasn't canceled, send the exception to the dialog
+            if self._continue_submission:
+                self.hashing_thread_exception.emit(e)
+            else:
+                logger.info("Job attachments hashing and upload canceled.")
+        except Exception as e:
+            # Send the exception to the dialog
+            self.hashing_thread_exception.emit(e)
+
     @api.record_success_fail_telemetry_event(metric_name="gui_asset_upload")  # type: ignore
     def _upload_background_thread(self, manifests: List[AssetRootManifest]) -> None:
         """
@@ -437,6 +495,7 @@ class SubmitJobProgressDialog(QDialog):
             else:
                 message = "CreateJob response was empty, or did not contain a job ID."
             if success:
+                api.clean_caches_in_time_budget()
                 self.create_job_thread_succeeded.emit(success, message)
             else:
                 self.create_job_thread_exception.emit(DeadlineOperationError(message))
@@ -457,8 +516,19 @@ class SubmitJobProgressDialog(QDialog):
         total_input_bytes: int,
     ) -> None:
         """
-        Starts the background hashing thread.
+        Starts the background hashing thread. If hashing and upload are pipelined,
+        the thread also uploads the job attachments.
         """
+        if config_file.str2bool(config_file.get_setting("settings.pipeline_hashing_and_upload")):
+            self.status_label.setText("Hashing and uploading job attachments...")
+            self.__hashing_thread = threading.Thread(
+                target=self._hash_and_upload_background_thread,
+                name="AWS Deadline Cloud hashing and upload background thread",
+                args=(asset_groups, total_input_files, total_input_bytes),
+            )
+            self.__hashing_thread.start()
+            return
+
         self.status_label.setText("Hashing job attachments...")
         self.__hashing_thread = threading.Thread(
             target=self._hashing_background_thread,
@@ -529,6 +599,24 @@ class SubmitJobProgressDialog(QDialog):
         )
         self._start_upload(asset_manifests)
 
+    def handle_hash_and_upload_thread_succeeded(
+        self,
+        hashing_summary: SummaryStatistics,
+        upload_summary: SummaryStatistics,
+        attachment_settings: Any,
+    ) -> None:
+        """
+        Handles the signal sent from the background thread when the pipelined
+        hashing and upload has finished.
+        """
+        api.get_deadline_cloud_library_telemetry_client().record_hashing_summary(
+            hashing_summary, from_gui=True
+        )
+        self.summary_edit.setText(
+            f"\nHashing summary:\n{textwrap.indent(str(hashing_summary), '    ')}"
+        )
+        self.handle_upload_thread_succeeded(upload_summary, attachment_settings)
+
     def handle_upload_thread_succeeded(
         self, upload_summary: SummaryStatistics, attachment_settings: Any
     ) -> None:
@@ -12,6 +12,7 @@ from deadline.job_attachments.asset_manifests.base_manifest import (
     BaseAssetManifest,
     BaseManifestPath,
 )
+from deadline.job_attachments.asset_manifests.compact_manifest import iter_path_strings
 from deadline.job_attachments.caches.hash_cache import HashCache
 from deadline.job_attachments.models import AssetRootManifest, FileStatus, ManifestDiff
 from deadline.job_attachments.upload import S3AssetManager
@@ -91,28 +92,33 @@ def compare_manifest(
     Compares two manifests, reference_manifest acting as the base, and compare_manifest acting as manifest with changes.
     Returns a list of FileStatus and BaseManifestPath
     """
-    reference_dict: Dict[str, BaseManifestPath] = {
-        manifest_path.path: manifest_path for manifest_path in reference_manifest.paths
+    # The paths are looked up by their index, so that compact paths are only turned into path objects
+    # when they are part of the differences.
+    reference_paths = reference_manifest.paths
+    compare_paths = compare_manifest.paths
+    reference_dict: Dict[str, int] = {
+        path: index for index, path in enumerate(iter_path_strings(reference_paths))
     }
-    compare_dict: Dict[str, BaseManifestPath] = {
-        manifest_path.path: manifest_path for manifest_path in compare_manifest.paths
+    compare_dict: Dict[str, int] = {
+        path: index for index, path in enumerate(iter_path_strings(compare_paths))
     }
 
     differences: List[(Tuple[FileStatus, BaseManifestPath])] = []
 
     # Find new files
-    for file_path, manifest_path in compare_dict.items():
+    for file_path, index in compare_dict.items():
+        manifest_path = compare_paths[index]
         if file_path not in reference_dict:
             differences.append((FileStatus.NEW, manifest_path))
-        elif reference_dict[file_path].hash != manifest_path.hash:
+        elif reference_paths[reference_dict[file_path]].hash != manifest_path.hash:
             differences.append((FileStatus.MODIFIED, manifest_path))
         else:
             differences.append((FileStatus.UNCHANGED, manifest_path))
 
     # Find deleted files
-    for file_path, manifest_path in reference_dict.items():
+    for file_path, index in reference_dict.items():
         if file_path not in compare_dict:
-            differences.append((FileStatus.DELETED, manifest_path))
+            differences.append((FileStatus.DELETED, reference_paths[index]))
 
     return differences
 
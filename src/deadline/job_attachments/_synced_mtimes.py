@@ -0,0 +1,150 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+
+""" Contains a compact record of the modification times of the files synced into a session. """
+from __future__ import annotations
+
+import os
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import xxhash
+
+from .asset_manifests import BaseManifestPath
+from .asset_manifests.compact_manifest import (
+    iter_path_hashes,
+    iter_path_mtimes,
+    iter_path_strings,
+)
+
+_UINT64_MASK = 0xFFFFFFFFFFFFFFFF
+_MAX_MTIME_NS = 2**63 - 1
+
+
+class SyncedAssetMtimes:
+    """
+    The modification times (in nanoseconds) of the files synced into a session, by local root and path
+    relative to it. This is used to determine which files have been modified or newly created during the
+    session, and need to be uploaded as output. The hashes of the files synced from a manifest are recorded
+    too, so that the files that were modified but have the same contents aren't uploaded as output.
+
+    Rather than keeping the absolute path of every file, each file is keyed by the 128-bit hash of its
+    relative path, seeded with the index of its local root. The files recorded from a manifest are kept in
+    sorted arrays of these keys, their modification times and the 64-bit hashes of their hashes, which are
+    bisected to look up a file. The files recorded one at a time are kept in a dictionary.
+    """
+
+    def __init__(self) -> None:
+        self._root_indexes: dict[str, int] = {}
+        # The arrays of the high and low halves of the keys, of the modification times, and of the hash
+        # digests, of each manifest recorded, sorted by key. Later manifests take precedence.
+        self._segments: List[Tuple[array, array, array, array]] = []
+        self._entries: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return sum(len(segment[2]) for segment in self._segments) + len(self._entries)
+
+    def get(self, local_root: str, relative_path: str) -> Optional[int]:
+        """
+        Returns the modification time recorded for the given file, or None if none was recorded.
+        """
+        key = self._get_key(local_root, relative_path)
+        mtime = self._entries.get(key)
+        if mtime is not None:
+            return mtime
+
+        found = self._find_in_segments(key)
+        if found is None:
+            return None
+        segment, index = found
+        return segment[2][index]
+
+    def has_hash(self, local_root: str, relative_path: str, file_hash: str) -> bool:
+        """
+        Returns whether the given file was recorded from a manifest with the given hash (and hasn't been
+        recorded one at a time since.)
+        """
+        key = self._get_key(local_root, relative_path)
+        if key in self._entries:
+            return False
+
+        found = self._find_in_segments(key)
+        if found is None:
+            return False
+        segment, index = found
+        return segment[3][index] == _get_hash_digest(file_hash)
+
+    def set(self, local_root: str, relative_path: str, mtime_ns: int) -> None:
+        """Records the modification time of the given file."""
+        self._entries[self._get_key(local_root, relative_path)] = mtime_ns
+
+    def record_manifest_paths(
+        self,
+        local_root: str,
+        paths: Sequence[BaseManifestPath],
+        mtimes_ns: Optional[Iterable[int]] = None,
+    ) -> None:
+        """
+        Records the modification times of the files of the given manifest paths, under the given local root.
+        If no modification times are given, the files are recorded with the modification times of the
+        manifest (which are in microseconds), as set on the files when they are downloaded.
+        """
+        if mtimes_ns is None:
+            mtimes_ns = (mtime * 1000 for mtime in iter_path_mtimes(paths))
+        root_index = self._get_root_index(local_root)
+        keys = [
+            xxhash.xxh3_128_intdigest(path.encode("utf-8", "surrogatepass"), seed=root_index)
+            for path in iter_path_strings(paths)
+        ]
+        mtimes = array("q", (min(mtime, _MAX_MTIME_NS) for mtime in mtimes_ns))
+        hash_digests = array(
+            "Q", (_get_hash_digest(path_hash) for path_hash in iter_path_hashes(paths))
+        )
+        order = sorted(range(len(keys)), key=lambda index: keys[index])
+
+        self._segments.append(
+            (
+                array("Q", (keys[index] >> 64 for index in order)),
+                array("Q", (keys[index] & _UINT64_MASK for index in order)),
+                array("q", (mtimes[index] for index in order)),
+                array("Q", (hash_digests[index] for index in order)),
+            )
+        )
+        if self._entries:
+            # The files recorded one at a time before are superseded by the manifest.
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def _find_in_segments(
+        self, key: int
+    ) -> Optional[Tuple[Tuple[array, array, array, array], int]]:
+        """Returns the latest segment that has the given key, with the index of the key in it."""
+        key_high, key_low = key >> 64, key & _UINT64_MASK
+        for segment in reversed(self._segments):
+            key_highs, key_lows = segment[0], segment[1]
+            index = bisect_left(key_highs, key_high)
+            while index < len(key_highs) and key_highs[index] == key_high:
+                if key_lows[index] == key_low:
+                    return (segment, index)
+                index += 1
+        return None
+
+    def _get_root_index(self, local_root: str) -> int:
+        local_root = str(Path(local_root))
+        root_index = self._root_indexes.get(local_root)
+        if root_index is None:
+            root_index = len(self._root_indexes)
+            self._root_indexes[local_root] = root_index
+        return root_index
+
+    def _get_key(self, local_root: str, relative_path: str) -> int:
+        if os.sep != "/":
+            relative_path = relative_path.replace(os.sep, "/")
+        return xxhash.xxh3_128_intdigest(
+            relative_path.encode("utf-8", "surrogatepass"), seed=self._get_root_index(local_root)
+        )
+
+
+def _get_hash_digest(file_hash: str) -> int:
+    return xxhash.xxh3_64_intdigest(file_hash.encode("utf-8", "surrogatepass"))
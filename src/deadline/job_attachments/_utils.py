@@ -19,8 +19,12 @@ __all__ = [
     "_get_unique_dest_dir_name",
     "_get_bucket_and_object_key",
     "_is_relative_to",
+    "_clone_file",
 ]
 
+# The Linux ioctl request code that clones a file as a reflink, on file systems that support it.
+FICLONE = 0x40049409
+
 
 def _join_s3_paths(root: str, *args: str):
     return "/".join([root, *args])
@@ -105,6 +109,24 @@ def _is_windows_file_path_limit() -> bool:
     return bool(ntdll.RtlAreLongPathsEnabled())
 
 
+def _clone_file(source_path: Union[Path, str], destination_path: Union[Path, str]) -> bool:
+    """
+    Clones the source file to the destination as a reflink, which shares the data blocks of the source
+    file until either file is written to. Returns False if the file system doesn't support it.
+    """
+    if sys.platform != "linux":
+        return False
+
+    import fcntl
+
+    with open(source_path, "rb") as source, open(destination_path, "wb") as destination:
+        try:
+            fcntl.ioctl(destination.fileno(), FICLONE, source.fileno())
+        except OSError:
+            return False
+    return True
+
+
 def _retry(
     ExceptionToCheck: Union[Type[Exception], Tuple[Type[Exception], ...]] = AssertionError,
     tries: int = 2,
@@ -24,3 +24,14 @@ VOLUME_NAME_DOS = 0
 VOLUME_NAME_GUID = 1
 VOLUME_NAME_NONE = 4
 VOLUME_NAME_NT = 2
+
+# https://learn.microsoft.com/en-us/windows/win32/api/fileapi/nf-fileapi-getdrivetypew
+kernel32.GetDriveTypeW.restype = ctypes.wintypes.UINT
+kernel32.GetDriveTypeW.argtypes = [
+    ctypes.wintypes.LPCWSTR,  # [in, optional] LPCWSTR lpRootPathName
+]
+GetDriveTypeW = kernel32.GetDriveTypeW
+
+DRIVE_FIXED = 3
+DRIVE_REMOTE = 4
+DRIVE_RAMDISK = 6
@@ -4,13 +4,13 @@ import os
 import boto3
 import json
 
-from contextlib import ExitStack
 from typing import Optional, List, Dict
 from pathlib import Path
 from dataclasses import asdict
 
 from deadline.job_attachments.asset_manifests.base_manifest import BaseAssetManifest
-from deadline.job_attachments.asset_manifests.decode import decode_manifest
+from deadline.job_attachments.asset_manifests.binary_manifest import read_local_manifest
+from deadline.job_attachments.caches import ObjectCache
 from deadline.job_attachments.download import download_files_from_manifests
 from deadline.job_attachments.models import JobAttachmentS3Settings, PathMappingRule
 from deadline.job_attachments.progress_tracker import DownloadSummaryStatistics
@@ -73,12 +73,16 @@ def attachment_download(
 
     # Given manifests and S3 bucket + root, downloads all files from a CAS in each manifest.
     s3_settings: JobAttachmentS3Settings = JobAttachmentS3Settings.from_s3_root_uri(s3_root_uri)
+    object_cache: Optional[ObjectCache] = ObjectCache.from_config()
     download_summary: DownloadSummaryStatistics = download_files_from_manifests(
         s3_bucket=s3_settings.s3BucketName,
         manifests_by_root=merged_manifests_by_root,
         cas_prefix=s3_settings.full_cas_prefix(),
         session=boto3_session,
+        object_cache=object_cache,
     )
+    if object_cache is not None:
+        object_cache.evict()
     logger.echo(download_summary)
     logger.json(asdict(download_summary.convert_to_summary_statistics()))
 
@@ -231,12 +235,8 @@ def _read_manifests(manifests: List[str]) -> Dict[str, BaseAssetManifest]:
     if nonvalid_files := [manifest for manifest in manifests if not os.path.isfile(manifest)]:
         raise NonValidInputError(f"Specified manifests {nonvalid_files} are not valid.")
 
-    with ExitStack() as stack:
-        file_name_manifest_dict: Dict[str, BaseAssetManifest] = {
-            os.path.basename(file_path): decode_manifest(
-                stack.enter_context(open(file_path)).read()
-            )
-            for file_path in manifests
-        }
+    file_name_manifest_dict: Dict[str, BaseAssetManifest] = {
+        os.path.basename(file_path): read_local_manifest(file_path) for file_path in manifests
+    }
 
     return file_name_manifest_dict
@@ -20,7 +20,10 @@ from deadline.job_attachments.asset_manifests.base_manifest import (
     BaseManifestPath,
 )
 from deadline.client.config import config_file
-from deadline.job_attachments.asset_manifests.decode import decode_manifest
+from deadline.job_attachments.asset_manifests.binary_manifest import (
+    read_local_manifest,
+    write_manifest_sidecar,
+)
 from deadline.job_attachments.asset_manifests.hash_algorithms import hash_data
 from deadline.job_attachments.caches.hash_cache import HashCache
 from deadline.job_attachments.download import (
@@ -89,6 +92,7 @@ def _manifest_snapshot(
     diff: Optional[str] = None,
     force_rehash: bool = False,
     logger: ClickLogger = ClickLogger(False),
+    write_sidecar: bool = False,
 ) -> Optional[ManifestSnapshot]:
 
     # Get all files in the root.
@@ -118,9 +122,7 @@ def _manifest_snapshot(
     # If this is a diff manifest, load the supplied manifest file.
     else:
         # Parse local manifest
-        with open(diff) as source_diff:
-            source_manifest_str = source_diff.read()
-            source_manifest = decode_manifest(source_manifest_str)
+        source_manifest = read_local_manifest(diff)
 
         # Get the differences
         changed_paths: List[str] = []
@@ -177,7 +179,9 @@ def _manifest_snapshot(
         local_manifest_file = os.path.join(destination, manifest_name)
         os.makedirs(os.path.dirname(local_manifest_file), exist_ok=True)
         with open(local_manifest_file, "w") as file:
-            file.write(output_manifest.encode())
+            output_manifest.encode_to(file)
+        if write_sidecar:
+            write_manifest_sidecar(output_manifest, local_manifest_file)
 
         # Output results.
         logger.echo(f"Manifest Generated at {local_manifest_file}\n")
@@ -219,10 +223,7 @@ def _manifest_diff(
     asset_manager = S3AssetManager()
 
     # parse the given manifest to compare against.
-    local_manifest_object: BaseAssetManifest
-    with open(manifest) as input_file:
-        manifest_data_str = input_file.read()
-        local_manifest_object = decode_manifest(manifest_data_str)
+    local_manifest_object: BaseAssetManifest = read_local_manifest(manifest)
 
     output: ManifestDiff = ManifestDiff()
 
@@ -439,7 +440,7 @@ def _manifest_download(
 
         local_manifest_file_path = os.path.join(download_dir, manifest_name)
         with open(local_manifest_file_path, "w") as file:
-            file.write(merged_manifests[root].encode())
+            merged_manifests[root].encode_to(file)
         successful_downloads.append(
             ManifestDownload(manifest_root=root, local_manifest_path=str(local_manifest_file_path))
         )
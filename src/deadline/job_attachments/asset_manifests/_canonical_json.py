@@ -4,10 +4,19 @@
 from __future__ import annotations
 
 import dataclasses
+import io
 import json
+import re
+from functools import lru_cache
+from json.encoder import encode_basestring_ascii
+from typing import IO, Any
 
 from .base_manifest import BaseAssetManifest, BaseManifestPath
 
+# Matches the characters whose order differs between their code points and their UTF-16 encoding
+# (surrogates, and the characters encoded as surrogate pairs).
+_NON_BMP_ORDER_REGEX = re.compile("[\ud800-\U0010ffff]")
+
 
 def canonical_path_comparator(path: BaseManifestPath):
     """
@@ -20,6 +29,72 @@ def canonical_path_comparator(path: BaseManifestPath):
     return path.path.encode("utf-16_be", errors="surrogatepass")
 
 
+def sort_paths_canonically(paths: list[BaseManifestPath]) -> None:
+    """
+    Sorts the given paths in place, in the order of canonical_path_comparator. If no path has
+    characters from U+D800 up, the UTF-16 order of the paths is the order of their code points,
+    so they are sorted as strings, without encoding every path.
+    """
+    if any(_NON_BMP_ORDER_REGEX.search(path.path) for path in paths):
+        paths.sort(key=canonical_path_comparator)
+    else:
+        paths.sort(key=_get_path)
+
+
+def _get_path(path: BaseManifestPath) -> str:
+    return path.path
+
+
+def _encode_value(value: Any) -> str:
+    """Encodes a value as json.dumps does with the canonical JSON options."""
+    value_type = type(value)
+    if value_type is str:
+        return encode_basestring_ascii(value)
+    if value_type is int:
+        return int.__repr__(value)
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=True)
+
+
+@lru_cache(maxsize=None)
+def _get_sorted_field_names(dataclass_type: type) -> tuple[str, ...]:
+    return tuple(sorted(field.name for field in dataclasses.fields(dataclass_type)))
+
+
+def write_canonical_json(manifest: BaseAssetManifest, stream: IO[str]) -> None:
+    """
+    Writes the canonicalized JSON string of the manifest (see manifest_to_canonical_json_string)
+    to the given stream, one path at a time, rather than building a dictionary of the whole manifest.
+    The paths *MUST* already be sorted.
+    """
+    write = stream.write
+    separator = "{"
+    for name in _get_sorted_field_names(type(manifest)):
+        write(f"{separator}{encode_basestring_ascii(name)}:")
+        separator = ","
+        value = getattr(manifest, name)
+        if name != "paths":
+            write(_encode_value(value))
+            continue
+
+        write("[")
+        path_type: Any = None
+        path_separator = ""
+        for path in value:
+            if type(path) is not path_type:
+                path_type = type(path)
+                path_fields = [
+                    (f"{encode_basestring_ascii(field_name)}:", field_name)
+                    for field_name in _get_sorted_field_names(path_type)
+                ]
+            path_json = ",".join(
+                key + _encode_value(getattr(path, field_name)) for key, field_name in path_fields
+            )
+            write(f"{path_separator}{{{path_json}}}")
+            path_separator = ","
+        write("]")
+    write("}")
+
+
 def manifest_to_canonical_json_string(manifest: BaseAssetManifest) -> str:
     """
     Return a canonicalized JSON string based on the following:
@@ -32,6 +107,6 @@ def manifest_to_canonical_json_string(manifest: BaseAssetManifest) -> str:
             and this version of the Asset Manifest only serializes strings and integers.
     * The paths array *MUST* be in lexicographical order by path.
     """
-    return json.dumps(
-        dataclasses.asdict(manifest), sort_keys=True, separators=(",", ":"), ensure_ascii=True
-    )
+    with io.StringIO() as stream:
+        write_canonical_json(manifest, stream)
+        return stream.getvalue()
@@ -5,7 +5,7 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, fields
-from typing import Any, ClassVar
+from typing import IO, Any, ClassVar
 
 from .hash_algorithms import HashAlgorithm
 from .versions import ManifestVersion
@@ -17,6 +17,9 @@ class BaseManifestPath(ABC):
     Data class for paths in the Asset Manifest
     """
 
+    # Manifests can have millions of paths, so paths don't have a per-instance __dict__.
+    __slots__ = ("path", "hash", "size", "mtime")
+
     path: str
     hash: str
     size: int
@@ -79,3 +82,11 @@ class BaseAssetManifest(ABC):
         whatever format the Asset Manifest was written for.
         """
         raise NotImplementedError("Asset Manifest base class does not implement encode")
+
+    def encode_to(self, stream: IO[str]) -> None:
+        """
+        Encode the Asset Manifest into the given text stream (such as a file), as encode does.
+        Versions of the Asset Manifest can override this to write the manifest without building
+        its whole string first.
+        """
+        stream.write(self.encode())
@@ -0,0 +1,353 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+
+"""
+Contains a binary format of Asset Manifests, which can be written next to a local manifest file as a
+sidecar, so that the manifest is loaded without parsing its JSON. The canonical JSON remains the
+format of the manifests uploaded to S3; the sidecar is only a local acceleration.
+"""
+from __future__ import annotations
+
+import dataclasses
+import json
+import logging
+import operator
+import os
+import struct
+import sys
+import uuid
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Iterator, Optional, Sequence, Type, Union, overload
+
+from ..exceptions import ManifestDecodeValidationError
+from ._canonical_json import _encode_value, sort_paths_canonically
+from .base_manifest import BaseAssetManifest, BaseManifestPath
+from .decode import decode_manifest
+from .manifest_model import ManifestModelRegistry
+from .versions import ManifestVersion
+
+logger = logging.getLogger("Deadline")
+
+SIDECAR_SUFFIX = ".bin"
+
+# The binary format, in little-endian byte order:
+# * The header: the magic bytes, the format version, a reserved field, the size and modification time
+#   (in nanoseconds) of the JSON manifest file the sidecar was written for (or zeros), the number of
+#   paths and the length of the manifest fields.
+# * The canonical JSON of the fields of the manifest other than its paths, padded to 8 bytes.
+# * The columns of the paths, in canonical order: the sizes and modification times (int64), the end
+#   offsets of the paths and of the hashes in their buffers (uint64), then the UTF-8 buffer of the
+#   paths and the buffer of the hashes.
+_MAGIC = b"DLMANBIN"
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sIIqqQQ")
+_ALIGNMENT = 8
+
+
+class BinaryManifestPaths(Sequence[BaseManifestPath]):
+    """
+    The paths of a manifest loaded from the binary format. The paths are read from the columns of the
+    loaded data, and path objects are created when they are accessed. The paths are in canonical
+    order, so a path can be looked up without reading every path.
+    """
+
+    def __init__(
+        self,
+        path_type: Type[BaseManifestPath],
+        sizes: array,
+        mtimes: array,
+        path_ends: array,
+        hash_ends: array,
+        path_buffer: memoryview,
+        hash_buffer: memoryview,
+    ) -> None:
+        self.path_type = path_type
+        self._sizes = sizes
+        self._mtimes = mtimes
+        self._path_ends = path_ends
+        self._hash_ends = hash_ends
+        self._path_buffer = path_buffer
+        self._hash_buffer = hash_buffer
+        # The order of the rows, if the paths were sorted in a different order than they are stored.
+        self._order: Optional[array] = None
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    @overload
+    def __getitem__(self, index: int) -> BaseManifestPath: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[BaseManifestPath]: ...
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[BaseManifestPath, list[BaseManifestPath]]:
+        if isinstance(index, slice):
+            return [self._get_path_object(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("manifest path index out of range")
+        return self._get_path_object(index)
+
+    def __iter__(self) -> Iterator[BaseManifestPath]:
+        for index in range(len(self)):
+            yield self._get_path_object(index)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, (str, bytes)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self)!r})"
+
+    def get_path(self, index: int) -> str:
+        """Returns the path (relative to its root) at the given index."""
+        return self._get_row_path(self._get_row(index))
+
+    def iter_paths(self) -> Iterator[str]:
+        """Iterates over the paths (relative to their root), without creating path objects."""
+        for index in range(len(self)):
+            yield self.get_path(index)
+
+    def iter_mtimes(self) -> Iterator[int]:
+        """Iterates over the modification times of the paths, without creating path objects."""
+        for index in range(len(self)):
+            yield self._mtimes[self._get_row(index)]
+
+    def iter_hashes(self) -> Iterator[str]:
+        """Iterates over the hashes of the paths, without creating path objects."""
+        for index in range(len(self)):
+            yield self._get_row_hash(self._get_row(index))
+
+    def find(self, path: str) -> Optional[BaseManifestPath]:
+        """Returns the manifest path with the given relative path, or None if there is none."""
+        key = _get_canonical_key(path)
+        row = bisect_left(_CanonicalKeys(self), key)
+        if row < len(self) and self._get_row_path(row) == path:
+            return self._get_row_object(row)
+        return None
+
+    def sort(self, *, key=None, reverse=False) -> None:
+        """Sorts the paths in place, as list.sort does, without reordering the loaded columns."""
+        keys: list[Any] = list(self) if key is None else [key(path) for path in self]
+        order = sorted(range(len(self)), key=lambda index: keys[index], reverse=reverse)
+        keys.clear()
+        if order == list(range(len(self))):
+            return
+        self._order = array("Q", (self._get_row(index) for index in order))
+
+    def _get_row(self, index: int) -> int:
+        return index if self._order is None else self._order[index]
+
+    def _get_row_path(self, row: int) -> str:
+        start = self._path_ends[row - 1] if row else 0
+        return str(self._path_buffer[start : self._path_ends[row]], "utf-8", "surrogatepass")
+
+    def _get_row_hash(self, row: int) -> str:
+        hash_start = self._hash_ends[row - 1] if row else 0
+        return str(self._hash_buffer[hash_start : self._hash_ends[row]], "ascii")
+
+    def _get_row_object(self, row: int) -> BaseManifestPath:
+        return self.path_type(
+            path=self._get_row_path(row),
+            hash=self._get_row_hash(row),
+            size=self._sizes[row],
+            mtime=self._mtimes[row],
+        )
+
+    def _get_path_object(self, index: int) -> BaseManifestPath:
+        return self._get_row_object(self._get_row(index))
+
+
+class _CanonicalKeys(Sequence[bytes]):
+    """The canonical sort keys of the stored rows of binary manifest paths, for bisecting them."""
+
+    def __init__(self, paths: BinaryManifestPaths) -> None:
+        self._paths = paths
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def __getitem__(self, row):  # type: ignore[override]
+        return _get_canonical_key(self._paths._get_row_path(row))
+
+
+def _get_canonical_key(path: str) -> bytes:
+    return path.encode("utf-16_be", errors="surrogatepass")
+
+
+def _to_little_endian(column: array) -> bytes:
+    if sys.byteorder == "big":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _read_column(typecode: str, data: memoryview, offset: int, count: int) -> tuple[array, int]:
+    column = array(typecode)
+    end = offset + count * column.itemsize
+    column.frombytes(data[offset:end])
+    if sys.byteorder == "big":
+        column.byteswap()
+    return (column, end)
+
+
+def encode_binary_manifest(
+    manifest: BaseAssetManifest, source_stat: Optional[os.stat_result] = None
+) -> bytes:
+    """
+    Encodes the manifest in the binary format. The paths of the manifest are sorted in canonical order.
+    If the stat of a JSON manifest file is given, it is recorded so that the sidecar is only used
+    while that file is unchanged.
+    """
+    sort_paths_canonically(manifest.paths)
+    manifest_fields = ",".join(
+        f'"{field.name}":{_encode_value(getattr(manifest, field.name))}'
+        for field in sorted(dataclasses.fields(manifest), key=lambda field: field.name)
+        if field.name != "paths"
+    )
+    fields_json = f"{{{manifest_fields}}}".encode("utf-8")
+
+    sizes, mtimes, path_ends, hash_ends = array("q"), array("q"), array("Q"), array("Q")
+    path_buffer, hash_buffer = bytearray(), bytearray()
+    for path in manifest.paths:
+        sizes.append(path.size)
+        mtimes.append(path.mtime)
+        path_buffer += path.path.encode("utf-8", "surrogatepass")
+        path_ends.append(len(path_buffer))
+        hash_buffer += path.hash.encode("ascii")
+        hash_ends.append(len(hash_buffer))
+
+    header = _HEADER.pack(
+        _MAGIC,
+        _FORMAT_VERSION,
+        0,
+        source_stat.st_size if source_stat else 0,
+        source_stat.st_mtime_ns if source_stat else 0,
+        len(sizes),
+        len(fields_json),
+    )
+    padding = bytes(-(len(header) + len(fields_json)) % _ALIGNMENT)
+    return b"".join(
+        [
+            header,
+            fields_json,
+            padding,
+            *(_to_little_endian(column) for column in (sizes, mtimes, path_ends, hash_ends)),
+            path_buffer,
+            hash_buffer,
+        ]
+    )
+
+
+def decode_binary_manifest(
+    data: bytes, source_stat: Optional[os.stat_result] = None
+) -> BaseAssetManifest:
+    """
+    Loads a manifest from the binary format. If the stat of a JSON manifest file is given, the data must
+    have been encoded for that file as it is now. Raises a ManifestDecodeValidationError if the data
+    isn't a manifest in the binary format (or is out of date), or if its hashes aren't all alphanumeric.
+    """
+    view = memoryview(data)
+    try:
+        magic, format_version, _, json_size, json_mtime_ns, path_count, fields_length = (
+            _HEADER.unpack_from(view)
+        )
+    except struct.error as e:
+        raise ManifestDecodeValidationError(f"Binary manifest is truncated: {e}") from e
+    if magic != _MAGIC or format_version != _FORMAT_VERSION:
+        raise ManifestDecodeValidationError("Data is not a binary manifest of a supported version")
+    if source_stat is not None and (json_size, json_mtime_ns) != (
+        source_stat.st_size,
+        source_stat.st_mtime_ns,
+    ):
+        raise ManifestDecodeValidationError("Binary manifest is out of date")
+
+    offset = _HEADER.size + fields_length
+    try:
+        document: dict[str, Any] = json.loads(bytes(view[_HEADER.size : offset]))
+        manifest_model = ManifestModelRegistry.get_manifest_model(
+            version=ManifestVersion(document["manifestVersion"])
+        )
+    except (ValueError, KeyError) as e:
+        raise ManifestDecodeValidationError(f"Binary manifest fields are not valid: {e}") from e
+    offset += -offset % _ALIGNMENT
+    # The four columns of 8-byte integers.
+    if len(view) < offset + 32 * path_count:
+        raise ManifestDecodeValidationError("Binary manifest is truncated")
+    sizes, offset = _read_column("q", view, offset, path_count)
+    mtimes, offset = _read_column("q", view, offset, path_count)
+    path_ends, offset = _read_column("Q", view, offset, path_count)
+    hash_ends, offset = _read_column("Q", view, offset, path_count)
+    path_buffer_size = path_ends[-1] if path_count else 0
+    hash_buffer_size = hash_ends[-1] if path_count else 0
+    if len(view) != offset + path_buffer_size + hash_buffer_size:
+        raise ManifestDecodeValidationError("Binary manifest is truncated")
+    hash_buffer = view[offset + path_buffer_size :]
+    # As for JSON manifests, the hashes must be alphanumeric, since they are used in S3 keys and file paths.
+    # They are checked once here, rather than when each path is read.
+    if path_count and not (
+        all(map(operator.le, path_ends, path_ends[1:]))
+        and hash_ends[0] > 0
+        and all(map(operator.lt, hash_ends, hash_ends[1:]))
+        and bytes(hash_buffer).isalnum()
+    ):
+        raise ManifestDecodeValidationError("Binary manifest hashes are not all alphanumeric")
+
+    manifest = manifest_model.AssetManifest.decode(manifest_data={**document, "paths": []})
+    manifest.paths = BinaryManifestPaths(  # type: ignore[assignment]
+        manifest_model.Path,
+        sizes,
+        mtimes,
+        path_ends,
+        hash_ends,
+        view[offset : offset + path_buffer_size],
+        hash_buffer,
+    )
+    return manifest
+
+
+def get_sidecar_path(manifest_path: Union[str, Path]) -> Path:
+    """Returns the path of the binary sidecar of the given JSON manifest file."""
+    return Path(f"{manifest_path}{SIDECAR_SUFFIX}")
+
+
+def write_manifest_sidecar(manifest: BaseAssetManifest, manifest_path: Union[str, Path]) -> None:
+    """
+    Writes the binary sidecar of the given JSON manifest file, which must already be written with the
+    given manifest. Failing to write the sidecar only logs a warning, since the sidecar is optional.
+    """
+    sidecar_path = get_sidecar_path(manifest_path)
+    temp_path = sidecar_path.with_name(f"{sidecar_path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        data = encode_binary_manifest(manifest, os.stat(manifest_path))
+        temp_path.write_bytes(data)
+        os.replace(temp_path, sidecar_path)
+    except OSError as e:
+        logger.warning(f"Failed to write the binary sidecar of {str(manifest_path)}: {e}")
+        try:
+            temp_path.unlink()
+        except OSError:
+            pass
+
+
+def read_local_manifest(manifest_path: Union[str, Path]) -> BaseAssetManifest:
+    """
+    Reads a local JSON manifest file. If the file has an up-to-date binary sidecar, the manifest is
+    loaded from the sidecar, without parsing the JSON.
+    """
+    try:
+        source_stat = os.stat(manifest_path)
+        sidecar_data = get_sidecar_path(manifest_path).read_bytes()
+        return decode_binary_manifest(sidecar_data, source_stat)
+    except FileNotFoundError:
+        pass
+    except (OSError, ManifestDecodeValidationError) as e:
+        logger.debug(f"Ignoring the binary sidecar of {str(manifest_path)}: {e}")
+
+    with open(manifest_path) as manifest_file:
+        return decode_manifest(manifest_file.read())
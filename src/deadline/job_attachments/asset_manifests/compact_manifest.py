@@ -0,0 +1,239 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+
+""" Contains a compact, columnar representation of the paths of an Asset Manifest. """
+from __future__ import annotations
+
+import re
+from array import array
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence, Type, Union, overload
+
+from .base_manifest import BaseAssetManifest, BaseManifestPath
+from .binary_manifest import BinaryManifestPaths
+from .hash_algorithms import HashAlgorithm
+
+# The number of bytes of the hashes of each hashing algorithm.
+_HASH_SIZES: dict[HashAlgorithm, int] = {HashAlgorithm.XXH128: 16}
+_LOWERCASE_HEX_REGEX = re.compile("[0-9a-f]*")
+
+
+class CompactManifestPaths(Sequence[BaseManifestPath]):
+    """
+    The paths of an Asset Manifest, stored in columns rather than as one object per path:
+    * The directory of each path is an index into a table of the unique directories, and the rest of
+      each path is stored in a single UTF-8 buffer.
+    * The hashes are stored as fixed-width bytes. Hashes that can't be stored that way (such as hashes
+      that aren't lowercase hexadecimal) are kept as strings.
+    * The sizes and modification times are stored in arrays of 64-bit integers.
+
+    This takes a fraction of the memory of a list of path objects. The paths are still available as
+    path objects, which are created when they are accessed, so this can be used (mostly) as the list
+    of paths of a manifest. Unlike a list, paths can only be appended, not replaced or removed.
+    """
+
+    def __init__(
+        self,
+        path_type: Type[BaseManifestPath],
+        hash_alg: HashAlgorithm,
+        paths: Iterable[BaseManifestPath] = (),
+    ) -> None:
+        self.path_type = path_type
+        self.hash_alg = hash_alg
+        self._hash_size = _HASH_SIZES.get(hash_alg, 0)
+        self._directories: list[str] = []
+        self._directory_ids: dict[str, int] = {}
+        self._path_directories = array("I")
+        self._names = bytearray()
+        self._name_ends = array("Q")
+        self._hashes = bytearray()
+        # The hashes that aren't in the hash column, by the index of their path.
+        self._other_hashes: dict[int, str] = {}
+        self._sizes = array("q")
+        self._mtimes = array("q")
+        self.extend(paths)
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    @overload
+    def __getitem__(self, index: int) -> BaseManifestPath: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[BaseManifestPath]: ...
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[BaseManifestPath, list[BaseManifestPath]]:
+        if isinstance(index, slice):
+            return [self._get_path_object(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("manifest path index out of range")
+        return self._get_path_object(index)
+
+    def __iter__(self) -> Iterator[BaseManifestPath]:
+        for index in range(len(self)):
+            yield self._get_path_object(index)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, (CompactManifestPaths, list)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self)!r})"
+
+    def append(self, path: BaseManifestPath) -> None:
+        """Adds a path to the end of the paths."""
+        self._append(path.path, path.hash, path.size, path.mtime)
+
+    def extend(self, paths: Iterable[BaseManifestPath]) -> None:
+        """Adds the given paths to the end of the paths."""
+        if isinstance(paths, CompactManifestPaths):
+            for index in range(len(paths)):
+                self.append_from(paths, index)
+            return
+        for path in paths:
+            self.append(path)
+
+    def append_from(self, paths: Sequence[BaseManifestPath], index: int) -> None:
+        """
+        Adds the path at the given index of the given paths to the end of the paths. If the paths are
+        also compact, the path is copied from their columns without creating a path object.
+        """
+        if isinstance(paths, CompactManifestPaths):
+            self._append(
+                paths.get_path(index), paths.get_hash(index), *paths._get_size_mtime(index)
+            )
+        else:
+            self.append(paths[index])
+
+    def get_path(self, index: int) -> str:
+        """Returns the path (relative to its root) at the given index."""
+        name_start = self._name_ends[index - 1] if index else 0
+        name = self._names[name_start : self._name_ends[index]].decode("utf-8", "surrogatepass")
+        return self._directories[self._path_directories[index]] + name
+
+    def get_hash(self, index: int) -> str:
+        """Returns the hash of the path at the given index."""
+        other_hash = self._other_hashes.get(index)
+        if other_hash is not None:
+            return other_hash
+        hash_start = index * self._hash_size
+        return self._hashes[hash_start : hash_start + self._hash_size].hex()
+
+    def iter_paths(self) -> Iterator[str]:
+        """Iterates over the paths (relative to their root), without creating path objects."""
+        for index in range(len(self)):
+            yield self.get_path(index)
+
+    def iter_mtimes(self) -> Iterator[int]:
+        """Iterates over the modification times of the paths, without creating path objects."""
+        return iter(self._mtimes)
+
+    def iter_hashes(self) -> Iterator[str]:
+        """Iterates over the hashes of the paths, without creating path objects."""
+        for index in range(len(self)):
+            yield self.get_hash(index)
+
+    def get_total_size(self) -> int:
+        """Returns the sum of the sizes of the paths."""
+        return sum(self._sizes)
+
+    def sort(
+        self, *, key: Optional[Callable[[BaseManifestPath], Any]] = None, reverse=False
+    ) -> None:
+        """Sorts the paths in place, as list.sort does."""
+        keys: list[Any] = list(self) if key is None else [key(path) for path in self]
+        order = sorted(range(len(self)), key=lambda index: keys[index], reverse=reverse)
+        keys.clear()
+        if order == list(range(len(self))):
+            return
+        reordered = CompactManifestPaths(self.path_type, self.hash_alg)
+        for index in order:
+            reordered.append_from(self, index)
+        self.__dict__.update(reordered.__dict__)
+
+    def _get_size_mtime(self, index: int) -> tuple[int, int]:
+        return (self._sizes[index], self._mtimes[index])
+
+    def _get_path_object(self, index: int) -> BaseManifestPath:
+        return self.path_type(
+            path=self.get_path(index),
+            hash=self.get_hash(index),
+            size=self._sizes[index],
+            mtime=self._mtimes[index],
+        )
+
+    def _append(self, path: str, hash: str, size: int, mtime: int) -> None:
+        index = len(self)
+        # The numbers are appended first, since they are the only values that can fail to be stored.
+        self._sizes.append(size)
+        try:
+            self._mtimes.append(mtime)
+        except BaseException:
+            self._sizes.pop()
+            raise
+
+        directory, separator, name = path.rpartition("/")
+        directory += separator
+        directory_id = self._directory_ids.get(directory)
+        if directory_id is None:
+            directory_id = len(self._directories)
+            self._directories.append(directory)
+            self._directory_ids[directory] = directory_id
+        self._path_directories.append(directory_id)
+        self._names += name.encode("utf-8", "surrogatepass")
+        self._name_ends.append(len(self._names))
+
+        if (
+            self._hash_size
+            and len(hash) == 2 * self._hash_size
+            and _LOWERCASE_HEX_REGEX.fullmatch(hash)
+        ):
+            self._hashes += bytes.fromhex(hash)
+        else:
+            self._hashes += bytes(self._hash_size)
+            self._other_hashes[index] = hash
+
+
+def compact_manifest(manifest: BaseAssetManifest) -> BaseAssetManifest:
+    """
+    Replaces the list of paths of the given manifest with CompactManifestPaths, in place, to reduce
+    the memory that holding the manifest takes. Returns the manifest.
+    """
+    if not isinstance(manifest.paths, CompactManifestPaths) and manifest.paths:
+        manifest.paths = CompactManifestPaths(  # type: ignore[assignment]
+            type(manifest.paths[0]), manifest.hashAlg, manifest.paths
+        )
+    return manifest
+
+
+def iter_path_strings(paths: Sequence[BaseManifestPath]) -> Iterator[str]:
+    """
+    Iterates over the relative paths of the given manifest paths, without creating path objects if
+    the paths are compact (or loaded from a binary manifest).
+    """
+    if isinstance(paths, (CompactManifestPaths, BinaryManifestPaths)):
+        return paths.iter_paths()
+    return (path.path for path in paths)
+
+
+def iter_path_mtimes(paths: Sequence[BaseManifestPath]) -> Iterator[int]:
+    """
+    Iterates over the modification times (in microseconds) of the given manifest paths, without creating
+    path objects if the paths are compact (or loaded from a binary manifest).
+    """
+    if isinstance(paths, (CompactManifestPaths, BinaryManifestPaths)):
+        return paths.iter_mtimes()
+    return (path.mtime for path in paths)
+
+
+def iter_path_hashes(paths: Sequence[BaseManifestPath]) -> Iterator[str]:
+    """
+    Iterates over the hashes of the given manifest paths, without creating path objects if the paths
+    are compact (or loaded from a binary manifest).
+    """
+    if isinstance(paths, (CompactManifestPaths, BinaryManifestPaths)):
+        return paths.iter_hashes()
+    return (path.hash for path in paths)
@@ -5,6 +5,7 @@ from __future__ import annotations
 
 import json
 import re
+import threading
 from pathlib import Path
 from typing import Any, Optional, Tuple
 
@@ -12,11 +13,18 @@ import jsonschema
 
 from ..exceptions import ManifestDecodeValidationError
 from .base_manifest import BaseAssetManifest
+from .hash_algorithms import HashAlgorithm
 from .manifest_model import ManifestModelRegistry
 from .versions import ManifestVersion
 
 alphanum_regex = re.compile("[a-zA-Z0-9]+")
 
+# The schema validator of each manifest version, which is created (and its schema checked) once.
+# jsonschema resolves the references of the metaschemas lazily, which isn't thread-safe, so the
+# validators are created under a lock. Validating with a created validator is thread-safe.
+_validators: dict[ManifestVersion, Any] = {}
+_validators_lock = threading.Lock()
+
 
 def _get_schema(version) -> dict[str, Any]:
     schema_filename = Path(__file__).parent.joinpath("schemas", version + ".json").resolve()
@@ -25,6 +33,22 @@ def _get_schema(version) -> dict[str, Any]:
         return json.load(schema_file)
 
 
+def _get_validator(version: ManifestVersion) -> Any:
+    """
+    Returns the schema validator of the given manifest version, creating it on first use.
+    Raises a jsonschema.SchemaError if the schema of the version isn't valid.
+    """
+    with _validators_lock:
+        validator = _validators.get(version)
+        if validator is None:
+            schema = _get_schema(version)
+            validator_class = jsonschema.validators.validator_for(schema)
+            validator_class.check_schema(schema)
+            validator = validator_class(schema)
+            _validators[version] = validator
+        return validator
+
+
 def validate_manifest(
     manifest: dict[str, Any], version: ManifestVersion
 ) -> Tuple[bool, Optional[str]]:
@@ -33,7 +57,10 @@ def validate_manifest(
     is valid for the given version. Returns False and a string explaining the error if the manifest is not valid.
     """
     try:
-        jsonschema.validate(manifest, _get_schema(version))
+        # Reports the same error as jsonschema.validate, without checking the schema on every call.
+        error = jsonschema.exceptions.best_match(_get_validator(version).iter_errors(manifest))
+        if error is not None:
+            raise error
 
     except (jsonschema.ValidationError, jsonschema.SchemaError) as e:
         return False, str(e)
@@ -41,11 +68,66 @@ def validate_manifest(
     return True, None
 
 
-def decode_manifest(manifest: str) -> BaseAssetManifest:
+def _is_integer(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_non_negative_integer(value: Any) -> bool:
+    return _is_integer(value) and value >= 0
+
+
+def _check_manifest_structure(manifest: dict[str, Any]) -> None:
+    """
+    Checks that the given manifest has the fields (and field types) that decoding it relies on,
+    which is much faster than validating it against its schema. Only used for trusted manifests.
+    """
+    paths = manifest.get("paths")
+    hash_alg = manifest.get("hashAlg")
+    if not isinstance(hash_alg, str):
+        raise ManifestDecodeValidationError('Manifest is missing the required "hashAlg" field')
+    if hash_alg not in {alg.value for alg in HashAlgorithm}:
+        raise ManifestDecodeValidationError(f"Manifest has an unknown hashAlg: {hash_alg}")
+    if not _is_integer(manifest.get("totalSize")):
+        raise ManifestDecodeValidationError('Manifest is missing the required "totalSize" field')
+    if not isinstance(paths, list) or not paths:
+        raise ManifestDecodeValidationError('Manifest is missing the required "paths" field')
+    for path in paths:
+        if not (
+            isinstance(path, dict)
+            and isinstance(path.get("path"), str)
+            and isinstance(path.get("hash"), str)
+            and _is_non_negative_integer(path.get("size"))
+            and _is_non_negative_integer(path.get("mtime"))
+        ):
+            raise ManifestDecodeValidationError(f"Manifest path entry is not valid: {path}")
+
+
+def _check_hashes_are_alphanumeric(manifest: BaseAssetManifest) -> None:
+    """
+    Checks that all the hashes of the manifest are alphanumeric, which is what makes them safe to use
+    in S3 keys and file names. The hashes are checked all at once, and only checked one by one to
+    report the first hash that isn't alphanumeric.
+    """
+    hashes = [path.hash for path in manifest.paths]
+    all_hashes = "".join(hashes)
+    if all(hashes) and all_hashes.isascii() and all_hashes.isalnum():
+        return
+    for path in manifest.paths:
+        if alphanum_regex.fullmatch(path.hash) is None:
+            raise ManifestDecodeValidationError(
+                f"The hash {path.hash} for path {path.path} is not alphanumeric"
+            )
+
+
+def decode_manifest(manifest: str, trusted: bool = False) -> BaseAssetManifest:
     """
     Takes in a manifest string and returns an Asset Manifest object.
     A ManifestDecodeValidationError will be raised if the manifest version is unknown or
     the manifest is not valid.
+
+    A trusted manifest (one that was already validated, such as a manifest from the local manifest
+    cache) is only checked for the fields that decoding it relies on, rather than validated against
+    the schema of its version, which takes much longer for large manifests.
     """
     document: dict[str, Any] = json.loads(manifest)
 
@@ -65,19 +147,17 @@ def decode_manifest(manifest: str) -> BaseAssetManifest:
             'Manifest is missing the required "manifestVersion" field'
         )
 
-    manifest_valid, error_string = validate_manifest(document, version)
+    if trusted:
+        _check_manifest_structure(document)
+    else:
+        manifest_valid, error_string = validate_manifest(document, version)
 
-    if not manifest_valid:
-        raise ManifestDecodeValidationError(error_string)
+        if not manifest_valid:
+            raise ManifestDecodeValidationError(error_string)
 
     manifest_model = ManifestModelRegistry.get_manifest_model(version=version)
     decoded_manifest = manifest_model.AssetManifest.decode(manifest_data=document)
 
-    # Validate hashes are alphanumeric
-    for path in decoded_manifest.paths:
-        if alphanum_regex.fullmatch(path.hash) is None:
-            raise ManifestDecodeValidationError(
-                f"The hash {path.hash} for path {path.path} is not alphanumeric"
-            )
+    _check_hashes_are_alphanumeric(decoded_manifest)
 
     return decoded_manifest
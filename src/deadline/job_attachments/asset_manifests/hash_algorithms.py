@@ -2,12 +2,54 @@
 
 """ Module that defines the hashing algorithms supported by this library. """
 
-import io
+import mmap
+import os
+import sys
+import threading
 
+from dataclasses import dataclass
 from enum import Enum
+from io import FileIO
+from typing import Any, Optional
 
 from ..exceptions import UnsupportedHashingAlgorithmError
 
+# The size of the buffer that files are read into to be hashed. Files that fit in the buffer are
+# read with a single read call instead.
+DEFAULT_HASH_FILE_BUFFER_SIZE: int = 1024 * 1024
+# The size from which files are hashed from a memory map, without copying them into a buffer.
+# Zero disables memory mapping.
+DEFAULT_HASH_FILE_MMAP_THRESHOLD: int = 0
+
+# Each thread reuses its own buffer to read files into.
+_thread_local = threading.local()
+
+# The file systems whose files can be memory mapped on Linux. Files on other file systems (such as network
+# shares) can be truncated by another host while they are mapped, which crashes the process with SIGBUS.
+_LINUX_LOCAL_FILE_SYSTEM_TYPES = frozenset(
+    ["btrfs", "ext2", "ext3", "ext4", "f2fs", "jfs", "overlay", "ramfs", "tmpfs", "xfs", "zfs"]
+)
+_LINUX_MOUNTINFO_PATH = "/proc/self/mountinfo"
+
+
+@dataclass(frozen=True)
+class HashFileOptions:
+    """
+    The options of `hash_file`: the size of the buffer that files are read into, and the size from which
+    files are hashed from a memory map instead (zero disables memory mapping).
+    """
+
+    buffer_size: int = DEFAULT_HASH_FILE_BUFFER_SIZE
+    mmap_threshold: int = DEFAULT_HASH_FILE_MMAP_THRESHOLD
+
+    def __post_init__(self) -> None:
+        if self.buffer_size <= 0:
+            raise ValueError(f"The hash file buffer size ({self.buffer_size}) must be positive.")
+        if self.mmap_threshold < 0:
+            raise ValueError(
+                f"The hash file mmap threshold ({self.mmap_threshold}) must not be negative."
+            )
+
 
 class HashAlgorithm(str, Enum):
     """
@@ -21,36 +63,128 @@ class HashAlgorithm(str, Enum):
     XXH128 = "xxh128"
 
 
-def hash_file(file_path: str, hash_alg: HashAlgorithm) -> str:
-    """Hashes the given file using the given hashing algorithm."""
+def _get_hasher(hash_alg: HashAlgorithm) -> Any:
+    """Returns a new incremental hasher object for the given hashing algorithm."""
     if hash_alg == HashAlgorithm.XXH128:
         from xxhash import xxh3_128
 
-        hasher = xxh3_128()
+        return xxh3_128()
     else:
         raise UnsupportedHashingAlgorithmError(
             f"Unsupported hashing algorithm provided: {hash_alg}"
         )
 
-    with open(file_path, "rb") as file:
-        while True:
-            chunk = file.read(io.DEFAULT_BUFFER_SIZE)
-            if not chunk:
-                break
-            hasher.update(chunk)
+
+def _get_buffer(buffer_size: int) -> memoryview:
+    buffer = getattr(_thread_local, "buffer", None)
+    if buffer is None or len(buffer) != buffer_size:
+        buffer = memoryview(bytearray(buffer_size))
+        _thread_local.buffer = buffer
+    return buffer
+
+
+def _hash_file_single_read(file: FileIO, hasher: Any, file_size: int, buffer_size: int) -> None:
+    """Hashes a file that fits in the buffer with a single read call."""
+    # Read one more byte than the file size, so that growing files are still hashed fully.
+    data = file.read(file_size + 1)
+    while data:
+        hasher.update(data)
+        data = file.read(buffer_size)
+
+
+def _hash_file_buffered(file: FileIO, hasher: Any, buffer_size: int) -> None:
+    """Hashes a file by reading it in chunks into the reusable buffer of this thread."""
+    buffer = _get_buffer(buffer_size)
+    while True:
+        bytes_read = file.readinto(buffer)
+        if not bytes_read:
+            break
+        hasher.update(buffer[:bytes_read])
+
+
+def _get_linux_file_system_type(device: int) -> Optional[str]:
+    """Returns the type of the mounted file system of the given device, or None if it isn't found."""
+    device_id = f"{os.major(device)}:{os.minor(device)}"
+    try:
+        with open(_LINUX_MOUNTINFO_PATH, encoding="utf-8", errors="replace") as mountinfo:
+            for line in mountinfo:
+                # Each line is "<mount id> <parent id> <major>:<minor> <root> <mount point> <options>
+                # [<optional fields>...] - <file system type> <source> <super options>".
+                fields, _, file_system_fields = line.partition(" - ")
+                if fields.split(" ")[2:3] == [device_id] and file_system_fields:
+                    return file_system_fields.split(" ")[0]
+    except OSError:
+        pass
+    return None
+
+
+def _is_on_local_file_system(file_path: str, device: int) -> bool:
+    """
+    Returns whether the given file, on the given device, is on a local file system. This is False when it
+    can't be determined, such as on platforms other than Linux and Windows.
+    """
+    if sys.platform == "win32":
+        from .._windows import file as win_file
+
+        drive, _ = os.path.splitdrive(os.path.abspath(file_path))
+        if not drive or drive.startswith("\\\\"):
+            # UNC paths are network shares.
+            return False
+        return win_file.GetDriveTypeW(drive + "\\") in (
+            win_file.DRIVE_FIXED,
+            win_file.DRIVE_RAMDISK,
+        )
+    if sys.platform.startswith("linux"):
+        return _get_linux_file_system_type(device) in _LINUX_LOCAL_FILE_SYSTEM_TYPES
+    return False
+
+
+def _hash_file_mmap(file: FileIO, hasher: Any) -> None:
+    """
+    Hashes a file from a memory map. Raises OSError or ValueError if the file can't be memory mapped.
+    """
+    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+        hasher.update(mapped_file)
+
+
+def hash_file(
+    file_path: str, hash_alg: HashAlgorithm, options: Optional[HashFileOptions] = None
+) -> str:
+    """
+    Hashes the given file using the given hashing algorithm. Depending on the file size, the file is
+    read with a single read call, read in chunks into a reusable buffer, or memory mapped, as set by
+    `options` (the defaults if not given). Only files on local file systems are memory mapped.
+    """
+    hasher = _get_hasher(hash_alg)
+    if options is None:
+        options = HashFileOptions()
+
+    with open(file_path, "rb", buffering=0) as file:
+        file_stat = os.fstat(file.fileno())
+        file_size = file_stat.st_size
+        if file_size < options.buffer_size:
+            _hash_file_single_read(file, hasher, file_size, options.buffer_size)
+            return hasher.hexdigest()
+
+        if (
+            options.mmap_threshold
+            and file_size >= options.mmap_threshold
+            and _is_on_local_file_system(file_path, file_stat.st_dev)
+        ):
+            try:
+                _hash_file_mmap(file, hasher)
+                return hasher.hexdigest()
+            except (OSError, ValueError):
+                # Some file systems don't support memory mapping, so fall back to reading the file.
+                hasher = _get_hasher(hash_alg)
+                file.seek(0)
+
+        _hash_file_buffered(file, hasher, options.buffer_size)
         return hasher.hexdigest()
 
 
 def hash_data(data: bytes, hash_alg: HashAlgorithm) -> str:
     """Hashes the given data bytes using the given hashing algorithm."""
-    if hash_alg == HashAlgorithm.XXH128:
-        from xxhash import xxh3_128
-
-        hasher = xxh3_128()
-    else:
-        raise UnsupportedHashingAlgorithmError(
-            f"Unsupported hashing algorithm provided: {hash_alg}"
-        )
-
+    hasher = _get_hasher(hash_alg)
     hasher.update(data)
     return hasher.hexdigest()
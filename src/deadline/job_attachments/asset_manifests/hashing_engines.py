@@ -0,0 +1,267 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+
+""" Module that defines the engines used to hash many files in parallel. """
+from __future__ import annotations
+
+import concurrent.futures
+import logging
+import multiprocessing
+import os
+import statistics
+import sys
+from abc import ABC, abstractmethod
+from enum import Enum
+from typing import Iterator, Optional, Sequence, Tuple
+
+from .hash_algorithms import HashAlgorithm, HashFileOptions, hash_file
+
+logger = logging.getLogger("deadline.job_attachments")
+
+# The minimum number of files to hash for the AUTO engine to use the process pool.
+HASHING_ENGINE_AUTO_MIN_FILES: int = 1000
+# The maximum median file size for the AUTO engine to use the process pool. Larger files are
+# hashed efficiently by threads, since the hashing releases the GIL for each chunk it reads.
+HASHING_ENGINE_AUTO_MAX_MEDIAN_FILE_SIZE: int = 1024 * 1024
+# The limits on the files hashed by a single process pool task, to amortize the inter-process
+# communication over many small files while still spreading large files across processes.
+PROCESS_HASHING_BATCH_MAX_FILES: int = 256
+PROCESS_HASHING_BATCH_MAX_BYTES: int = 64 * 1024 * 1024
+
+
+class HashingEngineType(str, Enum):
+    """
+    Enumerant of the engines used to hash files.
+
+    Types:
+      AUTO - Uses the process pool for many small files, and threads otherwise.
+      THREAD - Hashes files in a pool of threads.
+      PROCESS - Hashes batches of files in a pool of processes.
+    """
+
+    AUTO = "AUTO"
+    THREAD = "THREAD"
+    PROCESS = "PROCESS"
+
+    @classmethod
+    def _missing_(cls, value):
+        if not isinstance(value, str):
+            return None
+        value = value.upper()
+        for member in cls:
+            if member == value:
+                return member
+        return None
+
+
+class HashingEngine(ABC):
+    """
+    Base class of the engines that hash files in parallel. An engine can hash several sets of files
+    (such as the files of each asset root of a submission), and is shut down once it is no longer needed.
+    """
+
+    def __enter__(self) -> HashingEngine:
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback) -> None:
+        self.shutdown()
+
+    def shutdown(self) -> None:
+        """Releases the resources of the engine, such as its worker processes."""
+
+    @abstractmethod
+    def hash_files(
+        self, files: Sequence[Tuple[str, int]], hash_alg: HashAlgorithm
+    ) -> Iterator[Tuple[str, str]]:
+        """
+        Hashes the given files, each given as a tuple of (file path, file size), and yields a tuple
+        of (file path, file hash) for each of them as soon as it is hashed.
+        """
+        raise NotImplementedError
+
+
+class ThreadHashingEngine(HashingEngine):
+    """
+    Hashes each file as a task of a thread pool.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        hash_file_options: Optional[HashFileOptions] = None,
+    ) -> None:
+        self.max_workers = max_workers
+        self.hash_file_options = hash_file_options
+
+    def hash_files(
+        self, files: Sequence[Tuple[str, int]], hash_alg: HashAlgorithm
+    ) -> Iterator[Tuple[str, str]]:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(hash_file, file_path, hash_alg, self.hash_file_options): file_path
+                for file_path, _ in files
+            }
+            try:
+                for future in concurrent.futures.as_completed(futures):
+                    yield (futures[future], future.result())
+            finally:
+                for future in futures:
+                    future.cancel()
+
+
+class ProcessHashingEngine(HashingEngine):
+    """
+    Hashes batches of files as tasks of a process pool, so that hashing many small files is not
+    limited by the GIL. Files are batched to amortize the inter-process communication per task.
+    The process pool is started on the first call to hash_files, and reused by the later calls until
+    the engine is shut down.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        batch_max_files: int = PROCESS_HASHING_BATCH_MAX_FILES,
+        batch_max_bytes: int = PROCESS_HASHING_BATCH_MAX_BYTES,
+        hash_file_options: Optional[HashFileOptions] = None,
+    ) -> None:
+        self.max_workers = max_workers
+        self.batch_max_files = batch_max_files
+        self.batch_max_bytes = batch_max_bytes
+        self.hash_file_options = hash_file_options
+        self._executor: Optional[concurrent.futures.ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> concurrent.futures.ProcessPoolExecutor:
+        if self._executor is None:
+            # Worker processes are spawned rather than forked, since forking a process that runs other
+            # threads (such as the upload threads) can deadlock the child process.
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _get_batches(self, files: Sequence[Tuple[str, int]]) -> list[list[str]]:
+        batches: list[list[str]] = []
+        batch: list[str] = []
+        batch_bytes = 0
+        for file_path, file_size in files:
+            if batch and (
+                len(batch) >= self.batch_max_files or batch_bytes + file_size > self.batch_max_bytes
+            ):
+                batches.append(batch)
+                batch = []
+                batch_bytes = 0
+            batch.append(file_path)
+            batch_bytes += file_size
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def hash_files(
+        self, files: Sequence[Tuple[str, int]], hash_alg: HashAlgorithm
+    ) -> Iterator[Tuple[str, str]]:
+        if not files:
+            return
+        executor = self._get_executor()
+        futures = [
+            executor.submit(_hash_file_batch, batch, hash_alg, self.hash_file_options)
+            for batch in self._get_batches(files)
+        ]
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                yield from future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def _hash_file_batch(
+    file_paths: list[str], hash_alg: HashAlgorithm, hash_file_options: Optional[HashFileOptions]
+) -> list[Tuple[str, str]]:
+    """Hashes the given files in a worker process."""
+    return [
+        (file_path, hash_file(file_path, hash_alg, hash_file_options)) for file_path in file_paths
+    ]
+
+
+def _can_use_process_pool() -> bool:
+    """
+    Returns whether worker processes can be spawned from this interpreter. They can't be when it is
+    embedded in another application (such as a DCC or a frozen executable), since spawning runs
+    `sys.executable`, which would start another instance of the application.
+    """
+    if getattr(sys, "frozen", False):
+        return False
+    return os.path.basename(sys.executable).lower().startswith("python")
+
+
+def _is_main_module_safe_to_spawn() -> bool:
+    """
+    Returns whether spawned worker processes can safely import the __main__ module of this process,
+    which they do before running any task. A script without an `if __name__ == "__main__":` guard
+    would run again in each worker, so only the deadline entry points are trusted for the AUTO engine.
+    """
+    main_module = sys.modules.get("__main__")
+    main_file = getattr(main_module, "__file__", None)
+    if main_file is None:
+        # Interactive interpreters have no __main__ file for the workers to import.
+        return True
+    main_spec = getattr(main_module, "__spec__", None)
+    if main_spec is not None and main_spec.name.split(".")[0] == "deadline":
+        return True
+    main_name = os.path.splitext(os.path.basename(main_file))[0].lower()
+    if main_name == "__main__":
+        # Such as the deadline.exe launcher on Windows, which runs the __main__.py archived in it.
+        main_name = os.path.splitext(os.path.basename(os.path.dirname(main_file)))[0].lower()
+    return main_name in ("deadline", "deadline-script")
+
+
+def select_hashing_engine_type(file_sizes: Sequence[int]) -> HashingEngineType:
+    """
+    Selects the engine to hash files of the given sizes with: the process pool when there are many
+    small files, and threads otherwise.
+    """
+    if (
+        len(file_sizes) >= HASHING_ENGINE_AUTO_MIN_FILES
+        and statistics.median(file_sizes) <= HASHING_ENGINE_AUTO_MAX_MEDIAN_FILE_SIZE
+        and _can_use_process_pool()
+        and _is_main_module_safe_to_spawn()
+    ):
+        return HashingEngineType.PROCESS
+    return HashingEngineType.THREAD
+
+
+def get_hashing_engine(
+    engine_type: HashingEngineType,
+    file_sizes: Sequence[int] = (),
+    engines: Optional[dict[HashingEngineType, HashingEngine]] = None,
+    hash_file_options: Optional[HashFileOptions] = None,
+) -> HashingEngine:
+    """
+    Returns a hashing engine of the given type, which hashes files with the given `hash_file` options.
+    For the AUTO type, the engine is selected based on the sizes of the files to hash. If `engines` is given, the engine of the selected type in it is
+    reused, or the new engine is added to it, so that the engines (and their worker processes) are
+    created once for all the files of a submission. The caller then shuts them down.
+    """
+    if engine_type == HashingEngineType.AUTO:
+        engine_type = select_hashing_engine_type(file_sizes)
+    elif engine_type == HashingEngineType.PROCESS and not _can_use_process_pool():
+        logger.warning(
+            f"Cannot hash files in worker processes from {sys.executable}. Hashing files in threads instead."
+        )
+        engine_type = HashingEngineType.THREAD
+
+    if engines is not None and engine_type in engines:
+        return engines[engine_type]
+    engine: HashingEngine = (
+        ProcessHashingEngine(hash_file_options=hash_file_options)
+        if engine_type == HashingEngineType.PROCESS
+        else ThreadHashingEngine(hash_file_options=hash_file_options)
+    )
+    if engines is not None:
+        engines[engine_type] = engine
+    return engine
@@ -4,9 +4,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Type
+from typing import IO, Any, Type
 
-from .._canonical_json import canonical_path_comparator, manifest_to_canonical_json_string
+from .._canonical_json import (
+    manifest_to_canonical_json_string,
+    sort_paths_canonically,
+    write_canonical_json,
+)
 from ..base_manifest import BaseAssetManifest, BaseManifestPath
 from ..hash_algorithms import HashAlgorithm
 from ..manifest_model import BaseManifestModel
@@ -24,6 +28,7 @@ class ManifestPath(BaseManifestPath):
     Extension for version v2023-03-03 of the asset manifest.
     """
 
+    __slots__ = ()
     manifest_version = ManifestVersion.v2023_03_03
 
     def __init__(self, *, path: str, hash: str, size: int, mtime: int) -> None:
@@ -81,9 +86,16 @@ class AssetManifest(BaseAssetManifest):
         """
         Return a canonicalized JSON string of the manifest
         """
-        self.paths.sort(key=canonical_path_comparator)
+        sort_paths_canonically(self.paths)
         return manifest_to_canonical_json_string(manifest=self)
 
+    def encode_to(self, stream: IO[str]) -> None:
+        """
+        Write the canonicalized JSON string of the manifest to the given stream, one path at a time
+        """
+        sort_paths_canonically(self.paths)
+        write_canonical_json(self, stream)
+
 
 class ManifestModel(BaseManifestModel):
     """
@@ -2,17 +2,32 @@
 
 """ Module for File Attachment synching """
 from __future__ import annotations
+import concurrent.futures
 from dataclasses import asdict
 import os
 import shutil
+import stat
 import sys
+import tempfile
+import threading
 import time
 import json
 from io import BytesIO
 from logging import Logger, LoggerAdapter, getLogger
 from math import trunc
 from pathlib import Path, PurePosixPath
-from typing import Any, Callable, DefaultDict, Dict, List, Optional, Tuple, Type, Union
+from typing import (
+    Any,
+    Callable,
+    DefaultDict,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 
 import boto3
 
@@ -33,17 +48,24 @@ from .asset_manifests import (
     ManifestVersion,
 )
 from .asset_manifests import BaseManifestPath as RelativeFilePath
+from .asset_manifests.compact_manifest import compact_manifest, iter_path_strings
 from ._aws.aws_clients import get_boto3_session
 from ._aws.deadline import get_job, get_queue
+from ._synced_mtimes import SyncedAssetMtimes
 from .download import (
     merge_asset_manifests,
     download_files_from_manifests,
     get_manifest_from_s3,
     get_output_manifests_by_asset_root,
     mount_vfs_from_manifests,
+    _run_manifest_requests_concurrently,
 )
 
+from deadline.client.config import config_file
+
+from .caches import ManifestCache, ObjectCache, S3CheckCache, S3CheckCacheEntry
 from .exceptions import (
+    AssetSyncCancelledError,
     AssetSyncError,
     VFSExecutableMissingError,
     JobAttachmentsS3ClientError,
@@ -62,6 +84,7 @@ from .models import (
 from .upload import S3AssetUploader
 from .os_file_permission import FileSystemPermissionSettings, PosixFileSystemPermissionSettings
 from ._utils import (
+    _clone_file,
     _float_to_iso_datetime_string,
     _get_unique_dest_dir_name,
     _human_readable_file_size,
@@ -76,6 +99,12 @@ class AssetSync:
 
     _ENDING_PROGRESS = 100.0
 
+    # The default number of seconds between the polls of the output directories by the output watcher.
+    OUTPUT_WATCHER_POLL_INTERVAL = 30.0
+    # The default number of consecutive polls that an output file must be seen with the same size and
+    # modification time before the output watcher considers it complete, and uploads it.
+    OUTPUT_WATCHER_STABLE_POLLS = 2
+
     def __init__(
         self,
         farm_id: str,
@@ -83,6 +112,9 @@ class AssetSync:
         manifest_version: ManifestVersion = ManifestVersion.v2023_03_03,
         deadline_endpoint_url: Optional[str] = None,
         session_id: Optional[str] = None,
+        object_cache: Optional[ObjectCache] = None,
+        manifest_cache_dir: Optional[str] = None,
+        s3_check_cache_dir: Optional[str] = None,
     ) -> None:
         self.farm_id = farm_id
 
@@ -102,14 +134,48 @@ class AssetSync:
             version=manifest_version
         )
 
-        # A dictionary mapping absolute file paths to their last modification times in microseconds.
+        # The last modification times (in nanoseconds) of the synced files, by local root and relative path.
         # This is used to determine if an asset has been modified since it was last synced.
-        self.synced_assets_mtime: dict[str, int] = dict()
+        self.synced_assets_mtime: SyncedAssetMtimes = SyncedAssetMtimes()
 
         self.hash_alg: HashAlgorithm = self.manifest_model.AssetManifest.get_default_hash_alg()
 
         self._local_root_to_src_map: dict[str, str] = dict()
 
+        # The local cache of the objects downloaded from the CAS, shared across the sessions of this host,
+        # so that the inputs that an earlier session already downloaded are copied from it instead.
+        # Unless one is given, it is created from the configuration settings, if it is enabled there.
+        self.object_cache: Optional[ObjectCache] = (
+            object_cache if object_cache is not None else ObjectCache.from_config()
+        )
+
+        # The directory of the local cache of the manifests downloaded from S3, so that the input
+        # manifests of a job are downloaded only once for all of its tasks on this host.
+        # Unless one is given, the cache directory of the configuration is used.
+        self.manifest_cache_dir: str = (
+            manifest_cache_dir
+            if manifest_cache_dir is not None
+            else config_file.get_cache_directory()
+        )
+        self.manifest_cache_max_size_bytes: Optional[int] = ManifestCache.get_max_size_from_config()
+
+        # The directory of the local 'S3 check cache' of the objects known to be in the CAS, so that the
+        # outputs that this host already uploaded or found in S3 are not checked for again.
+        # Unless one is given, the cache directory of the configuration is used.
+        self.s3_check_cache_dir: str = (
+            s3_check_cache_dir
+            if s3_check_cache_dir is not None
+            else config_file.get_cache_directory()
+        )
+
+        # The background thread uploading output files while a task is running, if any (see start_output_watcher.)
+        self._output_watcher: Optional[threading.Thread] = None
+        self._output_watcher_stop = threading.Event()
+        self._output_watcher_cancel = threading.Event()
+        # The output files uploaded by the output watcher, by path, with the size, modification time, hash and
+        # CAS key that they were uploaded with.
+        self._watched_outputs_uploaded: dict[str, Tuple[int, int, str, str]] = dict()
+
     @staticmethod
     def generate_dynamic_path_mapping(
         session_dir: Path,
@@ -193,6 +259,7 @@ class AssetSync:
         Returns: a dictionary of manifest file stored in the session directory.
         """
         grouped_manifests_by_root: DefaultDict[str, list[BaseAssetManifest]] = DefaultDict(list)
+        input_manifest_keys_by_root: list[Tuple[str, str]] = []
 
         for manifest_properties in attachments.manifests:
             local_root: str = AssetSync.get_local_destination(
@@ -205,34 +272,36 @@ class AssetSync:
                 manifest_s3_key = s3_settings.add_root_and_manifest_folder_prefix(
                     manifest_properties.inputManifestPath
                 )
-                # s3 call to get manifests
-                manifest = get_manifest_from_s3(
-                    manifest_key=manifest_s3_key,
-                    s3_bucket=s3_settings.s3BucketName,
-                    session=self.session,
-                )
                 self._local_root_to_src_map[local_root] = manifest_properties.rootPath
+                input_manifest_keys_by_root.append((local_root, manifest_s3_key))
+
+        # s3 calls to get manifests
+        with self._open_manifest_cache() as manifest_cache:
+            for local_root, manifest in self._get_input_manifests_from_s3(
+                s3_settings, input_manifest_keys_by_root, manifest_cache
+            ):
                 grouped_manifests_by_root[local_root].append(manifest)
 
-        # Handle step-step dependencies.
-        if step_dependencies:
-            for step_id in step_dependencies:
-                manifests_by_root = get_output_manifests_by_asset_root(
-                    s3_settings,
-                    self.farm_id,
-                    queue_id,
-                    job_id,
-                    step_id=step_id,
-                    session=self.session,
-                )
-                for root, manifests in manifests_by_root.items():
-                    # this implicitly put the step dependency files to the same asset root (if no storage profile),
-                    # since the job is submitted from the same root
-                    dir_name = _get_unique_dest_dir_name(root)
-                    local_root = str(session_dir.joinpath(dir_name))
+            # Handle step-step dependencies.
+            if step_dependencies:
+                for step_id in step_dependencies:
+                    manifests_by_root = get_output_manifests_by_asset_root(
+                        s3_settings,
+                        self.farm_id,
+                        queue_id,
+                        job_id,
+                        step_id=step_id,
+                        session=self.session,
+                        manifest_cache=manifest_cache,
+                    )
+                    for root, manifests in manifests_by_root.items():
+                        # this implicitly put the step dependency files to the same asset root (if no storage profile),
+                        # since the job is submitted from the same root
+                        dir_name = _get_unique_dest_dir_name(root)
+                        local_root = str(session_dir.joinpath(dir_name))
 
-                    self._local_root_to_src_map[local_root] = root
-                    grouped_manifests_by_root[local_root].extend(manifests)
+                        self._local_root_to_src_map[local_root] = root
+                        grouped_manifests_by_root[local_root].extend(manifests)
 
         # Merge the manifests in each root into a single manifest
         merged_manifests_by_root: dict[str, BaseAssetManifest] = dict()
@@ -244,6 +313,42 @@ class AssetSync:
 
         return merged_manifests_by_root
 
+    def _open_manifest_cache(self) -> ManifestCache:
+        """Opens the local manifest cache, bounded to the size set in the configuration settings."""
+        return ManifestCache(self.manifest_cache_dir, self.manifest_cache_max_size_bytes)
+
+    def _get_input_manifests_from_s3(
+        self,
+        s3_settings: JobAttachmentS3Settings,
+        manifest_keys_by_root: list[Tuple[str, str]],
+        manifest_cache: Optional[ManifestCache] = None,
+    ) -> list[Tuple[str, BaseAssetManifest]]:
+        """
+        Gets the input manifests with the given S3 keys concurrently.
+
+        Args:
+            s3_settings: S3-specific Job Attachment settings.
+            manifest_keys_by_root: a list of (local root, manifest S3 key).
+            manifest_cache: the local manifest cache to get the manifests from, if any.
+        Returns: a list of (local root, manifest), in the order of the given keys. The paths of the
+            manifests are compact, since the manifests are held for the whole download.
+        """
+        manifests = _run_manifest_requests_concurrently(
+            lambda manifest_s3_key: compact_manifest(
+                get_manifest_from_s3(
+                    manifest_key=manifest_s3_key,
+                    s3_bucket=s3_settings.s3BucketName,
+                    session=self.session,
+                    manifest_cache=manifest_cache,
+                )
+            ),
+            [manifest_s3_key for _, manifest_s3_key in manifest_keys_by_root],
+        )
+        return [
+            (local_root, manifest)
+            for (local_root, _), manifest in zip(manifest_keys_by_root, manifests)
+        ]
+
     def _launch_vfs(
         self,
         s3_settings: JobAttachmentS3Settings,
@@ -318,6 +423,7 @@ class AssetSync:
                 session=self.session,
                 on_downloading_files=on_downloading_files,
                 logger=self.logger,
+                object_cache=self.object_cache,
             ).convert_to_summary_statistics()
         except JobAttachmentsS3ClientError as exc:
             if exc.status_code == 404:
@@ -334,6 +440,17 @@ class AssetSync:
                 ) from exc
             else:
                 raise
+        finally:
+            self._evict_object_cache()
+
+    def _evict_object_cache(self) -> None:
+        """Bounds the size of the object cache, once files have been downloaded into it."""
+        if self.object_cache is None:
+            return
+        try:
+            self.object_cache.evict()
+        except OSError as e:
+            self.logger.warning(f"Failed to evict objects from the object cache: {e}")
 
     def _check_and_write_local_manifests(
         self, merged_manifests_by_root: dict[str, BaseAssetManifest], manifest_write_dir: str
@@ -464,6 +581,7 @@ class AssetSync:
                 merged_manifests_by_root=merged_manifests_by_root,
                 os_env_vars=os_env_vars,
             )
+            self._record_attachment_mtimes(merged_manifests_by_root, stat_files=True)
         else:
             # Copied Download flow
             summary_statistics = self.copied_download(
@@ -473,8 +591,8 @@ class AssetSync:
                 merged_manifests_by_root=merged_manifests_by_root,
                 on_downloading_files=on_downloading_files,
             )
+            self._record_attachment_mtimes(merged_manifests_by_root)
 
-        self._record_attachment_mtimes(merged_manifests_by_root)
         return (
             summary_statistics,
             list(asdict(r) for r in dynamic_mapping_rules.values()),
@@ -485,10 +603,15 @@ class AssetSync:
         s3_settings: JobAttachmentS3Settings,
         output_files: List[OutputFile],
         on_uploading_files: Optional[Callable[[ProgressReportMetadata], bool]],
+        s3_check_cache: Optional[S3CheckCache] = None,
     ) -> SummaryStatistics:
         """
         Uploads the given output files to the given S3 bucket.
         Sets up `progress_tracker` to report upload progress back to the caller (i.e. worker.)
+
+        As with input files, small files are uploaded in parallel, and then large files are uploaded
+        one at a time (each with a parallel multi-part upload.) The CAS keys of the uploaded files are
+        recorded in the given S3 check cache, if any.
         """
         # Sets up progress tracker to report upload progress back to the caller.
         total_file_size = sum([file.file_size for file in output_files])
@@ -502,22 +625,71 @@ class AssetSync:
 
         start_time = time.perf_counter()
 
+        small_file_queue: List[OutputFile] = []
+        large_file_queue: List[OutputFile] = []
+        s3_keys_to_upload: set[str] = set()
         for file in output_files:
-            if file.in_s3:
+            # Files with the same contents only need to be uploaded once.
+            if file.in_s3 or file.s3_key in s3_keys_to_upload:
                 progress_tracker.increase_skipped(1, file.file_size)
                 continue
-
-            self.s3_uploader.upload_file_to_s3(
-                local_path=Path(file.full_path),
-                s3_bucket=s3_settings.s3BucketName,
-                s3_upload_key=file.s3_key,
-                progress_tracker=progress_tracker,
-                base_dir_path=Path(file.base_dir) if file.base_dir else None,
+            s3_keys_to_upload.add(file.s3_key)
+            if file.file_size <= self.s3_uploader.small_file_threshold:
+                small_file_queue.append(file)
+            else:
+                large_file_queue.append(file)
+
+        # First, process the whole 'small file' queue with parallel object uploads.
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.s3_uploader.num_upload_workers
+        ) as executor:
+            futures = [
+                executor.submit(
+                    self._upload_output_file_to_s3,
+                    s3_settings,
+                    file,
+                    progress_tracker,
+                    s3_check_cache,
+                )
+                for file in small_file_queue
+            ]
+            # surfaces any exceptions in the thread
+            for future in concurrent.futures.as_completed(futures):
+                future.result()
+
+        # Now process the whole 'large file' queue with serial object uploads (but still parallel multi-part upload.)
+        for file in large_file_queue:
+            self._upload_output_file_to_s3(s3_settings, file, progress_tracker, s3_check_cache)
+
+        # to report progress 100% at the end, and
+        # to check if the sync was canceled in the middle of processing the last batch of files.
+        progress_tracker.report_progress()
+        if not progress_tracker.continue_reporting:
+            raise AssetSyncCancelledError(
+                "File upload cancelled.", progress_tracker.get_summary_statistics()
             )
 
         progress_tracker.total_time = time.perf_counter() - start_time
         return progress_tracker.get_summary_statistics()
 
+    def _upload_output_file_to_s3(
+        self,
+        s3_settings: JobAttachmentS3Settings,
+        file: OutputFile,
+        progress_tracker: ProgressTracker,
+        s3_check_cache: Optional[S3CheckCache],
+    ) -> None:
+        """Uploads the given output file to the CAS, and records its CAS key in the S3 check cache."""
+        is_uploaded = self.s3_uploader.upload_file_to_s3(
+            local_path=Path(file.full_path),
+            s3_bucket=s3_settings.s3BucketName,
+            s3_upload_key=file.s3_key,
+            progress_tracker=progress_tracker,
+            base_dir_path=Path(file.base_dir) if file.base_dir else None,
+        )
+        if is_uploaded:
+            self._put_s3_check_cache_entry(file.s3_key, s3_settings, s3_check_cache)
+
     def _upload_output_manifest_to_s3(
         self,
         s3_settings: JobAttachmentS3Settings,
@@ -525,8 +697,8 @@ class AssetSync:
         full_output_prefix: str,
         root_path: str,
         file_system_location_name: Optional[str] = None,
-    ) -> None:
-        """Uploads the given output manifest to the given S3 bucket."""
+    ) -> str:
+        """Uploads the given output manifest to the given S3 bucket. Returns the key of the manifest."""
         hash_alg = output_manifest.get_default_hash_alg()
         manifest_bytes = output_manifest.encode().encode("utf-8")
         manifest_name_prefix = hash_data(
@@ -557,6 +729,7 @@ class AssetSync:
             manifest_path,
             extra_args=metadata,
         )
+        return manifest_path
 
     def _generate_output_manifest(self, outputs: List[OutputFile]) -> BaseAssetManifest:
         paths: list[RelativeFilePath] = []
@@ -566,9 +739,12 @@ class AssetSync:
                 "path": output.rel_path,
             }
             path_args["size"] = output.file_size
-            # stat().st_mtime_ns returns an int that represents the time in nanoseconds since the epoch.
-            # The asset manifest spec requires the mtime to be represented as an integer in microseconds.
-            path_args["mtime"] = trunc(Path(output.full_path).stat().st_mtime_ns // 1000)
+            if output.file_mtime is not None:
+                path_args["mtime"] = output.file_mtime
+            else:
+                # stat().st_mtime_ns returns an int that represents the time in nanoseconds since the epoch.
+                # The asset manifest spec requires the mtime to be represented as an integer in microseconds.
+                path_args["mtime"] = trunc(Path(output.full_path).stat().st_mtime_ns // 1000)
             paths.append(self.manifest_model.Path(**path_args))
 
         asset_manifest_args: dict[str, Any] = {
@@ -585,104 +761,246 @@ class AssetSync:
         s3_settings: JobAttachmentS3Settings,
         local_root: Path,
         session_dir: Path,
+        s3_check_cache: Optional[S3CheckCache] = None,
     ) -> List[OutputFile]:
         """
         Walks the output directories for this asset root for any output files that have been created or modified
         since the start time provided. Hashes and checks if the output files already exist in the CAS.
+
+        The output directories are walked on the calling thread, which also records the modification times
+        of new files. The hashing and existence checks of the new and modified files are done concurrently,
+        and the output files are returned in the order that they were found.
         """
         output_files: List[OutputFile] = []
+        real_session_dir = session_dir.resolve()
+
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.s3_uploader.num_upload_workers
+        ) as executor:
+            for output_root in self._get_output_directories(manifest_properties, local_root):
+                # Don't fail if output dir hasn't been created yet; another task might be working on it
+                if not output_root.is_dir():
+                    self.logger.info(
+                        f"Found 0 files (Output directory {output_root} does not exist.)"
+                    )
+                    continue
+
+                futures = [
+                    executor.submit(
+                        self._get_output_file,
+                        file_path,
+                        s3_settings,
+                        local_root,
+                        session_dir,
+                        real_session_dir,
+                        s3_check_cache,
+                    )
+                    for file_path in self._get_modified_files(local_root, output_root)
+                ]
+
+                total_file_count = 0
+                total_file_size = 0
+                for future in futures:
+                    output_file = future.result()
+                    if output_file is None:
+                        continue
+                    total_file_count += 1
+                    total_file_size += output_file.file_size
+                    output_files.append(output_file)
+
+                self.logger.info(
+                    f"Found {total_file_count} file{'' if total_file_count == 1 else 's'}"
+                    f" totaling {_human_readable_file_size(total_file_size)}"
+                    f" in output directory: {str(output_root)}"
+                )
+
+        return output_files
 
+    @staticmethod
+    def _get_output_directories(
+        manifest_properties: ManifestProperties, local_root: Path
+    ) -> List[Path]:
+        """
+        Returns the output directories of the given manifest properties, under the given local root.
+        """
         source_path_format = manifest_properties.rootPathFormat
         current_path_format = PathFormat.get_host_path_format()
 
+        output_roots: List[Path] = []
         for output_dir in manifest_properties.outputRelativeDirectories or []:
             if source_path_format != current_path_format:
                 if source_path_format == PathFormat.WINDOWS:
                     output_dir = output_dir.replace("\\", "/")
                 elif source_path_format == PathFormat.POSIX:
                     output_dir = output_dir.replace("/", "\\")
-            output_root: Path = local_root / output_dir
+            output_roots.append(local_root / output_dir)
+        return output_roots
 
-            total_file_count = 0
-            total_file_size = 0
-
-            # Don't fail if output dir hasn't been created yet; another task might be working on it
-            if not output_root.is_dir():
-                self.logger.info(f"Found 0 files (Output directory {output_root} does not exist.)")
-                continue
-
-            # Get all files in this directory (includes sub-directories)
-            for file_path in output_root.glob("**/*"):
-                # Files that are new or have been modified since the last sync will be added to the output list.
-                mtime_when_synced = self.synced_assets_mtime.get(str(file_path), None)
-                file_mtime = file_path.stat().st_mtime_ns
-                is_modified = False
-                if mtime_when_synced:
-                    if file_mtime > int(mtime_when_synced):
-                        # This file has been modified during this session action.
-                        is_modified = True
-                else:
-                    # This is a new file created during this session action.
-                    self.synced_assets_mtime[str(file_path)] = int(file_mtime)
-                    is_modified = True
+    def _walk_output_directory(self, output_root: Path) -> Iterator[Tuple[str, os.stat_result]]:
+        """
+        Walks the given output directory (including sub-directories, but not following symbolic links to
+        directories) and yields the path and status of each file.
+        """
+        directories = [str(output_root)]
+        while directories:
+            directory = directories.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                directories.append(entry.path)
+                                continue
+                            file_stat = entry.stat()
+                        except OSError:
+                            # The entry was removed, or is a broken symbolic link.
+                            continue
+                        yield (entry.path, file_stat)
+            except OSError as e:
+                self.logger.warning(f"Failed to list output directory {directory}: {e}")
+
+    def _get_modified_files(self, local_root: Path, output_root: Path) -> Iterator[str]:
+        """
+        Walks the given output directory and yields the paths of the files that are new or have been modified
+        since the last sync. Records the modification times of new files.
+        """
+        for file_path, file_stat in self._walk_output_directory(output_root):
+            file_mtime = file_stat.st_mtime_ns
+            relative_path = self._get_relative_path(local_root, file_path)
+            mtime_when_synced = self.synced_assets_mtime.get(str(local_root), relative_path)
+            if mtime_when_synced:
+                if file_mtime > int(mtime_when_synced):
+                    # This file has been modified during this session action.
+                    yield file_path
+            else:
+                # This is a new file created during this session action.
+                self.synced_assets_mtime.set(str(local_root), relative_path, int(file_mtime))
+                yield file_path
 
-                # Resolve the real path to prevent time-of-check/time-of-use vulnerability
-                file_real_path = file_path.resolve()
+    @staticmethod
+    def _get_relative_path(local_root: Path, file_path: str) -> str:
+        """Returns the given path of a file under the given local root, relative to that root."""
+        root_prefix = os.path.join(str(local_root), "")
+        if file_path.startswith(root_prefix):
+            return file_path[len(root_prefix) :]
+        return os.path.relpath(file_path, local_root)
+
+    def _get_output_file(
+        self,
+        file_path: str,
+        s3_settings: JobAttachmentS3Settings,
+        local_root: Path,
+        session_dir: Path,
+        real_session_dir: Path,
+        s3_check_cache: Optional[S3CheckCache] = None,
+    ) -> Optional[OutputFile]:
+        """
+        Hashes the given new or modified output file and checks if it already exists in the CAS (in the given
+        S3 check cache first, if any.) Returns None if the file resolves outside of the session directory, is
+        no longer a file, or has the same contents as in the input manifest it was synced from (so that the
+        output manifests only list the files that the task changed.)
+        """
+        # Resolve the real path to prevent time-of-check/time-of-use vulnerability
+        file_real_path = Path(file_path).resolve()
 
-                # validate that the file resolves inside of the session working directory.
-                is_file_path_under_session_dir = self._is_file_within_directory(
-                    file_real_path, session_dir
-                )
-                if is_file_path_under_session_dir is False:
-                    self.logger.info(
-                        f"Skipping file '{file_path}' as its resolved path '{file_real_path}' is"
-                        f" outside the session directory '{session_dir}'"
-                    )
-                    continue
+        # validate that the file resolves inside of the session working directory.
+        if not self._is_resolved_path_within_directory(file_real_path, real_session_dir):
+            self.logger.info(
+                f"Skipping file '{file_path}' as its resolved path '{file_real_path}' is"
+                f" outside the session directory '{session_dir}'"
+            )
+            return None
 
-                if (
-                    not file_real_path.is_dir()
-                    and file_real_path.exists()
-                    and is_modified
-                    and is_file_path_under_session_dir
-                ):
-                    file_size = file_real_path.resolve().lstat().st_size
-                    file_hash = hash_file(str(file_real_path), self.hash_alg)
-                    s3_key = f"{file_hash}.{self.hash_alg.value}"
+        try:
+            file_stat = file_real_path.stat()
+        except OSError:
+            return None
+        if stat.S_ISDIR(file_stat.st_mode):
+            return None
+
+        uploaded_output = self._watched_outputs_uploaded.get(file_path)
+        is_watcher_upload = uploaded_output is not None and uploaded_output[:2] == (
+            file_stat.st_size,
+            file_stat.st_mtime_ns,
+        )
+        if uploaded_output is not None and is_watcher_upload:
+            # The output watcher uploaded this file while the task was running, and it hasn't changed since.
+            file_hash, s3_key = uploaded_output[2:]
+        else:
+            file_hash = hash_file(str(file_real_path), self.hash_alg)
+            s3_key = self._get_output_cas_key(file_hash, s3_settings)
 
-                    if s3_settings.full_cas_prefix():
-                        s3_key = _join_s3_paths(s3_settings.full_cas_prefix(), s3_key)
-                    in_s3 = self.s3_uploader.file_already_uploaded(s3_settings.s3BucketName, s3_key)
+        if self.synced_assets_mtime.has_hash(
+            str(local_root), self._get_relative_path(local_root, file_path), file_hash
+        ):
+            self.logger.debug(f"Skipping file '{file_path}' as its contents haven't changed")
+            return None
+        in_s3 = is_watcher_upload or self._is_output_in_s3(s3_key, s3_settings, s3_check_cache)
+
+        return OutputFile(
+            file_size=file_stat.st_size,
+            file_hash=file_hash,
+            rel_path=str(PurePosixPath(*Path(file_path).relative_to(local_root).parts)),
+            full_path=str(file_real_path),
+            s3_key=s3_key,
+            in_s3=in_s3,
+            base_dir=str(session_dir),
+            file_mtime=file_stat.st_mtime_ns // 1000,
+        )
 
-                    total_file_count += 1
-                    total_file_size += file_size
-
-                    output_files.append(
-                        OutputFile(
-                            file_size=file_size,
-                            file_hash=file_hash,
-                            rel_path=str(PurePosixPath(*file_path.relative_to(local_root).parts)),
-                            full_path=str(file_real_path),
-                            s3_key=s3_key,
-                            in_s3=in_s3,
-                            base_dir=str(session_dir),
-                        )
-                    )
+    def _get_output_cas_key(self, file_hash: str, s3_settings: JobAttachmentS3Settings) -> str:
+        """Returns the key of the CAS object of an output file with the given hash."""
+        s3_key = f"{file_hash}.{self.hash_alg.value}"
+        if s3_settings.full_cas_prefix():
+            s3_key = _join_s3_paths(s3_settings.full_cas_prefix(), s3_key)
+        return s3_key
 
-            self.logger.info(
-                f"Found {total_file_count} file{'' if total_file_count == 1 else 's'}"
-                f" totaling {_human_readable_file_size(total_file_size)}"
-                f" in output directory: {str(output_root)}"
+    def _is_output_in_s3(
+        self,
+        s3_key: str,
+        s3_settings: JobAttachmentS3Settings,
+        s3_check_cache: Optional[S3CheckCache],
+    ) -> bool:
+        """
+        Checks if the given CAS object exists, in the given S3 check cache first (if any), and records it in the
+        S3 check cache if it's found in S3.
+        """
+        cache_key = f"{s3_settings.s3BucketName}/{s3_key}"
+        if s3_check_cache is not None and s3_check_cache.get_entry(s3_key=cache_key):
+            return True
+        in_s3 = self.s3_uploader.file_already_uploaded(s3_settings.s3BucketName, s3_key)
+        if in_s3:
+            self._put_s3_check_cache_entry(s3_key, s3_settings, s3_check_cache)
+        return in_s3
+
+    def _put_s3_check_cache_entry(
+        self,
+        s3_key: str,
+        s3_settings: JobAttachmentS3Settings,
+        s3_check_cache: Optional[S3CheckCache],
+    ) -> None:
+        """Records that the given CAS object exists in the given S3 check cache, if any."""
+        if s3_check_cache is not None:
+            s3_check_cache.put_entry(
+                S3CheckCacheEntry(
+                    s3_key=f"{s3_settings.s3BucketName}/{s3_key}",
+                    last_seen_time=self.s3_uploader._get_current_timestamp(),
+                )
             )
 
-        return output_files
-
     def _is_file_within_directory(self, file_path: Path, directory_path: Path) -> bool:
         """
         Checks if the given file path is within the given directory path.
         """
-        real_file_path = file_path.resolve()
-        real_directory_path = directory_path.resolve()
+        return self._is_resolved_path_within_directory(
+            file_path.resolve(), directory_path.resolve()
+        )
+
+    @staticmethod
+    def _is_resolved_path_within_directory(real_file_path: Path, real_directory_path: Path) -> bool:
+        """
+        Checks if the given resolved file path is within the given resolved directory path.
+        """
         common_path = os.path.commonpath([real_file_path, real_directory_path])
         return common_path.startswith(str(real_directory_path))
 
@@ -712,15 +1030,22 @@ class AssetSync:
         return job.attachments if job and job.attachments else None
 
     def _record_attachment_mtimes(
-        self, merged_manifests_by_root: dict[str, BaseAssetManifest]
+        self, merged_manifests_by_root: dict[str, BaseAssetManifest], stat_files: bool = False
     ) -> None:
-        # Record the mapping of downloaded files' absolute paths to their last modification time
-        # (in microseconds). This is used to later determine which files have been modified or
-        # newly created during the session and need to be uploaded as output.
+        # Record the synced files' last modification times. This is used to later determine which files
+        # have been modified or newly created during the session and need to be uploaded as output.
+        # Downloaded files are given the modification times of the manifest, so they are only stat'ed
+        # if they weren't downloaded (such as the files of the virtual file system.)
         for local_root, merged_manifest in merged_manifests_by_root.items():
-            for manifest_path in merged_manifest.paths:
-                abs_path = str(Path(local_root) / manifest_path.path)
-                self.synced_assets_mtime[abs_path] = Path(abs_path).stat().st_mtime_ns
+            mtimes_ns: Optional[List[int]] = None
+            if stat_files:
+                mtimes_ns = [
+                    Path(local_root, path).stat().st_mtime_ns
+                    for path in iter_path_strings(merged_manifest.paths)
+                ]
+            self.synced_assets_mtime.record_manifest_paths(
+                local_root, merged_manifest.paths, mtimes_ns
+            )
 
     def _ensure_disk_capacity(self, session_dir: Path, total_input_bytes: int) -> None:
         """
@@ -791,6 +1116,7 @@ class AssetSync:
             return (SummaryStatistics(), [])
 
         grouped_manifests_by_root: DefaultDict[str, list[BaseAssetManifest]] = DefaultDict(list)
+        input_manifest_keys_by_root: list[Tuple[str, str]] = []
         pathmapping_rules: Dict[str, Dict[str, str]] = {}
 
         storage_profiles_source_paths = list(storage_profiles_path_mapping_rules.keys())
@@ -821,28 +1147,30 @@ class AssetSync:
                 manifest_s3_key = s3_settings.add_root_and_manifest_folder_prefix(
                     manifest_properties.inputManifestPath
                 )
-                manifest = get_manifest_from_s3(
-                    manifest_key=manifest_s3_key,
-                    s3_bucket=s3_settings.s3BucketName,
-                    session=self.session,
-                )
+                input_manifest_keys_by_root.append((local_root, manifest_s3_key))
+
+        with self._open_manifest_cache() as manifest_cache:
+            for local_root, manifest in self._get_input_manifests_from_s3(
+                s3_settings, input_manifest_keys_by_root, manifest_cache
+            ):
                 grouped_manifests_by_root[local_root].append(manifest)
 
-        # Handle step-step dependencies.
-        if step_dependencies:
-            for step_id in step_dependencies:
-                manifests_by_root = get_output_manifests_by_asset_root(
-                    s3_settings,
-                    self.farm_id,
-                    queue_id,
-                    job_id,
-                    step_id=step_id,
-                    session=self.session,
-                )
-                for root, manifests in manifests_by_root.items():
-                    dir_name = _get_unique_dest_dir_name(root)
-                    local_root = str(session_dir.joinpath(dir_name))
-                    grouped_manifests_by_root[local_root].extend(manifests)
+            # Handle step-step dependencies.
+            if step_dependencies:
+                for step_id in step_dependencies:
+                    manifests_by_root = get_output_manifests_by_asset_root(
+                        s3_settings,
+                        self.farm_id,
+                        queue_id,
+                        job_id,
+                        step_id=step_id,
+                        session=self.session,
+                        manifest_cache=manifest_cache,
+                    )
+                    for root, manifests in manifests_by_root.items():
+                        dir_name = _get_unique_dest_dir_name(root)
+                        local_root = str(session_dir.joinpath(dir_name))
+                        grouped_manifests_by_root[local_root].extend(manifests)
 
         # Merge the manifests in each root into a single manifest
         merged_manifests_by_root: dict[str, BaseAssetManifest] = dict()
@@ -876,7 +1204,7 @@ class AssetSync:
                     cas_prefix=s3_settings.full_cas_prefix(),
                 )
                 summary_statistics = SummaryStatistics()
-                self._record_attachment_mtimes(merged_manifests_by_root)
+                self._record_attachment_mtimes(merged_manifests_by_root, stat_files=True)
                 return (summary_statistics, list(pathmapping_rules.values()))
             except VFSExecutableMissingError:
                 logger.error(
@@ -894,6 +1222,7 @@ class AssetSync:
                 session=self.session,
                 on_downloading_files=on_downloading_files,
                 logger=self.logger,
+                object_cache=self.object_cache,
             )
         except JobAttachmentsS3ClientError as exc:
             if exc.status_code == 404:
@@ -910,6 +1239,8 @@ class AssetSync:
                 ) from exc
             else:
                 raise
+        finally:
+            self._evict_object_cache()
 
         self._record_attachment_mtimes(merged_manifests_by_root)
 
@@ -932,7 +1263,12 @@ class AssetSync:
         storage_profiles_path_mapping_rules: dict[str, str] = {},
         on_uploading_files: Optional[Callable[[ProgressReportMetadata], bool]] = None,
     ) -> SummaryStatistics:
-        """Uploads any output files specified in the manifest, if found."""
+        """
+        Uploads any output files specified in the manifest, if found. Stops the output watcher if it's
+        running, and doesn't upload again the output files it uploaded that haven't changed since.
+        """
+        self.stop_output_watcher()
+
         if not s3_settings:
             self.logger.info(
                 f"No Job Attachment settings configured for Queue {queue_id}, no outputs to sync."
@@ -944,6 +1280,125 @@ class AssetSync:
 
         all_output_files: List[OutputFile] = []
 
+        with S3CheckCache(self.s3_check_cache_dir, bulk_mode=True) as s3_check_cache:
+            s3_check_cache.preload_entries(
+                S3AssetUploader._get_s3_check_cache_prefix(
+                    s3_settings.s3BucketName, s3_settings.full_cas_prefix()
+                )
+            )
+
+            for manifest_properties, local_root, session_root in self._get_output_sync_roots(
+                attachments, session_dir, storage_profiles_path_mapping_rules
+            ):
+                output_files: List[OutputFile] = self._get_output_files(
+                    manifest_properties,
+                    s3_settings,
+                    local_root,
+                    session_root,
+                    s3_check_cache,
+                )
+                if output_files:
+                    output_manifest = self._generate_output_manifest(output_files)
+                    session_action_id_with_time_stamp = (
+                        f"{_float_to_iso_datetime_string(start_time)}_{session_action_id}"
+                    )
+                    full_output_prefix = s3_settings.full_output_prefix(
+                        farm_id=self.farm_id,
+                        queue_id=queue_id,
+                        job_id=job_id,
+                        step_id=step_id,
+                        task_id=task_id,
+                        session_action_id=session_action_id_with_time_stamp,
+                    )
+                    self._upload_output_manifest_to_s3(
+                        s3_settings=s3_settings,
+                        output_manifest=output_manifest,
+                        full_output_prefix=full_output_prefix,
+                        root_path=manifest_properties.rootPath,
+                        file_system_location_name=manifest_properties.fileSystemLocationName,
+                    )
+                    all_output_files.extend(output_files)
+
+            if all_output_files:
+                num_output_files = len(all_output_files)
+                self.logger.info(
+                    f"Uploading {num_output_files} output file{'' if num_output_files == 1 else 's'}"
+                    f" to S3: {s3_settings.s3BucketName}/{s3_settings.full_cas_prefix()}"
+                )
+                summary_stats: SummaryStatistics = self._upload_output_files_to_s3(
+                    s3_settings, all_output_files, on_uploading_files, s3_check_cache
+                )
+            else:
+                summary_stats = SummaryStatistics()
+
+        self._watched_outputs_uploaded.clear()
+        return summary_stats
+
+    def sync_step_outputs(
+        self,
+        s3_settings: Optional[JobAttachmentS3Settings],
+        queue_id: str,
+        job_id: str,
+        step_id: str,
+    ) -> List[str]:
+        """
+        Merges the output manifests of all the tasks of the given step into one output manifest per asset
+        root, and uploads them to the step's output prefix. Consumers of the step's outputs (such as
+        downloading the job's outputs, or the steps that depend on this step) then get these manifests
+        instead of the manifests of each task, for as long as no task of the step writes new outputs.
+
+        This is meant to be called once the step has completed. Returns the keys of the uploaded manifests.
+        """
+        if not s3_settings:
+            self.logger.info(
+                f"No Job Attachment settings configured for Queue {queue_id}, no outputs to sync."
+            )
+            return []
+
+        with self._open_manifest_cache() as manifest_cache:
+            manifests_by_root = get_output_manifests_by_asset_root(
+                s3_settings,
+                self.farm_id,
+                queue_id,
+                job_id,
+                step_id=step_id,
+                session=self.session,
+                manifest_cache=manifest_cache,
+                use_step_manifests=False,
+            )
+
+        step_output_prefix = s3_settings.full_step_compacted_output_prefix(
+            self.farm_id, queue_id, job_id, step_id
+        )
+        manifest_keys: List[str] = []
+        for root, manifests in manifests_by_root.items():
+            merged_manifest = merge_asset_manifests(manifests)
+            if merged_manifest is None:
+                continue
+            self.logger.info(
+                f"Merged {len(manifests)} output manifest{'' if len(manifests) == 1 else 's'}"
+                f" of step {step_id} for asset root: {root}"
+            )
+            manifest_keys.append(
+                self._upload_output_manifest_to_s3(
+                    s3_settings=s3_settings,
+                    output_manifest=merged_manifest,
+                    full_output_prefix=step_output_prefix,
+                    root_path=root,
+                )
+            )
+        return manifest_keys
+
+    @staticmethod
+    def _get_output_sync_roots(
+        attachments: Attachments,
+        session_dir: Path,
+        storage_profiles_path_mapping_rules: dict[str, str],
+    ) -> Iterator[Tuple[ManifestProperties, Path, Path]]:
+        """
+        Yields the manifest properties of each asset root, with its local root and the directory that its
+        output files must resolve within.
+        """
         storage_profiles_source_paths = list(storage_profiles_path_mapping_rules.keys())
 
         for manifest_properties in attachments.manifests:
@@ -970,46 +1425,236 @@ class AssetSync:
                 dir_name: str = _get_unique_dest_dir_name(manifest_properties.rootPath)
                 local_root = session_dir.joinpath(dir_name)
 
-            output_files: List[OutputFile] = self._get_output_files(
-                manifest_properties,
+            yield (manifest_properties, local_root, session_root)
+
+    def start_output_watcher(
+        self,
+        s3_settings: Optional[JobAttachmentS3Settings],
+        attachments: Optional[Attachments],
+        session_dir: Path,
+        storage_profiles_path_mapping_rules: dict[str, str] = {},
+        poll_interval: float = OUTPUT_WATCHER_POLL_INTERVAL,
+        stable_polls: int = OUTPUT_WATCHER_STABLE_POLLS,
+    ) -> None:
+        """
+        Starts uploading the output files of a task to the CAS while the task is running, so that the
+        `sync_outputs` call once the task has finished only has to upload the remaining files.
+
+        A background thread polls the output directories every `poll_interval` seconds. Output files that
+        are new or modified, and have had the same size and modification time for `stable_polls` consecutive
+        polls, are considered complete: they are hashed and uploaded, and are checked again once uploaded.
+        Files that changed in the meantime (or are never complete) are left to `sync_outputs`, as are all of
+        the output manifests. `sync_outputs` stops the watcher, or it can be stopped with `stop_output_watcher`.
+        """
+        if not s3_settings or not attachments:
+            return
+        if self._output_watcher is not None:
+            raise AssetSyncError("The output watcher is already running.")
+
+        self._output_watcher_stop.clear()
+        self._output_watcher_cancel.clear()
+        self._watched_outputs_uploaded.clear()
+        self._output_watcher = threading.Thread(
+            target=self._watch_outputs,
+            args=(
                 s3_settings,
-                local_root,
-                session_root,
-            )
-            if output_files:
-                output_manifest = self._generate_output_manifest(output_files)
-                session_action_id_with_time_stamp = (
-                    f"{_float_to_iso_datetime_string(start_time)}_{session_action_id}"
-                )
-                full_output_prefix = s3_settings.full_output_prefix(
-                    farm_id=self.farm_id,
-                    queue_id=queue_id,
-                    job_id=job_id,
-                    step_id=step_id,
-                    task_id=task_id,
-                    session_action_id=session_action_id_with_time_stamp,
+                attachments,
+                session_dir,
+                storage_profiles_path_mapping_rules,
+                poll_interval,
+                stable_polls,
+            ),
+            name="OutputWatcher",
+            daemon=True,
+        )
+        self._output_watcher.start()
+
+    def stop_output_watcher(self, cancel_uploads: bool = False) -> None:
+        """
+        Stops the output watcher, if it's running, and waits for it to finish the uploads in progress (or
+        cancels them, if `cancel_uploads` is set.)
+        """
+        if self._output_watcher is None:
+            return
+        if cancel_uploads:
+            self._output_watcher_cancel.set()
+        self._output_watcher_stop.set()
+        self._output_watcher.join()
+        self._output_watcher = None
+
+        num_uploaded = len(self._watched_outputs_uploaded)
+        uploaded_size = sum(uploaded[0] for uploaded in self._watched_outputs_uploaded.values())
+        self.logger.info(
+            f"Output watcher stopped, having uploaded {num_uploaded} output file{'' if num_uploaded == 1 else 's'}"
+            f" totaling {_human_readable_file_size(uploaded_size)}"
+        )
+
+    def _watch_outputs(
+        self,
+        s3_settings: JobAttachmentS3Settings,
+        attachments: Attachments,
+        session_dir: Path,
+        storage_profiles_path_mapping_rules: dict[str, str],
+        poll_interval: float,
+        stable_polls: int,
+    ) -> None:
+        """The body of the output watcher thread."""
+        # The size and modification time of each output file that hasn't been uploaded, with the number of
+        # consecutive polls it was seen with them.
+        observed_outputs: dict[str, Tuple[int, int, int]] = dict()
+
+        try:
+            with S3CheckCache(
+                self.s3_check_cache_dir, bulk_mode=True
+            ) as s3_check_cache, concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.s3_uploader.num_upload_workers
+            ) as executor:
+                while not self._output_watcher_stop.wait(poll_interval):
+                    try:
+                        complete_outputs = self._poll_outputs(
+                            attachments,
+                            session_dir,
+                            storage_profiles_path_mapping_rules,
+                            stable_polls,
+                            observed_outputs,
+                        )
+                    except Exception as e:
+                        self.logger.warning(
+                            f"Output watcher failed to poll the output directories: {e}"
+                        )
+                        continue
+
+                    futures = {
+                        executor.submit(
+                            self._upload_watched_output,
+                            file_path,
+                            file_state,
+                            session_root,
+                            s3_settings,
+                            s3_check_cache,
+                        ): file_path
+                        for file_path, file_state, session_root in complete_outputs
+                    }
+                    for future in concurrent.futures.as_completed(futures):
+                        try:
+                            future.result()
+                        except Exception as e:
+                            # The file is left to be uploaded by sync_outputs.
+                            self.logger.warning(
+                                f"Output watcher failed to upload {futures[future]}: {e}"
+                            )
+        except Exception as e:
+            self.logger.warning(f"Output watcher stopped unexpectedly: {e}")
+
+    def _poll_outputs(
+        self,
+        attachments: Attachments,
+        session_dir: Path,
+        storage_profiles_path_mapping_rules: dict[str, str],
+        stable_polls: int,
+        observed_outputs: dict[str, Tuple[int, int, int]],
+    ) -> List[Tuple[str, Tuple[int, int], Path]]:
+        """
+        Walks the output directories, and updates the observed sizes and modification times of the output files
+        that are new or modified, and haven't been uploaded as they are. Returns the path, size and modification
+        time, and session root of the output files that have had the same size and modification time for the
+        given number of consecutive polls.
+        """
+        previous_outputs = dict(observed_outputs)
+        observed_outputs.clear()
+        complete_outputs: List[Tuple[str, Tuple[int, int], Path]] = []
+
+        for manifest_properties, local_root, session_root in self._get_output_sync_roots(
+            attachments, session_dir, storage_profiles_path_mapping_rules
+        ):
+            for output_root in self._get_output_directories(manifest_properties, local_root):
+                if not output_root.is_dir():
+                    continue
+                for file_path, file_stat in self._walk_output_directory(output_root):
+                    # Unlike sync_outputs, this doesn't record the modification times of new files, so that
+                    # sync_outputs still includes them in the output manifest.
+                    mtime_when_synced = self.synced_assets_mtime.get(
+                        str(local_root), self._get_relative_path(local_root, file_path)
+                    )
+                    if mtime_when_synced and file_stat.st_mtime_ns <= int(mtime_when_synced):
+                        continue
+
+                    file_state = (file_stat.st_size, file_stat.st_mtime_ns)
+                    uploaded_output = self._watched_outputs_uploaded.get(file_path)
+                    if uploaded_output is not None and uploaded_output[:2] == file_state:
+                        continue
+
+                    previous_output = previous_outputs.get(file_path)
+                    polls = 1
+                    if previous_output is not None and previous_output[:2] == file_state:
+                        polls = previous_output[2] + 1
+                    observed_outputs[file_path] = (*file_state, polls)
+                    if polls >= stable_polls:
+                        complete_outputs.append((file_path, file_state, session_root))
+
+        return complete_outputs
+
+    def _upload_watched_output(
+        self,
+        file_path: str,
+        file_state: Tuple[int, int],
+        session_root: Path,
+        s3_settings: JobAttachmentS3Settings,
+        s3_check_cache: Optional[S3CheckCache],
+    ) -> None:
+        """
+        Uploads the given complete output file to the CAS (if it isn't there already), and records it as
+        uploaded with the given size and modification time.
+
+        Since the task may still be writing the file, the file is first copied (as a reflink where the file
+        system supports it) to a snapshot, which is only used if the file still has the given size and
+        modification time once copied. The snapshot is then hashed and uploaded, so that the uploaded
+        contents always match their CAS key.
+        """
+        # Resolve the real path to prevent time-of-check/time-of-use vulnerability
+        file_real_path = Path(file_path).resolve()
+        if not self._is_file_within_directory(file_real_path, session_root):
+            return
+        file_stat = file_real_path.stat()
+        if (
+            stat.S_ISDIR(file_stat.st_mode)
+            or (file_stat.st_size, file_stat.st_mtime_ns) != file_state
+        ):
+            return
+
+        with tempfile.TemporaryDirectory() as snapshot_dir:
+            snapshot_path = Path(snapshot_dir) / file_real_path.name
+            if not _clone_file(file_real_path, snapshot_path):
+                shutil.copyfile(file_real_path, snapshot_path)
+            file_stat = file_real_path.stat()
+            if (file_stat.st_size, file_stat.st_mtime_ns) != file_state:
+                self.logger.debug(
+                    f"Output file {file_path} changed while the output watcher was copying it. It will be"
+                    " uploaded once it is complete."
                 )
-                self._upload_output_manifest_to_s3(
-                    s3_settings=s3_settings,
-                    output_manifest=output_manifest,
-                    full_output_prefix=full_output_prefix,
-                    root_path=manifest_properties.rootPath,
-                    file_system_location_name=manifest_properties.fileSystemLocationName,
+                return
+
+            file_hash = hash_file(str(snapshot_path), self.hash_alg)
+            s3_key = self._get_output_cas_key(file_hash, s3_settings)
+            if not self._is_output_in_s3(s3_key, s3_settings, s3_check_cache):
+                progress_tracker = ProgressTracker(
+                    status=ProgressStatus.UPLOAD_IN_PROGRESS,
+                    total_files=1,
+                    total_bytes=file_stat.st_size,
+                    on_progress_callback=lambda _: not self._output_watcher_cancel.is_set(),
                 )
-                all_output_files.extend(output_files)
+                if not self.s3_uploader.upload_file_to_s3(
+                    local_path=snapshot_path,
+                    s3_bucket=s3_settings.s3BucketName,
+                    s3_upload_key=s3_key,
+                    progress_tracker=progress_tracker,
+                    base_dir_path=Path(snapshot_dir),
+                ):
+                    return
+                self._put_s3_check_cache_entry(s3_key, s3_settings, s3_check_cache)
 
-        if all_output_files:
-            num_output_files = len(all_output_files)
-            self.logger.info(
-                f"Uploading {num_output_files} output file{'' if num_output_files == 1 else 's'}"
-                f" to S3: {s3_settings.s3BucketName}/{s3_settings.full_cas_prefix()}"
-            )
-            summary_stats: SummaryStatistics = self._upload_output_files_to_s3(
-                s3_settings, all_output_files, on_uploading_files
-            )
-        else:
-            summary_stats = SummaryStatistics()
-        return summary_stats
+        self._watched_outputs_uploaded[file_path] = (*file_state, file_hash, s3_key)
+        self.logger.debug(f"Output watcher uploaded {file_path} to {s3_key}")
 
     def cleanup_session(
         self,
@@ -1,15 +1,27 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 
-from .cache_db import CacheDB, CONFIG_ROOT, COMPONENT_NAME
+from .cache_db import CacheDB, CacheStats, CONFIG_ROOT, COMPONENT_NAME
+from .cache_maintenance import CacheCleanResult, clean_caches, get_cache_stats
+from .cache_session import CacheSession
 from .hash_cache import HashCache, HashCacheEntry
+from .manifest_cache import ManifestCache, ManifestCacheEntry
+from .object_cache import ObjectCache
 from .s3_check_cache import S3CheckCache, S3CheckCacheEntry
 
 __all__ = [
+    "CacheCleanResult",
     "CacheDB",
+    "CacheSession",
+    "CacheStats",
+    "clean_caches",
+    "get_cache_stats",
     "CONFIG_ROOT",
     "COMPONENT_NAME",
     "HashCache",
     "HashCacheEntry",
+    "ManifestCache",
+    "ManifestCacheEntry",
+    "ObjectCache",
     "S3CheckCache",
     "S3CheckCacheEntry",
 ]
@@ -6,9 +6,11 @@ Module for defining a local cache file.
 
 import logging
 import os
+import time
 from abc import ABC
+from dataclasses import dataclass
 from threading import Lock
-from typing import Optional
+from typing import Any, List, Optional, Tuple
 
 from ..exceptions import JobAttachmentsError
 
@@ -18,14 +20,37 @@ COMPONENT_NAME = "job_attachments"
 logger = logging.getLogger("Deadline")
 
 
+@dataclass
+class CacheStats:
+    """Statistics of a local cache database"""
+
+    cache_name: str
+    file_path: str
+    # The size of the database file, including its write-ahead log.
+    file_size: int
+    entry_count: int
+    # The number of entries that are no longer valid, and are only taking space.
+    expired_entry_count: int
+    # The oldest last access time of the entries, in seconds since the epoch.
+    oldest_access_time: Optional[float]
+
+
 class CacheDB(ABC):
     """
     Abstract base class for connecting to a local SQLite cache database.
 
     This class is intended to always be used with a context manager to properly
     close the connection to the cache database.
+
+    Subclasses that set LAST_ACCESS_COLUMN to the column holding the last access time of each entry
+    (in seconds since the epoch) support evicting the least recently used entries.
     """
 
+    LAST_ACCESS_COLUMN: Optional[str] = None
+    # The number of entries deleted per transaction when evicting entries, so that other processes
+    # using the cache aren't blocked for long, and eviction can stop when out of time.
+    EVICTION_BATCH_SIZE = 10000
+
     def __init__(
         self, cache_name: str, table_name: str, create_query: str, cache_dir: Optional[str] = None
     ) -> None:
@@ -70,13 +95,22 @@ class CacheDB(ABC):
                 ) from oe
 
             try:
-                self.db_connection.execute(f"SELECT * FROM {self.table_name}")
-            except Exception:
+                # Write-ahead logging lets readers and a writer use the cache at the same time, so that
+                # concurrent processes (such as multiple CLI runs) don't block each other.
+                self.db_connection.execute("PRAGMA journal_mode=WAL")
+            except sqlite3.DatabaseError as de:
+                # Some file systems (such as network shares) don't support write-ahead logging.
+                logger.debug(f"Could not enable write-ahead logging for {self.cache_dir}: {de}")
+
+            if not self.db_connection.execute(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name=?", [self.table_name]
+            ).fetchone():
                 # DB file doesn't have our table, so we need to create it
                 logger.info(
                     f"No cache entries for the current library version were found. Creating a new cache for {self.cache_name}"
                 )
                 self.db_connection.execute(self.create_query)
+                self.migrate_from_previous_version()
         return self
 
     def __exit__(self, exc_type, exc_value, exc_traceback):
@@ -84,6 +118,162 @@ class CacheDB(ABC):
         if self.enabled:
             self.db_connection.close()
 
+    def migrate_from_previous_version(self) -> None:
+        """
+        Called after creating the table for the current cache version, to migrate the entries of the
+        previous version that are still valid. Does nothing by default.
+        """
+
+    def get_expiry_time(self) -> Optional[float]:
+        """
+        Returns the last access time before which entries are expired, or None if entries don't expire.
+        """
+        return None
+
+    def _expired_condition(self) -> Tuple[str, List[Any]]:
+        """Returns the SQL condition that matches the expired entries, and its parameters."""
+        expiry_time = self.get_expiry_time()
+        if self.LAST_ACCESS_COLUMN is None or expiry_time is None:
+            return ("0", [])
+        # Entries with a time that isn't a number can never be valid.
+        return (
+            f"(typeof({self.LAST_ACCESS_COLUMN}) NOT IN ('integer', 'real') OR {self.LAST_ACCESS_COLUMN} < ?)",
+            [expiry_time],
+        )
+
+    def get_file_size(self) -> int:
+        """Returns the size of the database file, including its write-ahead log."""
+        return sum(
+            os.path.getsize(path)
+            for path in (self.cache_dir, f"{self.cache_dir}-wal")
+            if os.path.exists(path)
+        )
+
+    def get_stats(self) -> CacheStats:
+        """Returns the statistics of this cache."""
+        if not self.enabled:
+            return CacheStats(self.cache_name, "", 0, 0, 0, None)
+
+        expired_condition, expired_params = self._expired_condition()
+        with self.db_lock:
+            entry_count = self.db_connection.execute(
+                f"SELECT COUNT(*) FROM {self.table_name}"
+            ).fetchone()[0]
+            expired_entry_count = self.db_connection.execute(
+                f"SELECT COUNT(*) FROM {self.table_name} WHERE {expired_condition}", expired_params
+            ).fetchone()[0]
+            oldest_access_time = None
+            if self.LAST_ACCESS_COLUMN is not None:
+                oldest_access_time = self.db_connection.execute(
+                    f"SELECT MIN({self.LAST_ACCESS_COLUMN}) FROM {self.table_name} "
+                    f"WHERE typeof({self.LAST_ACCESS_COLUMN}) IN ('integer', 'real')"
+                ).fetchone()[0]
+        return CacheStats(
+            cache_name=self.cache_name,
+            file_path=self.cache_dir,
+            file_size=self.get_file_size(),
+            entry_count=entry_count,
+            expired_entry_count=expired_entry_count,
+            oldest_access_time=oldest_access_time,
+        )
+
+    def evict_entries(
+        self,
+        max_age_seconds: Optional[float] = None,
+        max_size_bytes: Optional[int] = None,
+        deadline: Optional[float] = None,
+    ) -> int:
+        """
+        Deletes the expired entries, the entries that weren't accessed in the last max_age_seconds, and
+        then the least recently used entries until the entries fit in max_size_bytes. Entries are deleted
+        in batches, and no more batches are deleted once the deadline (a time.monotonic() value) has passed.
+        The database file doesn't shrink until it is vacuumed, but the space of evicted entries is reused.
+
+        Returns the number of entries that were deleted.
+        """
+        if not self.enabled or self.LAST_ACCESS_COLUMN is None:
+            return 0
+
+        conditions: List[Tuple[str, List[Any]]] = []
+        if self.get_expiry_time() is not None:
+            conditions.append(self._expired_condition())
+        if max_age_seconds is not None:
+            conditions.append((f"{self.LAST_ACCESS_COLUMN} < ?", [time.time() - max_age_seconds]))
+
+        evicted_count = 0
+        for condition, params in conditions:
+            evicted_count += self._delete_in_batches(condition, params, deadline)
+
+        if max_size_bytes is not None and not self._is_past(deadline):
+            size_condition = self._get_size_eviction_condition(max_size_bytes)
+            if size_condition is not None:
+                evicted_count += self._delete_in_batches(*size_condition, deadline)
+
+        if evicted_count:
+            logger.info(f"Evicted {evicted_count} entries from {self.cache_name}")
+        return evicted_count
+
+    def _get_size_eviction_condition(self, max_size_bytes: int) -> Optional[Tuple[str, List[Any]]]:
+        """
+        Returns the condition matching the least recently used entries to delete for the entries to fit
+        in the given size, estimated from the average size of the entries, or None if they already fit.
+        """
+        with self.db_lock:
+            page_size = self.db_connection.execute("PRAGMA page_size").fetchone()[0]
+            page_count = self.db_connection.execute("PRAGMA page_count").fetchone()[0]
+            free_page_count = self.db_connection.execute("PRAGMA freelist_count").fetchone()[0]
+            entry_count = self.db_connection.execute(
+                f"SELECT COUNT(*) FROM {self.table_name}"
+            ).fetchone()[0]
+            used_size = (page_count - free_page_count) * page_size
+            if entry_count == 0 or used_size <= max_size_bytes:
+                return None
+
+            max_entry_count = int(max_size_bytes / (used_size / entry_count))
+            # Find the last access time at which to cut, rather than sorting the entries for each batch.
+            cutoff_row = self.db_connection.execute(
+                f"SELECT {self.LAST_ACCESS_COLUMN} FROM {self.table_name} "
+                f"ORDER BY {self.LAST_ACCESS_COLUMN} ASC LIMIT 1 OFFSET ?",
+                [entry_count - max_entry_count],
+            ).fetchone()
+        if cutoff_row is None:
+            return ("1", [])
+        return (
+            f"({self.LAST_ACCESS_COLUMN} < ? OR {self.LAST_ACCESS_COLUMN} IS NULL)",
+            [cutoff_row[0]],
+        )
+
+    def _delete_in_batches(
+        self, condition: str, params: List[Any], deadline: Optional[float]
+    ) -> int:
+        deleted_count = 0
+        while not self._is_past(deadline):
+            with self.db_lock, self.db_connection:
+                cursor = self.db_connection.execute(
+                    f"DELETE FROM {self.table_name} WHERE rowid IN "
+                    f"(SELECT rowid FROM {self.table_name} WHERE {condition} LIMIT ?)",
+                    [*params, self.EVICTION_BATCH_SIZE],
+                )
+            deleted_count += cursor.rowcount
+            if cursor.rowcount < self.EVICTION_BATCH_SIZE:
+                break
+        return deleted_count
+
+    @staticmethod
+    def _is_past(deadline: Optional[float]) -> bool:
+        return deadline is not None and time.monotonic() >= deadline
+
+    def vacuum(self) -> None:
+        """
+        Rebuilds the database file to release the space of deleted entries. This rewrites the whole file,
+        so it can take a while for large caches.
+        """
+        if self.enabled:
+            with self.db_lock:
+                self.db_connection.execute("VACUUM")
+                # In write-ahead logging mode, the rebuilt database is written to the log first.
+                self.db_connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
     @classmethod
     def get_default_cache_db_file_dir(cls) -> Optional[str]:
         """
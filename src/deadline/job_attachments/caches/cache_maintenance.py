@@ -0,0 +1,104 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+
+"""
+Module for reporting on and bounding the size of the local cache databases.
+"""
+
+import os
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Type, Union
+
+from .cache_db import CacheStats
+from .hash_cache import HashCache
+from .manifest_cache import ManifestCache
+from .s3_check_cache import S3CheckCache
+
+MAINTAINED_CACHES: List[Type[Union[S3CheckCache, HashCache, ManifestCache]]] = [
+    S3CheckCache,
+    HashCache,
+    ManifestCache,
+]
+
+
+@dataclass
+class CacheCleanResult:
+    """The result of cleaning a local cache database"""
+
+    cache_name: str
+    evicted_entry_count: int
+    file_size_before: int
+    file_size_after: int
+    vacuumed: bool
+    # Whether cleaning stopped before it was complete because the time budget ran out.
+    timed_out: bool
+
+
+def _get_cache_db_path(
+    cache_class: Type[Union[S3CheckCache, HashCache, ManifestCache]], cache_dir: Optional[str]
+) -> Optional[str]:
+    """Returns the path of the database file of the given cache, or None if it doesn't exist."""
+    if cache_dir is None:
+        cache_dir = cache_class.get_default_cache_db_file_dir()
+    if cache_dir is None:
+        return None
+    cache_db_path = os.path.join(cache_dir, f"{cache_class.CACHE_NAME}.db")
+    return cache_db_path if os.path.exists(cache_db_path) else None
+
+
+def get_cache_stats(cache_dir: Optional[str] = None) -> List[CacheStats]:
+    """
+    Returns the statistics of each local cache in the given directory (or the default one) that exists.
+    """
+    stats: List[CacheStats] = []
+    for cache_class in MAINTAINED_CACHES:
+        if _get_cache_db_path(cache_class, cache_dir) is None:
+            continue
+        with cache_class(cache_dir) as cache:
+            stats.append(cache.get_stats())
+    return stats
+
+
+def clean_caches(
+    cache_dir: Optional[str] = None,
+    max_age_days: Optional[float] = None,
+    max_size_mb: Optional[float] = None,
+    vacuum: bool = False,
+    time_budget_seconds: Optional[float] = None,
+) -> List[CacheCleanResult]:
+    """
+    Cleans each local cache in the given directory (or the default one) that exists: deletes its expired
+    entries and the entries that weren't used in the last max_age_days, then evicts the least recently
+    used entries until the cache fits in max_size_mb, and optionally vacuums the database file to
+    release the space of the deleted entries.
+
+    If a time budget is given, no more entries are deleted once it runs out, and the databases aren't
+    vacuumed, since vacuuming can't be interrupted.
+    """
+    deadline = None if time_budget_seconds is None else time.monotonic() + time_budget_seconds
+    results: List[CacheCleanResult] = []
+    for cache_class in MAINTAINED_CACHES:
+        if _get_cache_db_path(cache_class, cache_dir) is None:
+            continue
+        with cache_class(cache_dir) as cache:
+            file_size_before = cache.get_file_size()
+            evicted_entry_count = cache.evict_entries(
+                max_age_seconds=None if max_age_days is None else max_age_days * 24 * 60 * 60,
+                max_size_bytes=None if max_size_mb is None else int(max_size_mb * 1024 * 1024),
+                deadline=deadline,
+            )
+            timed_out = deadline is not None and time.monotonic() >= deadline
+            should_vacuum = vacuum and deadline is None
+            if should_vacuum:
+                cache.vacuum()
+            results.append(
+                CacheCleanResult(
+                    cache_name=cache.cache_name,
+                    evicted_entry_count=evicted_entry_count,
+                    file_size_before=file_size_before,
+                    file_size_after=cache.get_file_size(),
+                    vacuumed=should_vacuum,
+                    timed_out=timed_out,
+                )
+            )
+    return results
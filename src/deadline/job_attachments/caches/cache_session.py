@@ -0,0 +1,75 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+
+"""
+Module for sharing the local caches across the operations of a submission.
+"""
+
+import logging
+from threading import Lock
+from typing import Optional
+
+from .hash_cache import HashCache
+from .s3_check_cache import S3CheckCache
+
+logger = logging.getLogger("Deadline")
+
+
+class CacheSession:
+    """
+    Opens each of the local caches (in bulk mode) the first time it's needed, and keeps it open until
+    the session is closed. Sharing a session across all the asset roots of a submission, and across
+    its hashing and upload phases, connects to each cache database only once.
+
+    This class is intended to always be used with a context manager to properly
+    close the caches that were opened.
+    """
+
+    def __init__(
+        self, hash_cache_dir: Optional[str] = None, s3_check_cache_dir: Optional[str] = None
+    ) -> None:
+        self.hash_cache_dir = hash_cache_dir
+        self.s3_check_cache_dir = s3_check_cache_dir
+        self._hash_cache: Optional[HashCache] = None
+        self._s3_check_cache: Optional[S3CheckCache] = None
+        self._lock = Lock()
+
+    def __enter__(self) -> "CacheSession":
+        """Called when entering the context manager."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        """Called when exiting the context manager."""
+        self.close()
+
+    def get_hash_cache(self) -> HashCache:
+        """Returns the hash cache of this session, opening it if it isn't open yet."""
+        with self._lock:
+            if self._hash_cache is None:
+                self._hash_cache = HashCache(self.hash_cache_dir, bulk_mode=True).__enter__()
+            return self._hash_cache
+
+    def get_s3_check_cache(self) -> S3CheckCache:
+        """Returns the S3 check cache of this session, opening it if it isn't open yet."""
+        with self._lock:
+            if self._s3_check_cache is None:
+                self._s3_check_cache = S3CheckCache(
+                    self.s3_check_cache_dir, bulk_mode=True
+                ).__enter__()
+            return self._s3_check_cache
+
+    def close(self) -> None:
+        """Writes the pending entries of the open caches and closes them."""
+        with self._lock:
+            caches = [cache for cache in (self._hash_cache, self._s3_check_cache) if cache]
+            self._hash_cache = None
+            self._s3_check_cache = None
+        error: Optional[Exception] = None
+        for cache in caches:
+            try:
+                cache.__exit__(None, None, None)
+            except Exception as e:
+                # Keep closing the other caches, and raise the first error once they're closed.
+                logger.debug(f"Failed to close {cache.cache_name}: {e}")
+                error = error or e
+        if error is not None:
+            raise error
@@ -5,8 +5,13 @@ Module for accessing the local file hash cache.
 """
 
 import logging
-from dataclasses import dataclass
-from typing import Any, Dict, Optional
+import os
+import time
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
 
 from .cache_db import CacheDB
 from ..asset_manifests.hash_algorithms import HashAlgorithm
@@ -24,14 +29,54 @@ class HashCacheEntry:
     file_path: str
     hash_algorithm: HashAlgorithm
     file_hash: str
-    last_modified_time: str
+    # The size, modification time, inode number and device of the file when it was hashed, as
+    # returned by os.stat. The hash is valid as long as all of them are unchanged.
+    file_size: int
+    mtime_ns: int
+    inode: int
+    device: int
+    # The time the entry was last written or looked up, in seconds since the epoch. This is only
+    # updated once per LAST_ACCESS_UPDATE_INTERVAL, and isn't part of the entry's identity.
+    last_access_time: int = field(default=0, compare=False)
+
+    @classmethod
+    def from_stat(
+        cls,
+        file_path: str,
+        hash_algorithm: HashAlgorithm,
+        file_hash: str,
+        stat_result: os.stat_result,
+    ) -> "HashCacheEntry":
+        """Creates an entry for the hash of a file with the given os.stat result."""
+        return cls(
+            file_path=file_path,
+            hash_algorithm=hash_algorithm,
+            file_hash=file_hash,
+            file_size=stat_result.st_size,
+            mtime_ns=stat_result.st_mtime_ns,
+            inode=stat_result.st_ino,
+            device=stat_result.st_dev,
+        )
+
+    def matches_stat(self, stat_result: os.stat_result) -> bool:
+        """Returns whether the file is unchanged since it was hashed, given its current os.stat result."""
+        return (
+            self.file_size == stat_result.st_size
+            and self.mtime_ns == stat_result.st_mtime_ns
+            and self.inode == stat_result.st_ino
+            and self.device == stat_result.st_dev
+        )
 
     def to_dict(self) -> Dict[str, Any]:
         return {
             "file_path": self.file_path,
             "hash_algorithm": self.hash_algorithm.value,
             "file_hash": self.file_hash,
-            "last_modified_time": self.last_modified_time,
+            "file_size": self.file_size,
+            "mtime_ns": self.mtime_ns,
+            "inode": self.inode,
+            "device": self.device,
+            "last_access_time": self.last_access_time,
         }
 
 
@@ -44,15 +89,34 @@ class HashCache(CacheDB):
 
     This class also automatically locks when doing writes, so it can be called
     by multiple threads.
+
+    In bulk mode, entries are written in batches rather than one transaction per entry, and the
+    entries under the paths given to `preload_entries` are looked up in memory without locking.
+    Pending entries are written when the context manager exits, or when `flush` is called.
+
+    The last access time of each entry is kept so that the least recently used entries can be evicted.
     """
 
     CACHE_NAME = "hash_cache"
-    CACHE_DB_VERSION = 3
+    # The schema changed once since version 3 (which stored the modification time as a string), to store
+    # the size, modification time, inode and device of the files, and the last access time of the entries.
+    # Version 4 was skipped, so that the tables of unreleased builds are never read with other columns.
+    CACHE_DB_VERSION = 5
+    LAST_ACCESS_COLUMN = "last_access_time"
+    # The number of pending entries at which they are written to the database in bulk mode.
+    BULK_WRITE_BATCH_SIZE = 1000
+    # The minimum time, in seconds, between updates of the last access time of an entry that is looked up.
+    LAST_ACCESS_UPDATE_INTERVAL = 24 * 60 * 60
+    # The number of version 3 entries that are migrated per transaction.
+    MIGRATION_BATCH_SIZE = 1000
+    # The time, in seconds, after which the migration of the version 3 entries stops.
+    MIGRATION_TIME_LIMIT = 5
 
-    def __init__(self, cache_dir: Optional[str] = None) -> None:
+    def __init__(self, cache_dir: Optional[str] = None, bulk_mode: bool = False) -> None:
         table_name: str = f"hashesV{self.CACHE_DB_VERSION}"
         create_query: str = (
-            f"CREATE TABLE hashesV{self.CACHE_DB_VERSION}(file_path blob primary key, hash_algorithm text secondary key, file_hash text, last_modified_time timestamp)"
+            f"CREATE TABLE hashesV{self.CACHE_DB_VERSION}(file_path blob primary key, hash_algorithm text secondary key, file_hash text, "
+            "file_size integer, mtime_ns integer, inode integer, device integer, last_access_time integer)"
         )
         super().__init__(
             cache_name=self.CACHE_NAME,
@@ -60,6 +124,197 @@ class HashCache(CacheDB):
             create_query=create_query,
             cache_dir=cache_dir,
         )
+        self.bulk_mode = bulk_mode
+        self._preloaded_prefixes: List[Tuple[str, HashAlgorithm]] = []
+        self._entries: Dict[Tuple[str, HashAlgorithm], HashCacheEntry] = {}
+        self._pending_entries: Dict[Tuple[str, HashAlgorithm], Dict[str, Any]] = {}
+        self._accessed_entries: Dict[Tuple[str, HashAlgorithm], Dict[str, Any]] = {}
+        self._pending_lock = Lock()
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        """Called when exiting the context manager."""
+        if self.enabled:
+            self.flush()
+        super().__exit__(exc_type, exc_value, exc_traceback)
+
+    def preload_entries(self, path_prefix: str, hash_algorithm: HashAlgorithm) -> None:
+        """
+        Loads the entries of all the file paths starting with the given prefix into memory, so that
+        looking up any of these file paths doesn't query the database. Only used in bulk mode.
+        The prefix is resolved first (such as a root under a symbolic link), since the entries are
+        keyed by resolved file paths.
+        """
+        if not self.enabled or not self.bulk_mode:
+            return
+        path_prefix = str(Path(path_prefix).resolve())
+        if not path_prefix.endswith(os.sep):
+            path_prefix += os.sep
+        if self._is_preloaded(path_prefix, hash_algorithm):
+            return
+
+        prefix = path_prefix.encode(encoding="utf-8", errors="surrogatepass")
+        with self.db_lock, self.db_connection:
+            # A byte of 0xFF never occurs in UTF-8, so this range contains exactly the paths with the prefix.
+            rows = self.db_connection.execute(
+                f"SELECT * FROM {self.table_name} WHERE file_path >= ? AND file_path < ? AND hash_algorithm=?",
+                [prefix, prefix + b"\xff", hash_algorithm.value],
+            ).fetchall()
+        for row in rows:
+            entry = self._entry_from_row(row)
+            self._entries.setdefault((entry.file_path, entry.hash_algorithm), entry)
+        self._preloaded_prefixes.append((path_prefix, hash_algorithm))
+        logger.debug(f"Loaded {len(rows)} hash cache entries under {path_prefix}")
+
+    def flush(self) -> None:
+        """
+        Writes the pending entries of bulk mode, and the last access times of the entries that were
+        looked up, to the database in a single transaction.
+        """
+        with self._pending_lock:
+            pending_entries = list(self._pending_entries.values())
+            self._pending_entries.clear()
+            accessed_entries = list(self._accessed_entries.values())
+            self._accessed_entries.clear()
+        if not pending_entries and not accessed_entries:
+            return
+
+        with self.db_lock, self.db_connection:
+            self.db_connection.executemany(
+                self._insert_query(),
+                pending_entries,
+            )
+            self.db_connection.executemany(
+                self._update_last_access_query(),
+                accessed_entries,
+            )
+
+    def migrate_from_previous_version(self) -> None:
+        """
+        Copies the entries of the version 3 cache (which only stored the modification time as a string)
+        for the files that are unchanged since they were hashed. The migrated entries are considered
+        accessed now. The previous table is kept for older versions of this library.
+
+        The entries are migrated in batches of MIGRATION_BATCH_SIZE, each in its own transaction, and the
+        files are checked without holding the lock. Migration stops after MIGRATION_TIME_LIMIT seconds,
+        so that opening a large cache doesn't stall; the remaining files are hashed again when needed.
+        """
+        previous_table_name = "hashesV3"
+        if not self.db_connection.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name=?", [previous_table_name]
+        ).fetchone():
+            return
+
+        logger.info(f"Migrating the entries of {previous_table_name} to {self.table_name}")
+        now = int(time.time())
+        deadline = time.monotonic() + self.MIGRATION_TIME_LIMIT
+        last_rowid = -1
+        migrated_count = 0
+        while True:
+            with self.db_lock:
+                rows = self.db_connection.execute(
+                    f"SELECT rowid, * FROM {previous_table_name} WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    [last_rowid, self.MIGRATION_BATCH_SIZE],
+                ).fetchall()
+            if not rows:
+                break
+            last_rowid = rows[-1][0]
+
+            migrated_entries = [
+                entry_dict
+                for entry_dict in (self._migrated_entry(row[1:], now) for row in rows)
+                if entry_dict is not None
+            ]
+            with self.db_lock, self.db_connection:
+                self.db_connection.executemany(self._insert_query(), migrated_entries)
+            migrated_count += len(migrated_entries)
+
+            if len(rows) < self.MIGRATION_BATCH_SIZE:
+                break
+            if self._is_past(deadline):
+                logger.info(
+                    f"Stopped migrating the entries of {previous_table_name} after {self.MIGRATION_TIME_LIMIT} "
+                    "seconds. The files of the remaining entries will be hashed again."
+                )
+                break
+        logger.debug(f"Migrated {migrated_count} entries of {previous_table_name}")
+
+    @staticmethod
+    def _migrated_entry(row: Tuple[Any, ...], last_access_time: int) -> Optional[Dict[str, Any]]:
+        """
+        Returns the version 5 entry for a row of the version 3 cache, or None if the file changed since
+        it was hashed.
+        """
+        file_path = str(row[0], encoding="utf-8", errors="surrogatepass")
+        try:
+            stat_result = os.stat(file_path)
+        except OSError:
+            return None
+        if str(datetime.fromtimestamp(stat_result.st_mtime)) != str(row[3]):
+            return None
+        try:
+            hash_algorithm = HashAlgorithm(row[1])
+        except ValueError:
+            return None
+        entry_dict = HashCacheEntry.from_stat(
+            file_path, hash_algorithm, row[2], stat_result
+        ).to_dict()
+        entry_dict["file_path"] = row[0]
+        entry_dict["last_access_time"] = last_access_time
+        return entry_dict
+
+    def _insert_query(self) -> str:
+        return (
+            f"INSERT OR REPLACE INTO {self.table_name} "
+            "VALUES(:file_path, :hash_algorithm, :file_hash, :file_size, :mtime_ns, :inode, :device, :last_access_time)"
+        )
+
+    def _update_last_access_query(self) -> str:
+        return (
+            f"UPDATE {self.table_name} SET last_access_time=:last_access_time "
+            "WHERE file_path=:file_path AND hash_algorithm=:hash_algorithm"
+        )
+
+    def _record_access(self, entry: HashCacheEntry) -> None:
+        """
+        Updates the last access time of an entry that was looked up, if it wasn't updated recently.
+        In bulk mode, the update is written with the pending entries.
+        """
+        now = int(time.time())
+        if now - entry.last_access_time < self.LAST_ACCESS_UPDATE_INTERVAL:
+            return
+        access = {
+            "file_path": entry.file_path.encode(encoding="utf-8", errors="surrogatepass"),
+            "hash_algorithm": entry.hash_algorithm.value,
+            "last_access_time": now,
+        }
+        if self.bulk_mode:
+            with self._pending_lock:
+                stored_entry = self._entries.get((entry.file_path, entry.hash_algorithm))
+                if stored_entry is not None:
+                    stored_entry.last_access_time = now
+                self._accessed_entries[(entry.file_path, entry.hash_algorithm)] = access
+        else:
+            with self.db_lock, self.db_connection:
+                self.db_connection.execute(self._update_last_access_query(), access)
+
+    def _is_preloaded(self, file_path_key: str, hash_algorithm: HashAlgorithm) -> bool:
+        return any(
+            file_path_key.startswith(prefix) and hash_algorithm == prefix_hash_algorithm
+            for prefix, prefix_hash_algorithm in self._preloaded_prefixes
+        )
+
+    @staticmethod
+    def _entry_from_row(row: Tuple[Any, ...]) -> HashCacheEntry:
+        return HashCacheEntry(
+            file_path=str(row[0], encoding="utf-8", errors="surrogatepass"),
+            hash_algorithm=HashAlgorithm(row[1]),
+            file_hash=row[2],
+            file_size=row[3],
+            mtime_ns=row[4],
+            inode=row[5],
+            device=row[6],
+            last_access_time=row[7] or 0,
+        )
 
     def get_entry(
         self, file_path_key: str, hash_algorithm: HashAlgorithm
@@ -70,6 +325,15 @@ class HashCache(CacheDB):
         if not self.enabled:
             return None
 
+        if self.bulk_mode:
+            entry = self._entries.get((file_path_key, hash_algorithm))
+            if entry is not None:
+                self._record_access(entry)
+                # Return a copy, since callers update the entries they get.
+                return replace(entry)
+            if self._is_preloaded(file_path_key, hash_algorithm):
+                return None
+
         with self.db_lock, self.db_connection:
             entry_vals = self.db_connection.execute(
                 f"SELECT * FROM {self.table_name} WHERE file_path=? AND hash_algorithm=?",
@@ -78,25 +342,40 @@ class HashCache(CacheDB):
                     hash_algorithm.value,
                 ],
             ).fetchone()
-            if entry_vals:
-                return HashCacheEntry(
-                    file_path=str(entry_vals[0], encoding="utf-8", errors="surrogatepass"),
-                    hash_algorithm=HashAlgorithm(entry_vals[1]),
-                    file_hash=entry_vals[2],
-                    last_modified_time=str(entry_vals[3]),
-                )
-            else:
-                return None
+        if entry_vals:
+            entry = self._entry_from_row(entry_vals)
+            self._record_access(entry)
+            return entry
+        else:
+            return None
 
     def put_entry(self, entry: HashCacheEntry) -> None:
-        """Inserts or replaces an entry into the hash cache database after acquiring the lock."""
-        if self.enabled:
+        """
+        Inserts or replaces an entry into the hash cache database after acquiring the lock. In bulk mode,
+        the entry is added to the pending entries, which are written once there are enough of them.
+        """
+        if self.enabled and self.bulk_mode:
+            entry = replace(entry, last_access_time=int(time.time()))
+            entry_dict = entry.to_dict()
+            entry_dict["file_path"] = entry_dict["file_path"].encode(
+                encoding="utf-8", errors="surrogatepass"
+            )
+            key = (entry.file_path, entry.hash_algorithm)
+            with self._pending_lock:
+                self._entries[key] = entry
+                self._pending_entries[key] = entry_dict
+                self._accessed_entries.pop(key, None)
+                should_flush = len(self._pending_entries) >= self.BULK_WRITE_BATCH_SIZE
+            if should_flush:
+                self.flush()
+        elif self.enabled:
             with self.db_lock, self.db_connection:
                 entry_dict = entry.to_dict()
+                entry_dict["last_access_time"] = int(time.time())
                 entry_dict["file_path"] = entry_dict["file_path"].encode(
                     encoding="utf-8", errors="surrogatepass"
                 )
                 self.db_connection.execute(
-                    f"INSERT OR REPLACE INTO {self.table_name} VALUES(:file_path, :hash_algorithm, :file_hash, :last_modified_time)",
+                    self._insert_query(),
                     entry_dict,
                 )
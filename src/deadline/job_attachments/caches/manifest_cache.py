@@ -0,0 +1,176 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+
+"""
+Module for accessing the local cache of the manifests downloaded from S3.
+"""
+
+import logging
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from deadline.client.config import config_file
+
+from ..asset_manifests.base_manifest import BaseAssetManifest
+from ..asset_manifests.decode import decode_manifest
+from ..exceptions import JobAttachmentsError
+from .cache_db import CacheDB
+
+
+logger = logging.getLogger("Deadline")
+
+
+@dataclass
+class ManifestCacheEntry:
+    """Represents an entry in the local manifest cache database"""
+
+    # The bucket and key of the manifest object, as "{bucket}/{key}".
+    s3_key: str
+    # The ETag of the manifest object, which changes whenever the object is overwritten.
+    etag: str
+    # The asset root stored in the metadata of output manifests.
+    asset_root: Optional[str]
+    manifest: BaseAssetManifest
+    # The time the entry was last written or looked up, in seconds since the epoch. This is only
+    # updated once per LAST_ACCESS_UPDATE_INTERVAL, and isn't part of the entry's identity.
+    last_access_time: int = field(default=0, compare=False)
+
+
+class ManifestCache(CacheDB):
+    """
+    Maintains a cache of the manifests downloaded from the Job Attachments S3 bucket in a local
+    database, so that a manifest that was already downloaded (such as an input manifest, which
+    never changes once written) is neither downloaded nor validated again.
+
+    Manifests are stored as their canonical JSON encoding, compressed, and are decoded without
+    validating them against the manifest schema, since they were decoded when first downloaded.
+
+    This class is intended to always be used with a context manager to properly
+    close the connection to the manifest cache database.
+
+    This class also automatically locks when doing writes, so it can be called
+    by multiple threads.
+
+    If a maximum size is given, the least recently used entries are evicted when the context manager
+    exits, until the cache fits in it.
+    """
+
+    CACHE_NAME = "manifest_cache"
+    CACHE_DB_VERSION = 1
+    LAST_ACCESS_COLUMN = "last_access_time"
+    # The minimum time, in seconds, between updates of the last access time of an entry that is looked up.
+    LAST_ACCESS_UPDATE_INTERVAL = 24 * 60 * 60
+
+    def __init__(
+        self, cache_dir: Optional[str] = None, max_size_bytes: Optional[int] = None
+    ) -> None:
+        table_name: str = f"manifestsV{self.CACHE_DB_VERSION}"
+        create_query: str = (
+            f"CREATE TABLE manifestsV{self.CACHE_DB_VERSION}(s3_key text primary key, etag text, "
+            "asset_root text, manifest blob, last_access_time integer)"
+        )
+        super().__init__(
+            cache_name=self.CACHE_NAME,
+            table_name=table_name,
+            create_query=create_query,
+            cache_dir=cache_dir,
+        )
+        self.max_size_bytes = max_size_bytes
+
+    @classmethod
+    def from_config(cls, cache_dir: Optional[str] = None) -> "ManifestCache":
+        """
+        Creates the manifest cache in the given directory, or in the cache directory of the configuration
+        if none is given, bounded to the size set in the configuration settings.
+        """
+        return cls(
+            cache_dir=cache_dir if cache_dir is not None else config_file.get_cache_directory(),
+            max_size_bytes=cls.get_max_size_from_config(),
+        )
+
+    @staticmethod
+    def get_max_size_from_config() -> Optional[int]:
+        """Returns the maximum size of the cache set in the configuration settings, or None if it is unbounded."""
+        try:
+            max_size_mb = int(config_file.get_setting("settings.manifest_cache_max_size_mb"))
+        except ValueError as ve:
+            raise JobAttachmentsError(
+                f"Nonvalid value for configuration setting: 'manifest_cache_max_size_mb' must be an integer. {ve}"
+            ) from ve
+        return max_size_mb * 1024 * 1024 if max_size_mb > 0 else None
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        """Called when exiting the context manager."""
+        if self.enabled and self.max_size_bytes is not None:
+            self.evict_entries(max_size_bytes=self.max_size_bytes)
+        super().__exit__(exc_type, exc_value, exc_traceback)
+
+    def get_entry(self, s3_key: str, etag: Optional[str] = None) -> Optional[ManifestCacheEntry]:
+        """
+        Returns the cached manifest of the given "{bucket}/{key}", if it exists. If an ETag is given,
+        the entry is only returned if the cached manifest has the same ETag.
+        """
+        if not self.enabled:
+            return None
+
+        with self.db_lock, self.db_connection:
+            entry_vals = self.db_connection.execute(
+                f"SELECT * FROM {self.table_name} WHERE s3_key=?",
+                [s3_key],
+            ).fetchone()
+        if not entry_vals or (etag is not None and entry_vals[1] != etag):
+            return None
+
+        try:
+            manifest = _decode_cached_manifest(entry_vals[3])
+        except Exception as e:
+            logger.warning(f"Cached manifest for S3 key {s3_key} is not valid. Ignoring. ({e})")
+            return None
+        entry = ManifestCacheEntry(
+            s3_key=entry_vals[0],
+            etag=entry_vals[1],
+            asset_root=entry_vals[2],
+            manifest=manifest,
+            last_access_time=entry_vals[4] or 0,
+        )
+        self._record_access(entry)
+        return entry
+
+    def put_entry(self, entry: ManifestCacheEntry) -> None:
+        """Inserts or replaces an entry into the cache database after acquiring the lock."""
+        if not self.enabled:
+            return
+
+        entry_dict: Dict[str, Any] = {
+            "s3_key": entry.s3_key,
+            "etag": entry.etag,
+            "asset_root": entry.asset_root,
+            "manifest": zlib.compress(entry.manifest.encode().encode("utf-8")),
+            "last_access_time": int(time.time()),
+        }
+        with self.db_lock, self.db_connection:
+            self.db_connection.execute(
+                f"INSERT OR REPLACE INTO {self.table_name} "
+                "VALUES(:s3_key, :etag, :asset_root, :manifest, :last_access_time)",
+                entry_dict,
+            )
+
+    def _record_access(self, entry: ManifestCacheEntry) -> None:
+        """Updates the last access time of an entry that was looked up, if it wasn't updated recently."""
+        now = int(time.time())
+        if now - entry.last_access_time < self.LAST_ACCESS_UPDATE_INTERVAL:
+            return
+        with self.db_lock, self.db_connection:
+            self.db_connection.execute(
+                f"UPDATE {self.table_name} SET last_access_time=? WHERE s3_key=?",
+                [now, entry.s3_key],
+            )
+
+
+def _decode_cached_manifest(data: bytes) -> BaseAssetManifest:
+    """
+    Decodes a manifest stored by the cache. The manifest is trusted, so it isn't validated against
+    its schema, since only manifests that were already decoded are stored.
+    """
+    return decode_manifest(zlib.decompress(data).decode("utf-8"), trusted=True)
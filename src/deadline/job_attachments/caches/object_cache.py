@@ -0,0 +1,336 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+
+"""
+Module for the local cache of the objects downloaded from the Job Attachments CAS.
+"""
+
+import logging
+import os
+import shutil
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import DefaultDict, Iterator, List, Optional, Tuple
+
+from deadline.client.config import config_file
+
+from .._utils import _clone_file
+from ..asset_manifests.hash_algorithms import HashAlgorithm, hash_file
+from ..exceptions import JobAttachmentsError
+from .cache_db import COMPONENT_NAME, CONFIG_ROOT
+
+logger = logging.getLogger("Deadline")
+
+# The size of the objects that this process added to each cache directory since it last counted them
+# in the stored size of the cache.
+_added_sizes: DefaultDict[Path, int] = defaultdict(int)
+_added_sizes_lock = threading.Lock()
+
+
+class ObjectCache:
+    """
+    A content-addressed cache of the objects downloaded from the Job Attachments CAS, kept in a local
+    directory that is shared by all the sessions (and processes) on a host. Each object is stored
+    under the name `{hash}.{hashAlg}`, so that a file is downloaded only once for all the sessions
+    that need it, and is then copied (or hard linked) from the cache.
+
+    Since the cache is shared by all the jobs of the host, a file is only added to it once its
+    contents are hashed again and match its hash, so that an object uploaded with contents that
+    don't match its CAS key never reaches other jobs. Objects are written to a temporary file and
+    renamed, so that other processes never see partial objects. Since the cache is bounded by `evict`, which deletes the least recently used objects,
+    objects can disappear at any time, and reading an object that disappeared is a cache miss.
+
+    So that evicting objects doesn't scan the whole cache on every download, the size of the cache
+    is stored in a file, to which each process adds the size of the objects it added. The cache is
+    only scanned when this size exceeds the maximum size, or when the stored size is missing or old.
+    """
+
+    CACHE_NAME = "object_cache"
+    DEFAULT_MAX_SIZE_BYTES = 10 * 1024 * 1024 * 1024
+    LOCK_FILE_NAME = ".lock"
+    SIZE_FILE_NAME = ".size"
+    TEMP_FILE_SUFFIX = ".tmp"
+    # Temporary files that are older than this were left by a process that stopped while writing
+    # them, and are deleted by `evict`.
+    STALE_TEMP_FILE_AGE_SECONDS = 24 * 60 * 60
+    # The stored size of the cache is recomputed by scanning the cache once it is older than this,
+    # which also corrects it for the objects that were deleted by other means.
+    STORED_SIZE_MAX_AGE_SECONDS = 24 * 60 * 60
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES,
+        use_hardlinks: bool = False,
+    ) -> None:
+        """
+        Args:
+            cache_dir: The directory of the cache. Defaults to a directory in the user's home directory.
+            max_size_bytes: The size that `evict` bounds the cache to.
+            use_hardlinks: Whether to hard link the files to the cached objects instead of copying them.
+                The linked files share their contents, permissions and modification times with the
+                cached objects, so this must only be used if the files aren't modified (nor their
+                permissions changed), and the least recently used objects are then only approximately
+                known.
+        """
+        if cache_dir is None:
+            cache_dir = self.get_default_cache_dir()
+        self.cache_dir = Path(cache_dir)
+        self.max_size_bytes = max_size_bytes
+        self.use_hardlinks = use_hardlinks
+
+    @classmethod
+    def from_config(cls) -> Optional["ObjectCache"]:
+        """
+        Creates the object cache from the configuration settings, or returns None if the object cache
+        isn't enabled.
+        """
+        if not config_file.str2bool(config_file.get_setting("settings.object_cache_enabled")):
+            return None
+        try:
+            max_size_mb = int(config_file.get_setting("settings.object_cache_max_size_mb"))
+            use_hardlinks = config_file.str2bool(
+                config_file.get_setting("settings.object_cache_use_hardlinks")
+            )
+        except ValueError as ve:
+            raise JobAttachmentsError(
+                "Nonvalid value for configuration setting: 'object_cache_max_size_mb' must be an integer, "
+                f"and 'object_cache_use_hardlinks' must be a boolean. {ve}"
+            ) from ve
+        return cls(
+            cache_dir=config_file.get_setting("settings.object_cache_dir") or None,
+            max_size_bytes=max_size_mb * 1024 * 1024,
+            use_hardlinks=use_hardlinks,
+        )
+
+    @classmethod
+    def get_default_cache_dir(cls) -> str:
+        """Gets the default directory of the cache, in the user's home directory."""
+        return str(Path.home() / CONFIG_ROOT / COMPONENT_NAME / cls.CACHE_NAME)
+
+    def without_hardlinks(self) -> "ObjectCache":
+        """Returns the same cache, but copying the files from the cached objects instead of linking them."""
+        return ObjectCache(str(self.cache_dir), self.max_size_bytes, use_hardlinks=False)
+
+    def get_object_path(self, file_hash: str, hash_alg: HashAlgorithm) -> Path:
+        """
+        Returns the path of the cached object with the given hash. Objects are spread over
+        subdirectories by the first characters of their hash, to keep each directory small.
+        """
+        return self.cache_dir / file_hash[:2] / f"{file_hash}.{hash_alg.value}"
+
+    def materialize(
+        self,
+        file_hash: str,
+        hash_alg: HashAlgorithm,
+        destination: Path,
+        mtime_ns: Optional[int] = None,
+    ) -> bool:
+        """
+        Writes the cached object with the given hash to the destination, replacing the destination
+        if it exists, and sets its modification time to the given one. Returns False if the object
+        isn't in the cache.
+
+        When using hard links, the destination is only linked to the object if the object already has
+        the given modification time, since setting it would change the modification time of the
+        object (and of the other files linked to it). Otherwise the object is copied.
+        """
+        object_path = self.get_object_path(file_hash, hash_alg)
+        try:
+            if self.use_hardlinks and (
+                mtime_ns is None or object_path.stat().st_mtime_ns == mtime_ns
+            ):
+                if destination.is_file():
+                    destination.unlink()
+                os.link(object_path, destination)
+                return True
+            # Marks the object as recently used. Hard linked objects aren't touched, since that
+            # would change the modification time of the linked files.
+            if not self.use_hardlinks:
+                os.utime(object_path)
+            if not _clone_file(object_path, destination):
+                shutil.copyfile(object_path, destination)
+            if mtime_ns is not None:
+                os.utime(destination, ns=(mtime_ns, mtime_ns))
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            logger.debug(f"Failed to write {str(destination)} from the object cache: {e}")
+            return False
+        return True
+
+    def put(self, file_hash: str, hash_alg: HashAlgorithm, source: Path) -> None:
+        """
+        Adds the given file to the cache as the object with the given hash, if it isn't already there
+        and its contents match the hash. Failing to add it only logs a warning, since the file itself
+        has been written.
+        """
+        object_path = self.get_object_path(file_hash, hash_alg)
+        if object_path.is_file():
+            return
+        try:
+            actual_hash = hash_file(str(source), hash_alg)
+        except OSError as e:
+            logger.warning(f"Failed to add {str(source)} to the object cache: {e}")
+            return
+        if actual_hash != file_hash:
+            logger.warning(
+                f"Not adding {str(source)} to the object cache, since its contents don't match "
+                f"its hash {file_hash} (they hash to {actual_hash})."
+            )
+            return
+        temp_path = object_path.with_name(
+            f"{object_path.name}.{uuid.uuid4().hex}{self.TEMP_FILE_SUFFIX}"
+        )
+        try:
+            object_path.parent.mkdir(parents=True, exist_ok=True)
+            if self.use_hardlinks:
+                os.link(source, temp_path)
+            elif not _clone_file(source, temp_path):
+                shutil.copyfile(source, temp_path)
+            object_size = temp_path.stat().st_size
+            os.replace(temp_path, object_path)
+            with _added_sizes_lock:
+                _added_sizes[self.cache_dir] += object_size
+        except OSError as e:
+            logger.warning(f"Failed to add {str(source)} to the object cache: {e}")
+            try:
+                temp_path.unlink()
+            except OSError:
+                pass
+
+    def _list_objects(self) -> Tuple[List[Tuple[float, int, Path]], List[Path]]:
+        """
+        Returns a list of (last access time, size, path) of the cached objects, and the list of the
+        stale temporary files.
+        """
+        objects: List[Tuple[float, int, Path]] = []
+        stale_temp_files: List[Path] = []
+        stale_time = time.time() - self.STALE_TEMP_FILE_AGE_SECONDS
+        if not self.cache_dir.is_dir():
+            return (objects, stale_temp_files)
+        for subdir in os.scandir(self.cache_dir):
+            if not subdir.is_dir(follow_symlinks=False):
+                continue
+            for entry in os.scandir(subdir.path):
+                try:
+                    stat = entry.stat(follow_symlinks=False)
+                except OSError:
+                    # The object has been evicted by another process.
+                    continue
+                if entry.name.endswith(self.TEMP_FILE_SUFFIX):
+                    if stat.st_mtime < stale_time:
+                        stale_temp_files.append(Path(entry.path))
+                    continue
+                objects.append((stat.st_mtime, stat.st_size, Path(entry.path)))
+        return (objects, stale_temp_files)
+
+    def get_size(self) -> int:
+        """Returns the total size of the cached objects."""
+        return sum(size for _, size, _ in self._list_objects()[0])
+
+    def _read_stored_size(self) -> Tuple[Optional[int], float]:
+        """
+        Returns the stored size of the cache and the time at which the cache was last scanned.
+        The size is None if it is missing, not valid, or older than the maximum age.
+        """
+        try:
+            size, scan_time = (self.cache_dir / self.SIZE_FILE_NAME).read_text().split()
+            if time.time() - float(scan_time) > self.STORED_SIZE_MAX_AGE_SECONDS:
+                return (None, 0)
+            return (int(size), float(scan_time))
+        except (OSError, ValueError):
+            return (None, 0)
+
+    def _write_stored_size(self, cache_size: int, scan_time: float) -> None:
+        try:
+            (self.cache_dir / self.SIZE_FILE_NAME).write_text(f"{cache_size} {scan_time}")
+        except OSError as e:
+            logger.debug(f"Failed to store the size of {str(self.cache_dir)}: {e}")
+
+    def evict(self) -> int:
+        """
+        Deletes the least recently used objects until the cache fits in its maximum size. If another
+        process is already evicting objects from the cache, returns without waiting for it.
+        The cache is only scanned if its stored size (including the objects that this process added)
+        exceeds the maximum size. Returns the number of evicted objects.
+        """
+        with _try_lock_file(self.cache_dir / self.LOCK_FILE_NAME) as locked:
+            if not locked:
+                logger.debug(f"Objects are already being evicted from {str(self.cache_dir)}")
+                return 0
+
+            with _added_sizes_lock:
+                added_size = _added_sizes.pop(self.cache_dir, 0)
+            stored_size, scan_time = self._read_stored_size()
+            if stored_size is not None and stored_size + added_size <= self.max_size_bytes:
+                self._write_stored_size(stored_size + added_size, scan_time)
+                return 0
+
+            scan_time = time.time()
+            objects, stale_temp_files = self._list_objects()
+            for temp_file in stale_temp_files:
+                _unlink_if_exists(temp_file)
+
+            cache_size = sum(size for _, size, _ in objects)
+            evicted_count = 0
+            for _, size, object_path in sorted(objects):
+                if cache_size <= self.max_size_bytes:
+                    break
+                if _unlink_if_exists(object_path):
+                    evicted_count += 1
+                cache_size -= size
+            self._write_stored_size(cache_size, scan_time)
+            if evicted_count:
+                logger.info(f"Evicted {evicted_count} objects from {str(self.cache_dir)}")
+            return evicted_count
+
+
+def _unlink_if_exists(path: Path) -> bool:
+    """Deletes the given file, returning False if it couldn't be deleted."""
+    try:
+        path.unlink()
+    except OSError as e:
+        # Such as a file that was deleted by another process, or is open on Windows.
+        logger.debug(f"Failed to delete {str(path)}: {e}")
+        return False
+    return True
+
+
+@contextmanager
+def _try_lock_file(lock_path: Path) -> Iterator[bool]:
+    """
+    Holds an exclusive lock on the given file, shared with the other processes of the host.
+    Yields False without waiting if another process holds the lock.
+    """
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a+b") as lock_file:
+        lock_file.seek(0)
+        try:
+            if sys.platform == "win32":
+                import msvcrt
+
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            if sys.platform == "win32":
+                import msvcrt
+
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
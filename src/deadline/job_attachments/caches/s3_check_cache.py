@@ -5,9 +5,13 @@ Module for accessing the local 'last seen on S3' cache.
 """
 
 import logging
+import math
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Any, Dict, Optional
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+import xxhash
 
 from .cache_db import CacheDB
 
@@ -29,6 +33,33 @@ class S3CheckCacheEntry:
         }
 
 
+class _BloomFilter:
+    """
+    A compact set of strings that can have false positives, but no false negatives.
+    """
+
+    def __init__(self, expected_items: int, false_positive_rate: float) -> None:
+        expected_items = max(expected_items, 1)
+        self.num_bits = max(
+            int(-expected_items * math.log(false_positive_rate) / (math.log(2) ** 2)), 8
+        )
+        self.num_hashes = max(round(self.num_bits / expected_items * math.log(2)), 1)
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _bit_indexes(self, item: str) -> List[int]:
+        # Derives all the bit indexes from the two halves of a single 128-bit hash.
+        digest = xxhash.xxh3_128_intdigest(item.encode("utf-8", errors="surrogatepass"))
+        hash1, hash2 = digest >> 64, digest & 0xFFFFFFFFFFFFFFFF
+        return [(hash1 + i * hash2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, item: str) -> None:
+        for index in self._bit_indexes(item):
+            self._bits[index >> 3] |= 1 << (index & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[index >> 3] & (1 << (index & 7)) for index in self._bit_indexes(item))
+
+
 class S3CheckCache(CacheDB):
     """
     Maintains a cache of 'last seen on S3' entries in a local database, which
@@ -40,13 +71,24 @@ class S3CheckCache(CacheDB):
 
     This class also automatically locks when doing writes, so it can be called
     by multiple threads.
+
+    In bulk mode, entries are written in batches rather than one transaction per entry, and the
+    unexpired entries under the key prefixes given to `preload_entries` are looked up in memory.
+    Pending entries are written when the context manager exits, or when `flush` is called.
     """
 
     CACHE_NAME = "s3_check_cache"
     CACHE_DB_VERSION = 1
+    LAST_ACCESS_COLUMN = "last_seen_time"
     ENTRY_EXPIRY_DAYS = 30
-
-    def __init__(self, cache_dir: Optional[str] = None) -> None:
+    # The number of pending entries at which they are written to the database in bulk mode.
+    BULK_WRITE_BATCH_SIZE = 1000
+    # The maximum number of entries under a key prefix to load into memory. Beyond this, only a
+    # Bloom filter of the keys is kept in memory, to skip the database for keys that aren't cached.
+    PRELOAD_MAX_ENTRIES = 1_000_000
+    BLOOM_FILTER_FALSE_POSITIVE_RATE = 0.01
+
+    def __init__(self, cache_dir: Optional[str] = None, bulk_mode: bool = False) -> None:
         table_name: str = f"s3checkV{self.CACHE_DB_VERSION}"
         create_query: str = (
             f"CREATE TABLE s3checkV{self.CACHE_DB_VERSION}(s3_key text primary key, last_seen_time timestamp)"
@@ -57,6 +99,85 @@ class S3CheckCache(CacheDB):
             create_query=create_query,
             cache_dir=cache_dir,
         )
+        self.bulk_mode = bulk_mode
+        self._preloaded_prefixes: List[Tuple[str, Optional[_BloomFilter]]] = []
+        self._entries: Dict[str, str] = {}
+        self._pending_entries: Dict[str, Dict[str, Any]] = {}
+        self._pending_lock = Lock()
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        """Called when exiting the context manager."""
+        if self.enabled:
+            self.flush()
+        super().__exit__(exc_type, exc_value, exc_traceback)
+
+    def get_expiry_time(self) -> Optional[float]:
+        """Returns the last seen time before which entries are expired."""
+        return (datetime.now() - timedelta(days=self.ENTRY_EXPIRY_DAYS)).timestamp()
+
+    def preload_entries(self, key_prefix: str) -> None:
+        """
+        Loads the unexpired entries of all the S3 keys starting with the given prefix (such as the
+        bucket and CAS prefix) into memory, so that looking up any of these keys doesn't query the
+        database. If there are more than PRELOAD_MAX_ENTRIES of them, only a Bloom filter of the keys
+        is loaded, and the keys it contains are still looked up in the database. Only used in bulk mode.
+        """
+        if not self.enabled or not self.bulk_mode:
+            return
+        if any(key_prefix.startswith(prefix) for prefix, _ in self._preloaded_prefixes):
+            return
+
+        expiry_time = self.get_expiry_time()
+        # A code point of U+10FFFF sorts after any other, so this range contains exactly the keys
+        # with the prefix. Entries with a timestamp that isn't a number are never valid.
+        where_clause = (
+            "WHERE s3_key >= ? AND s3_key < ? "
+            "AND typeof(last_seen_time) IN ('integer', 'real') AND last_seen_time > ?"
+        )
+        params = [key_prefix, key_prefix + "\U0010ffff", expiry_time]
+        bloom_filter: Optional[_BloomFilter] = None
+        with self.db_lock, self.db_connection:
+            num_entries = self.db_connection.execute(
+                f"SELECT COUNT(*) FROM {self.table_name} {where_clause}", params
+            ).fetchone()[0]
+            rows = self.db_connection.execute(
+                f"SELECT * FROM {self.table_name} {where_clause}", params
+            )
+            if num_entries <= self.PRELOAD_MAX_ENTRIES:
+                for s3_key, last_seen_time in rows:
+                    self._entries.setdefault(s3_key, str(last_seen_time))
+            else:
+                bloom_filter = _BloomFilter(num_entries, self.BLOOM_FILTER_FALSE_POSITIVE_RATE)
+                for s3_key, _ in rows:
+                    bloom_filter.add(s3_key)
+        self._preloaded_prefixes.append((key_prefix, bloom_filter))
+        logger.debug(
+            f"Loaded {num_entries} S3 check cache entries under {key_prefix}"
+            + (" into a Bloom filter" if bloom_filter is not None else "")
+        )
+
+    def flush(self) -> None:
+        """Writes the pending entries of bulk mode to the database in a single transaction."""
+        with self._pending_lock:
+            pending_entries = list(self._pending_entries.values())
+            self._pending_entries.clear()
+        if not pending_entries:
+            return
+
+        with self.db_lock, self.db_connection:
+            self.db_connection.executemany(
+                f"INSERT OR REPLACE INTO {self.table_name} VALUES(:s3_key, :last_seen_time)",
+                pending_entries,
+            )
+
+    def _is_preloaded_miss(self, s3_key: str) -> bool:
+        """Returns whether the key is known not to be in the cache from the preloaded entries."""
+        for prefix, bloom_filter in self._preloaded_prefixes:
+            if s3_key.startswith(prefix):
+                # A Bloom filter can have false positives, so the keys it contains are looked up in
+                # the database rather than trusted, which would skip uploading missing objects.
+                return bloom_filter is None or s3_key not in bloom_filter
+        return False
 
     def get_entry(self, s3_key: str) -> Optional[S3CheckCacheEntry]:
         """
@@ -65,6 +186,13 @@ class S3CheckCache(CacheDB):
         if not self.enabled:
             return None
 
+        if self.bulk_mode:
+            last_seen_time = self._entries.get(s3_key)
+            if last_seen_time is not None:
+                return S3CheckCacheEntry(s3_key=s3_key, last_seen_time=last_seen_time)
+            if self._is_preloaded_miss(s3_key):
+                return None
+
         with self.db_lock, self.db_connection:
             entry_vals = self.db_connection.execute(
                 f"SELECT * FROM {self.table_name} WHERE s3_key=?",
@@ -85,8 +213,18 @@ class S3CheckCache(CacheDB):
             return None
 
     def put_entry(self, entry: S3CheckCacheEntry) -> None:
-        """Inserts or replaces an entry into the cache database."""
-        if self.enabled:
+        """
+        Inserts or replaces an entry into the cache database. In bulk mode, the entry is added to the
+        pending entries, which are written once there are enough of them.
+        """
+        if self.enabled and self.bulk_mode:
+            with self._pending_lock:
+                self._entries[entry.s3_key] = entry.last_seen_time
+                self._pending_entries[entry.s3_key] = entry.to_dict()
+                should_flush = len(self._pending_entries) >= self.BULK_WRITE_BATCH_SIZE
+            if should_flush:
+                self.flush()
+        elif self.enabled:
             with self.db_lock, self.db_connection:
                 self.db_connection.execute(
                     f"INSERT OR REPLACE INTO {self.table_name} VALUES(:s3_key, :last_seen_time)",
@@ -4,28 +4,46 @@
 from __future__ import annotations
 
 import concurrent.futures
-import io
 import json
 import os
 import re
+import secrets
+import shutil
 import sys
+import threading
 import time
 from collections import defaultdict
+from contextlib import closing, contextmanager, nullcontext
 from datetime import datetime
 from itertools import chain
 from logging import Logger, LoggerAdapter, getLogger
 from pathlib import Path
 from tempfile import NamedTemporaryFile
-from typing import Any, Callable, DefaultDict, List, Optional, Tuple, Union
+from typing import (
+    Any,
+    Callable,
+    DefaultDict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 import boto3
 from boto3.s3.transfer import ProgressCallbackInvoker
 from botocore.client import BaseClient
 from botocore.exceptions import BotoCoreError, ClientError
+from s3transfer.utils import S3_RETRYABLE_DOWNLOAD_ERRORS
 
 from .asset_manifests.base_manifest import BaseAssetManifest, BaseManifestPath as RelativeFilePath
+from .asset_manifests.binary_manifest import read_local_manifest, write_manifest_sidecar
+from .asset_manifests.compact_manifest import CompactManifestPaths, iter_path_strings
 from .asset_manifests.hash_algorithms import HashAlgorithm
 from .asset_manifests.decode import decode_manifest
+from .caches import ManifestCache, ManifestCacheEntry, ObjectCache
 from .exceptions import (
     COMMON_ERROR_GUIDANCE_FOR_S3,
     AssetSyncError,
@@ -46,9 +64,11 @@ from .vfs import (
 
 from .models import (
     Attachments,
+    DuplicateFileMode,
     FileConflictResolution,
     JobAttachmentS3Settings,
     ManifestPathGroup,
+    S3_STEP_OUTPUT_MANIFEST_FOLDER_NAME,
 )
 from .progress_tracker import (
     DownloadSummaryStatistics,
@@ -69,32 +89,88 @@ from .os_file_permission import (
     _set_fs_group_for_posix,
     _set_fs_permission_for_windows,
 )
-from ._utils import _is_relative_to, _join_s3_paths, _is_windows_file_path_limit
+from ._utils import (
+    _clone_file,
+    _human_readable_file_size,
+    _is_relative_to,
+    _join_s3_paths,
+    _is_windows_file_path_limit,
+)
 
 download_logger = getLogger("deadline.job_attachments.download")
 
+T = TypeVar("T")
+
 S3_DOWNLOAD_MAX_CONCURRENCY = 10
+# The maximum number of manifests downloaded concurrently, within the default S3 connection pool size.
+S3_MANIFEST_DOWNLOAD_MAX_CONCURRENCY = 16
+# Objects up to the size of a multipart chunk (8 MB) are downloaded with a single GetObject request rather
+# than through the TransferManager, which would only make one request for them anyway.
+S3_DOWNLOAD_SMALL_OBJECT_MAX_SIZE = 8 * (1024**2)
+S3_DOWNLOAD_SMALL_OBJECT_CHUNK_SIZE = 256 * 1024
+S3_DOWNLOAD_SMALL_OBJECT_MAX_ATTEMPTS = 5
+# The maximum number of small files downloaded by a single thread pool task, to amortize the overhead of
+# a task over many small files, and the minimum number of batches per download worker to balance them.
+SMALL_FILE_DOWNLOAD_BATCH_MAX_FILES = 64
+SMALL_FILE_DOWNLOAD_BATCHES_PER_WORKER = 4
+# The interval at which the number of concurrent small file downloads is adjusted to the observed
+# throughput, and the relative drop in throughput that reverses the adjustment.
+DOWNLOAD_CONCURRENCY_ADJUST_INTERVAL = 2.0
+DOWNLOAD_CONCURRENCY_THROUGHPUT_TOLERANCE = 0.05
 WINDOWS_MAX_PATH_LENGTH = 260
 TEMP_DOWNLOAD_ADDED_CHARS_LENGTH = 9
 
 
 def get_manifest_from_s3(
-    manifest_key: str, s3_bucket: str, session: Optional[boto3.Session] = None
+    manifest_key: str,
+    s3_bucket: str,
+    session: Optional[boto3.Session] = None,
+    manifest_cache: Optional[ManifestCache] = None,
 ) -> BaseAssetManifest:
+    """
+    Gets a manifest from S3. If a manifest cache is given, a manifest that is in the cache isn't
+    downloaded again, since a manifest with a given key (such as an input manifest) never changes.
+    """
+    return _get_manifest_and_asset_root_from_s3(
+        manifest_key, s3_bucket, session, manifest_cache=manifest_cache
+    )[0]
+
+
+def _get_manifest_and_asset_root_from_s3(
+    manifest_key: str,
+    s3_bucket: str,
+    session: Optional[boto3.Session] = None,
+    manifest_cache: Optional[ManifestCache] = None,
+    etag: Optional[str] = None,
+) -> Tuple[BaseAssetManifest, Optional[str]]:
+    """
+    Gets a manifest from S3 along with the asset root stored in its metadata (for output manifests),
+    with a single GetObject request. The asset root is None if the metadata doesn't have one.
+
+    If a manifest cache is given, the manifest is looked up in it first, and added to it once
+    downloaded. If an ETag is given (such as one listed with the manifest key), the cached manifest
+    is only used if it has the same ETag.
+    """
+    cache_key = f"{s3_bucket}/{manifest_key}"
+    if manifest_cache is not None:
+        entry = manifest_cache.get_entry(cache_key, etag=etag)
+        if entry is not None:
+            return (entry.manifest, entry.asset_root)
+
     s3_client = get_s3_client(session=session)
     try:
-        file_buffer = io.BytesIO()
-        s3_client.download_fileobj(
-            s3_bucket,
-            manifest_key,
-            file_buffer,
-            ExtraArgs={"ExpectedBucketOwner": get_account_id(session=session)},
+        response = s3_client.get_object(
+            Bucket=s3_bucket,
+            Key=manifest_key,
+            ExpectedBucketOwner=get_account_id(session=session),
         )
-        byte_value = file_buffer.getvalue()
+        with closing(response["Body"]) as body:
+            byte_value = body.read()
         string_value = byte_value.decode("utf-8")
+        # The bucket owner check doesn't prove who wrote the manifest, so it is fully validated. Once
+        # added to the manifest cache, it is decoded from there without schema validation.
         asset_manifest = decode_manifest(string_value)
-        file_buffer.close()
-        return asset_manifest
+        asset_root = _get_asset_root_from_metadata(response.get("Metadata", {}))
     except ClientError as exc:
         status_code = int(exc.response["ResponseMetadata"]["HTTPStatusCode"])
         status_code_guidance = {
@@ -128,6 +204,51 @@ def get_manifest_from_s3(
     except Exception as e:
         raise AssetSyncError(e) from e
 
+    if manifest_cache is not None:
+        manifest_cache.put_entry(
+            ManifestCacheEntry(
+                s3_key=cache_key,
+                etag=response["ETag"],
+                asset_root=asset_root,
+                manifest=asset_manifest,
+            )
+        )
+    return (asset_manifest, asset_root)
+
+
+def _get_asset_root_from_metadata(metadata: dict[str, str]) -> Optional[str]:
+    """
+    Gets the asset root from the S3 metadata of an output manifest.
+    If neither of the keys "asset-root-json" or "asset-root" exist in the metadata, returns None.
+    """
+    if "asset-root-json" in metadata:
+        return json.loads(metadata["asset-root-json"])
+    else:
+        return metadata.get("asset-root", None)
+
+
+def _run_manifest_requests_concurrently(
+    func: Callable[[str], T], manifest_keys: List[str]
+) -> List[T]:
+    """
+    Calls the given function (that gets a manifest from S3) on each of the manifest keys on a bounded
+    thread pool, so that each manifest is decoded as soon as it has
+    been downloaded. Returns the results in the order of the keys. If a call fails, the calls that
+    haven't started yet are cancelled and its exception is raised.
+    """
+    if len(manifest_keys) <= 1:
+        return [func(key) for key in manifest_keys]
+
+    max_workers = min(len(manifest_keys), S3_MANIFEST_DOWNLOAD_MAX_CONCURRENCY)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(func, key) for key in manifest_keys]
+        try:
+            return [future.result() for future in futures]
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
 
 def _get_output_manifest_prefix(
     s3_settings: JobAttachmentS3Settings,
@@ -168,13 +289,22 @@ def _get_output_manifest_prefix(
 
 
 def _get_tasks_manifests_keys_from_s3(
-    manifest_prefix: str, s3_bucket: str, session: Optional[boto3.Session] = None
-) -> List[str]:
+    manifest_prefix: str,
+    s3_bucket: str,
+    session: Optional[boto3.Session] = None,
+    use_step_manifests: bool = True,
+) -> dict[str, str]:
     """
-    Returns the keys of all output manifests from the given s3 prefix.
+    Returns the keys of all output manifests from the given s3 prefix, mapped to their ETags.
     (Only the manifests that end with the prefix pattern task-*/*_output)
+
+    If use_step_manifests is True, the manifests of the tasks of a step are replaced with the merged
+    output manifests of the step, if it has any that were written after all the manifests of its tasks.
     """
-    manifests_keys: List[str] = []
+    manifests_keys: dict[str, str] = {}
+    etags: dict[str, str] = {}
+    last_modified_times: dict[str, Any] = {}
+    step_manifests: DefaultDict[str, list[str]] = DefaultDict(list)
     s3_client = get_s3_client(session=session)
     try:
         paginator = s3_client.get_paginator("list_objects_v2")
@@ -192,7 +322,16 @@ def _get_tasks_manifests_keys_from_s3(
                     f"Unable to find asset manifest in s3://{s3_bucket}/{manifest_prefix}"
                 )
             for content in contents:
-                if re.search(r"task-.*/.*/.*output.*", content["Key"]):
+                if use_step_manifests and re.search(
+                    rf"/{S3_STEP_OUTPUT_MANIFEST_FOLDER_NAME}/[^/]*output[^/]*$", content["Key"]
+                ):
+                    etags[content["Key"]] = content["ETag"]
+                    last_modified_times[content["Key"]] = content.get("LastModified")
+                    step_folder = content["Key"].rsplit("/", 2)[0]
+                    step_manifests[step_folder].append(content["Key"])
+                elif re.search(r"task-.*/.*/.*output.*", content["Key"]):
+                    etags[content["Key"]] = content["ETag"]
+                    last_modified_times[content["Key"]] = content.get("LastModified")
                     parts = content["Key"].split("/")
                     for i, part in enumerate(parts):
                         if "task-" in part:
@@ -231,12 +370,55 @@ def _get_tasks_manifests_keys_from_s3(
         last_subfolder = sorted(
             set(f.split("/")[len(task_folder.split("/"))] for f in files), reverse=True
         )[0]
-        manifests_keys += [f for f in files if f.startswith(f"{task_folder}/{last_subfolder}/")]
+        manifests_keys.update(
+            (f, etags[f]) for f in files if f.startswith(f"{task_folder}/{last_subfolder}/")
+        )
 
     # Now `manifests_keys` is a list of the keys of files in the last folder (alphabetically) under each "task-" folder.
+    if step_manifests:
+        manifests_keys = _replace_with_step_manifests_keys(
+            manifests_keys, task_prefixes, step_manifests, etags, last_modified_times
+        )
     return manifests_keys
 
 
+def _replace_with_step_manifests_keys(
+    manifests_keys: dict[str, str],
+    task_prefixes: dict[str, list[str]],
+    step_manifests: dict[str, list[str]],
+    etags: dict[str, str],
+    last_modified_times: dict[str, Any],
+) -> dict[str, str]:
+    """
+    Replaces the keys of the task output manifests of each step that has merged output manifests written
+    after all the output manifests of its tasks (including those of earlier session actions) with the keys
+    of the merged manifests, in the place of the step's first task manifest.
+    """
+    task_manifests_by_step: DefaultDict[str, list[str]] = DefaultDict(list)
+    for task_folder, files in task_prefixes.items():
+        task_manifests_by_step[task_folder.rsplit("/", 1)[0]].extend(files)
+
+    up_to_date_steps: set[str] = set()
+    for step_folder, keys in step_manifests.items():
+        step_times = [last_modified_times[key] for key in keys]
+        task_times = [last_modified_times[key] for key in task_manifests_by_step[step_folder]]
+        if None in step_times or None in task_times:
+            continue
+        if task_times and min(step_times) > max(task_times):
+            up_to_date_steps.add(step_folder)
+
+    replaced_keys: dict[str, str] = {}
+    for key, etag in manifests_keys.items():
+        step_folder = key.split("/task-", 1)[0]
+        if step_folder not in up_to_date_steps:
+            replaced_keys[key] = etag
+        elif not any(step_key in replaced_keys for step_key in step_manifests[step_folder]):
+            replaced_keys.update(
+                (step_key, etags[step_key]) for step_key in step_manifests[step_folder]
+            )
+    return replaced_keys
+
+
 def get_job_input_paths_by_asset_root(
     s3_settings: JobAttachmentS3Settings,
     attachments: Attachments,
@@ -376,6 +558,79 @@ def download_files_in_directory(
     )
 
 
+def _download_small_object(
+    s3_client: BaseClient,
+    s3_bucket: str,
+    s3_key: str,
+    local_file_name: Path,
+    expected_bucket_owner: str,
+    progress_tracker: Optional[ProgressTracker] = None,
+) -> None:
+    """
+    Downloads a small object with a single GetObject request, streaming it into a temporary file that is
+    renamed to the local file name once complete, as the TransferManager does. Small objects can't be
+    split into ranged requests, so this avoids the overhead of a TransferManager future per object,
+    which dominates the time to download many small files.
+
+    Raises concurrent.futures.CancelledError if the progress tracker cancels the download.
+    """
+    # The same length of suffix as the temporary files of the TransferManager (see TEMP_DOWNLOAD_ADDED_CHARS_LENGTH.)
+    temp_file_name = local_file_name.with_name(f"{local_file_name.name}.{secrets.token_hex(4)}")
+    for attempt in range(1, S3_DOWNLOAD_SMALL_OBJECT_MAX_ATTEMPTS + 1):
+        bytes_downloaded = 0
+        try:
+            response = s3_client.get_object(
+                Bucket=s3_bucket, Key=s3_key, ExpectedBucketOwner=expected_bucket_owner
+            )
+            with closing(response["Body"]) as body, open(temp_file_name, "wb") as temp_file:
+                for chunk in body.iter_chunks(S3_DOWNLOAD_SMALL_OBJECT_CHUNK_SIZE):
+                    temp_file.write(chunk)
+                    bytes_downloaded += len(chunk)
+                    if progress_tracker and not progress_tracker.track_progress_callback(
+                        len(chunk)
+                    ):
+                        raise concurrent.futures.CancelledError()
+            os.replace(temp_file_name, local_file_name)
+            return
+        except S3_RETRYABLE_DOWNLOAD_ERRORS as e:
+            # The same errors are retried by the TransferManager while streaming the object.
+            if attempt == S3_DOWNLOAD_SMALL_OBJECT_MAX_ATTEMPTS:
+                raise
+            download_logger.debug(f"Retrying the download of {s3_key} after error: {e}")
+            if progress_tracker and bytes_downloaded:
+                progress_tracker.track_progress_callback(-bytes_downloaded)
+        finally:
+            if temp_file_name.exists():
+                temp_file_name.unlink()
+
+
+def _resolve_file_conflict(
+    local_file_name: Path,
+    file_conflict_resolution: Optional[FileConflictResolution],
+) -> Optional[Path]:
+    """
+    If the file name already exists, resolves the conflict based on the file_conflict_resolution.
+    Returns the file name to write the file to, or None if the file should be skipped.
+    """
+    if local_file_name.is_file():
+        if file_conflict_resolution == FileConflictResolution.SKIP:
+            return None
+        elif file_conflict_resolution == FileConflictResolution.OVERWRITE:
+            pass
+        elif file_conflict_resolution == FileConflictResolution.CREATE_COPY:
+            # This loop resolves filename conflicts by appending " (1)"
+            # to the stem of the filename until a unique name is found.
+            while local_file_name.is_file():
+                local_file_name = local_file_name.parent.joinpath(
+                    local_file_name.stem + " (1)" + local_file_name.suffix
+                )
+        else:
+            raise ValueError(
+                f"Unknown choice for file conflict resolution: {file_conflict_resolution}"
+            )
+    return local_file_name
+
+
 def download_file(
     file: RelativeFilePath,
     hash_algorithm: HashAlgorithm,
@@ -387,10 +642,12 @@ def download_file(
     modified_time_override: Optional[float] = None,
     progress_tracker: Optional[ProgressTracker] = None,
     file_conflict_resolution: Optional[FileConflictResolution] = FileConflictResolution.CREATE_COPY,
+    object_cache: Optional[ObjectCache] = None,
 ) -> Tuple[int, Optional[Path]]:
     """
     Downloads a file from the S3 bucket to the local directory. `modified_time_override` is ignored if the manifest
-    version used supports timestamps.
+    version used supports timestamps. If an object cache is given, the file is written from the cache when it's
+    there, and added to the cache once downloaded otherwise.
     Returns a tuple of (size in bytes, filename) of the downloaded file.
     - The file size of 0 means that this file comes from a manifest version that does not provide file sizes.
     - The filename of None indicates that this file has been skipped or has not been downloaded.
@@ -400,8 +657,9 @@ def download_file(
 
     transfer_manager = get_s3_transfer_manager(s3_client=s3_client)
 
-    # The modified time in the manifest is in microseconds, but utime requires the time be expressed in seconds.
-    modified_time_override = file.mtime / 1000000  # type: ignore[attr-defined]
+    # The modified time in the manifest is in microseconds. It's set in nanoseconds (rather than in seconds, as
+    # a float) so that the file gets exactly the modified time of the manifest.
+    modified_time_ns = file.mtime * 1000  # type: ignore[attr-defined]
 
     file_bytes = file.size
 
@@ -414,26 +672,21 @@ def download_file(
         else f"{file.hash}.{hash_algorithm.value}"
     )
 
-    # If the file name already exists, resolve the conflict based on the file_conflict_resolution
-    if local_file_name.is_file():
-        if file_conflict_resolution == FileConflictResolution.SKIP:
-            return (file_bytes, None)
-        elif file_conflict_resolution == FileConflictResolution.OVERWRITE:
-            pass
-        elif file_conflict_resolution == FileConflictResolution.CREATE_COPY:
-            # This loop resolves filename conflicts by appending " (1)"
-            # to the stem of the filename until a unique name is found.
-            while local_file_name.is_file():
-                local_file_name = local_file_name.parent.joinpath(
-                    local_file_name.stem + " (1)" + local_file_name.suffix
-                )
-        else:
-            raise ValueError(
-                f"Unknown choice for file conflict resolution: {file_conflict_resolution}"
-            )
+    resolved_file_name = _resolve_file_conflict(local_file_name, file_conflict_resolution)
+    if resolved_file_name is None:
+        return (file_bytes, None)
+    local_file_name = resolved_file_name
 
     local_file_name.parent.mkdir(parents=True, exist_ok=True)
 
+    if object_cache is not None and object_cache.materialize(
+        file.hash, hash_algorithm, local_file_name, mtime_ns=modified_time_ns
+    ):
+        download_logger.debug(f"Wrote {file.path} to {str(local_file_name)} from the object cache")
+        if progress_tracker and not progress_tracker.track_progress_callback(file_bytes):
+            raise AssetSyncCancelledError("File download cancelled.")
+        return (file_bytes, local_file_name)
+
     future: concurrent.futures.Future
 
     def handler(bytes_downloaded):
@@ -447,16 +700,31 @@ def download_file(
 
     subscribers = [ProgressCallbackInvoker(handler)]
 
-    future = transfer_manager.download(
-        bucket=s3_bucket,
-        key=s3_key,
-        fileobj=str(local_file_name),
-        extra_args={"ExpectedBucketOwner": get_account_id(session=session)},
-        subscribers=subscribers,
-    )
+    def download_object(s3_key: str) -> None:
+        nonlocal future
 
-    try:
+        if file_bytes <= S3_DOWNLOAD_SMALL_OBJECT_MAX_SIZE:
+            _download_small_object(
+                s3_client,  # type: ignore[arg-type]
+                s3_bucket,
+                s3_key,
+                local_file_name,
+                get_account_id(session=session),
+                progress_tracker,
+            )
+            return
+
+        future = transfer_manager.download(
+            bucket=s3_bucket,
+            key=s3_key,
+            fileobj=str(local_file_name),
+            extra_args={"ExpectedBucketOwner": get_account_id(session=session)},
+            subscribers=subscribers,
+        )
         future.result()
+
+    try:
+        download_object(s3_key)
     except concurrent.futures.CancelledError as ce:
         if progress_tracker and progress_tracker.continue_reporting is False:
             raise AssetSyncCancelledError("File download cancelled.")
@@ -495,15 +763,8 @@ def download_file(
         status_code = int(exc.response["ResponseMetadata"]["HTTPStatusCode"])
         if status_code == 404:
             s3_key = s3_key.rsplit(".", 1)[0]
-            future = transfer_manager.download(
-                bucket=s3_bucket,
-                key=s3_key,
-                fileobj=str(local_file_name),
-                extra_args={"ExpectedBucketOwner": get_account_id(session=session)},
-                subscribers=subscribers,
-            )
             try:
-                future.result()
+                download_object(s3_key)
             except concurrent.futures.CancelledError as ce:
                 if progress_tracker and progress_tracker.continue_reporting is False:
                     raise AssetSyncCancelledError("File download cancelled.")
@@ -542,34 +803,85 @@ def download_file(
         raise AssetSyncError(e) from e
 
     download_logger.debug(f"Downloaded {file.path} to {str(local_file_name)}")
-    os.utime(local_file_name, (modified_time_override, modified_time_override))  # type: ignore[arg-type]
+    os.utime(local_file_name, ns=(modified_time_ns, modified_time_ns))
+
+    if object_cache is not None:
+        object_cache.put(file.hash, hash_algorithm, local_file_name)
 
     return (file_bytes, local_file_name)
 
 
-def _download_files_parallel(
+def _write_duplicate_file(
+    file: RelativeFilePath,
+    source_path: Path,
+    local_download_dir: str,
+    duplicate_file_mode: DuplicateFileMode,
+    file_conflict_resolution: Optional[FileConflictResolution] = FileConflictResolution.CREATE_COPY,
+) -> Optional[Path]:
+    """
+    Writes a file from the already downloaded file with the same content hash, instead of downloading
+    it again. Returns the file name of the written file, or None if the file has been skipped.
+    """
+    local_file_name = _resolve_file_conflict(
+        Path(local_download_dir).joinpath(file.path), file_conflict_resolution
+    )
+    if local_file_name is None:
+        return None
+
+    local_file_name.parent.mkdir(parents=True, exist_ok=True)
+
+    try:
+        linked = False
+        if duplicate_file_mode == DuplicateFileMode.HARDLINK:
+            if local_file_name.is_file():
+                local_file_name.unlink()
+            try:
+                os.link(source_path, local_file_name)
+                linked = True
+            except OSError as e:
+                download_logger.debug(
+                    f"Failed to hard link {str(local_file_name)} to {str(source_path)}, copying it instead: {e}"
+                )
+        if not linked and not _clone_file(source_path, local_file_name):
+            shutil.copyfile(source_path, local_file_name)
+    except OSError as e:
+        raise AssetSyncError(
+            f"Failed to write {str(local_file_name)} from the downloaded file {str(source_path)}: {e}"
+        ) from e
+
+    # The modified time in the manifest is in microseconds. It's set in nanoseconds so that the file gets
+    # exactly the modified time of the manifest.
+    modified_time_ns = file.mtime * 1000  # type: ignore[attr-defined]
+    os.utime(local_file_name, ns=(modified_time_ns, modified_time_ns))
+
+    download_logger.debug(f"Wrote {file.path} to {str(local_file_name)} from {str(source_path)}")
+    return local_file_name
+
+
+def _download_file_group(
     files: List[RelativeFilePath],
     hash_algorithm: HashAlgorithm,
-    num_download_workers: int,
     local_download_dir: str,
     s3_bucket: str,
     cas_prefix: Optional[str],
     s3_client: Optional[BaseClient] = None,
     session: Optional[boto3.Session] = None,
-    file_mod_time: Optional[float] = None,
+    modified_time_override: Optional[float] = None,
     progress_tracker: Optional[ProgressTracker] = None,
     file_conflict_resolution: Optional[FileConflictResolution] = FileConflictResolution.CREATE_COPY,
-) -> list[str]:
+    duplicate_file_mode: DuplicateFileMode = DuplicateFileMode.COPY,
+    object_cache: Optional[ObjectCache] = None,
+) -> List[Tuple[int, Optional[Path], bool]]:
     """
-    Downloads files in parallel using thread pool.
-    Returns a list of local paths of downloaded files.
+    Downloads a group of files that have the same content hash: the first file that isn't skipped is
+    downloaded from S3, and the other files are written from it.
+    Returns a list of tuples of (size in bytes, filename, whether it was deduplicated) for each file.
     """
-    downloaded_file_names: list[str] = []
-
-    with concurrent.futures.ThreadPoolExecutor(max_workers=num_download_workers) as executor:
-        futures = {
-            executor.submit(
-                download_file,
+    results: List[Tuple[int, Optional[Path], bool]] = []
+    source_path: Optional[Path] = None
+    for file in files:
+        if source_path is None:
+            (file_bytes, local_file_name) = download_file(
                 file,
                 hash_algorithm,
                 local_download_dir,
@@ -577,24 +889,286 @@ def _download_files_parallel(
                 cas_prefix,
                 s3_client,
                 session,
-                file_mod_time,
+                modified_time_override,
                 progress_tracker,
                 file_conflict_resolution,
-            ): file
-            for file in files
-        }
+                object_cache,
+            )
+            source_path = local_file_name
+            results.append((file_bytes, local_file_name, False))
+        else:
+            if progress_tracker and progress_tracker.continue_reporting is False:
+                raise AssetSyncCancelledError("File download cancelled.")
+            local_file_name = _write_duplicate_file(
+                file,
+                source_path,
+                local_download_dir,
+                duplicate_file_mode,
+                file_conflict_resolution,
+            )
+            results.append((file.size, local_file_name, local_file_name is not None))
+    return results
+
+
+def _download_file_batch(
+    file_groups: List[List[RelativeFilePath]],
+    hash_algorithm: HashAlgorithm,
+    local_download_dir: str,
+    s3_bucket: str,
+    cas_prefix: Optional[str],
+    s3_client: Optional[BaseClient] = None,
+    session: Optional[boto3.Session] = None,
+    modified_time_override: Optional[float] = None,
+    progress_tracker: Optional[ProgressTracker] = None,
+    file_conflict_resolution: Optional[FileConflictResolution] = FileConflictResolution.CREATE_COPY,
+    duplicate_file_mode: DuplicateFileMode = DuplicateFileMode.COPY,
+    object_cache: Optional[ObjectCache] = None,
+) -> List[Tuple[int, Optional[Path], bool]]:
+    """
+    Downloads a batch of groups of files with the same content hash in a single thread pool task.
+    Returns the results of _download_file_group for all the files of the batch.
+    """
+    results: List[Tuple[int, Optional[Path], bool]] = []
+    for file_group in file_groups:
+        if progress_tracker and progress_tracker.continue_reporting is False:
+            raise AssetSyncCancelledError("File download cancelled.")
+        results.extend(
+            _download_file_group(
+                file_group,
+                hash_algorithm,
+                local_download_dir,
+                s3_bucket,
+                cas_prefix,
+                s3_client,
+                session,
+                modified_time_override,
+                progress_tracker,
+                file_conflict_resolution,
+                duplicate_file_mode,
+                object_cache,
+            )
+        )
+    return results
+
+
+def _separate_file_groups_by_size(
+    file_groups: List[List[RelativeFilePath]],
+) -> Tuple[List[List[RelativeFilePath]], List[List[RelativeFilePath]]]:
+    """
+    Splits the given groups of files with the same content hash into two queues: one for small files
+    and one for large files. Each queue is ordered largest first, so that the longest downloads start
+    first rather than extending the tail of the download.
+    """
+    small_file_groups: List[List[RelativeFilePath]] = []
+    large_file_groups: List[List[RelativeFilePath]] = []
+    for file_group in file_groups:
+        if file_group[0].size <= S3_DOWNLOAD_SMALL_OBJECT_MAX_SIZE:
+            small_file_groups.append(file_group)
+        else:
+            large_file_groups.append(file_group)
+    small_file_groups.sort(key=lambda file_group: file_group[0].size, reverse=True)
+    large_file_groups.sort(key=lambda file_group: file_group[0].size, reverse=True)
+    return (small_file_groups, large_file_groups)
+
+
+def _batch_file_groups(
+    small_file_groups: List[List[RelativeFilePath]], num_download_workers: int
+) -> List[List[List[RelativeFilePath]]]:
+    """
+    Batches the groups of small files, so that each thread pool task downloads many small files, while
+    keeping a few batches per worker to balance the work across workers.
+    """
+    batch_size = max(
+        1,
+        min(
+            SMALL_FILE_DOWNLOAD_BATCH_MAX_FILES,
+            len(small_file_groups)
+            // (num_download_workers * SMALL_FILE_DOWNLOAD_BATCHES_PER_WORKER),
+        ),
+    )
+    return [
+        small_file_groups[i : i + batch_size] for i in range(0, len(small_file_groups), batch_size)
+    ]
+
+
+class _AdaptiveConcurrencyLimiter:
+    """
+    Limits the number of tasks that run at once, and adjusts the limit to the observed throughput by
+    hill climbing: at each interval, the limit keeps moving in the same direction while the throughput
+    doesn't drop, and turns around when it does (or when it reaches a bound.) This finds the concurrency
+    that the network and the file system can sustain, rather than a fixed number of workers.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        max_limit: int,
+        min_limit: int = 1,
+        adjust_interval: float = DOWNLOAD_CONCURRENCY_ADJUST_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.min_limit = min_limit
+        self.max_limit = max(min_limit, max_limit)
+        self.limit = min(max(initial_limit, self.min_limit), self.max_limit)
+        self.adjust_interval = adjust_interval
+        self._clock = clock
+        self._direction = 1
+        self._active = 0
+        self._interval_bytes = 0
+        self._interval_start = clock()
+        self._last_throughput: Optional[float] = None
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def acquire(self) -> Iterator[None]:
+        """Waits until fewer tasks than the current limit are running, and runs a task."""
+        with self._condition:
+            while self._active >= self.limit:
+                self._condition.wait()
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._active -= 1
+                self._condition.notify_all()
+
+    def record_bytes(self, num_bytes: int) -> None:
+        """Records the bytes transferred by a task, and adjusts the limit once an interval has passed."""
+        with self._condition:
+            self._interval_bytes += num_bytes
+            now = self._clock()
+            elapsed = now - self._interval_start
+            if elapsed < self.adjust_interval:
+                return
+            throughput = self._interval_bytes / elapsed
+            if self._last_throughput is not None and throughput < self._last_throughput * (
+                1 - DOWNLOAD_CONCURRENCY_THROUGHPUT_TOLERANCE
+            ):
+                self._direction = -self._direction
+            step = max(1, self.limit // 4)
+            new_limit = min(
+                max(self.limit + self._direction * step, self.min_limit), self.max_limit
+            )
+            if new_limit == self.limit:
+                # Explore the other direction from a bound.
+                self._direction = -self._direction
+            if new_limit != self.limit:
+                download_logger.debug(
+                    f"Download throughput {_human_readable_file_size(int(throughput))}/s with {self.limit} "
+                    f"concurrent tasks, changing to {new_limit} concurrent tasks"
+                )
+            self.limit = new_limit
+            self._last_throughput = throughput
+            self._interval_bytes = 0
+            self._interval_start = now
+            self._condition.notify_all()
+
+
+def _group_files_by_hash(
+    files: List[RelativeFilePath], duplicate_file_mode: DuplicateFileMode
+) -> List[List[RelativeFilePath]]:
+    """
+    Groups the files that have the same content hash, in the order they first appear. Each file is
+    in its own group if the duplicate files are downloaded anyway.
+    """
+    if duplicate_file_mode == DuplicateFileMode.DOWNLOAD:
+        return [[file] for file in files]
+    files_by_hash: dict[str, List[RelativeFilePath]] = {}
+    for file in files:
+        files_by_hash.setdefault(file.hash, []).append(file)
+    return list(files_by_hash.values())
+
+
+def _download_files_parallel(
+    files: List[RelativeFilePath],
+    hash_algorithm: HashAlgorithm,
+    num_download_workers: int,
+    local_download_dir: str,
+    s3_bucket: str,
+    cas_prefix: Optional[str],
+    s3_client: Optional[BaseClient] = None,
+    session: Optional[boto3.Session] = None,
+    file_mod_time: Optional[float] = None,
+    progress_tracker: Optional[ProgressTracker] = None,
+    file_conflict_resolution: Optional[FileConflictResolution] = FileConflictResolution.CREATE_COPY,
+    duplicate_file_mode: DuplicateFileMode = DuplicateFileMode.COPY,
+    object_cache: Optional[ObjectCache] = None,
+) -> list[str]:
+    """
+    Downloads files in parallel using thread pool. Files with the same content hash are downloaded
+    only once, and written from the downloaded file as given by the duplicate_file_mode. If an object
+    cache is given, files are written from it when they're there.
+
+    Large files are downloaded one at a time, largest first, each with a multi-part download. Small files
+    are downloaded in batches on the remaining connections, starting with num_download_workers concurrent
+    batches and adjusting that number to the observed throughput.
+    Returns a list of local paths of downloaded files.
+    """
+    downloaded_file_names: list[str] = []
+
+    # Separate 'large' files from 'small' files, as uploads do. Large files are downloaded serially, each
+    # with a multi-threaded multi-part download, while the small files share the remaining connections.
+    (small_file_groups, large_file_groups) = _separate_file_groups_by_size(
+        _group_files_by_hash(files, duplicate_file_mode)
+    )
+    max_small_file_workers = max(
+        num_download_workers,
+        get_s3_max_pool_connections() - (S3_DOWNLOAD_MAX_CONCURRENCY if large_file_groups else 0),
+    )
+    limiter = _AdaptiveConcurrencyLimiter(
+        initial_limit=num_download_workers, max_limit=max_small_file_workers
+    )
+
+    def download_batch(file_batch: List[List[RelativeFilePath]]):
+        return _download_file_batch(
+            file_batch,
+            hash_algorithm,
+            local_download_dir,
+            s3_bucket,
+            cas_prefix,
+            s3_client,
+            session,
+            file_mod_time,
+            progress_tracker,
+            file_conflict_resolution,
+            duplicate_file_mode,
+            object_cache,
+        )
+
+    def download_small_file_batch(file_batch: List[List[RelativeFilePath]]):
+        with limiter.acquire():
+            results = download_batch(file_batch)
+        limiter.record_bytes(sum(file_group[0].size for file_group in file_batch))
+        return results
+
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=1
+    ) as large_file_executor, concurrent.futures.ThreadPoolExecutor(
+        max_workers=max_small_file_workers
+    ) as small_file_executor:
+        futures = [
+            large_file_executor.submit(download_batch, [file_group])
+            for file_group in large_file_groups
+        ] + [
+            small_file_executor.submit(download_small_file_batch, file_batch)
+            for file_batch in _batch_file_groups(small_file_groups, num_download_workers)
+        ]
         # surfaces any exceptions in the thread
         for future in concurrent.futures.as_completed(futures):
-            (file_bytes, local_file_name) = future.result()
-            if local_file_name:
-                downloaded_file_names.append(str(local_file_name.resolve()))
-                if progress_tracker:
-                    progress_tracker.increase_processed(1, 0)
-                    progress_tracker.report_progress()
-            else:
-                if progress_tracker:
-                    progress_tracker.increase_skipped(1, file_bytes)
-                    progress_tracker.report_progress()
+            for file_bytes, local_file_name, deduplicated in future.result():
+                if local_file_name:
+                    downloaded_file_names.append(str(local_file_name.resolve()))
+                    if progress_tracker:
+                        if deduplicated:
+                            progress_tracker.increase_deduplicated(1, file_bytes)
+                        else:
+                            progress_tracker.increase_processed(1, 0)
+                        progress_tracker.report_progress()
+                else:
+                    if progress_tracker:
+                        progress_tracker.increase_skipped(1, file_bytes)
+                        progress_tracker.report_progress()
 
     # to report progress 100% at the end
     if progress_tracker:
@@ -636,47 +1210,6 @@ def download_files(
     )
 
 
-def _get_asset_root_from_s3(
-    manifest_key: str, s3_bucket: str, session: Optional[boto3.Session] = None
-) -> Optional[str]:
-    """
-    Gets asset root from metadata (of output manifest) stored in S3.
-    If neither of the keys "asset-root-json" or "asset-root" exist in the metadata, returns None.
-    """
-    s3_client = get_s3_client(session=session)
-    try:
-        head = s3_client.head_object(Bucket=s3_bucket, Key=manifest_key)
-    except ClientError as exc:
-        status_code = int(exc.response["ResponseMetadata"]["HTTPStatusCode"])
-        status_code_guidance = {
-            **COMMON_ERROR_GUIDANCE_FOR_S3,
-            403: (
-                "Access denied. Ensure that the bucket is in the AWS account, "
-                "and your AWS IAM Role or User has the 's3:ListBucket' permission for this bucket."
-            ),
-            404: "Not found. Please check your bucket name and object key, and ensure that they exist in the AWS account.",
-        }
-        raise JobAttachmentsS3ClientError(
-            action="checking if object exists",
-            status_code=status_code,
-            bucket_name=s3_bucket,
-            key_or_prefix=manifest_key,
-            message=f"{status_code_guidance.get(status_code, '')} {str(exc)}",
-        ) from exc
-    except BotoCoreError as bce:
-        raise JobAttachmentS3BotoCoreError(
-            action="checking for the existence of an object in the S3 bucket",
-            error_details=str(bce),
-        ) from bce
-    except Exception as e:
-        raise AssetSyncError(e) from e
-
-    if "asset-root-json" in head["Metadata"]:
-        return json.loads(head["Metadata"]["asset-root-json"])
-    else:
-        return head["Metadata"].get("asset-root", None)
-
-
 def get_job_output_paths_by_asset_root(
     s3_settings: JobAttachmentS3Settings,
     farm_id: str,
@@ -686,6 +1219,7 @@ def get_job_output_paths_by_asset_root(
     task_id: Optional[str] = None,
     session_action_id: Optional[str] = None,
     session: Optional[boto3.Session] = None,
+    manifest_cache: Optional[ManifestCache] = None,
 ) -> dict[str, ManifestPathGroup]:
     """
     Gets dict of grouped paths of all output files of a given job.
@@ -693,7 +1227,15 @@ def get_job_output_paths_by_asset_root(
     Returns a dict of ManifestPathGroups, with the root path as the key.
     """
     output_manifests_by_root = get_output_manifests_by_asset_root(
-        s3_settings, farm_id, queue_id, job_id, step_id, task_id, session_action_id, session=session
+        s3_settings,
+        farm_id,
+        queue_id,
+        job_id,
+        step_id,
+        task_id,
+        session_action_id,
+        session=session,
+        manifest_cache=manifest_cache,
     )
 
     outputs: dict[str, ManifestPathGroup] = {}
@@ -715,29 +1257,41 @@ def get_output_manifests_by_asset_root(
     task_id: Optional[str] = None,
     session_action_id: Optional[str] = None,
     session: Optional[boto3.Session] = None,
+    manifest_cache: Optional[ManifestCache] = None,
+    use_step_manifests: bool = True,
 ) -> dict[str, list[BaseAssetManifest]]:
     """
     For a given job/step/task, gets a map from each root path to a corresponding list of
-    output manifests.
+    output manifests. If a manifest cache is given, the manifests that are in the cache with the
+    ETag they are listed with aren't downloaded again. If use_step_manifests is True, the merged
+    output manifests of a step (see AssetSync.sync_step_outputs) are used instead of the manifests of
+    its tasks, if they are up to date.
     """
     outputs: DefaultDict[str, list[BaseAssetManifest]] = DefaultDict(list)
     manifest_prefix: str = _get_output_manifest_prefix(
         s3_settings, farm_id, queue_id, job_id, step_id, task_id, session_action_id
     )
     try:
-        manifests_keys: list[str] = _get_tasks_manifests_keys_from_s3(
-            manifest_prefix, s3_settings.s3BucketName, session=session
+        manifests_keys: dict[str, str] = _get_tasks_manifests_keys_from_s3(
+            manifest_prefix,
+            s3_settings.s3BucketName,
+            session=session,
+            use_step_manifests=use_step_manifests,
         )
     except JobAttachmentsError:
         return outputs
 
-    for key in manifests_keys:
-        asset_manifest = get_manifest_from_s3(
+    manifests_and_asset_roots = _run_manifest_requests_concurrently(
+        lambda key: _get_manifest_and_asset_root_from_s3(
             manifest_key=key,
             s3_bucket=s3_settings.s3BucketName,
             session=session,
-        )
-        asset_root = _get_asset_root_from_s3(key, s3_settings.s3BucketName, session)
+            manifest_cache=manifest_cache,
+            etag=manifests_keys[key],
+        ),
+        list(manifests_keys),
+    )
+    for key, (asset_manifest, asset_root) in zip(manifests_keys, manifests_and_asset_roots):
         if not asset_root:
             raise MissingAssetRootError(
                 f"Failed to get asset root from metadata of output manifest: {key}"
@@ -755,9 +1309,12 @@ def download_files_from_manifests(
     session: Optional[boto3.Session] = None,
     on_downloading_files: Optional[Callable[[ProgressReportMetadata], bool]] = None,
     logger: Optional[Union[Logger, LoggerAdapter]] = None,
+    duplicate_file_mode: DuplicateFileMode = DuplicateFileMode.COPY,
+    object_cache: Optional[ObjectCache] = None,
 ) -> DownloadSummaryStatistics:
     """
-    Given manifests, downloads all files from a CAS in each manifest.
+    Given manifests, downloads all files from a CAS in each manifest. The files of a manifest that have
+    the same content hash are downloaded only once.
 
     Args:
         s3_bucket: The name of the S3 bucket.
@@ -766,9 +1323,15 @@ def download_files_from_manifests(
         session: The boto3 session to use.
         on_downloading_files: a callback to be called to periodically report progress to the caller.
             The callback returns True if the operation should continue as normal, or False to cancel.
+        duplicate_file_mode: How to write the files that have the same content hash as a downloaded file.
+            Hard links are opt-in, since the linked files share their contents.
+        object_cache: The local cache of the objects downloaded from the CAS, which is shared across
+            sessions. Files are written from it when they're there, and added to it once downloaded.
+            Files are copied from it rather than hard linked if file system permission settings are
+            given, since setting the permissions of a linked file would set those of the cached object.
 
     Returns:
-        The download summary statistics.
+        The download summary statistics, including the number and size of the deduplicated files.
     """
     s3_client = get_s3_client(session=session)
     num_download_workers = _get_num_download_workers()
@@ -791,6 +1354,13 @@ def download_files_from_manifests(
 
     downloaded_files_paths_by_root: DefaultDict[str, list[str]] = DefaultDict(list)
 
+    if (
+        object_cache is not None
+        and object_cache.use_hardlinks
+        and fs_permission_settings is not None
+    ):
+        object_cache = object_cache.without_hardlinks()
+
     for local_download_dir, manifest in manifests_by_root.items():
         downloaded_files_paths = _download_files_parallel(
             manifest.paths,
@@ -803,6 +1373,8 @@ def download_files_from_manifests(
             session,
             file_mod_time,
             progress_tracker=progress_tracker,
+            duplicate_file_mode=duplicate_file_mode,
+            object_cache=object_cache,
         )
 
         if fs_permission_settings is not None:
@@ -886,16 +1458,21 @@ def merge_asset_manifests(manifests: list[BaseAssetManifest]) -> BaseAssetManife
     first_manifest = manifests[0]
 
     hash_alg: HashAlgorithm = first_manifest.hashAlg
-    merged_paths: dict[str, RelativeFilePath] = dict()
-    total_size: int = 0
-
-    # Loop each manifest
     for manifest in manifests:
         if manifest.hashAlg != hash_alg:
             raise NotImplementedError(
                 f"Merging manifests with different hash algorithms is not supported.  {manifest.hashAlg.value} does not match {hash_alg.value}"
             )
 
+    for manifest in manifests:
+        if isinstance(manifest.paths, CompactManifestPaths):
+            return _merge_compact_asset_manifests(manifests, manifest.paths.path_type)
+
+    merged_paths: dict[str, RelativeFilePath] = dict()
+    total_size: int = 0
+
+    # Loop each manifest
+    for manifest in manifests:
         for path in manifest.paths:
             merged_paths[path.path] = path
 
@@ -912,12 +1489,38 @@ def merge_asset_manifests(manifests: list[BaseAssetManifest]) -> BaseAssetManife
     return output_manifest
 
 
+def _merge_compact_asset_manifests(
+    manifests: list[BaseAssetManifest], path_type: type[RelativeFilePath]
+) -> BaseAssetManifest:
+    """
+    Merges manifests as merge_asset_manifests does, when some of their paths are compact. The merged
+    manifest has compact paths, which are copied from the columns of the compact paths.
+    """
+    merged_rows: dict[str, Tuple[Sequence[RelativeFilePath], int]] = dict()
+    for manifest in manifests:
+        for index, path in enumerate(iter_path_strings(manifest.paths)):
+            merged_rows[path] = (manifest.paths, index)
+
+    merged_paths = CompactManifestPaths(path_type, manifests[0].hashAlg)
+    for paths, index in merged_rows.values():
+        merged_paths.append_from(paths, index)
+    del merged_rows
+
+    return manifests[0].__class__(
+        hash_alg=manifests[0].hashAlg,
+        paths=merged_paths,  # type: ignore[arg-type]
+        total_size=merged_paths.get_total_size(),  # type: ignore[call-arg]
+    )
+
+
 def _write_manifest_to_temp_file(manifest: BaseAssetManifest, dir: Path) -> str:
     with NamedTemporaryFile(
         suffix=".json", prefix="deadline-merged-manifest-", delete=False, mode="w", dir=dir
     ) as file:
-        file.write(manifest.encode())
-        return file.name
+        manifest.encode_to(file)
+    # The manifest is read back if another VFS is mounted at the same mount point in the session.
+    write_manifest_sidecar(manifest, file.name)
+    return file.name
 
 
 def _read_manifest_file(input_manifest_path: Path):
@@ -928,8 +1531,7 @@ def _read_manifest_file(input_manifest_path: Path):
     Returns:
         BaseAssetManifest : Single decoded manifest
     """
-    with open(input_manifest_path) as input_manifest_file:
-        return decode_manifest(input_manifest_file.read())
+    return read_local_manifest(input_manifest_path)
 
 
 def handle_existing_vfs(
@@ -1090,19 +1692,31 @@ class OutputDownloader:
         task_id: Optional[str] = None,
         session_action_id: Optional[str] = None,
         session: Optional[boto3.Session] = None,
+        manifest_cache_dir: Optional[str] = None,
     ) -> None:
+        """
+        If a manifest cache directory is given, the output manifests are cached in it, so that the
+        manifests that were already downloaded aren't downloaded again. The cache is bounded to the
+        size set in the configuration settings.
+        """
         self.s3_settings = s3_settings
         self.session = session
-        self.outputs_by_root = get_job_output_paths_by_asset_root(
-            s3_settings=s3_settings,
-            farm_id=farm_id,
-            queue_id=queue_id,
-            job_id=job_id,
-            step_id=step_id,
-            task_id=task_id,
-            session_action_id=session_action_id,
-            session=session,
-        )
+        with (
+            ManifestCache.from_config(manifest_cache_dir)
+            if manifest_cache_dir is not None
+            else nullcontext()
+        ) as manifest_cache:
+            self.outputs_by_root = get_job_output_paths_by_asset_root(
+                s3_settings=s3_settings,
+                farm_id=farm_id,
+                queue_id=queue_id,
+                job_id=job_id,
+                step_id=step_id,
+                task_id=task_id,
+                session_action_id=session_action_id,
+                session=session,
+                manifest_cache=manifest_cache,
+            )
 
     def get_output_paths_by_root(self) -> dict[str, list[str]]:
         """
@@ -31,6 +31,7 @@ from ._utils import (
 S3_DATA_FOLDER_NAME = "Data"
 S3_MANIFEST_FOLDER_NAME = "Manifests"
 S3_INPUT_MANIFEST_FOLDER_NAME = "Inputs"
+S3_STEP_OUTPUT_MANIFEST_FOLDER_NAME = "StepOutputs"
 
 
 @dataclass
@@ -115,6 +116,8 @@ class OutputFile:
     in_s3: bool
     # The base directory path against which file paths are containment-checked
     base_dir: Optional[str]
+    # The modification time of the file (in microseconds) when it was hashed
+    file_mtime: Optional[int] = None
 
 
 class StorageProfileOperatingSystemFamily(str, Enum):
@@ -262,6 +265,13 @@ class JobAttachmentS3Settings:
             self.rootPrefix, S3_MANIFEST_FOLDER_NAME, farm_id, queue_id, job_id, step_id
         )
 
+    def full_step_compacted_output_prefix(self, farm_id, queue_id, job_id, step_id) -> str:
+        self._validate_root_prefix()
+        return _join_s3_paths(
+            self.full_step_output_prefix(farm_id, queue_id, job_id, step_id),
+            S3_STEP_OUTPUT_MANIFEST_FOLDER_NAME,
+        )
+
     def full_task_output_prefix(self, farm_id, queue_id, job_id, step_id, task_id) -> str:
         self._validate_root_prefix()
         return _join_s3_paths(
@@ -364,6 +374,24 @@ class FileConflictResolution(Enum):
     CREATE_COPY = 3
 
 
+class DuplicateFileMode(str, Enum):
+    """
+    Enumerant of the ways to write the files of a download that have the same content hash as
+    another file of the download, which is downloaded only once.
+
+    Modes:
+      DOWNLOAD - Downloads each of the files from S3, without deduplicating them.
+      COPY - Copies the downloaded file, cloning it instead (reflink) where the file system supports it.
+      HARDLINK - Hard links the files to the downloaded file, falling back to COPY where that fails.
+        The files then share their contents, permissions and modification time, so writing to one of
+        them changes all of them.
+    """
+
+    DOWNLOAD = "DOWNLOAD"
+    COPY = "COPY"
+    HARDLINK = "HARDLINK"
+
+
 def default_glob_all() -> List[str]:
     return ["**/*"]
 
@@ -72,10 +72,14 @@ class DownloadSummaryStatistics(SummaryStatistics):
     """
     A summary statistics metadata to be returned to the client when the downloading files has
     completed. In addition to the general statistics, includes a dict mapping download locations
-    to the number of downloaded files in each of those locations.
+    to the number of downloaded files in each of those locations, and the number and size of the
+    processed files that were written from another downloaded file with the same content hash
+    instead of being downloaded again.
     """
 
     file_counts_by_root_directory: Dict[str, int] = field(default_factory=dict)
+    deduplicated_files: int = 0
+    deduplicated_bytes: int = 0
 
     def aggregate(self, other: SummaryStatistics) -> SummaryStatistics:
         """
@@ -91,6 +95,8 @@ class DownloadSummaryStatistics(SummaryStatistics):
                 Counter(self.file_counts_by_root_directory)
                 + Counter(other.file_counts_by_root_directory)
             )
+            self.deduplicated_files += getattr(other, "deduplicated_files", 0)
+            self.deduplicated_bytes += getattr(other, "deduplicated_bytes", 0)
 
         return self
 
@@ -100,6 +106,8 @@ class DownloadSummaryStatistics(SummaryStatistics):
         """
         download_summary_statistics_dict = asdict(self)
         del download_summary_statistics_dict["file_counts_by_root_directory"]
+        del download_summary_statistics_dict["deduplicated_files"]
+        del download_summary_statistics_dict["deduplicated_bytes"]
         return SummaryStatistics(**download_summary_statistics_dict)
 
 
@@ -190,6 +198,8 @@ class ProgressTracker:
         self.processed_bytes = 0
         self.skipped_files = 0
         self.skipped_bytes = 0
+        self.deduplicated_files = 0
+        self.deduplicated_bytes = 0
         self.total_time = 0.0  # total time (in fractional seconds) taken for the process
 
         self._lock = Lock()
@@ -254,6 +264,19 @@ class ProgressTracker:
             self.completed_files_in_chunk += num_files
             self.skipped_bytes += file_bytes
 
+    def increase_deduplicated(self, num_files: int = 1, file_bytes: int = 0) -> None:
+        """
+        Adds the number and size of files that were processed by writing them from another
+        processed file with the same contents, which are counted as processed files too.
+        """
+        with self._lock:
+            self._initialize_timestamps_if_none()
+            self.processed_files += num_files
+            self.completed_files_in_chunk += num_files
+            self.processed_bytes += file_bytes
+            self.deduplicated_files += num_files
+            self.deduplicated_bytes += file_bytes
+
     def _report_progress(self) -> bool:
         """
         Invokes the callback with current progress metadata in one of the following cases:
@@ -346,6 +369,8 @@ class ProgressTracker:
         summary_statistics_dict["file_counts_by_root_directory"] = {
             root: len(paths) for root, paths in downloaded_files_paths_by_root.items()
         }
+        summary_statistics_dict["deduplicated_files"] = self.deduplicated_files
+        summary_statistics_dict["deduplicated_bytes"] = self.deduplicated_bytes
         return DownloadSummaryStatistics(**summary_statistics_dict)
 
     def _log_progress_message(self) -> None:
@@ -6,17 +6,21 @@ Classes for handling uploading of assets.
 from __future__ import annotations
 
 import concurrent.futures
-from contextlib import contextmanager
+from contextlib import contextmanager, nullcontext
 import errno
+import functools
 import logging
 import os
+import stat
 import sys
+import threading
 import time
+from collections import Counter, defaultdict
 from datetime import datetime
 from io import BufferedReader, BytesIO
 from math import trunc
 from pathlib import Path, PurePath
-from typing import Any, Callable, Generator, Optional, Tuple, Type, Union
+from typing import Any, Callable, ContextManager, Generator, Iterator, Optional, Tuple, Type, Union
 
 import boto3
 from boto3.s3.transfer import ProgressCallbackInvoker
@@ -51,7 +55,7 @@ from .exceptions import (
     MissingS3BucketError,
     MissingS3RootPrefixError,
 )
-from .caches import HashCache, HashCacheEntry, S3CheckCache, S3CheckCacheEntry
+from .caches import CacheSession, HashCache, HashCacheEntry, S3CheckCache, S3CheckCacheEntry
 from .models import (
     AssetRootGroup,
     AssetRootManifest,
@@ -69,6 +73,13 @@ from .progress_tracker import (
     ProgressTracker,
     SummaryStatistics,
 )
+from .asset_manifests.hash_algorithms import HashFileOptions
+from .asset_manifests.hashing_engines import (
+    HASHING_ENGINE_AUTO_MIN_FILES,
+    HashingEngine,
+    HashingEngineType,
+    get_hashing_engine,
+)
 from ._utils import (
     _is_relative_to,
     _join_s3_paths,
@@ -82,6 +93,20 @@ S3_MULTIPART_UPLOAD_CHUNK_SIZE: int = 8388608  # 8 MB
 # The maximum number of concurrency for multipart uploads. This is used to determine the max number
 # of thread workers for uploading multiple small files in parallel.
 S3_UPLOAD_MAX_CONCURRENCY: int = 10
+# The number of leading characters of the file hashes used to split the listing of the S3 CAS prefix
+# into shards, when checking the existence of many files at once. (256 shards for hexadecimal hashes.)
+S3_CAS_LIST_SHARD_PREFIX_LENGTH: int = 2
+# The maximum size of the files that are hashed and uploaded from a single read when single-read uploads are
+# enabled. A file's CAS key is only known once it has been read in full, so a file is held in memory until
+# it's uploaded; larger files are still read twice, once to be hashed and once to be uploaded.
+S3_SINGLE_READ_UPLOAD_MAX_SIZE: int = S3_MULTIPART_UPLOAD_CHUNK_SIZE
+# The maximum number of keys listed in a shard per file to look up in it. The cost of listing a shard
+# scales with the number of objects in the CAS, not the number of files to look up, so the listing of a
+# shard that has more keys than this stops, and its files are checked with a head-object call each.
+S3_CAS_LIST_MAX_KEYS_PER_FILE: int = 100
+# The maximum number of files waiting to be uploaded when hashing and uploading are pipelined.
+# When this is reached, the hashing results wait for the uploads to catch up.
+S3_UPLOAD_PIPELINE_MAX_QUEUED_FILES: int = 1000
 
 
 class S3AssetUploader:
@@ -119,10 +144,16 @@ class S3AssetUploader:
             if self.num_upload_workers <= 0:
                 # This can result in triggering "Connection pool is full" warning messages during uploads.
                 self.num_upload_workers = 1
+
+            # The number of files not found in the S3 check cache at which existence in S3 is
+            # determined by listing the CAS prefix rather than by a head-object call per file.
+            self.bulk_existence_check_threshold = int(
+                config_file.get_setting("settings.s3_bulk_existence_check_threshold")
+            )
         except ValueError as ve:
             raise AssetSyncError(
                 "Failed to parse configuration settings. Please ensure that the following settings in the config file are integers: "
-                "'s3_max_pool_connections', 'small_file_threshold_multiplier'"
+                "'s3_max_pool_connections', 'small_file_threshold_multiplier', 's3_bulk_existence_check_threshold'"
             ) from ve
 
         self._s3 = get_s3_client(self._session)  # pylint: disable=invalid-name
@@ -135,6 +166,8 @@ class S3AssetUploader:
             error_msg = (
                 f"'s3_max_pool_connections' ({s3_max_pool_connections}) must be positive integer."
             )
+        elif self.bulk_existence_check_threshold <= 0:
+            error_msg = f"'s3_bulk_existence_check_threshold' ({self.bulk_existence_check_threshold}) must be positive integer."
         if error_msg:
             raise AssetSyncError("Nonvalid value for configuration setting: " + error_msg)
 
@@ -152,6 +185,7 @@ class S3AssetUploader:
         manifest_metadata: dict[str, dict[str, str]] = dict(),
         manifest_file_name: Optional[str] = None,
         asset_root: Optional[Path] = None,
+        s3_check_cache: Optional[S3CheckCache] = None,
     ) -> tuple[str, str]:
         """
         Uploads assets based off of an asset manifest, uploads the asset manifest.
@@ -168,12 +202,58 @@ class S3AssetUploader:
             manifest_metadata: File metadata for given manifest to be uploaded.
             manifest_file_name: Optional file name for given manifest to be uploaded, otherwise use default name.
             asset_root: The root in which asset actually in to facilitate path mapping.
+            s3_check_cache: Optional open S3 check cache to use, rather than opening the one in s3_check_cache_dir.
 
         Returns:
             A tuple of (the partial key for the manifest on S3, the hash of input manifest).
         """
 
         # Upload asset manifest
+        (partial_manifest_key, manifest_hash) = self.upload_manifest(
+            job_attachment_settings=job_attachment_settings,
+            manifest=manifest,
+            source_root=source_root,
+            partial_manifest_prefix=partial_manifest_prefix,
+            file_system_location_name=file_system_location_name,
+            manifest_write_dir=manifest_write_dir,
+            manifest_name_suffix=manifest_name_suffix,
+            manifest_metadata=manifest_metadata,
+            manifest_file_name=manifest_file_name,
+        )
+
+        # Upload assets
+        self.upload_input_files(
+            manifest=manifest,
+            s3_bucket=job_attachment_settings.s3BucketName,
+            source_root=asset_root if asset_root else source_root,
+            s3_cas_prefix=job_attachment_settings.full_cas_prefix(),
+            progress_tracker=progress_tracker,
+            s3_check_cache_dir=s3_check_cache_dir,
+            s3_check_cache=s3_check_cache,
+        )
+
+        return (partial_manifest_key, manifest_hash)
+
+    def upload_manifest(
+        self,
+        job_attachment_settings: JobAttachmentS3Settings,
+        manifest: BaseAssetManifest,
+        source_root: Path,
+        partial_manifest_prefix: Optional[str] = None,
+        file_system_location_name: Optional[str] = None,
+        manifest_write_dir: Optional[str] = None,
+        manifest_name_suffix: str = "input",
+        manifest_metadata: dict[str, dict[str, str]] = dict(),
+        manifest_file_name: Optional[str] = None,
+    ) -> tuple[str, str]:
+        """
+        Uploads the asset manifest (and writes it locally if `manifest_write_dir` is given), without
+        uploading the files listed in it. See `upload_assets` for the arguments.
+
+        Returns:
+            A tuple of (the partial key for the manifest on S3, the hash of input manifest).
+        """
+
         (hash_alg, manifest_bytes, manifest_name) = S3AssetUploader._gather_upload_metadata(
             manifest=manifest,
             source_root=source_root,
@@ -207,16 +287,6 @@ class S3AssetUploader:
                 extra_args=manifest_metadata,
             )
 
-        # Upload assets
-        self.upload_input_files(
-            manifest=manifest,
-            s3_bucket=job_attachment_settings.s3BucketName,
-            source_root=asset_root if asset_root else source_root,
-            s3_cas_prefix=job_attachment_settings.full_cas_prefix(),
-            progress_tracker=progress_tracker,
-            s3_check_cache_dir=s3_check_cache_dir,
-        )
-
         return (partial_manifest_key, hash_data(manifest_bytes, hash_alg))
 
     @staticmethod
@@ -272,7 +342,7 @@ class S3AssetUploader:
         logger.info(f"Creating local manifest file: {local_manifest_file}\n")
         local_manifest_file.parent.mkdir(parents=True, exist_ok=True)
         with open(local_manifest_file, "w") as file:
-            file.write(manifest.encode())
+            manifest.encode_to(file)
 
         return local_manifest_file
 
@@ -302,13 +372,15 @@ class S3AssetUploader:
         s3_cas_prefix: str,
         progress_tracker: Optional[ProgressTracker] = None,
         s3_check_cache_dir: Optional[str] = None,
+        s3_check_cache: Optional[S3CheckCache] = None,
     ) -> None:
         """
         Uploads all of the files listed in the given manifest to S3 if they don't exist in the
         given S3 prefix already.
 
         The local 'S3 check cache' is used to note if we've seen an object in S3 before so we
-        can save the S3 API calls.
+        can save the S3 API calls. If many files are missing from the cache, the S3 CAS prefix is
+        listed in bulk instead of checking each of those files with a head-object call.
         """
 
         # Split into a separate 'large file' and 'small file' queues.
@@ -319,7 +391,17 @@ class S3AssetUploader:
             manifest.paths, self.small_file_threshold
         )
 
-        with S3CheckCache(s3_check_cache_dir) as s3_cache:
+        s3_check_cache_context: ContextManager[S3CheckCache] = (
+            nullcontext(s3_check_cache)
+            if s3_check_cache is not None
+            else S3CheckCache(s3_check_cache_dir, bulk_mode=True)
+        )
+        with s3_check_cache_context as s3_cache:
+            s3_cache.preload_entries(self._get_s3_check_cache_prefix(s3_bucket, s3_cas_prefix))
+            existing_s3_keys = self._get_existing_cas_keys(
+                manifest.paths, manifest.hashAlg, s3_bucket, s3_cas_prefix, s3_cache
+            )
+
             # First, process the whole 'small file' queue with parallel object uploads.
             with concurrent.futures.ThreadPoolExecutor(
                 max_workers=self.num_upload_workers
@@ -334,6 +416,7 @@ class S3AssetUploader:
                         s3_cas_prefix,
                         s3_cache,
                         progress_tracker,
+                        existing_s3_keys,
                     ): file
                     for file in small_file_queue
                 }
@@ -353,6 +436,7 @@ class S3AssetUploader:
                     s3_cas_prefix,
                     s3_cache,
                     progress_tracker,
+                    existing_s3_keys,
                 )
                 if progress_tracker and not is_uploaded:
                     progress_tracker.increase_skipped(1, file_size)
@@ -386,6 +470,138 @@ class S3AssetUploader:
     def _get_current_timestamp(self) -> str:
         return str(datetime.now().timestamp())
 
+    @staticmethod
+    def _get_cas_key(file_hash: str, hash_algorithm: HashAlgorithm, s3_cas_prefix: str) -> str:
+        """
+        Returns the S3 key of the content-addressable storage (CAS) object for the given file hash.
+        """
+        s3_key = f"{file_hash}.{hash_algorithm.value}"
+        if s3_cas_prefix:
+            s3_key = _join_s3_paths(s3_cas_prefix, s3_key)
+        return s3_key
+
+    @staticmethod
+    def _get_s3_check_cache_prefix(s3_bucket: str, s3_cas_prefix: str) -> str:
+        """
+        Returns the prefix of the S3 check cache keys of the objects in the given S3 CAS prefix.
+        """
+        return f"{s3_bucket}/{s3_cas_prefix}/" if s3_cas_prefix else f"{s3_bucket}/"
+
+    def _get_existing_cas_keys(
+        self,
+        files: list[base_manifest.BaseManifestPath],
+        hash_algorithm: HashAlgorithm,
+        s3_bucket: str,
+        s3_cas_prefix: str,
+        s3_check_cache: S3CheckCache,
+    ) -> Optional[set[str]]:
+        """
+        Finds which of the given files already exist in the S3 CAS prefix by listing the prefix in bulk,
+        rather than doing a head-object call per file. Files found in the S3 check cache are not looked up.
+
+        The listing is split into shards by the first characters of the file hashes, and only the shards
+        that contain files to look up are listed (in parallel.) The listing of a shard stops once it has
+        listed S3_CAS_LIST_MAX_KEYS_PER_FILE keys per file to look up in it, and the files of that shard
+        are checked with a head-object call each instead. Returns the set of existing CAS keys among the
+        files to look up, or None if fewer files than the bulk existence check threshold are missing from
+        the S3 check cache, in which case existence should be checked per file.
+        """
+        hashes_to_check: set[str] = set()
+        for file in files:
+            s3_key = self._get_cas_key(file.hash, hash_algorithm, s3_cas_prefix)
+            if not s3_check_cache.get_entry(s3_key=f"{s3_bucket}/{s3_key}"):
+                hashes_to_check.add(file.hash)
+
+        if len(hashes_to_check) < self.bulk_existence_check_threshold:
+            return None
+
+        s3_keys_by_shard: dict[str, list[str]] = defaultdict(list)
+        for file_hash in sorted(hashes_to_check):
+            shard_prefix = (
+                _join_s3_paths(s3_cas_prefix, file_hash[:S3_CAS_LIST_SHARD_PREFIX_LENGTH])
+                if s3_cas_prefix
+                else file_hash[:S3_CAS_LIST_SHARD_PREFIX_LENGTH]
+            )
+            s3_keys_by_shard[shard_prefix].append(
+                self._get_cas_key(file_hash, hash_algorithm, s3_cas_prefix)
+            )
+        logger.info(
+            f"Listing {len(s3_keys_by_shard)} prefix(es) in s3://{s3_bucket}/{s3_cas_prefix} to check "
+            f"the existence of {len(hashes_to_check)} file(s)."
+        )
+
+        existing_s3_keys: set[str] = set()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.num_upload_workers) as executor:
+            futures = [
+                executor.submit(self._get_existing_shard_keys, s3_bucket, prefix, s3_keys)
+                for prefix, s3_keys in s3_keys_by_shard.items()
+            ]
+            # surfaces any exceptions in the thread
+            for future in concurrent.futures.as_completed(futures):
+                existing_s3_keys.update(future.result())
+
+        return existing_s3_keys
+
+    def _get_existing_shard_keys(
+        self, s3_bucket: str, shard_prefix: str, s3_keys: list[str]
+    ) -> list[str]:
+        """
+        Returns which of the given CAS keys in the given shard exist, by listing the shard, or by checking
+        each key with a head-object call if the shard has too many objects to list.
+        """
+        listed_keys = self._list_object_keys(
+            s3_bucket, shard_prefix, max_keys=len(s3_keys) * S3_CAS_LIST_MAX_KEYS_PER_FILE
+        )
+        if listed_keys is not None:
+            listed_key_set = set(listed_keys)
+            return [s3_key for s3_key in s3_keys if s3_key in listed_key_set]
+
+        logger.debug(
+            f"Too many objects to list in s3://{s3_bucket}/{shard_prefix}, checking the existence of"
+            f" {len(s3_keys)} file(s) one at a time."
+        )
+        return [s3_key for s3_key in s3_keys if self.file_already_uploaded(s3_bucket, s3_key)]
+
+    def _list_object_keys(
+        self, s3_bucket: str, prefix: str, max_keys: Optional[int] = None
+    ) -> Optional[list[str]]:
+        """
+        Returns the keys of all objects in the given S3 bucket that start with the given prefix, or None if
+        the listing was stopped because there are more than the given maximum number of keys.
+        """
+        keys: list[str] = []
+        try:
+            paginator = self._s3.get_paginator("list_objects_v2")
+            for page in paginator.paginate(Bucket=s3_bucket, Prefix=prefix):
+                keys.extend(content["Key"] for content in page.get("Contents", []))
+                if max_keys is not None and len(keys) > max_keys and page.get("IsTruncated"):
+                    return None
+        except ClientError as exc:
+            status_code = int(exc.response["ResponseMetadata"]["HTTPStatusCode"])
+            status_code_guidance = {
+                **COMMON_ERROR_GUIDANCE_FOR_S3,
+                403: (
+                    f"Access denied. Ensure that the bucket is in the account {get_account_id(session=self._session)}, "
+                    "and your AWS IAM Role or User has the 's3:ListBucket' permission for this bucket."
+                ),
+                404: "Not found. Please check your bucket name, and ensure that it exists in the AWS account.",
+            }
+            raise JobAttachmentsS3ClientError(
+                action="listing bucket contents",
+                status_code=status_code,
+                bucket_name=s3_bucket,
+                key_or_prefix=prefix,
+                message=f"{status_code_guidance.get(status_code, '')} {str(exc)}",
+            ) from exc
+        except BotoCoreError as bce:
+            raise JobAttachmentS3BotoCoreError(
+                action="listing bucket contents",
+                error_details=str(bce),
+            ) from bce
+        except Exception as e:
+            raise AssetSyncError(e) from e
+        return keys
+
     def upload_object_to_cas(
         self,
         file: base_manifest.BaseManifestPath,
@@ -395,16 +611,17 @@ class S3AssetUploader:
         s3_cas_prefix: str,
         s3_check_cache: S3CheckCache,
         progress_tracker: Optional[ProgressTracker] = None,
+        existing_s3_keys: Optional[set[str]] = None,
     ) -> Tuple[bool, int]:
         """
         Uploads an object to the S3 content-addressable storage (CAS) prefix. Optionally,
         does a head-object check and only uploads the file if it doesn't exist in S3 already.
+        If `existing_s3_keys` (the result of a bulk listing of the CAS prefix) is given, it is
+        used in place of the head-object check.
         Returns a tuple (whether it has been uploaded, the file size).
         """
         local_path = source_root.joinpath(file.path)
-        s3_upload_key = f"{file.hash}.{hash_algorithm.value}"
-        if s3_cas_prefix:
-            s3_upload_key = _join_s3_paths(s3_cas_prefix, s3_upload_key)
+        s3_upload_key = self._get_cas_key(file.hash, hash_algorithm, s3_cas_prefix)
         is_uploaded = False
         file_size = local_path.resolve().stat().st_size
 
@@ -414,7 +631,12 @@ class S3AssetUploader:
             )
             return (is_uploaded, file_size)
 
-        if self.file_already_uploaded(s3_bucket, s3_upload_key):
+        if existing_s3_keys is not None:
+            already_uploaded = s3_upload_key in existing_s3_keys
+        else:
+            already_uploaded = self.file_already_uploaded(s3_bucket, s3_upload_key)
+
+        if already_uploaded:
             logger.debug(
                 f"skipping {local_path} because it has already been uploaded to s3://{s3_bucket}/{s3_upload_key}"
             )
@@ -443,27 +665,14 @@ class S3AssetUploader:
         s3_upload_key: str,
         progress_tracker: Optional[ProgressTracker] = None,
         base_dir_path: Optional[Path] = None,
-    ) -> None:
+    ) -> bool:
         """
         Uploads a single file to an S3 bucket using TransferManager, allowing mid-way
         cancellation. It monitors for upload progress through a callback, `handler`,
         which also checks if the upload should continue or not. If the `progress_tracker`
         signals to stop, the ongoing upload is cancelled.
+        Returns whether the file was uploaded, or skipped for not being a file within the base directory.
         """
-        transfer_manager = get_s3_transfer_manager(s3_client=self._s3)
-
-        future: concurrent.futures.Future
-
-        def handler(bytes_uploaded):
-            nonlocal progress_tracker
-            nonlocal future
-
-            if progress_tracker:
-                should_continue = progress_tracker.track_progress_callback(bytes_uploaded)
-                if not should_continue and future is not None:
-                    future.cancel()
-
-        subscribers = [ProgressCallbackInvoker(handler)]
         real_path = local_path.resolve()
 
         if base_dir_path:
@@ -475,63 +684,100 @@ class S3AssetUploader:
 
         # Skip the file if it's (1) a directory, 2. not existing, or 3. not within the base directory.
         if real_path.is_dir() or not real_path.exists() or not is_file_within_base_dir:
-            return
+            return False
 
         with self._open_non_symlink_file_binary(str(real_path)) as file_obj:
             if file_obj is None:
-                return
+                return False
 
-            future = transfer_manager.upload(
-                fileobj=file_obj,
-                bucket=s3_bucket,
-                key=s3_upload_key,
-                subscribers=subscribers,
+            self._upload_fileobj_to_s3(
+                file_obj=file_obj,
+                s3_bucket=s3_bucket,
+                s3_upload_key=s3_upload_key,
+                progress_tracker=progress_tracker,
+                local_path=local_path,
             )
+        return True
 
-            try:
-                future.result()
-                is_uploaded = True
-                if progress_tracker and is_uploaded:
-                    progress_tracker.increase_processed(1, 0)
-            except concurrent.futures.CancelledError as ce:
-                if progress_tracker and progress_tracker.continue_reporting is False:
-                    raise AssetSyncCancelledError(
-                        "File upload cancelled.", progress_tracker.get_summary_statistics()
+    def _upload_fileobj_to_s3(
+        self,
+        file_obj: Any,
+        s3_bucket: str,
+        s3_upload_key: str,
+        progress_tracker: Optional[ProgressTracker],
+        local_path: Union[Path, str],
+    ) -> None:
+        """
+        Uploads the contents of a readable file-like object to an S3 bucket using TransferManager.
+        See `upload_file_to_s3` for how progress is tracked and how the upload can be cancelled.
+        The `local_path` is the file the data is read from, used for error messages.
+        """
+        transfer_manager = get_s3_transfer_manager(s3_client=self._s3)
+
+        future: concurrent.futures.Future
+
+        def handler(bytes_uploaded):
+            nonlocal progress_tracker
+            nonlocal future
+
+            if progress_tracker:
+                should_continue = progress_tracker.track_progress_callback(bytes_uploaded)
+                if not should_continue and future is not None:
+                    future.cancel()
+
+        subscribers = [ProgressCallbackInvoker(handler)]
+
+        future = transfer_manager.upload(
+            fileobj=file_obj,
+            bucket=s3_bucket,
+            key=s3_upload_key,
+            subscribers=subscribers,
+        )
+
+        try:
+            future.result()
+            is_uploaded = True
+            if progress_tracker and is_uploaded:
+                progress_tracker.increase_processed(1, 0)
+        except concurrent.futures.CancelledError as ce:
+            if progress_tracker and progress_tracker.continue_reporting is False:
+                raise AssetSyncCancelledError(
+                    "File upload cancelled.", progress_tracker.get_summary_statistics()
+                )
+            else:
+                raise AssetSyncError("File upload failed.", ce) from ce
+        except ClientError as exc:
+            status_code = int(exc.response["ResponseMetadata"]["HTTPStatusCode"])
+            status_code_guidance = {
+                **COMMON_ERROR_GUIDANCE_FOR_S3,
+                403: (
+                    (
+                        "Forbidden or Access denied. Please check your AWS credentials, and ensure that "
+                        "your AWS IAM Role or User has the 's3:PutObject' permission for this bucket. "
                     )
-                else:
-                    raise AssetSyncError("File upload failed.", ce) from ce
-            except ClientError as exc:
-                status_code = int(exc.response["ResponseMetadata"]["HTTPStatusCode"])
-                status_code_guidance = {
-                    **COMMON_ERROR_GUIDANCE_FOR_S3,
-                    403: (
-                        (
-                            "Forbidden or Access denied. Please check your AWS credentials, and ensure that "
-                            "your AWS IAM Role or User has the 's3:PutObject' permission for this bucket. "
-                        )
-                        if "kms:" not in str(exc)
-                        else (
-                            "Forbidden or Access denied. Please check your AWS credentials and Job Attachments S3 bucket "
-                            "encryption settings. If a customer-managed KMS key is set, confirm that your AWS IAM Role or "
-                            "User has the 'kms:GenerateDataKey' and 'kms:DescribeKey' permissions for the key used to encrypt the bucket."
-                        )
-                    ),
-                    404: "Not found. Please check your bucket name and object key, and ensure that they exist in the AWS account.",
-                }
-                raise JobAttachmentsS3ClientError(
-                    action="uploading file",
-                    status_code=status_code,
-                    bucket_name=s3_bucket,
-                    key_or_prefix=s3_upload_key,
-                    message=f"{status_code_guidance.get(status_code, '')} {str(exc)} (Failed to upload {str(local_path)})",
-                ) from exc
-            except BotoCoreError as bce:
-                raise JobAttachmentS3BotoCoreError(
-                    action="uploading file",
-                    error_details=str(bce),
-                ) from bce
-            except Exception as e:
-                raise AssetSyncError(e) from e
+                    if "kms:" not in str(exc)
+                    else (
+                        "Forbidden or Access denied. Please check your AWS credentials and Job Attachments S3 bucket "
+                        "encryption settings. If a customer-managed KMS key is set, confirm that your AWS IAM Role or "
+                        "User has the 'kms:GenerateDataKey' and 'kms:DescribeKey' permissions for the key used to encrypt the bucket."
+                    )
+                ),
+                404: "Not found. Please check your bucket name and object key, and ensure that they exist in the AWS account.",
+            }
+            raise JobAttachmentsS3ClientError(
+                action="uploading file",
+                status_code=status_code,
+                bucket_name=s3_bucket,
+                key_or_prefix=s3_upload_key,
+                message=f"{status_code_guidance.get(status_code, '')} {str(exc)} (Failed to upload {str(local_path)})",
+            ) from exc
+        except BotoCoreError as bce:
+            raise JobAttachmentS3BotoCoreError(
+                action="uploading file",
+                error_details=str(bce),
+            ) from bce
+        except Exception as e:
+            raise AssetSyncError(e) from e
 
     @contextmanager
     def _open_non_symlink_file_binary(
@@ -746,6 +992,227 @@ class S3AssetUploader:
             raise AssetSyncError(e) from e
 
 
+class _InputFileUploadQueue:
+    """
+    Uploads input files to the S3 content-addressable storage (CAS) prefix as they are added,
+    so that uploading can start while the hashes of other files are still being computed.
+    As in `S3AssetUploader.upload_input_files`, small files are uploaded in parallel and large
+    files serially. The number of files waiting to be uploaded is bounded, so adding a file
+    blocks while the queue is full.
+    """
+
+    def __init__(
+        self,
+        asset_uploader: S3AssetUploader,
+        s3_bucket: str,
+        s3_cas_prefix: str,
+        s3_check_cache: S3CheckCache,
+        progress_tracker: Optional[ProgressTracker] = None,
+        max_queued_files: int = S3_UPLOAD_PIPELINE_MAX_QUEUED_FILES,
+        hash_file_options: Optional[HashFileOptions] = None,
+    ) -> None:
+        self._asset_uploader = asset_uploader
+        self._hash_file_options = hash_file_options
+        self._s3_bucket = s3_bucket
+        self._s3_cas_prefix = s3_cas_prefix
+        self._s3_check_cache = s3_check_cache
+        self._s3_check_cache.preload_entries(
+            S3AssetUploader._get_s3_check_cache_prefix(s3_bucket, s3_cas_prefix)
+        )
+        self._progress_tracker = progress_tracker
+        self._queue_slots = threading.BoundedSemaphore(max_queued_files)
+        self._queued_s3_keys: set[str] = set()
+        # The number of files of each CAS key that were uploaded while being hashed, which are not queued again.
+        self._single_read_s3_keys: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._futures: list[concurrent.futures.Future] = []
+        self._error: Optional[BaseException] = None
+        self._small_file_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=asset_uploader.num_upload_workers
+        )
+        self._large_file_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+    def __enter__(self) -> _InputFileUploadQueue:
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback) -> None:
+        if exc_value is not None:
+            # Stop the uploads that are queued or in progress, since the operation has failed.
+            for future in self._futures:
+                future.cancel()
+            if self._progress_tracker:
+                self._progress_tracker.continue_reporting = False
+        self._small_file_executor.shutdown(wait=True)
+        self._large_file_executor.shutdown(wait=True)
+
+    def add(
+        self,
+        file: base_manifest.BaseManifestPath,
+        hash_algorithm: HashAlgorithm,
+        source_root: Path,
+    ) -> None:
+        """
+        Queues the given file for upload. Raises the error of any upload that has failed so far.
+        """
+        self._raise_if_failed()
+
+        s3_key = self._asset_uploader._get_cas_key(file.hash, hash_algorithm, self._s3_cas_prefix)
+        with self._lock:
+            if self._single_read_s3_keys[s3_key] > 0:
+                # The file was already uploaded (and its progress reported) while it was hashed.
+                self._single_read_s3_keys[s3_key] -= 1
+                return
+            is_queued = s3_key in self._queued_s3_keys
+            self._queued_s3_keys.add(s3_key)
+        if is_queued:
+            # A file with the same contents has already been queued for upload.
+            if self._progress_tracker:
+                self._progress_tracker.increase_skipped(1, file.size)
+                self._progress_tracker.report_progress()
+            return
+
+        self._queue_slots.acquire()
+        if file.size <= self._asset_uploader.small_file_threshold:
+            executor = self._small_file_executor
+        else:
+            executor = self._large_file_executor
+        future = executor.submit(self._upload, file, hash_algorithm, source_root)
+        future.add_done_callback(self._on_upload_done)
+        self._futures.append(future)
+
+    def hash_and_upload_file(self, file_path: str, hash_algorithm: HashAlgorithm) -> str:
+        """
+        Hashes the given file and returns its hash, uploading it at the same time if it's small, so that
+        it is read from disk only once. This is used in place of `hash_file` for the files that miss the
+        hash cache.
+
+        Files up to S3_SINGLE_READ_UPLOAD_MAX_SIZE (the multipart upload chunk size) are read into memory
+        and hashed, and then uploaded to their CAS key (if they are not in S3 already) on the upload workers,
+        like the queued files. The calling thread waits for the upload, so that at most one file per hashing
+        thread is held in memory. Larger files are only hashed, since their CAS key is only known once they
+        have been read in full, and are read again to be uploaded when they're added to the queue.
+        """
+        self._raise_if_failed()
+
+        uploader = self._asset_uploader
+        with uploader._open_non_symlink_file_binary(file_path) as file_obj:
+            # A file that can't be opened safely for upload is skipped when it's added to the queue.
+            if (
+                file_obj is None
+                or os.fstat(file_obj.fileno()).st_size > S3_SINGLE_READ_UPLOAD_MAX_SIZE
+            ):
+                return hash_file(file_path, hash_algorithm, self._hash_file_options)
+            data = file_obj.read()
+
+        file_hash = hash_data(data, hash_algorithm)
+        s3_key = uploader._get_cas_key(file_hash, hash_algorithm, self._s3_cas_prefix)
+        if self._claim_s3_key(s3_key):
+            self._raise_if_failed()
+            self._queue_slots.acquire()
+            future = self._small_file_executor.submit(self._upload_data, data, s3_key, file_path)
+            future.add_done_callback(self._on_upload_done)
+            self._futures.append(future)
+            future.result()
+        elif self._progress_tracker:
+            self._progress_tracker.increase_skipped(1, len(data))
+
+        with self._lock:
+            self._single_read_s3_keys[s3_key] += 1
+        if self._progress_tracker:
+            self._progress_tracker.report_progress()
+        return file_hash
+
+    def _upload_data(self, data: bytes, s3_key: str, file_path: str) -> None:
+        """
+        Uploads the given contents of a file to the given CAS key, if it's not in S3 already.
+        """
+        self._raise_if_failed()
+        if self._exists_in_s3(s3_key):
+            if self._progress_tracker:
+                self._progress_tracker.increase_skipped(1, len(data))
+            return
+        self._asset_uploader._upload_fileobj_to_s3(
+            BytesIO(data), self._s3_bucket, s3_key, self._progress_tracker, file_path
+        )
+        self._put_s3_check_cache_entry(s3_key)
+
+    def _claim_s3_key(self, s3_key: str) -> bool:
+        """
+        Marks the given CAS key as queued for upload. Returns False if it was already queued.
+        """
+        with self._lock:
+            if s3_key in self._queued_s3_keys:
+                return False
+            self._queued_s3_keys.add(s3_key)
+            return True
+
+    def _exists_in_s3(self, s3_key: str) -> bool:
+        if self._s3_check_cache.get_entry(s3_key=f"{self._s3_bucket}/{s3_key}"):
+            return True
+        if self._asset_uploader.file_already_uploaded(self._s3_bucket, s3_key):
+            self._put_s3_check_cache_entry(s3_key)
+            return True
+        return False
+
+    def _put_s3_check_cache_entry(self, s3_key: str) -> None:
+        self._s3_check_cache.put_entry(
+            S3CheckCacheEntry(
+                s3_key=f"{self._s3_bucket}/{s3_key}",
+                last_seen_time=self._asset_uploader._get_current_timestamp(),
+            )
+        )
+
+    def wait(self) -> None:
+        """
+        Waits until all of the queued files have been uploaded, raising the first upload error if any.
+        """
+        for future in concurrent.futures.as_completed(self._futures):
+            # surfaces any exceptions in the thread
+            future.result()
+
+        # to report progress 100% at the end, and
+        # to check if the job submission was canceled in the middle of processing the last batch of files.
+        if self._progress_tracker:
+            self._progress_tracker.report_progress()
+            if not self._progress_tracker.continue_reporting:
+                raise AssetSyncCancelledError(
+                    "File upload cancelled.", self._progress_tracker.get_summary_statistics()
+                )
+
+    def _upload(
+        self,
+        file: base_manifest.BaseManifestPath,
+        hash_algorithm: HashAlgorithm,
+        source_root: Path,
+    ) -> None:
+        (is_uploaded, file_size) = self._asset_uploader.upload_object_to_cas(
+            file,
+            hash_algorithm,
+            self._s3_bucket,
+            source_root,
+            self._s3_cas_prefix,
+            self._s3_check_cache,
+            self._progress_tracker,
+        )
+        if self._progress_tracker:
+            if not is_uploaded:
+                self._progress_tracker.increase_skipped(1, file_size)
+            self._progress_tracker.report_progress()
+
+    def _on_upload_done(self, future: concurrent.futures.Future) -> None:
+        self._queue_slots.release()
+        if not future.cancelled() and future.exception() is not None and self._error is None:
+            self._error = future.exception()
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise self._error
+        if self._progress_tracker and not self._progress_tracker.continue_reporting:
+            raise AssetSyncCancelledError(
+                "File upload cancelled.", self._progress_tracker.get_summary_statistics()
+            )
+
+
 class S3AssetManager:
     """
     Asset handler that creates an asset manifest and uploads assets. Based on an S3 file system.
@@ -779,9 +1246,88 @@ class S3AssetManager:
 
         self.asset_uploader = asset_uploader
         self.session = session
+        self._cache_session: Optional[CacheSession] = None
+        # The hashing engines created for the submission in progress, by type, which are reused for
+        # each of its asset roots.
+        self._hashing_engines: Optional[dict[HashingEngineType, HashingEngine]] = None
 
         self.manifest_version: ManifestVersion = asset_manifest_version
 
+        hashing_engine = config_file.get_setting("settings.hashing_engine")
+        try:
+            self.hashing_engine_type = HashingEngineType(hashing_engine)
+        except ValueError as ve:
+            raise AssetSyncError(
+                f"Nonvalid value for configuration setting: 'hashing_engine' ({hashing_engine}) must be one of "
+                f"{', '.join(engine_type.value for engine_type in HashingEngineType)}."
+            ) from ve
+
+        try:
+            hash_file_buffer_size_kb = int(
+                config_file.get_setting("settings.hash_file_buffer_size_kb")
+            )
+            hash_file_mmap_threshold_mb = int(
+                config_file.get_setting("settings.hash_file_mmap_threshold_mb")
+            )
+            # The options are passed to each hashing call of this manager, so that they don't affect
+            # the other callers of hash_file.
+            self.hash_file_options = HashFileOptions(
+                buffer_size=hash_file_buffer_size_kb * 1024,
+                mmap_threshold=hash_file_mmap_threshold_mb * 1024 * 1024,
+            )
+        except ValueError as ve:
+            raise AssetSyncError(
+                "Nonvalid value for configuration setting: 'hash_file_buffer_size_kb' must be a positive integer, "
+                f"and 'hash_file_mmap_threshold_mb' must be a non-negative integer. {ve}"
+            ) from ve
+
+    @contextmanager
+    def open_cache_session(
+        self, hash_cache_dir: Optional[str] = None, s3_check_cache_dir: Optional[str] = None
+    ) -> Iterator[CacheSession]:
+        """
+        Opens a session in which the hashing and upload operations of this asset manager share the
+        local caches, so that each cache is opened only once rather than for each operation and
+        asset root. While the session is open, its cache directories are used rather than the ones
+        given to each operation.
+        """
+        with CacheSession(
+            hash_cache_dir, s3_check_cache_dir
+        ) as cache_session, self._open_hashing_engines():
+            self._cache_session = cache_session
+            try:
+                yield cache_session
+            finally:
+                self._cache_session = None
+
+    @contextmanager
+    def _open_hashing_engines(self) -> Iterator[None]:
+        """
+        Keeps the hashing engines (and the worker processes of the process pool engine) created for the
+        asset roots of a submission, so that they're created once, and shuts them down at the end.
+        Does nothing if they're already kept, such as within a cache session.
+        """
+        if self._hashing_engines is not None:
+            yield
+            return
+        self._hashing_engines = {}
+        try:
+            yield
+        finally:
+            hashing_engines, self._hashing_engines = self._hashing_engines, None
+            for hashing_engine in hashing_engines.values():
+                hashing_engine.shutdown()
+
+    def _get_cache_session(
+        self, hash_cache_dir: Optional[str] = None, s3_check_cache_dir: Optional[str] = None
+    ) -> ContextManager[CacheSession]:
+        """
+        Returns the open cache session, or a new session for the duration of a single operation.
+        """
+        if self._cache_session is not None:
+            return nullcontext(self._cache_session)
+        return CacheSession(hash_cache_dir, s3_check_cache_dir)
+
     def _process_input_path(
         self,
         path: Path,
@@ -789,6 +1335,7 @@ class S3AssetManager:
         hash_cache: HashCache,
         progress_tracker: Optional[ProgressTracker] = None,
         update: bool = True,
+        hash_function: Optional[Callable[[str, HashAlgorithm], str]] = None,
     ) -> Tuple[FileStatus, int, base_manifest.BaseManifestPath]:
         # If it's cancelled, raise an AssetSyncCancelledError exception
         if progress_tracker and not progress_tracker.continue_reporting:
@@ -800,43 +1347,179 @@ class S3AssetManager:
             version=self.manifest_version
         )
         hash_alg: HashAlgorithm = manifest_model.AssetManifest.get_default_hash_alg()
+        if hash_function is None:
+            hash_function = functools.partial(hash_file, options=self.hash_file_options)
 
         full_path = str(path.resolve())
+        # A single stat of the file checks whether its cached hash is valid, and gives its size and mtime.
+        stat_result = os.stat(full_path)
         file_status: FileStatus = FileStatus.UNCHANGED
-        actual_modified_time = str(datetime.fromtimestamp(path.stat().st_mtime))
 
         entry: Optional[HashCacheEntry] = hash_cache.get_entry(full_path, hash_alg)
-        if entry is not None:
-            # If the file was modified, we need to rehash it
-            if actual_modified_time != entry.last_modified_time:
-                entry.last_modified_time = actual_modified_time
-                entry.file_hash = hash_file(full_path, hash_alg)
-                entry.hash_algorithm = hash_alg
-                file_status = FileStatus.MODIFIED
-        else:
-            entry = HashCacheEntry(
-                file_path=full_path,
-                hash_algorithm=hash_alg,
-                file_hash=hash_file(full_path, hash_alg),
-                last_modified_time=actual_modified_time,
+        if entry is None or not entry.matches_stat(stat_result):
+            # If the file is new or was modified, we need to hash it
+            file_status = FileStatus.NEW if entry is None else FileStatus.MODIFIED
+            entry = HashCacheEntry.from_stat(
+                full_path, hash_alg, hash_function(full_path, hash_alg), stat_result
             )
-            file_status = FileStatus.NEW
+            if update:
+                hash_cache.put_entry(entry)
+
+        return (
+            file_status,
+            stat_result.st_size,
+            self._get_manifest_path(manifest_model, path, root_path, entry.file_hash, stat_result),
+        )
 
-        if file_status != FileStatus.UNCHANGED and update:
-            hash_cache.put_entry(entry)
+    @staticmethod
+    def _resolve_and_stat(
+        path: Path, resolved_directories: dict[Path, str]
+    ) -> Tuple[str, os.stat_result]:
+        """
+        Returns the resolved path of the given file and its stat result. On POSIX, the resolved paths of
+        the directories are kept in `resolved_directories`, so that a file that isn't a symlink only
+        needs a single lstat.
+        """
+        if os.name != "posix":
+            full_path = str(path.resolve())
+            return (full_path, os.stat(full_path))
+
+        directory = resolved_directories.get(path.parent)
+        if directory is None:
+            directory = str(path.parent.resolve())
+            resolved_directories[path.parent] = directory
+        full_path = os.path.join(directory, path.name)
+        stat_result = os.lstat(full_path)
+        if stat.S_ISLNK(stat_result.st_mode):
+            full_path = str(Path(full_path).resolve())
+            stat_result = os.stat(full_path)
+        return (full_path, stat_result)
 
-        file_size = path.resolve().stat().st_size
+    @staticmethod
+    def _get_manifest_path(
+        manifest_model: Type[BaseManifestModel],
+        path: Path,
+        root_path: str,
+        file_hash: str,
+        stat_result: os.stat_result,
+    ) -> base_manifest.BaseManifestPath:
         path_args: dict[str, Any] = {
             "path": path.relative_to(root_path).as_posix(),
-            "hash": entry.file_hash,
+            "hash": file_hash,
         }
 
-        # stat().st_mtime_ns returns an int that represents the time in nanoseconds since the epoch.
+        # st_mtime_ns is an int that represents the time in nanoseconds since the epoch.
         # The asset manifest spec requires the mtime to be represented as an integer in microseconds.
-        path_args["mtime"] = trunc(path.stat().st_mtime_ns // 1000)
-        path_args["size"] = file_size
+        path_args["mtime"] = trunc(stat_result.st_mtime_ns // 1000)
+        path_args["size"] = stat_result.st_size
+
+        return manifest_model.Path(**path_args)
+
+    def _process_input_paths_with_engine(
+        self,
+        input_paths: list[Path],
+        root_path: str,
+        hash_cache: HashCache,
+        manifest_model: Type[BaseManifestModel],
+        progress_tracker: Optional[ProgressTracker] = None,
+        on_path_processed: Optional[Callable[[base_manifest.BaseManifestPath], None]] = None,
+    ) -> list[base_manifest.BaseManifestPath]:
+        """
+        Returns the manifest paths of the given input files. The files that are in the hash cache are
+        checked with a single stat each, and the others are hashed together with the configured
+        hashing engine.
+        """
+        hash_alg: HashAlgorithm = manifest_model.AssetManifest.get_default_hash_alg()
+        paths: list[base_manifest.BaseManifestPath] = []
 
-        return (file_status, file_size, manifest_model.Path(**path_args))
+        def add_path(path: Path, file_hash: str, stat_result: os.stat_result, hashed: bool) -> None:
+            path_to_put_in_manifest = self._get_manifest_path(
+                manifest_model, path, root_path, file_hash, stat_result
+            )
+            paths.append(path_to_put_in_manifest)
+            if progress_tracker:
+                if hashed:
+                    progress_tracker.increase_processed(1, stat_result.st_size)
+                else:
+                    progress_tracker.increase_skipped(1, stat_result.st_size)
+                progress_tracker.report_progress()
+                # If it's cancelled, raise an AssetSyncCancelledError exception
+                if not progress_tracker.continue_reporting:
+                    raise AssetSyncCancelledError(
+                        "File hashing cancelled.", progress_tracker.get_summary_statistics()
+                    )
+            if on_path_processed:
+                on_path_processed(path_to_put_in_manifest)
+
+        # The input paths and stat results of the files to hash, by resolved file path.
+        files_to_hash: dict[str, list[Tuple[Path, os.stat_result]]] = {}
+        resolved_directories: dict[Path, str] = {}
+        for path in input_paths:
+            full_path, stat_result = self._resolve_and_stat(path, resolved_directories)
+            entry = hash_cache.get_entry(full_path, hash_alg)
+            if entry is not None and entry.matches_stat(stat_result):
+                add_path(path, entry.file_hash, stat_result, hashed=False)
+            else:
+                files_to_hash.setdefault(full_path, []).append((path, stat_result))
+
+        file_sizes = [
+            (full_path, files[0][1].st_size) for full_path, files in files_to_hash.items()
+        ]
+        with self._open_hashing_engines():
+            hashing_engine = get_hashing_engine(
+                self.hashing_engine_type,
+                [file_size for _, file_size in file_sizes],
+                self._hashing_engines,
+                self.hash_file_options,
+            )
+            logger.debug(f"Hashing {len(file_sizes)} file(s) with {type(hashing_engine).__name__}.")
+            for full_path, file_hash in hashing_engine.hash_files(file_sizes, hash_alg):
+                files = files_to_hash[full_path]
+                hash_cache.put_entry(
+                    HashCacheEntry.from_stat(full_path, hash_alg, file_hash, files[0][1])
+                )
+                for path, stat_result in files:
+                    add_path(path, file_hash, stat_result, hashed=True)
+
+        return paths
+
+    def _process_input_paths(
+        self,
+        input_paths: list[Path],
+        root_path: str,
+        hash_cache: HashCache,
+        progress_tracker: Optional[ProgressTracker] = None,
+        on_path_processed: Optional[Callable[[base_manifest.BaseManifestPath], None]] = None,
+        hash_function: Optional[Callable[[str, HashAlgorithm], str]] = None,
+    ) -> list[base_manifest.BaseManifestPath]:
+        """
+        Returns the manifest paths of the given input files, processing each of them in a thread pool.
+        """
+        paths: list[base_manifest.BaseManifestPath] = []
+        with concurrent.futures.ThreadPoolExecutor() as executor:
+            futures = [
+                executor.submit(
+                    self._process_input_path,
+                    path,
+                    root_path,
+                    hash_cache,
+                    progress_tracker,
+                    hash_function=hash_function,
+                )
+                for path in input_paths
+            ]
+            for future in concurrent.futures.as_completed(futures):
+                (file_status, file_size, path_to_put_in_manifest) = future.result()
+                paths.append(path_to_put_in_manifest)
+                if progress_tracker:
+                    if file_status == FileStatus.NEW or file_status == FileStatus.MODIFIED:
+                        progress_tracker.increase_processed(1, file_size)
+                    else:
+                        progress_tracker.increase_skipped(1, file_size)
+                    progress_tracker.report_progress()
+                if on_path_processed:
+                    on_path_processed(path_to_put_in_manifest)
+        return paths
 
     def _create_manifest_file(
         self,
@@ -844,31 +1527,49 @@ class S3AssetManager:
         root_path: str,
         hash_cache: HashCache,
         progress_tracker: Optional[ProgressTracker] = None,
+        on_path_processed: Optional[Callable[[base_manifest.BaseManifestPath], None]] = None,
+        hash_function: Optional[Callable[[str, HashAlgorithm], str]] = None,
     ) -> BaseAssetManifest:
+        """
+        Creates the manifest of the given input files, hashing the files that are not in the hash cache
+        with `hash_function`, or with the configured hashing engine by default. If `on_path_processed`
+        is given, it is called with each manifest path as soon as it is known.
+        """
         manifest_model: Type[BaseManifestModel] = ManifestModelRegistry.get_manifest_model(
             version=self.manifest_version
         )
         if manifest_model.manifest_version in {
             ManifestVersion.v2023_03_03,
         }:
-            paths: list[base_manifest.BaseManifestPath] = []
+            # In bulk mode, load the cached hashes of all the files under the root at once.
+            hash_cache.preload_entries(
+                str(root_path), manifest_model.AssetManifest.get_default_hash_alg()
+            )
 
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                futures = {
-                    executor.submit(
-                        self._process_input_path, path, root_path, hash_cache, progress_tracker
-                    ): path
-                    for path in input_paths
-                }
-                for future in concurrent.futures.as_completed(futures):
-                    (file_status, file_size, path_to_put_in_manifest) = future.result()
-                    paths.append(path_to_put_in_manifest)
-                    if progress_tracker:
-                        if file_status == FileStatus.NEW or file_status == FileStatus.MODIFIED:
-                            progress_tracker.increase_processed(1, file_size)
-                        else:
-                            progress_tracker.increase_skipped(1, file_size)
-                        progress_tracker.report_progress()
+            if hash_function is None and (
+                self.hashing_engine_type == HashingEngineType.PROCESS
+                or (
+                    self.hashing_engine_type == HashingEngineType.AUTO
+                    and len(input_paths) >= HASHING_ENGINE_AUTO_MIN_FILES
+                )
+            ):
+                paths: list[base_manifest.BaseManifestPath] = self._process_input_paths_with_engine(
+                    input_paths,
+                    root_path,
+                    hash_cache,
+                    manifest_model,
+                    progress_tracker,
+                    on_path_processed,
+                )
+            else:
+                paths = self._process_input_paths(
+                    input_paths,
+                    root_path,
+                    hash_cache,
+                    progress_tracker,
+                    on_path_processed,
+                    hash_function,
+                )
 
             # Need to sort the list to keep it canonical
             paths.sort(key=lambda x: x.path, reverse=True)
@@ -1209,29 +1910,52 @@ class S3AssetManager:
         )
 
         asset_root_manifests: list[AssetRootManifest] = []
-        for group in asset_groups:
-            # Might have output directories, but no inputs for this group
-            asset_manifest: Optional[BaseAssetManifest] = None
-            if group.inputs:
-                # Create manifest, using local hash cache
-                with HashCache(hash_cache_dir) as hash_cache:
+        with self._get_cache_session(
+            hash_cache_dir=hash_cache_dir
+        ) as cache_session, self._open_hashing_engines():
+            for group in asset_groups:
+                # Might have output directories, but no inputs for this group
+                asset_manifest: Optional[BaseAssetManifest] = None
+                if group.inputs:
+                    # Create manifest, using local hash cache
                     asset_manifest = self._create_manifest_file(
-                        sorted(list(group.inputs)), group.root_path, hash_cache, progress_tracker
+                        sorted(list(group.inputs)),
+                        group.root_path,
+                        cache_session.get_hash_cache(),
+                        progress_tracker,
                     )
 
-            asset_root_manifests.append(
-                AssetRootManifest(
-                    file_system_location_name=group.file_system_location_name,
-                    root_path=group.root_path,
-                    asset_manifest=asset_manifest,
-                    outputs=sorted(list(group.outputs)),
+                asset_root_manifests.append(
+                    AssetRootManifest(
+                        file_system_location_name=group.file_system_location_name,
+                        root_path=group.root_path,
+                        asset_manifest=asset_manifest,
+                        outputs=sorted(list(group.outputs)),
+                    )
                 )
-            )
 
         progress_tracker.total_time = time.perf_counter() - start_time
 
         return (progress_tracker.get_summary_statistics(), asset_root_manifests)
 
+    def _get_manifest_properties(
+        self, asset_root_manifest: AssetRootManifest
+    ) -> ManifestProperties:
+        """
+        Creates the manifest properties of the given asset root, without the input manifest path and hash.
+        """
+        output_rel_paths: list[str] = [
+            str(path.relative_to(asset_root_manifest.root_path))
+            for path in asset_root_manifest.outputs
+        ]
+
+        return ManifestProperties(
+            fileSystemLocationName=asset_root_manifest.file_system_location_name,
+            rootPath=asset_root_manifest.root_path,
+            rootPathFormat=PathFormat.get_host_path_format(),
+            outputRelativeDirectories=output_rel_paths,
+        )
+
     def upload_assets(
         self,
         manifests: list[AssetRootManifest],
@@ -1269,21 +1993,161 @@ class S3AssetManager:
 
         manifest_properties_list: list[ManifestProperties] = []
 
-        for asset_root_manifest in manifests:
-            output_rel_paths: list[str] = [
-                str(path.relative_to(asset_root_manifest.root_path))
-                for path in asset_root_manifest.outputs
-            ]
+        with self._get_cache_session(s3_check_cache_dir=s3_check_cache_dir) as cache_session:
+            for asset_root_manifest in manifests:
+                manifest_properties = self._get_manifest_properties(asset_root_manifest)
 
-            manifest_properties = ManifestProperties(
-                fileSystemLocationName=asset_root_manifest.file_system_location_name,
-                rootPath=asset_root_manifest.root_path,
-                rootPathFormat=PathFormat.get_host_path_format(),
-                outputRelativeDirectories=output_rel_paths,
-            )
+                if asset_root_manifest.asset_manifest:
+                    (partial_manifest_key, asset_manifest_hash) = self.asset_uploader.upload_assets(
+                        job_attachment_settings=self.job_attachment_settings,  # type: ignore[arg-type]
+                        manifest=asset_root_manifest.asset_manifest,
+                        partial_manifest_prefix=self.job_attachment_settings.partial_manifest_prefix(  # type: ignore[union-attr]
+                            self.farm_id, self.queue_id
+                        ),
+                        source_root=Path(asset_root_manifest.root_path),
+                        file_system_location_name=asset_root_manifest.file_system_location_name,
+                        progress_tracker=progress_tracker,
+                        s3_check_cache_dir=s3_check_cache_dir,
+                        manifest_write_dir=manifest_write_dir,
+                        s3_check_cache=cache_session.get_s3_check_cache(),
+                    )
+                    manifest_properties.inputManifestPath = partial_manifest_key
+                    manifest_properties.inputManifestHash = asset_manifest_hash
+
+                manifest_properties_list.append(manifest_properties)
+
+                logger.debug("Asset manifests - locations in S3:")
+                logger.debug(
+                    "\n".join(
+                        filter(
+                            None,
+                            (
+                                manifest_properties.inputManifestPath
+                                for manifest_properties in manifest_properties_list
+                            ),
+                        )
+                    )
+                )
+
+        progress_tracker.total_time = time.perf_counter() - start_time
+
+        return (
+            progress_tracker.get_summary_statistics(),
+            Attachments(manifests=manifest_properties_list),
+        )
+
+    def hash_and_upload_assets(
+        self,
+        asset_groups: list[AssetRootGroup],
+        total_input_files: int,
+        total_input_bytes: int,
+        hash_cache_dir: Optional[str] = None,
+        s3_check_cache_dir: Optional[str] = None,
+        manifest_write_dir: Optional[str] = None,
+        on_preparing_to_submit: Optional[Callable[[Any], bool]] = None,
+        on_uploading_assets: Optional[Callable[[Any], bool]] = None,
+        single_read_upload: bool = False,
+    ) -> tuple[SummaryStatistics, SummaryStatistics, list[AssetRootManifest], Attachments]:
+        """
+        Computes the hashes for input files and uploads them to S3 in a single pass. Each file is queued
+        for upload as soon as its hash is known, so hashing and uploading overlap rather than running one
+        after the other as with `hash_assets_and_create_manifest` followed by `upload_assets`. The manifests
+        are created and uploaded once all the files have been uploaded.
+
+        Args:
+            asset_groups: the asset root groups of the input and output paths.
+            total_input_files: the total number of input files, for progress reporting.
+            total_input_bytes: the total size of input files in bytes, for progress reporting.
+            hash_cache_dir: a path to local hash cache directory. If it's None, use default path.
+            s3_check_cache_dir: a path to local S3 check cache directory. If it's None, use default path.
+            manifest_write_dir: a directory to write the input manifests to locally, if given.
+            on_preparing_to_submit: a callback to be called to periodically report hashing progress to the caller.
+            on_uploading_assets: a callback to be called to periodically report upload progress to the caller.
+            Each callback returns True if the operation should continue as normal, or False to cancel.
+            single_read_upload: if True, the files that are not in the hash cache are hashed while they
+            are uploaded, so that each of them is read from disk only once.
+
+        Returns:
+            a tuple with (1) the summary statistics of the hash operation, (2) the summary statistics
+            of the upload operation, (3) a list of AssetRootManifest (a manifest and output paths for
+            each asset root), and (4) the attachments with the S3 paths to the asset manifest files.
+        """
+        # This is a programming error if the user did not construct the object with Farm and Queue IDs.
+        if not self.farm_id or not self.queue_id:
+            logger.error("hash_and_upload_assets: Farm or Fleet ID is missing.")
+            raise JobAttachmentsError("hash_and_upload_assets: Farm or Fleet ID is missing.")
+
+        start_time = time.perf_counter()
+
+        # Sets up progress trackers to report hashing and upload progress back to the caller.
+        hashing_progress_tracker = ProgressTracker(
+            status=ProgressStatus.PREPARING_IN_PROGRESS,
+            total_files=total_input_files,
+            total_bytes=total_input_bytes,
+            on_progress_callback=on_preparing_to_submit,
+        )
+        upload_progress_tracker = ProgressTracker(
+            status=ProgressStatus.UPLOAD_IN_PROGRESS,
+            total_files=total_input_files,
+            total_bytes=total_input_bytes,
+            on_progress_callback=on_uploading_assets,
+        )
+
+        hash_alg: HashAlgorithm = ManifestModelRegistry.get_manifest_model(
+            version=self.manifest_version
+        ).AssetManifest.get_default_hash_alg()
+
+        asset_root_manifests: list[AssetRootManifest] = []
+        with self._get_cache_session(
+            hash_cache_dir, s3_check_cache_dir
+        ) as cache_session, _InputFileUploadQueue(
+            asset_uploader=self.asset_uploader,
+            s3_bucket=self.job_attachment_settings.s3BucketName,  # type: ignore[union-attr]
+            s3_cas_prefix=self.job_attachment_settings.full_cas_prefix(),  # type: ignore[union-attr]
+            s3_check_cache=cache_session.get_s3_check_cache(),
+            progress_tracker=upload_progress_tracker,
+            hash_file_options=self.hash_file_options,
+        ) as upload_queue, self._open_hashing_engines():
+            for group in asset_groups:
+                # Might have output directories, but no inputs for this group
+                asset_manifest: Optional[BaseAssetManifest] = None
+                if group.inputs:
+                    source_root = Path(group.root_path)
+
+                    def on_path_processed(
+                        path: base_manifest.BaseManifestPath, source_root: Path = source_root
+                    ) -> None:
+                        upload_queue.add(path, hash_alg, source_root)
+
+                    # Create manifest, using local hash cache
+                    asset_manifest = self._create_manifest_file(
+                        sorted(list(group.inputs)),
+                        group.root_path,
+                        cache_session.get_hash_cache(),
+                        hashing_progress_tracker,
+                        on_path_processed,
+                        upload_queue.hash_and_upload_file if single_read_upload else None,
+                    )
+
+                asset_root_manifests.append(
+                    AssetRootManifest(
+                        file_system_location_name=group.file_system_location_name,
+                        root_path=group.root_path,
+                        asset_manifest=asset_manifest,
+                        outputs=sorted(list(group.outputs)),
+                    )
+                )
+
+            hashing_progress_tracker.total_time = time.perf_counter() - start_time
+
+            upload_queue.wait()
+
+        manifest_properties_list: list[ManifestProperties] = []
+        for asset_root_manifest in asset_root_manifests:
+            manifest_properties = self._get_manifest_properties(asset_root_manifest)
 
             if asset_root_manifest.asset_manifest:
-                (partial_manifest_key, asset_manifest_hash) = self.asset_uploader.upload_assets(
+                (partial_manifest_key, asset_manifest_hash) = self.asset_uploader.upload_manifest(
                     job_attachment_settings=self.job_attachment_settings,  # type: ignore[arg-type]
                     manifest=asset_root_manifest.asset_manifest,
                     partial_manifest_prefix=self.job_attachment_settings.partial_manifest_prefix(  # type: ignore[union-attr]
@@ -1291,8 +2155,6 @@ class S3AssetManager:
                     ),
                     source_root=Path(asset_root_manifest.root_path),
                     file_system_location_name=asset_root_manifest.file_system_location_name,
-                    progress_tracker=progress_tracker,
-                    s3_check_cache_dir=s3_check_cache_dir,
                     manifest_write_dir=manifest_write_dir,
                 )
                 manifest_properties.inputManifestPath = partial_manifest_key
@@ -1300,22 +2162,11 @@ class S3AssetManager:
 
             manifest_properties_list.append(manifest_properties)
 
-            logger.debug("Asset manifests - locations in S3:")
-            logger.debug(
-                "\n".join(
-                    filter(
-                        None,
-                        (
-                            manifest_properties.inputManifestPath
-                            for manifest_properties in manifest_properties_list
-                        ),
-                    )
-                )
-            )
-
-        progress_tracker.total_time = time.perf_counter() - start_time
+        upload_progress_tracker.total_time = time.perf_counter() - start_time
 
         return (
-            progress_tracker.get_summary_statistics(),
+            hashing_progress_tracker.get_summary_statistics(),
+            upload_progress_tracker.get_summary_statistics(),
+            asset_root_manifests,
             Attachments(manifests=manifest_properties_list),
         )
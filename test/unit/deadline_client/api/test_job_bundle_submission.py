@@ -20,6 +20,7 @@ from deadline.client.api import _submit_job_bundle
 from deadline.job_attachments.exceptions import MisconfiguredInputsError
 from deadline.job_attachments.models import (
     AssetRootGroup,
+    AssetRootManifest,
     AssetUploadGroup,
     Attachments,
     FileSystemLocation,
@@ -588,6 +589,91 @@ def test_create_job_from_job_bundle_job_attachments(
         assert mock_telemetry.call_count == 3
 
 
+def test_create_job_from_job_bundle_job_attachments_pipelined(
+    fresh_deadline_config, temp_job_bundle_dir, temp_assets_dir
+):
+    """
+    Test that a job bundle with asset references is hashed and uploaded in a single
+    pipelined pass when the setting is enabled.
+    """
+    with patch.object(_submit_job_bundle.api, "get_boto3_session"), patch.object(
+        _submit_job_bundle.api, "get_boto3_client"
+    ) as client_mock, patch.object(
+        _submit_job_bundle.api, "get_queue_user_boto3_session"
+    ), patch.object(
+        _submit_job_bundle, "_hash_attachments"
+    ) as mock_hash_attachments, patch.object(
+        S3AssetManager,
+        "prepare_paths_for_upload",
+    ) as mock_prepare_paths, patch.object(
+        S3AssetManager, "upload_assets"
+    ) as mock_upload_assets, patch.object(
+        S3AssetManager, "hash_and_upload_assets"
+    ) as mock_hash_and_upload_assets, patch.object(
+        _submit_job_bundle.api, "get_deadline_cloud_library_telemetry_client"
+    ), patch.object(
+        api._telemetry, "get_deadline_endpoint_url", side_effect=["https://fake-endpoint-url"]
+    ):
+        client_mock().get_queue.side_effect = [MOCK_GET_QUEUE_RESPONSE]
+        client_mock().create_job.side_effect = [MOCK_CREATE_JOB_RESPONSE]
+        client_mock().get_job.side_effect = [MOCK_GET_JOB_RESPONSE]
+        mock_prepare_paths.return_value = AssetUploadGroup(
+            total_input_files=1, total_input_bytes=15, asset_groups=[AssetRootGroup()]
+        )
+        mock_hash_and_upload_assets.return_value = (
+            SummaryStatistics(),
+            SummaryStatistics(),
+            [AssetRootManifest()],
+            Attachments([]),
+        )
+
+        config.set_setting("defaults.farm_id", MOCK_FARM_ID)
+        config.set_setting("defaults.queue_id", MOCK_QUEUE_ID)
+        config.set_setting("settings.pipeline_hashing_and_upload", "true")
+
+        with open(os.path.join(temp_job_bundle_dir, "template.json"), "w", encoding="utf8") as f:
+            f.write(MOCK_JOB_TEMPLATE_CASES["MINIMAL_JSON"][1])
+        _write_asset_files(temp_assets_dir, {"asset-1.txt": "This is asset 1"})
+        with open(
+            os.path.join(temp_job_bundle_dir, "asset_references.json"), "w", encoding="utf8"
+        ) as f:
+            json.dump(
+                {
+                    "assetReferences": {
+                        "inputs": {"filenames": [os.path.join(temp_assets_dir, "asset-1.txt")]}
+                    }
+                },
+                f,
+            )
+
+        # This is the function we're testing
+        api.create_job_from_job_bundle(temp_job_bundle_dir, queue_parameter_definitions=[])
+
+        mock_hash_and_upload_assets.assert_called_once_with(
+            asset_groups=[AssetRootGroup()],
+            total_input_files=1,
+            total_input_bytes=15,
+            hash_cache_dir=ANY,
+            s3_check_cache_dir=ANY,
+            on_preparing_to_submit=ANY,
+            on_uploading_assets=ANY,
+            single_read_upload=False,
+        )
+        mock_hash_attachments.assert_not_called()
+        mock_upload_assets.assert_not_called()
+        client_mock().create_job.assert_called_once_with(
+            farmId=MOCK_FARM_ID,
+            queueId=MOCK_QUEUE_ID,
+            template=ANY,
+            templateType=ANY,
+            priority=50,
+            attachments={
+                "manifests": [],
+                "fileSystem": JobAttachmentsFileSystem.COPIED,
+            },
+        )
+
+
 def test_create_job_from_job_bundle_empty_job_attachments(
     fresh_deadline_config, temp_job_bundle_dir, temp_assets_dir
 ):
@@ -1123,3 +1209,33 @@ def test_wait_for_create_job_to_complete_timeout():
             deadline_client=deadline_client,
             continue_callback=mock_continue_callback,
         )
+
+
+@pytest.mark.parametrize(
+    "time_budget_ms,expected_time_budget_seconds",
+    [("0", None), ("250", 0.25)],
+)
+def test_clean_caches_in_time_budget(
+    fresh_deadline_config, time_budget_ms, expected_time_budget_seconds
+):
+    """
+    Test that the caches are only cleaned at the end of a submission when a time budget is configured,
+    and that cleaning errors don't fail the submission.
+    """
+    config.set_setting("settings.cache_maintenance_time_budget_ms", time_budget_ms)
+    config.set_setting("settings.cache_max_size_mb", "0")
+
+    with patch.object(
+        _submit_job_bundle, "clean_caches", side_effect=Exception("database is locked")
+    ) as mock_clean_caches:
+        api.clean_caches_in_time_budget()
+
+    if expected_time_budget_seconds is None:
+        mock_clean_caches.assert_not_called()
+    else:
+        mock_clean_caches.assert_called_once_with(
+            ANY,
+            max_age_days=90,
+            max_size_mb=None,
+            time_budget_seconds=expected_time_budget_seconds,
+        )
@@ -0,0 +1,59 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+
+"""
+Tests for the CLI cache commands.
+"""
+import json
+import time
+from unittest.mock import patch
+
+from click.testing import CliRunner
+
+from deadline.client import config
+from deadline.client.cli import main
+from deadline.client.cli._groups import cache_group
+from deadline.job_attachments.caches import S3CheckCache, S3CheckCacheEntry
+
+
+def test_cli_cache_stats(fresh_deadline_config, tmp_path):
+    """
+    Confirm that the stats of the caches in the cache directory are printed as JSON.
+    """
+    with S3CheckCache(str(tmp_path)) as s3c:
+        s3c.put_entry(S3CheckCacheEntry("bucket/Data/a.xxh128", str(time.time())))
+        s3c.put_entry(S3CheckCacheEntry("bucket/Data/b.xxh128", "123.456"))
+
+    runner = CliRunner()
+    with patch.object(cache_group.config_file, "get_cache_directory", return_value=str(tmp_path)):
+        result = runner.invoke(main, ["cache", "stats", "--json"])
+
+    assert result.exit_code == 0, result.output
+    (stats,) = json.loads(result.output)["caches"]
+    assert stats["cache_name"] == S3CheckCache.CACHE_NAME
+    assert stats["entry_count"] == 2
+    assert stats["expired_entry_count"] == 1
+
+
+def test_cli_cache_clean_uses_settings(fresh_deadline_config, tmp_path):
+    """
+    Confirm that cleaning defaults to the configured limits, and that the options override them.
+    """
+    config.set_setting("settings.cache_max_age_days", "30")
+    config.set_setting("settings.cache_max_size_mb", "0")
+
+    runner = CliRunner()
+    with patch.object(
+        cache_group.config_file, "get_cache_directory", return_value=str(tmp_path)
+    ), patch.object(cache_group, "clean_caches", return_value=[]) as mock_clean_caches:
+        result = runner.invoke(main, ["cache", "clean"])
+        assert result.exit_code == 0, result.output
+        mock_clean_caches.assert_called_once_with(
+            str(tmp_path), max_age_days=30, max_size_mb=None, vacuum=True
+        )
+
+        mock_clean_caches.reset_mock()
+        result = runner.invoke(main, ["cache", "clean", "--max-size-mb", "64", "--no-vacuum"])
+        assert result.exit_code == 0, result.output
+        mock_clean_caches.assert_called_once_with(
+            str(tmp_path), max_age_days=30, max_size_mb=64, vacuum=False
+        )
@@ -35,7 +35,7 @@ def test_cli_config_show_defaults(fresh_deadline_config):
     assert fresh_deadline_config in result.output
 
     # Assert the expected number of settings
-    assert len(settings.keys()) == 15
+    assert len(settings.keys()) == 29
 
     for setting_name in settings.keys():
         assert setting_name in result.output
@@ -104,6 +104,20 @@ def test_cli_config_show_modified_config(fresh_deadline_config):
     config.set_setting("telemetry.identifier", "user-id-123abc-456def")
     config.set_setting("settings.s3_max_pool_connections", "100")
     config.set_setting("settings.small_file_threshold_multiplier", "15")
+    config.set_setting("settings.s3_bulk_existence_check_threshold", "2500")
+    config.set_setting("settings.pipeline_hashing_and_upload", "true")
+    config.set_setting("settings.single_read_upload", "true")
+    config.set_setting("settings.hashing_engine", "PROCESS")
+    config.set_setting("settings.hash_file_buffer_size_kb", "4096")
+    config.set_setting("settings.hash_file_mmap_threshold_mb", "256")
+    config.set_setting("settings.cache_max_age_days", "30")
+    config.set_setting("settings.cache_max_size_mb", "512")
+    config.set_setting("settings.cache_maintenance_time_budget_ms", "500")
+    config.set_setting("settings.manifest_cache_max_size_mb", "128")
+    config.set_setting("settings.object_cache_enabled", "true")
+    config.set_setting("settings.object_cache_dir", "~/alternate/object_cache")
+    config.set_setting("settings.object_cache_max_size_mb", "2048")
+    config.set_setting("settings.object_cache_use_hardlinks", "true")
 
     runner = CliRunner()
     result = runner.invoke(main, ["config", "show"])
@@ -291,6 +291,7 @@ def test_cli_handle_web_url_download_output_only_required_input(fresh_deadline_c
             step_id=None,
             task_id=None,
             session=ANY,
+            manifest_cache_dir=ANY,
         )
         mock_download.assert_called_once_with(
             file_conflict_resolution=FileConflictResolution.CREATE_COPY,
@@ -344,6 +345,7 @@ def test_cli_handle_web_url_download_output_with_optional_input(fresh_deadline_c
             step_id=MOCK_STEP_ID,
             task_id=MOCK_TASK_ID,
             session=ANY,
+            manifest_cache_dir=ANY,
         )
         mock_download.assert_called_once_with(
             file_conflict_resolution=FileConflictResolution.CREATE_COPY,
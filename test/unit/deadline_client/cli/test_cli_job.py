@@ -411,6 +411,7 @@ def test_cli_job_download_output_stdout_with_only_required_input(
             step_id=None,
             task_id=None,
             session=ANY,
+            manifest_cache_dir=ANY,
         )
 
         path_separator = "/" if sys.platform != "win32" else "\\"
@@ -516,6 +517,7 @@ def test_cli_job_download_output_stdout_with_mismatching_path_format(
             step_id=None,
             task_id=None,
             session=ANY,
+            manifest_cache_dir=ANY,
         )
 
         path_separator = "/" if sys.platform != "win32" else "\\"
@@ -608,6 +610,7 @@ def test_cli_job_download_output_handles_unc_path_on_windows(fresh_deadline_conf
             step_id=None,
             task_id=None,
             session=ANY,
+            manifest_cache_dir=ANY,
         )
 
         path_separator = "/" if sys.platform != "win32" else "\\"
@@ -687,6 +690,7 @@ def test_cli_job_download_no_output_stdout(fresh_deadline_config, tmp_path: Path
             step_id=None,
             task_id=None,
             session=ANY,
+            manifest_cache_dir=ANY,
         )
 
         assert (
@@ -775,6 +779,7 @@ def test_cli_job_download_output_stdout_with_json_format(
             step_id=None,
             task_id=None,
             session=ANY,
+            manifest_cache_dir=ANY,
         )
 
         expected_json_title = json.dumps({"messageType": "title", "value": "Mock Job"})
@@ -943,6 +948,7 @@ def test_cli_job_download_output_handle_web_url_with_optional_input(fresh_deadli
             step_id="step-1",
             task_id="task-2",
             session=ANY,
+            manifest_cache_dir=ANY,
         )
         mock_download.assert_called_once_with(
             file_conflict_resolution=FileConflictResolution.CREATE_COPY,
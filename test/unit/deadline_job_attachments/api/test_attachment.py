@@ -168,6 +168,7 @@ class TestAttachmentDownload:
             },
             cas_prefix="assetRoot/Data",
             session=session_mock,
+            object_cache=None,
         )
 
     @pytest.mark.parametrize("manifest_case_key", MOCK_MANIFEST_CASE.keys())
@@ -196,6 +197,7 @@ class TestAttachmentDownload:
             },
             cas_prefix="assetRoot/Data",
             session=session_mock,
+            object_cache=None,
         )
 
     def test_download_multiple_to_current(
@@ -225,6 +227,7 @@ class TestAttachmentDownload:
             manifests_by_root=expected_merged,
             cas_prefix="assetRoot/Data",
             session=session_mock,
+            object_cache=None,
         )
 
     def test_download_invalid_input_manifests(self, session_mock):
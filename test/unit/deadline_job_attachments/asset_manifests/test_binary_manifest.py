@@ -0,0 +1,186 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+
+""" Tests for the asset_manifests.binary_manifest module """
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from deadline.job_attachments.asset_manifests import HashAlgorithm, binary_manifest
+from deadline.job_attachments.asset_manifests.binary_manifest import (
+    BinaryManifestPaths,
+    decode_binary_manifest,
+    encode_binary_manifest,
+    get_sidecar_path,
+    read_local_manifest,
+    write_manifest_sidecar,
+)
+from deadline.job_attachments.asset_manifests.decode import decode_manifest
+from deadline.job_attachments.asset_manifests.v2023_03_03 import AssetManifest, ManifestPath
+from deadline.job_attachments.exceptions import ManifestDecodeValidationError
+
+
+def _make_manifest() -> AssetManifest:
+    # The paths are in canonical (UTF-16) order, which is the order of the paths of a binary manifest.
+    paths = [
+        ManifestPath(path="test_dir/test_file", hash="b", size=1, mtime=1479079344833848),
+        ManifestPath(path="test_file", hash="a", size=1, mtime=167907934333848),
+        ManifestPath(path="\u20ac", hash="EuroSign", size=1, mtime=1679079344836848),
+        ManifestPath(path="\U0001f600", hash="EmojiGrinningFace", size=1, mtime=1679579344833848),
+        ManifestPath(path="\ude0a", hash="LoneSurrogate", size=2**62, mtime=-1),
+        ManifestPath(
+            path="\ufb33", hash="HebrewLetterDaletWithDagesh", size=1, mtime=1679039344833848
+        ),
+    ]
+    return AssetManifest(
+        hash_alg=HashAlgorithm.XXH128,
+        paths=paths,  # type: ignore[arg-type]
+        total_size=sum(path.size for path in paths),
+    )
+
+
+def _write_manifest_file(manifest: AssetManifest, manifest_path: Path) -> None:
+    with open(manifest_path, "w") as file:
+        manifest.encode_to(file)
+
+
+def test_binary_manifest_round_trip():
+    """
+    Test that a manifest loaded from the binary format is the same manifest, and encodes to the same
+    canonical JSON.
+    """
+    manifest = decode_binary_manifest(encode_binary_manifest(_make_manifest()))
+
+    assert isinstance(manifest.paths, BinaryManifestPaths)
+    assert manifest == _make_manifest()
+    assert manifest.encode() == _make_manifest().encode()
+    assert decode_manifest(manifest.encode()) == _make_manifest()
+
+
+def test_binary_manifest_empty():
+    manifest = AssetManifest(hash_alg=HashAlgorithm.XXH128, paths=[], total_size=0)
+
+    assert decode_binary_manifest(encode_binary_manifest(manifest)) == manifest
+
+
+def test_binary_manifest_find():
+    """
+    Test that paths are looked up by their relative path, including after sorting the paths.
+    """
+    paths = decode_binary_manifest(encode_binary_manifest(_make_manifest())).paths
+    assert isinstance(paths, BinaryManifestPaths)
+
+    paths.sort(key=lambda path: path.size, reverse=True)
+
+    assert paths[0].path == "\ude0a"
+    for path in _make_manifest().paths:
+        assert paths.find(path.path) == path
+    assert paths.find("missing") is None
+    assert paths.find("test_dir") is None
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        pytest.param(b"", id="empty"),
+        pytest.param(b"not a binary manifest, but long enough for a header", id="bad_magic"),
+        pytest.param(encode_binary_manifest(_make_manifest())[:-1], id="truncated_buffers"),
+        pytest.param(encode_binary_manifest(_make_manifest())[:100], id="truncated_columns"),
+    ],
+)
+def test_decode_binary_manifest_not_valid(data: bytes):
+    with pytest.raises(ManifestDecodeValidationError):
+        decode_binary_manifest(data)
+
+
+def _make_manifest_with_hash(file_hash: str) -> AssetManifest:
+    manifest = _make_manifest()
+    manifest.paths[1] = ManifestPath(path="test_file", hash=file_hash, size=1, mtime=1)
+    return manifest
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        pytest.param(
+            encode_binary_manifest(_make_manifest_with_hash("../../a")), id="path_traversal"
+        ),
+        pytest.param(encode_binary_manifest(_make_manifest_with_hash("")), id="empty_hash"),
+        pytest.param(
+            encode_binary_manifest(_make_manifest()).replace(b"EuroSign", b"Euro\xe2\x82\xacn"),
+            id="non_ascii",
+        ),
+    ],
+)
+def test_decode_binary_manifest_hashes_not_valid(data: bytes):
+    """
+    Test that a binary manifest is rejected when it's loaded if any of its hashes isn't alphanumeric,
+    as for JSON manifests.
+    """
+    with pytest.raises(ManifestDecodeValidationError, match="alphanumeric"):
+        decode_binary_manifest(data)
+
+
+def test_read_local_manifest_from_sidecar(tmp_path: Path):
+    """
+    Test that a local manifest with a sidecar is loaded from the sidecar, without parsing its JSON.
+    """
+    manifest_path = tmp_path / "test.manifest"
+    _write_manifest_file(_make_manifest(), manifest_path)
+    write_manifest_sidecar(_make_manifest(), manifest_path)
+
+    with patch.object(binary_manifest, "decode_manifest") as mock_decode_manifest:
+        manifest = read_local_manifest(manifest_path)
+
+    mock_decode_manifest.assert_not_called()
+    assert isinstance(manifest.paths, BinaryManifestPaths)
+    assert manifest == _make_manifest()
+
+
+def test_read_local_manifest_with_outdated_sidecar(tmp_path: Path):
+    """
+    Test that the sidecar of a local manifest that changed since the sidecar was written is ignored.
+    """
+    manifest_path = tmp_path / "test.manifest"
+    _write_manifest_file(_make_manifest(), manifest_path)
+    write_manifest_sidecar(_make_manifest(), manifest_path)
+    changed_manifest = _make_manifest()
+    changed_manifest.paths.pop()
+    _write_manifest_file(changed_manifest, manifest_path)
+    stat = os.stat(manifest_path)
+    os.utime(manifest_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    manifest = read_local_manifest(manifest_path)
+
+    assert not isinstance(manifest.paths, BinaryManifestPaths)
+    assert manifest == changed_manifest
+
+
+def test_read_local_manifest_with_sidecar_hashes_not_valid(tmp_path: Path):
+    """
+    Test that the sidecar of a local manifest is ignored if its hashes aren't all alphanumeric, and
+    that the manifest is loaded from its JSON instead.
+    """
+    manifest_path = tmp_path / "test.manifest"
+    _write_manifest_file(_make_manifest(), manifest_path)
+    get_sidecar_path(manifest_path).write_bytes(
+        encode_binary_manifest(_make_manifest(), os.stat(manifest_path)).replace(
+            b"EuroSign", b"../../..", 1
+        )
+    )
+
+    manifest = read_local_manifest(manifest_path)
+
+    assert not isinstance(manifest.paths, BinaryManifestPaths)
+    assert manifest == _make_manifest()
+
+
+def test_read_local_manifest_without_sidecar(tmp_path: Path):
+    manifest_path = tmp_path / "test.manifest"
+    _write_manifest_file(_make_manifest(), manifest_path)
+
+    assert not get_sidecar_path(manifest_path).exists()
+    assert read_local_manifest(manifest_path) == _make_manifest()
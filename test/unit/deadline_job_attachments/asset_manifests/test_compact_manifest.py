@@ -0,0 +1,109 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+
+""" Tests for the asset_manifests.compact_manifest module """
+from __future__ import annotations
+
+import pytest
+
+# Imported through the manifest API, since importing the _diff module first is a circular import.
+from deadline.job_attachments.api.manifest import compare_manifest
+from deadline.job_attachments.asset_manifests import HashAlgorithm
+from deadline.job_attachments.asset_manifests.compact_manifest import (
+    CompactManifestPaths,
+    compact_manifest,
+    iter_path_strings,
+)
+from deadline.job_attachments.asset_manifests.v2023_03_03 import AssetManifest, ManifestPath
+
+
+def _make_paths() -> list[ManifestPath]:
+    return [
+        ManifestPath(path="dir/file", hash="0123456789abcdef0123456789abcdef", size=1, mtime=2),
+        ManifestPath(path="dir/other", hash="fedcba9876543210fedcba9876543210", size=3, mtime=4),
+        ManifestPath(path="top", hash="NotHex", size=0, mtime=-1),
+        ManifestPath(
+            path="dir/sub/€\ude0a", hash="0123456789ABCDEF0123456789ABCDEF", size=5, mtime=2**62
+        ),
+        ManifestPath(path="/leading", hash="00", size=6, mtime=7),
+        ManifestPath(path="trailing/", hash="0" * 32, size=8, mtime=9),
+    ]
+
+
+def _make_manifest(paths: list[ManifestPath]) -> AssetManifest:
+    return AssetManifest(
+        hash_alg=HashAlgorithm.XXH128, paths=paths, total_size=sum(path.size for path in paths)  # type: ignore[arg-type]
+    )
+
+
+class TestCompactManifestPaths:
+    """
+    Tests for the compact, columnar manifest paths.
+    """
+
+    def test_paths_round_trip(self):
+        paths = _make_paths()
+
+        compact_paths = CompactManifestPaths(ManifestPath, HashAlgorithm.XXH128, paths)
+
+        assert len(compact_paths) == len(paths)
+        assert list(compact_paths) == paths
+        assert compact_paths == paths
+        assert paths == compact_paths
+        assert compact_paths[-1] == paths[-1]
+        assert compact_paths[1:3] == paths[1:3]
+        assert list(iter_path_strings(compact_paths)) == [path.path for path in paths]
+        assert compact_paths.get_total_size() == sum(path.size for path in paths)
+        with pytest.raises(IndexError):
+            compact_paths[len(paths)]
+
+    def test_append_and_extend(self):
+        paths = _make_paths()
+        compact_paths = CompactManifestPaths(ManifestPath, HashAlgorithm.XXH128, paths[:2])
+
+        compact_paths.append(paths[2])
+        compact_paths.extend(CompactManifestPaths(ManifestPath, HashAlgorithm.XXH128, paths[3:]))
+
+        assert compact_paths == paths
+
+    def test_append_value_out_of_range(self):
+        compact_paths = CompactManifestPaths(ManifestPath, HashAlgorithm.XXH128, _make_paths())
+
+        with pytest.raises(OverflowError):
+            compact_paths.append(ManifestPath(path="big", hash="a", size=1, mtime=2**64))
+
+        assert compact_paths == _make_paths()
+
+    def test_sort(self):
+        paths = _make_paths()
+        compact_paths = CompactManifestPaths(ManifestPath, HashAlgorithm.XXH128, paths)
+
+        compact_paths.sort(key=lambda path: path.size, reverse=True)
+        paths.sort(key=lambda path: path.size, reverse=True)
+
+        assert compact_paths == paths
+
+    def test_encode(self):
+        """
+        Test that a manifest with compact paths encodes to the same string as with a list of paths.
+        """
+        manifest = compact_manifest(_make_manifest(_make_paths()))
+
+        assert isinstance(manifest.paths, CompactManifestPaths)
+        assert manifest.encode() == _make_manifest(_make_paths()).encode()
+
+    def test_compare_manifest(self):
+        """
+        Test that compact manifests are compared as manifests with lists of paths are.
+        """
+        reference_paths = _make_paths()
+        compare_paths = _make_paths()[1:]
+        compare_paths[0] = ManifestPath(path="dir/other", hash="ab" * 16, size=3, mtime=4)
+        compare_paths.append(ManifestPath(path="new", hash="cd" * 16, size=1, mtime=1))
+
+        expected = compare_manifest(_make_manifest(reference_paths), _make_manifest(compare_paths))
+        actual = compare_manifest(
+            compact_manifest(_make_manifest(reference_paths)),
+            compact_manifest(_make_manifest(compare_paths)),
+        )
+
+        assert actual == expected
@@ -77,7 +77,8 @@ def test_validate_manifest_not_valid_schema(manifest_params: list[ManifestParam]
             },
         }
 
-        with patch(
+        # The validators are cached, so the cached validators are hidden while the schema is patched.
+        with patch.dict(decode._validators, clear=True), patch(
             f"{deadline.__package__}.job_attachments.asset_manifests.decode._get_schema",
             return_value=bad_schema,
         ):
@@ -203,3 +204,108 @@ def test_decode_manifest_hash_not_alphanumeric():
                 "}"
             )
             decode.decode_manifest(manifest_str)
+
+
+def test_validate_manifest_loads_schema_once(manifest_params: list[ManifestParam]):
+    """
+    Test that the schema of a manifest version is only loaded the first time a manifest of that
+    version is validated.
+    """
+    with patch.dict(decode._validators, clear=True), patch(
+        f"{deadline.__package__}.job_attachments.asset_manifests.decode._get_schema",
+        wraps=decode._get_schema,
+    ) as mock_get_schema:
+        for manifest_param in manifest_params * 3:
+            manifest: dict[str, Any] = json.loads(manifest_param.manifest_str)
+            assert decode.validate_manifest(manifest, manifest_param.manifest_version) == (
+                True,
+                None,
+            )
+
+    assert mock_get_schema.call_count == len(manifest_params)
+
+
+def test_decode_manifest_trusted(default_manifest_str_v2023_03_03: str):
+    """
+    Test that a trusted manifest decodes to the same AssetManifest object, without being validated
+    against its schema.
+    """
+    with patch(
+        f"{deadline.__package__}.job_attachments.asset_manifests.decode.validate_manifest"
+    ) as mock_validate_manifest:
+        manifest = decode.decode_manifest(default_manifest_str_v2023_03_03, trusted=True)
+
+    mock_validate_manifest.assert_not_called()
+    assert manifest == decode.decode_manifest(default_manifest_str_v2023_03_03)
+
+
+@pytest.mark.parametrize(
+    ("manifest_str", "error_match"),
+    [
+        pytest.param(
+            '{"manifestVersion":"2023-03-03","paths":[],"totalSize":0}',
+            'missing the required "hashAlg" field',
+            id="missing_hash_alg",
+        ),
+        pytest.param(
+            '{"hashAlg":"md5","manifestVersion":"2023-03-03","totalSize":1,'
+            '"paths":[{"hash":"a","mtime":1,"path":"file","size":1}]}',
+            "unknown hashAlg: md5",
+            id="unknown_hash_alg",
+        ),
+        pytest.param(
+            '{"hashAlg":"xxh128","manifestVersion":"2023-03-03","paths":[],"totalSize":true}',
+            'missing the required "totalSize" field',
+            id="bool_total_size",
+        ),
+        pytest.param(
+            '{"hashAlg":"xxh128","manifestVersion":"2023-03-03","totalSize":0}',
+            'missing the required "paths" field',
+            id="missing_paths",
+        ),
+        pytest.param(
+            '{"hashAlg":"xxh128","manifestVersion":"2023-03-03","totalSize":1,'
+            '"paths":[{"hash":"a","mtime":1,"path":"file","size":"1"}]}',
+            "path entry is not valid",
+            id="string_size",
+        ),
+        pytest.param(
+            '{"hashAlg":"xxh128","manifestVersion":"2023-03-03","totalSize":1,'
+            '"paths":[{"hash":"a","path":"file","size":1}]}',
+            "path entry is not valid",
+            id="missing_mtime",
+        ),
+        pytest.param(
+            '{"hashAlg":"xxh128","manifestVersion":"2023-03-03","totalSize":1,'
+            '"paths":[{"hash":"a","mtime":1,"path":"file","size":-1}]}',
+            "path entry is not valid",
+            id="negative_size",
+        ),
+        pytest.param(
+            '{"hashAlg":"xxh128","manifestVersion":"2023-03-03","totalSize":1,'
+            '"paths":[{"hash":"a","mtime":-1,"path":"file","size":1}]}',
+            "path entry is not valid",
+            id="negative_mtime",
+        ),
+        pytest.param(
+            '{"hashAlg":"xxh128","manifestVersion":"2023-03-03","totalSize":1,'
+            '"paths":[{"hash":"","mtime":1,"path":"file","size":1}]}',
+            "The hash  for path file is not alphanumeric",
+            id="empty_hash",
+        ),
+        pytest.param(
+            '{"hashAlg":"xxh128","manifestVersion":"2023-03-03","totalSize":1,'
+            '"paths":[{"hash":"a","mtime":1,"path":"a","size":1},'
+            '{"hash":"\u00e9","mtime":1,"path":"b","size":1}]}',
+            "The hash \u00e9 for path b is not alphanumeric",
+            id="non_ascii_hash",
+        ),
+    ],
+)
+def test_decode_manifest_trusted_not_valid(manifest_str: str, error_match: str):
+    """
+    Test that a ManifestDecodeValidationError is raised if a trusted manifest doesn't have the
+    fields that decoding it relies on, or has hashes that aren't alphanumeric.
+    """
+    with pytest.raises(ManifestDecodeValidationError, match=error_match):
+        decode.decode_manifest(manifest_str, trusted=True)
@@ -0,0 +1,195 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+
+""" Tests for the asset_manifests.hash_algorithms module """
+from __future__ import annotations
+
+import mmap
+import os
+import sys
+import time
+from io import FileIO
+from typing import Any, Callable, Optional
+from unittest.mock import patch
+
+import pytest
+
+import deadline
+from deadline.job_attachments.asset_manifests import HashAlgorithm, hash_data, hash_file
+from deadline.job_attachments.asset_manifests.hash_algorithms import (
+    DEFAULT_HASH_FILE_BUFFER_SIZE,
+    DEFAULT_HASH_FILE_MMAP_THRESHOLD,
+    HashFileOptions,
+    _get_hasher,
+    _get_linux_file_system_type,
+    _hash_file_buffered,
+    _hash_file_mmap,
+    _hash_file_single_read,
+    _is_on_local_file_system,
+)
+
+
+@pytest.mark.parametrize(
+    "file_size, buffer_size, mmap_threshold",
+    [
+        pytest.param(0, 16, 0, id="empty"),
+        pytest.param(10, 16, 0, id="single-read"),
+        pytest.param(100, 16, 0, id="buffered"),
+        pytest.param(100, 10, 0, id="buffered-multiple-of-buffer-size"),
+        pytest.param(100, 16, 64, id="mmap"),
+    ],
+)
+def test_hash_file(tmpdir, file_size: int, buffer_size: int, mmap_threshold: int):
+    """Test that every strategy of hash_file gives the same hash as hashing the whole data."""
+    # GIVEN
+    data = os.urandom(file_size)
+    file = tmpdir.join("file.bin")
+    file.write_binary(data)
+    options = HashFileOptions(buffer_size=buffer_size, mmap_threshold=mmap_threshold)
+
+    # WHEN
+    file_hash = hash_file(str(file), HashAlgorithm.XXH128, options)
+
+    # THEN
+    assert file_hash == hash_data(data, HashAlgorithm.XXH128)
+
+
+def test_hash_file_falls_back_when_mmap_fails(tmpdir):
+    """Test that files are read into a buffer if they can't be memory mapped."""
+    # GIVEN
+    data = os.urandom(100)
+    file = tmpdir.join("file.bin")
+    file.write_binary(data)
+    options = HashFileOptions(buffer_size=16, mmap_threshold=64)
+
+    # WHEN
+    with patch(
+        f"{deadline.__package__}.job_attachments.asset_manifests.hash_algorithms.mmap.mmap",
+        side_effect=OSError("mmap not supported"),
+    ):
+        file_hash = hash_file(str(file), HashAlgorithm.XXH128, options)
+
+    # THEN
+    assert file_hash == hash_data(data, HashAlgorithm.XXH128)
+
+
+@pytest.mark.parametrize("is_local", [True, False])
+def test_hash_file_mmaps_only_local_files(tmpdir, is_local: bool):
+    """Test that only files on local file systems are memory mapped."""
+    # GIVEN
+    data = os.urandom(100)
+    file = tmpdir.join("file.bin")
+    file.write_binary(data)
+    options = HashFileOptions(buffer_size=16, mmap_threshold=64)
+
+    # WHEN
+    with patch(
+        f"{deadline.__package__}.job_attachments.asset_manifests.hash_algorithms._is_on_local_file_system",
+        return_value=is_local,
+    ), patch(
+        f"{deadline.__package__}.job_attachments.asset_manifests.hash_algorithms.mmap.mmap",
+        wraps=mmap.mmap,
+    ) as mock_mmap:
+        file_hash = hash_file(str(file), HashAlgorithm.XXH128, options)
+
+    # THEN
+    assert file_hash == hash_data(data, HashAlgorithm.XXH128)
+    assert mock_mmap.called == is_local
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Linux only")
+@pytest.mark.parametrize(
+    "major, minor, expected_type",
+    [
+        pytest.param(254, 0, "ext4", id="local"),
+        pytest.param(0, 50, "nfs4", id="network"),
+        pytest.param(8, 1, None, id="not mounted"),
+    ],
+)
+def test_get_linux_file_system_type(tmpdir, major: int, minor: int, expected_type: Optional[str]):
+    """Test that the file system type of a device is read from the mount information."""
+    # GIVEN
+    mountinfo = tmpdir.join("mountinfo")
+    mountinfo.write(
+        "28 1 254:0 / / rw,relatime - ext4 /dev/vda rw\n"
+        "45 28 0:50 / /mnt/share rw,relatime shared:1 - nfs4 server:/share rw,vers=4.1\n"
+    )
+
+    # WHEN
+    with patch(
+        f"{deadline.__package__}.job_attachments.asset_manifests.hash_algorithms._LINUX_MOUNTINFO_PATH",
+        str(mountinfo),
+    ):
+        file_system_type = _get_linux_file_system_type(os.makedev(major, minor))
+
+    # THEN
+    assert file_system_type == expected_type
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Linux only")
+def test_is_on_local_file_system_network_share(tmpdir):
+    """Test that files on network file systems are not considered local on Linux."""
+    with patch(
+        f"{deadline.__package__}.job_attachments.asset_manifests.hash_algorithms._get_linux_file_system_type",
+        return_value="nfs4",
+    ):
+        assert not _is_on_local_file_system(str(tmpdir), os.stat(tmpdir).st_dev)
+    with patch(
+        f"{deadline.__package__}.job_attachments.asset_manifests.hash_algorithms._get_linux_file_system_type",
+        return_value="ext4",
+    ):
+        assert _is_on_local_file_system(str(tmpdir), os.stat(tmpdir).st_dev)
+
+
+def test_hash_file_options_defaults():
+    """Test that the options that aren't given have their defaults."""
+    assert HashFileOptions(buffer_size=4096) == HashFileOptions(
+        4096, DEFAULT_HASH_FILE_MMAP_THRESHOLD
+    )
+    assert HashFileOptions() == HashFileOptions(
+        DEFAULT_HASH_FILE_BUFFER_SIZE, DEFAULT_HASH_FILE_MMAP_THRESHOLD
+    )
+
+
+@pytest.mark.parametrize(
+    "buffer_size, mmap_threshold",
+    [(0, 0), (-1, 0), (1024, -1)],
+)
+def test_hash_file_options_nonvalid(buffer_size: int, mmap_threshold: int):
+    with pytest.raises(ValueError):
+        HashFileOptions(buffer_size=buffer_size, mmap_threshold=mmap_threshold)
+
+
+@pytest.mark.skipif(
+    not os.environ.get("DEADLINE_RUN_BENCHMARKS"),
+    reason="Set DEADLINE_RUN_BENCHMARKS to run the micro-benchmarks.",
+)
+def test_hash_file_strategies_benchmark(tmpdir):
+    """
+    A micro-benchmark printing the throughput of each strategy of hash_file across file sizes. Each
+    strategy is called directly, so that it runs regardless of the size of the file.
+    Run it with `DEADLINE_RUN_BENCHMARKS=1 pytest -k benchmark -s --no-cov -n 0`.
+    """
+    strategies: dict[str, Callable[[FileIO, Any, int], None]] = {
+        "single read": lambda file, hasher, file_size: _hash_file_single_read(
+            file, hasher, file_size, DEFAULT_HASH_FILE_BUFFER_SIZE
+        ),
+        "8 KiB reads": lambda file, hasher, _: _hash_file_buffered(file, hasher, 8 * 1024),
+        "1 MiB buffer": lambda file, hasher, _: _hash_file_buffered(file, hasher, 1024 * 1024),
+        "mmap": lambda file, hasher, _: _hash_file_mmap(file, hasher),
+    }
+    print()
+    for file_size in (4 * 1024, 256 * 1024, 16 * 1024**2, 256 * 1024**2):
+        file_path = tmpdir.join(f"file{file_size}.bin")
+        file_path.write_binary(os.urandom(file_size))
+        # Hash a similar amount of data for each file size.
+        num_iterations = max(1, 512 * 1024**2 // file_size)
+        for name, strategy in strategies.items():
+            start_time = time.perf_counter()
+            for _ in range(num_iterations):
+                with open(file_path, "rb", buffering=0) as file:
+                    hasher = _get_hasher(HashAlgorithm.XXH128)
+                    strategy(file, hasher, file_size)
+                    hasher.hexdigest()
+            elapsed = time.perf_counter() - start_time
+            throughput = file_size * num_iterations / elapsed / 1024**2
+            print(f"{file_size:>12} bytes, {name:>12}: {throughput:10.1f} MiB/s")
@@ -0,0 +1,159 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+
+""" Tests for the asset_manifests.hashing_engines module """
+from __future__ import annotations
+
+import concurrent.futures
+from typing import Optional
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import deadline
+from deadline.job_attachments.asset_manifests import HashAlgorithm, hash_file
+from deadline.job_attachments.asset_manifests.hashing_engines import (
+    HASHING_ENGINE_AUTO_MAX_MEDIAN_FILE_SIZE,
+    HASHING_ENGINE_AUTO_MIN_FILES,
+    HashingEngine,
+    HashingEngineType,
+    ProcessHashingEngine,
+    ThreadHashingEngine,
+    _is_main_module_safe_to_spawn,
+    get_hashing_engine,
+    select_hashing_engine_type,
+)
+
+
+@pytest.fixture
+def files(tmpdir) -> list[tuple[str, int]]:
+    files = []
+    for i in range(10):
+        file = tmpdir.join(f"file{i}.txt")
+        file.write("x" * i)
+        files.append((str(file), i))
+    return files
+
+
+@pytest.mark.parametrize(
+    "engine",
+    [
+        ThreadHashingEngine(max_workers=2),
+        ProcessHashingEngine(max_workers=2, batch_max_files=3),
+    ],
+)
+def test_hash_files(engine, files: list[tuple[str, int]]):
+    """Test that every engine yields the same hashes as hash_file, including when it's reused."""
+    # WHEN
+    with engine:
+        hashes = dict(engine.hash_files(files[:5], HashAlgorithm.XXH128))
+        hashes.update(engine.hash_files(files[5:], HashAlgorithm.XXH128))
+
+    # THEN
+    assert hashes == {
+        file_path: hash_file(file_path, HashAlgorithm.XXH128) for file_path, _ in files
+    }
+
+
+def test_process_hashing_engine_reuses_pool(files: list[tuple[str, int]]):
+    """Test that the process pool is started once for all the calls to hash_files, until shut down."""
+    engine = ProcessHashingEngine(max_workers=1)
+    with patch(
+        f"{deadline.__package__}.job_attachments.asset_manifests.hashing_engines.concurrent.futures.ProcessPoolExecutor",
+        wraps=concurrent.futures.ProcessPoolExecutor,
+    ) as mock_executor:
+        with engine:
+            list(engine.hash_files(files[:5], HashAlgorithm.XXH128))
+            list(engine.hash_files(files[5:], HashAlgorithm.XXH128))
+        assert engine._executor is None
+
+    mock_executor.assert_called_once()
+
+
+def test_get_hashing_engine_reuses_engines():
+    """Test that the engines given to get_hashing_engine are reused, and new engines added to them."""
+    engines: dict[HashingEngineType, HashingEngine] = {}
+
+    engine = get_hashing_engine(HashingEngineType.THREAD, engines=engines)
+
+    assert engines == {HashingEngineType.THREAD: engine}
+    assert get_hashing_engine(HashingEngineType.THREAD, engines=engines) is engine
+
+
+def test_process_hashing_engine_batches():
+    """Test that files are batched up to the maximum number of files and bytes per batch."""
+    engine = ProcessHashingEngine(batch_max_files=3, batch_max_bytes=100)
+    files = [("a", 10), ("b", 10), ("c", 10), ("d", 10), ("e", 90), ("f", 200), ("g", 1)]
+
+    assert engine._get_batches(files) == [["a", "b", "c"], ["d", "e"], ["f"], ["g"]]
+
+
+@pytest.mark.parametrize(
+    "file_sizes, can_use_process_pool, expected_engine_type",
+    [
+        ([1] * HASHING_ENGINE_AUTO_MIN_FILES, True, HashingEngineType.PROCESS),
+        ([1] * HASHING_ENGINE_AUTO_MIN_FILES, False, HashingEngineType.THREAD),
+        ([1] * (HASHING_ENGINE_AUTO_MIN_FILES - 1), True, HashingEngineType.THREAD),
+        (
+            [HASHING_ENGINE_AUTO_MAX_MEDIAN_FILE_SIZE + 1] * HASHING_ENGINE_AUTO_MIN_FILES,
+            True,
+            HashingEngineType.THREAD,
+        ),
+    ],
+)
+def test_select_hashing_engine_type(
+    file_sizes: list[int], can_use_process_pool: bool, expected_engine_type: HashingEngineType
+):
+    """Test that the process pool is only selected for many small files, when it can be used."""
+    with patch(
+        f"{deadline.__package__}.job_attachments.asset_manifests.hashing_engines._can_use_process_pool",
+        return_value=can_use_process_pool,
+    ), patch(
+        f"{deadline.__package__}.job_attachments.asset_manifests.hashing_engines._is_main_module_safe_to_spawn",
+        return_value=True,
+    ):
+        assert select_hashing_engine_type(file_sizes) == expected_engine_type
+
+
+@pytest.mark.parametrize(
+    "main_file, main_spec_name, expected_result",
+    [
+        (None, None, True),
+        ("/usr/bin/deadline", None, True),
+        ("/opt/python/bin/deadline-script.py", None, True),
+        ("/opt/python/Scripts/deadline.exe/__main__.py", None, True),
+        ("/site-packages/deadline/__main__.py", "deadline.__main__", True),
+        ("/home/user/submit.py", None, False),
+        ("/site-packages/pytest/__main__.py", "pytest.__main__", False),
+    ],
+)
+def test_is_main_module_safe_to_spawn(
+    main_file: Optional[str], main_spec_name: Optional[str], expected_result: bool
+):
+    """Test that the AUTO engine only spawns worker processes from the deadline entry points."""
+    main_module = MagicMock(spec=["__file__", "__spec__"])
+    main_module.__file__ = main_file
+    main_module.__spec__ = MagicMock() if main_spec_name else None
+    if main_spec_name:
+        main_module.__spec__.name = main_spec_name
+
+    with patch.dict("sys.modules", {"__main__": main_module}):
+        assert _is_main_module_safe_to_spawn() == expected_result
+
+
+def test_get_hashing_engine_process_falls_back_to_threads():
+    """Test that threads are used when worker processes can't be spawned from this interpreter."""
+    with patch(
+        f"{deadline.__package__}.job_attachments.asset_manifests.hashing_engines._can_use_process_pool",
+        return_value=False,
+    ):
+        assert isinstance(get_hashing_engine(HashingEngineType.PROCESS), ThreadHashingEngine)
+
+
+def test_hashing_engine_type_is_case_insensitive():
+    assert HashingEngineType("process") == HashingEngineType.PROCESS
+
+
+@pytest.mark.parametrize("value", ["md5", 1, None])
+def test_hashing_engine_type_not_valid(value):
+    with pytest.raises(ValueError):
+        HashingEngineType(value)
@@ -1,8 +1,19 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 
 """ Tests for the v2023-03-03 version of the manifest file. """
+import dataclasses
+import io
 import json
+import random
+from typing import List
 
+import pytest
+
+from deadline.job_attachments.asset_manifests._canonical_json import (
+    canonical_path_comparator,
+    sort_paths_canonically,
+)
+from deadline.job_attachments.asset_manifests.base_manifest import BaseManifestPath
 from deadline.job_attachments.asset_manifests.v2023_03_03.asset_manifest import (
     AssetManifest,
     ManifestPath,
@@ -88,3 +99,71 @@ def test_decode(default_manifest_str_v2023_03_03: str):
     assert (
         AssetManifest.decode(manifest_data=json.loads(default_manifest_str_v2023_03_03)) == expected
     )
+
+
+def _encode_with_asdict(manifest: AssetManifest) -> str:
+    """The encoder that the streaming encoder replaced, which builds a dictionary of the manifest."""
+    manifest.paths.sort(key=canonical_path_comparator)
+    return json.dumps(
+        dataclasses.asdict(manifest), sort_keys=True, separators=(",", ":"), ensure_ascii=True
+    )
+
+
+def _make_random_manifest(seed: int, alphabet: str) -> AssetManifest:
+    rng = random.Random(seed)
+    paths: List[BaseManifestPath] = [
+        ManifestPath(
+            path="".join(rng.choice(alphabet) for _ in range(rng.randint(1, 12))),
+            hash=f"{rng.getrandbits(128):032x}",
+            size=rng.randint(0, 2**40),
+            mtime=rng.randint(0, 2**60),
+        )
+        for _ in range(500)
+    ]
+    return AssetManifest(
+        hash_alg=HashAlgorithm.XXH128,
+        paths=paths,
+        total_size=sum(path.size for path in paths),
+    )
+
+
+@pytest.mark.parametrize(
+    "alphabet",
+    [
+        pytest.param("abc/_.", id="ascii"),
+        pytest.param('ab/"\\\n\t\x00\x7f\u0080é€\ufb33', id="bmp"),
+        pytest.param("ab/\ud800\udfff\ue000\uffff😀\U0010ffff", id="surrogates_and_non_bmp"),
+    ],
+)
+def test_encode_matches_asdict_encoder(alphabet: str):
+    """
+    Ensure the streaming encoder writes the same string as encoding a dictionary of the manifest,
+    and sorts the paths in the same order.
+    """
+    for seed in range(5):
+        manifest = _make_random_manifest(seed, alphabet)
+        expected = _encode_with_asdict(_make_random_manifest(seed, alphabet))
+
+        assert manifest.encode() == expected
+        stream = io.StringIO()
+        _make_random_manifest(seed, alphabet).encode_to(stream)
+        assert stream.getvalue() == expected
+
+
+def test_sort_paths_canonically():
+    """
+    Ensure that paths are sorted by their UTF-16 encoding, whether or not they have characters
+    that sort differently as code points.
+    """
+    bmp_paths: List[BaseManifestPath] = [
+        ManifestPath(path=path, hash="a", size=1, mtime=1) for path in ["b", "é", "a", ""]
+    ]
+    sort_paths_canonically(bmp_paths)
+    assert [path.path for path in bmp_paths] == ["", "a", "b", "é"]
+
+    # U+FB33 sorts before U+1F600 as code points, but after its surrogate pair in UTF-16.
+    non_bmp_paths: List[BaseManifestPath] = [
+        ManifestPath(path=path, hash="a", size=1, mtime=1) for path in ["\U0001f600", "\ufb33", "a"]
+    ]
+    sort_paths_canonically(non_bmp_paths)
+    assert [path.path for path in non_bmp_paths] == ["a", "\U0001f600", "\ufb33"]
@@ -0,0 +1,175 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+
+from deadline.job_attachments.asset_manifests import HashAlgorithm
+from deadline.job_attachments.caches import (
+    HashCache,
+    HashCacheEntry,
+    S3CheckCache,
+    S3CheckCacheEntry,
+    clean_caches,
+    get_cache_stats,
+)
+
+
+def _put_hash_entries(cache_dir, count: int, last_access_time: int, start: int = 0) -> None:
+    with HashCache(cache_dir) as hc:
+        hc.db_connection.executemany(
+            hc._insert_query(),
+            [
+                {
+                    **HashCacheEntry(
+                        f"/root/{i}.txt", HashAlgorithm.XXH128, f"hash{i}", 1, 1234, i, 1
+                    ).to_dict(),
+                    "file_path": f"/root/{i}.txt".encode(),
+                    "last_access_time": last_access_time + i,
+                }
+                for i in range(start, start + count)
+            ],
+        )
+        hc.db_connection.commit()
+
+
+class TestCacheMaintenance:
+    """
+    Tests for the reporting and cleaning of the local caches
+    """
+
+    @pytest.fixture
+    def cache_dir(self, tmpdir):
+        return str(tmpdir.mkdir("cache"))
+
+    def test_get_cache_stats(self, cache_dir):
+        """
+        Tests that the statistics of the existing caches are reported, with the S3 check entries that
+        are expired or have a nonvalid time counted as expired.
+        """
+        # GIVEN
+        now = time.time()
+        _put_hash_entries(cache_dir, 3, int(now) - 100)
+        with S3CheckCache(cache_dir) as s3c:
+            s3c.put_entry(S3CheckCacheEntry("bucket/Data/a.xxh128", str(now)))
+            s3c.put_entry(S3CheckCacheEntry("bucket/Data/b.xxh128", "123.456"))
+            s3c.put_entry(S3CheckCacheEntry("bucket/Data/c.xxh128", "not a time"))
+
+        # WHEN
+        stats = {cache_stats.cache_name: cache_stats for cache_stats in get_cache_stats(cache_dir)}
+
+        # THEN
+        assert stats[HashCache.CACHE_NAME].entry_count == 3
+        assert stats[HashCache.CACHE_NAME].expired_entry_count == 0
+        assert stats[HashCache.CACHE_NAME].oldest_access_time == int(now) - 100
+        assert stats[HashCache.CACHE_NAME].file_size > 0
+        assert stats[S3CheckCache.CACHE_NAME].entry_count == 3
+        assert stats[S3CheckCache.CACHE_NAME].expired_entry_count == 2
+
+    def test_get_cache_stats_skips_missing_caches(self, tmpdir):
+        """
+        Tests that caches that don't exist are not reported, nor created.
+        """
+        assert get_cache_stats(str(tmpdir.join("cache"))) == []
+        assert not tmpdir.join("cache").exists()
+
+    def test_clean_caches_evicts_expired_and_old_entries(self, cache_dir):
+        """
+        Tests that cleaning deletes the expired S3 check entries and the hash entries that were not used
+        in the maximum age.
+        """
+        # GIVEN
+        now = time.time()
+        _put_hash_entries(cache_dir, 5, int(now - timedelta(days=10).total_seconds()))
+        _put_hash_entries(cache_dir, 5, int(now), start=5)
+        valid_entry = S3CheckCacheEntry("bucket/Data/a.xxh128", str(now))
+        with S3CheckCache(cache_dir) as s3c:
+            s3c.put_entry(valid_entry)
+            s3c.put_entry(S3CheckCacheEntry("bucket/Data/b.xxh128", "123.456"))
+            s3c.put_entry(S3CheckCacheEntry("bucket/Data/c.xxh128", "not a time"))
+
+        # WHEN
+        results = {result.cache_name: result for result in clean_caches(cache_dir, max_age_days=5)}
+
+        # THEN
+        assert results[HashCache.CACHE_NAME].evicted_entry_count == 5
+        assert results[S3CheckCache.CACHE_NAME].evicted_entry_count == 2
+        assert not results[HashCache.CACHE_NAME].timed_out
+        with HashCache(cache_dir) as hc:
+            assert hc.get_entry("/root/4.txt", HashAlgorithm.XXH128) is None
+            assert hc.get_entry("/root/5.txt", HashAlgorithm.XXH128) is not None
+        with S3CheckCache(cache_dir) as s3c:
+            assert s3c.get_entry(valid_entry.s3_key) == valid_entry
+            assert s3c.db_connection.execute("SELECT COUNT(*) FROM s3checkV1").fetchone()[0] == 1
+
+    def test_clean_caches_evicts_least_recently_used_entries_to_fit_size(self, cache_dir):
+        """
+        Tests that cleaning evicts the least recently used entries until the cache fits in the maximum
+        size, and that vacuuming then shrinks the database file.
+        """
+        # GIVEN
+        _put_hash_entries(cache_dir, 20000, int(time.time()) - 20000)
+        size_before = get_cache_stats(cache_dir)[0].file_size
+
+        # WHEN
+        (result,) = clean_caches(cache_dir, max_size_mb=size_before / 2 / 1024 / 1024, vacuum=True)
+
+        # THEN
+        assert 9000 <= result.evicted_entry_count <= 11000
+        assert result.vacuumed
+        assert result.file_size_after < size_before * 0.6
+        with HashCache(cache_dir) as hc:
+            # The most recently used entries are kept.
+            assert hc.get_entry("/root/19999.txt", HashAlgorithm.XXH128) is not None
+            assert hc.get_entry("/root/0.txt", HashAlgorithm.XXH128) is None
+
+    def test_clean_caches_stops_when_time_budget_runs_out(self, cache_dir):
+        """
+        Tests that no more batches of entries are deleted once the time budget runs out, and that the
+        database isn't vacuumed within a time budget.
+        """
+        # GIVEN
+        _put_hash_entries(cache_dir, 100, 1000)
+
+        # WHEN
+        with patch.object(HashCache, "EVICTION_BATCH_SIZE", 10), patch(
+            "time.monotonic", side_effect=[0, 0] + [10] * 5
+        ):
+            (result,) = clean_caches(cache_dir, max_age_days=1, vacuum=True, time_budget_seconds=1)
+
+        # THEN
+        assert result.evicted_entry_count == 10
+        assert result.timed_out
+        assert not result.vacuumed
+
+
+class TestHashCacheLastAccess:
+    """
+    Tests for the last access time of the hash cache entries
+    """
+
+    def test_get_entry_updates_stale_last_access_time(self, tmpdir):
+        """
+        Tests that looking up an entry updates its last access time when it wasn't updated recently,
+        including in bulk mode, where the update is written when flushing.
+        """
+        # GIVEN
+        cache_dir = str(tmpdir.mkdir("cache"))
+        stale_time = int(time.time()) - 2 * HashCache.LAST_ACCESS_UPDATE_INTERVAL
+        _put_hash_entries(cache_dir, 2, stale_time)
+
+        # WHEN
+        with HashCache(cache_dir) as hc:
+            hc.get_entry("/root/0.txt", HashAlgorithm.XXH128)
+        with HashCache(cache_dir, bulk_mode=True) as hc:
+            hc.preload_entries("/root/", HashAlgorithm.XXH128)
+            hc.get_entry("/root/1.txt", HashAlgorithm.XXH128)
+
+        # THEN
+        with HashCache(cache_dir) as hc:
+            for file_path in ("/root/0.txt", "/root/1.txt"):
+                entry = hc.get_entry(file_path, HashAlgorithm.XXH128)
+                assert entry is not None
+                assert entry.last_access_time > stale_time + HashCache.LAST_ACCESS_UPDATE_INTERVAL
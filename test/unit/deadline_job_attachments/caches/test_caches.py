@@ -1,19 +1,27 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 
 import os
+import sqlite3
+import zlib
 from datetime import datetime
 from sqlite3 import OperationalError
-from unittest.mock import patch
+from typing import Optional
+from unittest.mock import MagicMock, patch
 
 import pytest
 
 import deadline
+from deadline.client.config import config_file
 from deadline.job_attachments.asset_manifests import HashAlgorithm
+from deadline.job_attachments.asset_manifests.v2023_03_03 import AssetManifest, ManifestPath
 from deadline.job_attachments.exceptions import JobAttachmentsError
 from deadline.job_attachments.caches import (
     CacheDB,
+    CacheSession,
     HashCache,
     HashCacheEntry,
+    ManifestCache,
+    ManifestCacheEntry,
     S3CheckCache,
     S3CheckCacheEntry,
 )
@@ -107,7 +115,10 @@ class TestHashCache:
             file_path=file_path,
             hash_algorithm=HashAlgorithm.XXH128,
             file_hash="hash",
-            last_modified_time="1234.5678",
+            file_size=12,
+            mtime_ns=1234567800000,
+            inode=5678,
+            device=1,
         )
 
         # WHEN
@@ -118,6 +129,197 @@ class TestHashCache:
             # THEN
             assert actual_entry == expected_entry
 
+    def test_bulk_mode_serves_preloaded_entries_from_memory(self, tmpdir):
+        """
+        Tests that in bulk mode, the entries under a preloaded prefix are returned without querying the
+        database, and that paths under the prefix that aren't cached are known to be missing.
+        """
+        # GIVEN
+        cache_dir = tmpdir.mkdir("cache")
+        entries = [
+            HashCacheEntry(f"/root/{name}", HashAlgorithm.XXH128, f"hash_{name}", 1, 1234, 5, 1)
+            for name in ("a.txt", "dir/b.txt")
+        ]
+        other_entry = HashCacheEntry("/other/c.txt", HashAlgorithm.XXH128, "hash_c", 1, 1234, 6, 1)
+        with HashCache(cache_dir) as hc:
+            for entry in entries + [other_entry]:
+                hc.put_entry(entry)
+
+        with HashCache(cache_dir, bulk_mode=True) as hc:
+            hc.preload_entries("/root/", HashAlgorithm.XXH128)
+            hc.db_connection = MagicMock()
+            hc.db_connection.execute.return_value.fetchone.return_value = None
+
+            # WHEN / THEN
+            for entry in entries:
+                assert hc.get_entry(entry.file_path, HashAlgorithm.XXH128) == entry
+            assert hc.get_entry("/root/missing.txt", HashAlgorithm.XXH128) is None
+            hc.db_connection.execute.assert_not_called()
+
+            # Paths that weren't preloaded are still looked up in the database.
+            hc.get_entry(other_entry.file_path, HashAlgorithm.XXH128)
+            hc.db_connection.execute.assert_called_once()
+
+    @pytest.mark.skipif(
+        os.name == "nt", reason="Creating symbolic links on Windows requires extra privileges."
+    )
+    def test_bulk_mode_preloads_entries_under_symlinked_root(self, tmpdir):
+        """
+        Tests that in bulk mode, a root under a symbolic link preloads the entries of its resolved
+        file paths, which are the paths the entries are keyed by.
+        """
+        # GIVEN
+        cache_dir = tmpdir.mkdir("cache")
+        real_root = tmpdir.mkdir("real_root")
+        link_root = tmpdir.join("link_root")
+        os.symlink(str(real_root), str(link_root))
+        entry = HashCacheEntry(
+            str(real_root.join("a.txt")), HashAlgorithm.XXH128, "hash_a", 1, 1234, 5, 1
+        )
+        with HashCache(cache_dir) as hc:
+            hc.put_entry(entry)
+
+        with HashCache(cache_dir, bulk_mode=True) as hc:
+            # WHEN
+            hc.preload_entries(str(link_root), HashAlgorithm.XXH128)
+            hc.db_connection = MagicMock()
+
+            # THEN
+            assert hc.get_entry(entry.file_path, HashAlgorithm.XXH128) == entry
+            hc.db_connection.execute.assert_not_called()
+
+    def test_bulk_mode_writes_entries_in_batches(self, tmpdir):
+        """
+        Tests that in bulk mode, entries are written once there are enough pending entries, and the rest
+        are written when exiting the context manager.
+        """
+        # GIVEN
+        cache_dir = tmpdir.mkdir("cache")
+        entries = [
+            HashCacheEntry(f"/root/{i}.txt", HashAlgorithm.XXH128, f"hash{i}", 1, 1234, i, 1)
+            for i in range(5)
+        ]
+
+        # WHEN
+        with patch.object(HashCache, "BULK_WRITE_BATCH_SIZE", 2), HashCache(
+            cache_dir, bulk_mode=True
+        ) as hc:
+            for entry in entries:
+                hc.put_entry(entry)
+            # An updated entry is returned from memory before it's written.
+            assert hc.get_entry(entries[4].file_path, HashAlgorithm.XXH128) == entries[4]
+            # THEN
+            assert (
+                hc.db_connection.execute(f"SELECT COUNT(*) FROM {hc.table_name}").fetchone()[0] == 4
+            )
+
+        with HashCache(cache_dir) as hc:
+            for entry in entries:
+                assert hc.get_entry(entry.file_path, HashAlgorithm.XXH128) == entry
+
+    def test_enter_migrates_unchanged_entries_from_previous_version(self, tmpdir):
+        """
+        Tests that when the cache is created, the entries of the version 3 cache are migrated for the
+        files that were not modified since they were hashed.
+        """
+        # GIVEN
+        cache_dir = tmpdir.mkdir("cache")
+        unchanged_file = tmpdir.join("unchanged.txt")
+        unchanged_file.write("a")
+        modified_file = tmpdir.join("modified.txt")
+        modified_file.write("b")
+        unchanged_mtime = str(datetime.fromtimestamp(os.stat(unchanged_file).st_mtime))
+        with sqlite3.connect(cache_dir.join(f"{HashCache.CACHE_NAME}.db")) as connection:
+            connection.execute(
+                "CREATE TABLE hashesV3(file_path blob primary key, hash_algorithm text secondary key, "
+                "file_hash text, last_modified_time timestamp)"
+            )
+            connection.executemany(
+                "INSERT INTO hashesV3 VALUES(?, ?, ?, ?)",
+                [
+                    (str(unchanged_file).encode(), "xxh128", "hash_a", unchanged_mtime),
+                    (str(modified_file).encode(), "xxh128", "hash_b", "2000-01-01 00:00:00"),
+                    (str(tmpdir.join("deleted.txt")).encode(), "xxh128", "hash_c", "1234.5"),
+                ],
+            )
+        connection.close()
+
+        # WHEN
+        with HashCache(cache_dir) as hc:
+            # THEN
+            entry = hc.get_entry(str(unchanged_file), HashAlgorithm.XXH128)
+            assert entry == HashCacheEntry.from_stat(
+                str(unchanged_file), HashAlgorithm.XXH128, "hash_a", os.stat(unchanged_file)
+            )
+            # The migrated entries are considered accessed now.
+            assert entry is not None
+            assert entry.last_access_time >= int(datetime.now().timestamp()) - 60
+            assert hc.get_entry(str(modified_file), HashAlgorithm.XXH128) is None
+            assert hc.get_entry(str(tmpdir.join("deleted.txt")), HashAlgorithm.XXH128) is None
+
+    @pytest.mark.parametrize(
+        ("time_limit", "expected_count"),
+        [
+            pytest.param(60, 5, id="all batches"),
+            pytest.param(0, 2, id="stops after the time limit"),
+        ],
+    )
+    def test_enter_migrates_previous_version_in_batches(self, tmpdir, time_limit, expected_count):
+        """
+        Tests that the entries of the version 3 cache are migrated in batches, and that migration stops
+        once the time limit is reached, leaving the remaining files to be hashed again.
+        """
+        # GIVEN
+        cache_dir = tmpdir.mkdir("cache")
+        rows = []
+        for i in range(5):
+            file = tmpdir.join(f"file{i}.txt")
+            file.write(str(i))
+            rows.append(
+                (
+                    str(file).encode(),
+                    "xxh128",
+                    f"hash{i}",
+                    str(datetime.fromtimestamp(os.stat(file).st_mtime)),
+                )
+            )
+        with sqlite3.connect(cache_dir.join(f"{HashCache.CACHE_NAME}.db")) as connection:
+            connection.execute(
+                "CREATE TABLE hashesV3(file_path blob primary key, hash_algorithm text secondary key, "
+                "file_hash text, last_modified_time timestamp)"
+            )
+            connection.executemany("INSERT INTO hashesV3 VALUES(?, ?, ?, ?)", rows)
+        connection.close()
+
+        # WHEN
+        with patch.object(HashCache, "MIGRATION_BATCH_SIZE", 2), patch.object(
+            HashCache, "MIGRATION_TIME_LIMIT", time_limit
+        ), HashCache(cache_dir) as hc:
+            # THEN
+            assert (
+                hc.db_connection.execute(f"SELECT COUNT(*) FROM {hc.table_name}").fetchone()[0]
+                == expected_count
+            )
+
+    def test_entry_matches_stat(self, tmpdir):
+        """
+        Tests that an entry only matches the stat result of an unchanged file.
+        """
+        file = tmpdir.join("file.txt")
+        file.write("a")
+        entry = HashCacheEntry.from_stat(str(file), HashAlgorithm.XXH128, "hash", os.stat(file))
+        assert entry.matches_stat(os.stat(file))
+
+        os.utime(file, ns=(entry.mtime_ns + 1, entry.mtime_ns + 1))
+        assert not entry.matches_stat(os.stat(file))
+
+    def test_enter_enables_write_ahead_logging(self, tmpdir):
+        """
+        Tests that the cache database uses write-ahead logging, so concurrent processes don't block each other.
+        """
+        with HashCache(tmpdir.mkdir("cache")) as hc:
+            assert hc.db_connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
     def test_enter_sqlite_import_error(self, tmpdir):
         """
         Tests that the cache doesn't throw errors when the SQLite module can't be found
@@ -133,7 +335,10 @@ class TestHashCache:
                         file_path="/no/file",
                         hash_algorithm=HashAlgorithm.XXH128,
                         file_hash="abc",
-                        last_modified_time="1234.56",
+                        file_size=1,
+                        mtime_ns=1234560000000,
+                        inode=1,
+                        device=1,
                     )
                 )
                 assert hc.get_entry("/no/file", HashAlgorithm.XXH128) is None
@@ -193,6 +398,105 @@ class TestS3CheckCache:
             # THEN
             assert actual_entry is None
 
+    def test_bulk_mode_serves_preloaded_entries_from_memory(self, tmpdir):
+        """
+        Tests that in bulk mode, the unexpired entries under a preloaded prefix are returned without
+        querying the database, and that expired or nonvalid entries under the prefix are known to be missing.
+        """
+        # GIVEN
+        cache_dir = tmpdir.mkdir("cache")
+        now = str(datetime.now().timestamp())
+        valid_entries = [
+            S3CheckCacheEntry(s3_key=f"bucket/Data/hash{i}.xxh128", last_seen_time=now)
+            for i in range(3)
+        ]
+        with S3CheckCache(cache_dir) as s3c:
+            for entry in valid_entries:
+                s3c.put_entry(entry)
+            s3c.put_entry(S3CheckCacheEntry("bucket/Data/expired.xxh128", "123.456"))
+            s3c.put_entry(S3CheckCacheEntry("bucket/Data/nonvalid.xxh128", "not a time"))
+            s3c.put_entry(S3CheckCacheEntry("other-bucket/Data/hash.xxh128", now))
+
+        with S3CheckCache(cache_dir, bulk_mode=True) as s3c:
+            s3c.preload_entries("bucket/Data/")
+            s3c.db_connection = MagicMock()
+            s3c.db_connection.execute.return_value.fetchone.return_value = None
+
+            # WHEN / THEN
+            for entry in valid_entries:
+                assert s3c.get_entry(entry.s3_key) == entry
+            assert s3c.get_entry("bucket/Data/expired.xxh128") is None
+            assert s3c.get_entry("bucket/Data/nonvalid.xxh128") is None
+            assert s3c.get_entry("bucket/Data/missing.xxh128") is None
+            s3c.db_connection.execute.assert_not_called()
+
+            # Keys that weren't preloaded are still looked up in the database.
+            s3c.get_entry("other-bucket/Data/hash.xxh128")
+            s3c.db_connection.execute.assert_called_once()
+
+    def test_bulk_mode_preloads_bloom_filter_for_many_entries(self, tmpdir):
+        """
+        Tests that when there are too many entries to load into memory, the keys that the Bloom filter
+        contains are looked up in the database, and the ones it doesn't are known to be missing.
+        """
+        # GIVEN
+        cache_dir = tmpdir.mkdir("cache")
+        now = str(datetime.now().timestamp())
+        entries = [
+            S3CheckCacheEntry(s3_key=f"bucket/Data/hash{i}.xxh128", last_seen_time=now)
+            for i in range(10)
+        ]
+        with S3CheckCache(cache_dir) as s3c:
+            for entry in entries:
+                s3c.put_entry(entry)
+
+        with patch.object(S3CheckCache, "PRELOAD_MAX_ENTRIES", 5), S3CheckCache(
+            cache_dir, bulk_mode=True
+        ) as s3c:
+            s3c.preload_entries("bucket/Data/")
+
+            # WHEN / THEN
+            for entry in entries:
+                assert s3c.get_entry(entry.s3_key) == entry
+            with patch.object(s3c, "db_connection") as mock_db_connection:
+                missing_keys = [f"bucket/Data/missing{i}.xxh128" for i in range(100)]
+                for key in missing_keys:
+                    assert s3c.get_entry(key) is None
+                # Only the Bloom filter's false positives are looked up.
+                assert mock_db_connection.execute.call_count < 10
+
+    def test_bulk_mode_writes_entries_in_batches(self, tmpdir):
+        """
+        Tests that in bulk mode, entries are written once there are enough pending entries, and the rest
+        are written when exiting the context manager.
+        """
+        # GIVEN
+        cache_dir = tmpdir.mkdir("cache")
+        now = str(datetime.now().timestamp())
+        entries = [
+            S3CheckCacheEntry(s3_key=f"bucket/Data/hash{i}.xxh128", last_seen_time=now)
+            for i in range(5)
+        ]
+
+        # WHEN
+        with patch.object(S3CheckCache, "BULK_WRITE_BATCH_SIZE", 2), S3CheckCache(
+            cache_dir, bulk_mode=True
+        ) as s3c:
+            s3c.preload_entries("bucket/Data/")
+            for entry in entries:
+                s3c.put_entry(entry)
+            # An entry is returned from memory before it's written.
+            assert s3c.get_entry(entries[4].s3_key) == entries[4]
+            # THEN
+            assert (
+                s3c.db_connection.execute(f"SELECT COUNT(*) FROM {s3c.table_name}").fetchone()[0]
+                == 4
+            )
+
+        with S3CheckCache(cache_dir) as s3c:
+            for entry in entries:
+                assert s3c.get_entry(entry.s3_key) == entry
+
     def test_enter_sqlite_import_error(self, tmpdir):
         """
         Tests that the cache doesn't throw errors when the SQLite module can't be found
@@ -210,3 +514,201 @@ class TestS3CheckCache:
                     )
                 )
                 assert s3c.get_entry("bucket/Data/somehash") is None
+
+
+class TestManifestCache:
+    """
+    Tests for the local manifest cache
+    """
+
+    @pytest.fixture
+    def manifest(self) -> AssetManifest:
+        return AssetManifest(
+            hash_alg=HashAlgorithm.XXH128,
+            paths=[
+                ManifestPath(path="a.txt", hash="hasha", size=1, mtime=1234000000),
+                ManifestPath(path="dir/b.txt", hash="hashb", size=2, mtime=1234000000),
+            ],
+            total_size=3,
+        )
+
+    def test_init_empty_path(self, tmpdir):
+        """
+        Tests that when no cache file path is given, the default is used.
+        """
+        with patch(
+            f"{deadline.__package__}.job_attachments.caches.CacheDB.get_default_cache_db_file_dir",
+            side_effect=[tmpdir],
+        ):
+            mc = ManifestCache()
+            assert mc.cache_dir == tmpdir.join(f"{ManifestCache.CACHE_NAME}.db")
+
+    def test_exit_evicts_least_recently_used_entries(self, tmpdir, manifest):
+        """
+        Tests that when the cache exceeds its maximum size, the least recently used entries are evicted
+        when the context manager exits.
+        """
+        # GIVEN
+        cache_dir = tmpdir.mkdir("cache")
+        with ManifestCache(cache_dir, max_size_bytes=32 * 1024) as mc:
+            for i in range(1000):
+                mc.put_entry(
+                    ManifestCacheEntry(
+                        s3_key=f"bucket/Manifests/key{i}",
+                        etag='"etag"',
+                        asset_root=None,
+                        manifest=manifest,
+                    )
+                )
+            # Give the entries distinct last access times, in the order they were put.
+            with mc.db_connection:
+                mc.db_connection.execute(f"UPDATE {mc.table_name} SET last_access_time=rowid")
+
+        # WHEN
+        with ManifestCache(cache_dir) as mc:
+            entry_count = mc.db_connection.execute(
+                f"SELECT COUNT(*) FROM {mc.table_name}"
+            ).fetchone()[0]
+
+            # THEN
+            assert 0 < entry_count < 1000
+            assert mc.get_entry("bucket/Manifests/key999") is not None
+            assert mc.get_entry("bucket/Manifests/key0") is None
+
+    @pytest.mark.parametrize(
+        ("max_size_mb", "expected_max_size_bytes"),
+        [("128", 128 * 1024 * 1024), ("0", None)],
+    )
+    def test_from_config(
+        self, fresh_deadline_config, max_size_mb: str, expected_max_size_bytes: Optional[int]
+    ):
+        """
+        Tests that the cache is created in the cache directory of the configuration, with the maximum size
+        of the configuration settings.
+        """
+        config_file.set_setting("settings.manifest_cache_max_size_mb", max_size_mb)
+
+        mc = ManifestCache.from_config()
+
+        assert mc.cache_dir == os.path.join(
+            config_file.get_cache_directory(), f"{ManifestCache.CACHE_NAME}.db"
+        )
+        assert mc.max_size_bytes == expected_max_size_bytes
+
+    def test_from_config_nonvalid(self, fresh_deadline_config):
+        config_file.set_setting("settings.manifest_cache_max_size_mb", "a lot")
+        with pytest.raises(JobAttachmentsError, match="manifest_cache_max_size_mb"):
+            ManifestCache.from_config()
+
+    def test_get_entry_returns_valid_entry(self, tmpdir, manifest):
+        """
+        Tests that a cached manifest is returned without validating it against the manifest schema,
+        and only if it has the given ETag.
+        """
+        # GIVEN
+        cache_dir = tmpdir.mkdir("cache")
+        expected_entry = ManifestCacheEntry(
+            s3_key="bucket/Manifests/key_output",
+            etag='"etag1"',
+            asset_root="/tmp/root",
+            manifest=manifest,
+        )
+
+        # WHEN
+        with ManifestCache(cache_dir) as mc, patch(
+            f"{deadline.__package__}.job_attachments.asset_manifests.decode.validate_manifest"
+        ) as mock_validate_manifest:
+            mc.put_entry(expected_entry)
+            actual_entry = mc.get_entry("bucket/Manifests/key_output")
+            entry_with_etag = mc.get_entry("bucket/Manifests/key_output", etag='"etag1"')
+            entry_with_other_etag = mc.get_entry("bucket/Manifests/key_output", etag='"etag2"')
+            missing_entry = mc.get_entry("bucket/Manifests/other_key")
+
+        # THEN
+        assert actual_entry == expected_entry
+        assert entry_with_etag == expected_entry
+        assert entry_with_other_etag is None
+        assert missing_entry is None
+        mock_validate_manifest.assert_not_called()
+
+    def test_get_entry_ignores_invalid_entry(self, tmpdir):
+        """
+        Tests that an entry whose manifest can't be decoded is treated as missing.
+        """
+        cache_dir = tmpdir.mkdir("cache")
+        with ManifestCache(cache_dir) as mc:
+            mc.db_connection.execute(
+                f"INSERT INTO {mc.table_name} VALUES(?, ?, ?, ?, ?)",
+                ["bucket/key", '"etag"', None, b"not compressed", 0],
+            )
+
+            assert mc.get_entry("bucket/key") is None
+
+    def test_manifest_is_stored_compressed(self, tmpdir, manifest):
+        """
+        Tests that the manifest is stored compressed rather than as its JSON encoding.
+        """
+        cache_dir = tmpdir.mkdir("cache")
+        with ManifestCache(cache_dir) as mc:
+            mc.put_entry(ManifestCacheEntry("bucket/key", '"etag"', None, manifest))
+            stored_manifest = mc.db_connection.execute(
+                f"SELECT manifest FROM {mc.table_name}"
+            ).fetchone()[0]
+
+        assert stored_manifest != manifest.encode().encode("utf-8")
+        assert zlib.decompress(stored_manifest) == manifest.encode().encode("utf-8")
+
+
+class TestCacheSession:
+    """
+    Tests for the session that shares the local caches
+    """
+
+    def test_get_caches_opens_each_cache_once(self, tmpdir):
+        """
+        Tests that each cache is opened in bulk mode the first time it's needed, and that the same open
+        cache is returned afterwards.
+        """
+        # GIVEN
+        cache_dir = tmpdir.mkdir("cache")
+
+        # WHEN
+        with CacheSession(cache_dir, cache_dir) as session:
+            hash_cache = session.get_hash_cache()
+            s3_check_cache = session.get_s3_check_cache()
+
+            # THEN
+            assert hash_cache.bulk_mode and s3_check_cache.bulk_mode
+            assert session.get_hash_cache() is hash_cache
+            assert session.get_s3_check_cache() is s3_check_cache
+
+    def test_close_writes_pending_entries(self, tmpdir):
+        """
+        Tests that closing the session writes the pending entries of the open caches.
+        """
+        # GIVEN
+        cache_dir = tmpdir.mkdir("cache")
+        hash_entry = HashCacheEntry("/root/a.txt", HashAlgorithm.XXH128, "hash", 1, 1234, 5, 1)
+        s3_check_entry = S3CheckCacheEntry(
+            s3_key="bucket/Data/hash.xxh128", last_seen_time=str(datetime.now().timestamp())
+        )
+
+        # WHEN
+        with CacheSession(cache_dir, cache_dir) as session:
+            session.get_hash_cache().put_entry(hash_entry)
+            session.get_s3_check_cache().put_entry(s3_check_entry)
+
+        # THEN
+        with HashCache(cache_dir) as hc:
+            assert hc.get_entry(hash_entry.file_path, HashAlgorithm.XXH128) == hash_entry
+        with S3CheckCache(cache_dir) as s3c:
+            assert s3c.get_entry(s3_check_entry.s3_key) == s3_check_entry
+
+    def test_close_without_opened_caches(self, tmpdir):
+        """
+        Tests that caches that were never needed are never opened.
+        """
+        with patch.object(HashCache, "__enter__") as mock_enter:
+            with CacheSession(tmpdir.join("cache"), tmpdir.join("cache")):
+                pass
+            mock_enter.assert_not_called()
@@ -0,0 +1,245 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Tuple
+from unittest.mock import patch
+
+import pytest
+
+from deadline.client.config import config_file
+from deadline.job_attachments.asset_manifests import HashAlgorithm, hash_data
+from deadline.job_attachments.caches import ObjectCache
+from deadline.job_attachments.caches.object_cache import _try_lock_file
+from deadline.job_attachments.exceptions import JobAttachmentsError
+
+
+def _put_object(cache: ObjectCache, tmp_path: Path, data: bytes) -> Tuple[str, Path]:
+    """Adds an object with the given contents to the cache, returning its hash and path."""
+    file_hash = hash_data(data, HashAlgorithm.XXH128)
+    source = tmp_path / f"source_{file_hash}"
+    source.write_bytes(data)
+    cache.put(file_hash, HashAlgorithm.XXH128, source)
+    return (file_hash, cache.get_object_path(file_hash, HashAlgorithm.XXH128))
+
+
+class TestObjectCache:
+    """
+    Tests for the local cache of the objects downloaded from the CAS.
+    """
+
+    def test_get_default_cache_dir(self):
+        assert ObjectCache.get_default_cache_dir() == str(
+            Path.home() / ".deadline" / "job_attachments" / "object_cache"
+        )
+
+    def test_from_config_disabled(self, fresh_deadline_config):
+        assert ObjectCache.from_config() is None
+
+    def test_from_config(self, fresh_deadline_config, tmp_path: Path):
+        config_file.set_setting("settings.object_cache_enabled", "true")
+        config_file.set_setting("settings.object_cache_max_size_mb", "2")
+        config_file.set_setting("settings.object_cache_use_hardlinks", "true")
+
+        cache = ObjectCache.from_config()
+        assert cache is not None
+        assert cache.cache_dir == Path(ObjectCache.get_default_cache_dir())
+        assert cache.max_size_bytes == 2 * 1024 * 1024
+        assert cache.use_hardlinks
+
+        config_file.set_setting("settings.object_cache_dir", str(tmp_path / "cache"))
+        cache = ObjectCache.from_config()
+        assert cache is not None
+        assert cache.cache_dir == tmp_path / "cache"
+
+    def test_from_config_nonvalid_setting(self, fresh_deadline_config):
+        config_file.set_setting("settings.object_cache_enabled", "true")
+        config_file.set_setting("settings.object_cache_max_size_mb", "lots")
+
+        with pytest.raises(JobAttachmentsError, match="object_cache_max_size_mb"):
+            ObjectCache.from_config()
+
+    def test_put_and_materialize(self, tmp_path: Path):
+        cache = ObjectCache(str(tmp_path / "cache"))
+        file_hash, object_path = _put_object(cache, tmp_path, b"contents")
+
+        assert object_path == tmp_path / "cache" / file_hash[:2] / f"{file_hash}.xxh128"
+        assert object_path.read_bytes() == b"contents"
+        assert list(object_path.parent.iterdir()) == [object_path]
+
+        destination = tmp_path / "session" / "file.txt"
+        destination.parent.mkdir()
+        assert cache.materialize(file_hash, HashAlgorithm.XXH128, destination)
+        assert destination.read_bytes() == b"contents"
+        assert destination.stat().st_ino != object_path.stat().st_ino
+
+    def test_materialize_miss(self, tmp_path: Path):
+        cache = ObjectCache(str(tmp_path / "cache"))
+
+        assert not cache.materialize("abcdef", HashAlgorithm.XXH128, tmp_path / "file.txt")
+        assert not (tmp_path / "file.txt").exists()
+
+    def test_materialize_with_hardlinks(self, tmp_path: Path):
+        cache = ObjectCache(str(tmp_path / "cache"), use_hardlinks=True)
+        file_hash, object_path = _put_object(cache, tmp_path, b"contents")
+        destination = tmp_path / "file.txt"
+        destination.write_bytes(b"old contents")
+
+        assert cache.materialize(file_hash, HashAlgorithm.XXH128, destination)
+        assert destination.read_bytes() == b"contents"
+        assert destination.stat().st_ino == object_path.stat().st_ino
+
+    def test_materialize_with_hardlinks_and_other_mtime(self, tmp_path: Path):
+        """
+        Tests that when the object doesn't have the modification time of the destination, it is
+        copied rather than linked, so that setting the modification time doesn't change the object's.
+        """
+        cache = ObjectCache(str(tmp_path / "cache"), use_hardlinks=True)
+        file_hash, object_path = _put_object(cache, tmp_path, b"contents")
+        os.utime(object_path, ns=(1000000000, 1000000000))
+        destination = tmp_path / "file.txt"
+
+        assert cache.materialize(file_hash, HashAlgorithm.XXH128, destination, mtime_ns=2000000000)
+        assert destination.read_bytes() == b"contents"
+        assert destination.stat().st_ino != object_path.stat().st_ino
+        assert destination.stat().st_mtime_ns == 2000000000
+        assert object_path.stat().st_mtime_ns == 1000000000
+
+        linked_destination = tmp_path / "linked_file.txt"
+        assert cache.materialize(
+            file_hash, HashAlgorithm.XXH128, linked_destination, mtime_ns=1000000000
+        )
+        assert linked_destination.stat().st_ino == object_path.stat().st_ino
+
+    def test_without_hardlinks(self, tmp_path: Path):
+        cache = ObjectCache(str(tmp_path / "cache"), max_size_bytes=5, use_hardlinks=True)
+
+        copying_cache = cache.without_hardlinks()
+
+        assert copying_cache.cache_dir == cache.cache_dir
+        assert copying_cache.max_size_bytes == 5
+        assert not copying_cache.use_hardlinks
+
+    def test_put_existing_object(self, tmp_path: Path):
+        cache = ObjectCache(str(tmp_path / "cache"))
+        file_hash, object_path = _put_object(cache, tmp_path, b"contents")
+        object_path.write_bytes(b"cached contents")
+        cache.put(file_hash, HashAlgorithm.XXH128, tmp_path / f"source_{file_hash}")
+
+        assert object_path.read_bytes() == b"cached contents"
+
+    def test_put_mismatched_contents(self, tmp_path: Path):
+        """
+        Tests that a file whose contents don't match its hash, such as an object uploaded to the CAS
+        with other contents than its key, isn't added to the cache.
+        """
+        cache = ObjectCache(str(tmp_path / "cache"))
+        file_hash = hash_data(b"contents", HashAlgorithm.XXH128)
+        source = tmp_path / "source"
+        source.write_bytes(b"other contents")
+
+        cache.put(file_hash, HashAlgorithm.XXH128, source)
+
+        assert not cache.get_object_path(file_hash, HashAlgorithm.XXH128).exists()
+        assert not cache.materialize(file_hash, HashAlgorithm.XXH128, tmp_path / "file.txt")
+
+    def test_put_failure_is_not_raised(self, tmp_path: Path):
+        cache = ObjectCache(str(tmp_path / "cache"))
+        file_hash = hash_data(b"contents", HashAlgorithm.XXH128)
+        source = tmp_path / "source"
+        source.write_bytes(b"contents")
+
+        with patch("shutil.copyfile", side_effect=OSError("disk full")), patch(
+            f"{ObjectCache.__module__}._clone_file", return_value=False
+        ):
+            cache.put(file_hash, HashAlgorithm.XXH128, source)
+
+        assert not cache.get_object_path(file_hash, HashAlgorithm.XXH128).exists()
+        assert list((tmp_path / "cache" / file_hash[:2]).iterdir()) == []
+
+    def test_evict_least_recently_used(self, tmp_path: Path):
+        cache = ObjectCache(str(tmp_path / "cache"), max_size_bytes=25)
+        now = time.time()
+        file_hashes = []
+        object_paths = []
+        for i in range(4):
+            file_hash, object_path = _put_object(cache, tmp_path, b"012345678%d" % i)
+            os.utime(object_path, (now - 1000 + i, now - 1000 + i))
+            file_hashes.append(file_hash)
+            object_paths.append(object_path)
+        # Using the oldest object marks it as the most recently used.
+        assert cache.materialize(file_hashes[0], HashAlgorithm.XXH128, tmp_path / "file.txt")
+        assert cache.get_size() == 40
+
+        assert cache.evict() == 2
+
+        assert [path.exists() for path in object_paths] == [True, False, False, True]
+        assert cache.get_size() == 20
+
+    def test_evict_deletes_stale_temp_files(self, tmp_path: Path):
+        cache = ObjectCache(str(tmp_path / "cache"))
+        (tmp_path / "cache" / "ab").mkdir(parents=True)
+        stale_temp_file = tmp_path / "cache" / "ab" / "abcdef.xxh128.1234.tmp"
+        stale_temp_file.write_bytes(b"partial")
+        stale_time = time.time() - ObjectCache.STALE_TEMP_FILE_AGE_SECONDS - 1
+        os.utime(stale_temp_file, (stale_time, stale_time))
+        new_temp_file = tmp_path / "cache" / "ab" / "abcdef.xxh128.5678.tmp"
+        new_temp_file.write_bytes(b"partial")
+
+        assert cache.evict() == 0
+
+        assert not stale_temp_file.exists()
+        assert new_temp_file.exists()
+        assert cache.get_size() == 0
+
+    def test_evict_scans_only_when_stored_size_is_exceeded(self, tmp_path: Path):
+        """
+        Tests that once the cache was scanned, evicting only scans it again when the objects added
+        since then make its stored size exceed the maximum size, or when the stored size is old.
+        """
+        cache = ObjectCache(str(tmp_path / "cache"), max_size_bytes=25)
+        _put_object(cache, tmp_path, b"0123456789")
+        assert cache.evict() == 0
+
+        with patch.object(cache, "_list_objects", wraps=cache._list_objects) as mock_list_objects:
+            _put_object(cache, tmp_path, b"0123456780")
+            assert cache.evict() == 0
+            mock_list_objects.assert_not_called()
+
+            _put_object(cache, tmp_path, b"0123456781")
+            assert cache.evict() == 1
+            mock_list_objects.assert_called_once()
+            assert cache.get_size() == 20
+
+            mock_list_objects.reset_mock()
+            assert cache.evict() == 0
+            mock_list_objects.assert_not_called()
+
+            with patch(
+                "time.time", return_value=time.time() + cache.STORED_SIZE_MAX_AGE_SECONDS + 1
+            ):
+                assert cache.evict() == 0
+            mock_list_objects.assert_called_once()
+
+    def test_evict_empty_cache(self, tmp_path: Path):
+        cache = ObjectCache(str(tmp_path / "cache"))
+
+        assert cache.evict() == 0
+
+    @pytest.mark.skipif(
+        sys.platform == "win32",
+        reason="Windows file locks are held per handle, not per open file description.",
+    )
+    def test_evict_skipped_while_locked(self, tmp_path: Path):
+        cache = ObjectCache(str(tmp_path / "cache"), max_size_bytes=0)
+        _, object_path = _put_object(cache, tmp_path, b"contents")
+
+        with _try_lock_file(tmp_path / "cache" / ObjectCache.LOCK_FILE_NAME) as locked:
+            assert locked
+            assert cache.evict() == 0
+            assert object_path.exists()
+
+        assert cache.evict() == 1
+        assert not object_path.exists()
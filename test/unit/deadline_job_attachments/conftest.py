@@ -32,6 +32,19 @@ from deadline.job_attachments.models import (  # noqa: E402 isort:skip
 )
 
 
+@pytest.fixture(autouse=True)
+def isolated_cache_directory(tmp_path):
+    """
+    Fixture to use a temporary directory as the cache directory of the configuration, so that the local
+    caches that are opened by default don't share entries across tests.
+    """
+    with patch(
+        "deadline.client.config.config_file.get_cache_directory",
+        return_value=str(tmp_path / "isolated_cache"),
+    ):
+        yield
+
+
 @pytest.fixture(scope="function")
 def temp_assets_dir():
     """
@@ -6,21 +6,34 @@ import json
 from logging import getLogger
 import os
 import shutil
+import time
 from math import trunc
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Dict, Optional, Tuple
 from unittest.mock import ANY, MagicMock, patch
 
 import boto3
 import pytest
+from botocore.exceptions import ClientError
 from moto import mock_aws
 
 import deadline
+from deadline.client.config import config_file
+from deadline.job_attachments.asset_manifests import HashAlgorithm, hash_data
 from deadline.job_attachments.asset_manifests.decode import decode_manifest
+from deadline.job_attachments.asset_manifests.v2023_03_03 import AssetManifest, ManifestPath
 from deadline.job_attachments.asset_sync import AssetSync
+from deadline.job_attachments.asset_manifests.hash_algorithms import hash_file
+from deadline.job_attachments.caches import (
+    ManifestCache,
+    ObjectCache,
+    S3CheckCache,
+    S3CheckCacheEntry,
+)
 from deadline.job_attachments.os_file_permission import PosixFileSystemPermissionSettings
 
 from deadline.job_attachments.exceptions import (
+    AssetSyncCancelledError,
     AssetSyncError,
     VFSExecutableMissingError,
     JobAttachmentsS3ClientError,
@@ -32,6 +45,7 @@ from deadline.job_attachments.models import (
     JobAttachmentsFileSystem,
     JobAttachmentS3Settings,
     ManifestProperties,
+    OutputFile,
     PathFormat,
     Queue,
 )
@@ -40,7 +54,7 @@ from deadline.job_attachments.progress_tracker import (
     ProgressStatus,
     SummaryStatistics,
 )
-from deadline.job_attachments._utils import _human_readable_file_size
+from deadline.job_attachments._utils import _get_unique_dest_dir_name, _human_readable_file_size
 from ..conftest import is_windows_non_admin
 
 
@@ -230,7 +244,7 @@ class TestAssetSync:
         ), patch(
             f"{deadline.__package__}.job_attachments.asset_sync.VFSProcessManager.find_vfs"
         ), patch.object(
-            Path, "stat", MagicMock(st_mtime_ns=1234512345123451)
+            Path, "stat", return_value=MagicMock(st_mtime_ns=1234512345123451)
         ):
             mock_on_downloading_files = MagicMock(return_value=True)
 
@@ -363,7 +377,7 @@ class TestAssetSync:
             f"{deadline.__package__}.job_attachments.asset_sync.get_output_manifests_by_asset_root",
             side_effect=[{step_output_root: {}}],
         ), patch.object(
-            Path, "stat", MagicMock(st_mtime_ns=1234512345123451)
+            Path, "stat", return_value=MagicMock(st_mtime_ns=1234512345123451)
         ):
             mock_on_downloading_files = MagicMock(return_value=True)
 
@@ -431,7 +445,7 @@ class TestAssetSync:
         # WHEN
         with patch(
             f"{deadline.__package__}.job_attachments.asset_sync.get_manifest_from_s3",
-            return_value=json.dumps(test_manifest_one),
+            return_value=decode_manifest(json.dumps(test_manifest_one)),
         ), patch(
             f"{deadline.__package__}.job_attachments.asset_sync.download_files_from_manifests",
             side_effect=[DownloadSummaryStatistics()],
@@ -536,7 +550,7 @@ class TestAssetSync:
             f"{deadline.__package__}.job_attachments.asset_sync._get_unique_dest_dir_name",
             side_effect=[dest_dir],
         ), patch.object(
-            Path, "stat", MagicMock(st_mtime_ns=1234512345123451)
+            Path, "stat", return_value=MagicMock(st_mtime_ns=1234512345123451)
         ):
             mock_on_downloading_files = MagicMock(return_value=True)
 
@@ -628,10 +642,12 @@ class TestAssetSync:
         )
 
         # WHEN
+        # Output files are hashed concurrently, so the hashes are given by file name.
+        file_hashes = {"test.txt": "hash1", "test2.txt": "hash2"}
         with patch(
             f"{deadline.__package__}.job_attachments.asset_sync.hash_file",
-            side_effect=["hash1", "hash2"],
-        ), patch(
+            side_effect=lambda file_path, _: file_hashes[Path(file_path).name],
+        ) as mock_hash_file, patch(
             f"{deadline.__package__}.job_attachments.asset_sync.hash_data", side_effect=["hash3"]
         ), patch(
             f"{deadline.__package__}.job_attachments.asset_sync._get_unique_dest_dir_name",
@@ -723,6 +739,7 @@ class TestAssetSync:
             )
 
             assert summary_statistics == expected_summary_statistics
+            assert mock_hash_file.call_count == 2
 
     @pytest.mark.parametrize(
         "file_path, directory_path, expected",
@@ -777,6 +794,600 @@ class TestAssetSync:
             is False
         )
 
+    @pytest.mark.skipif(
+        is_windows_non_admin(),
+        reason="Windows requires Admin to create symlinks, skipping this test.",
+    )
+    def test_get_output_files(
+        self, tmp_path: Path, asset_sync: AssetSync, client: MagicMock
+    ) -> None:
+        """
+        Tests that the output files that are new or modified are found in the output directories and their
+        sub-directories, hashed, and checked for in the CAS, and that files that resolve outside of the session
+        directory are skipped.
+        """
+        # GIVEN
+        session_dir = tmp_path / "session"
+        local_root = session_dir / "assetroot"
+        output_root = local_root / "outputs"
+        (output_root / "inner_dir" / "inner_most").mkdir(parents=True)
+        outside_file = tmp_path / "outside.txt"
+        outside_file.write_text("outside")
+        new_files = [
+            output_root / "a.txt",
+            output_root / "inner_dir" / "b.txt",
+            output_root / "inner_dir" / "inner_most" / "c.txt",
+        ]
+        for file in new_files:
+            file.write_text(file.name)
+        unmodified_file = output_root / "unmodified.txt"
+        unmodified_file.write_text("unmodified")
+        asset_sync.synced_assets_mtime.set(
+            str(local_root), "outputs/unmodified.txt", unmodified_file.stat().st_mtime_ns
+        )
+        os.symlink(outside_file, output_root / "outside_link.txt")
+        os.symlink(output_root / "inner_dir", output_root / "dir_link")
+        (output_root / "inner_dir" / "deleted_link.txt").symlink_to(tmp_path / "deleted.txt")
+
+        manifest_properties = ManifestProperties(
+            rootPath=str(local_root),
+            rootPathFormat=PathFormat.get_host_path_format(),
+            outputRelativeDirectories=["outputs", "missing"],
+        )
+        s3_settings = JobAttachmentS3Settings(s3BucketName="bucket", rootPrefix="root")
+        client.head_object.side_effect = lambda Bucket, Key: None
+
+        # WHEN
+        with patch(
+            f"{deadline.__package__}.job_attachments.asset_sync.hash_file",
+            side_effect=lambda file_path, _: f"hash_{Path(file_path).stem}",
+        ):
+            output_files = asset_sync._get_output_files(
+                manifest_properties, s3_settings, local_root, session_dir
+            )
+
+        # THEN
+        assert sorted(output_file.rel_path for output_file in output_files) == [
+            "outputs/a.txt",
+            "outputs/inner_dir/b.txt",
+            "outputs/inner_dir/inner_most/c.txt",
+        ]
+        for output_file in output_files:
+            file = local_root / output_file.rel_path
+            assert output_file.full_path == str(file.resolve())
+            assert output_file.file_size == len(file.name)
+            assert output_file.file_hash == f"hash_{file.stem}"
+            assert output_file.s3_key == f"root/Data/hash_{file.stem}.xxh128"
+            assert output_file.in_s3
+            assert output_file.base_dir == str(session_dir)
+            assert (
+                asset_sync.synced_assets_mtime.get(str(local_root), output_file.rel_path)
+                == file.stat().st_mtime_ns
+            )
+        assert client.head_object.call_count == 3
+
+        # WHEN
+        new_files[0].write_text("modified")
+        os.utime(new_files[0], ns=(0, new_files[0].stat().st_mtime_ns + 1_000_000_000))
+        with patch(
+            f"{deadline.__package__}.job_attachments.asset_sync.hash_file",
+            side_effect=lambda file_path, _: f"hash_{Path(file_path).stem}",
+        ):
+            output_files = asset_sync._get_output_files(
+                manifest_properties, s3_settings, local_root, session_dir
+            )
+
+        # THEN
+        assert [output_file.rel_path for output_file in output_files] == ["outputs/a.txt"]
+
+    def test_get_output_files_skips_synced_inputs(
+        self, tmp_path: Path, asset_sync: AssetSync, client: MagicMock
+    ) -> None:
+        """
+        Tests that the downloaded input files are recorded with the modification times of their manifest,
+        without statting them, and that they aren't output files unless they were modified.
+        """
+        # GIVEN
+        local_root = tmp_path / "assetroot"
+        output_root = local_root / "outputs"
+        output_root.mkdir(parents=True)
+        input_paths = [
+            ManifestPath(path="outputs/input.txt", hash="a", size=5, mtime=1679079344833848),
+            ManifestPath(path="outputs/modified.txt", hash="b", size=8, mtime=1679079344833849),
+        ]
+        for input_path in input_paths:
+            input_file = local_root / input_path.path
+            input_file.write_text(input_path.path)
+            # As done when the file is downloaded.
+            os.utime(input_file, ns=(input_path.mtime * 1000, input_path.mtime * 1000))
+        manifest = AssetManifest(
+            hash_alg=HashAlgorithm.XXH128,
+            paths=input_paths,  # type: ignore[arg-type]
+            total_size=sum(input_path.size for input_path in input_paths),
+        )
+        manifest_properties = ManifestProperties(
+            rootPath=str(local_root),
+            rootPathFormat=PathFormat.get_host_path_format(),
+            outputRelativeDirectories=["outputs"],
+        )
+        s3_settings = JobAttachmentS3Settings(s3BucketName="bucket", rootPrefix="root")
+
+        # WHEN
+        with patch.object(Path, "stat", side_effect=AssertionError("Synced files were stat'ed")):
+            asset_sync._record_attachment_mtimes({str(local_root): manifest})
+        (output_root / "modified.txt").write_text("modified")
+        (output_root / "output.txt").write_text("output")
+        with patch(
+            f"{deadline.__package__}.job_attachments.asset_sync.hash_file", return_value="hash"
+        ):
+            output_files = asset_sync._get_output_files(
+                manifest_properties, s3_settings, local_root, tmp_path
+            )
+
+        # THEN
+        assert sorted(output_file.rel_path for output_file in output_files) == [
+            "outputs/modified.txt",
+            "outputs/output.txt",
+        ]
+
+    def test_get_output_files_skips_unchanged_contents(
+        self, tmp_path: Path, asset_sync: AssetSync, client: MagicMock
+    ) -> None:
+        """
+        Tests that the input files that were modified, but have the same contents as in the input manifest,
+        aren't output files, so that the output manifest only lists the files that the task changed.
+        """
+        # GIVEN
+        local_root = tmp_path / "assetroot"
+        output_root = local_root / "outputs"
+        output_root.mkdir(parents=True)
+        input_paths = []
+        for name in ["unchanged.txt", "changed.txt"]:
+            input_file = output_root / name
+            input_file.write_text(name)
+            os.utime(input_file, ns=(1679079344833848000, 1679079344833848000))
+            input_paths.append(
+                ManifestPath(
+                    path=f"outputs/{name}",
+                    hash=hash_file(str(input_file), HashAlgorithm.XXH128),
+                    size=len(name),
+                    mtime=1679079344833848,
+                )
+            )
+        manifest = AssetManifest(
+            hash_alg=HashAlgorithm.XXH128,
+            paths=input_paths,  # type: ignore[arg-type]
+            total_size=sum(input_path.size for input_path in input_paths),
+        )
+        manifest_properties = ManifestProperties(
+            rootPath=str(local_root),
+            rootPathFormat=PathFormat.get_host_path_format(),
+            outputRelativeDirectories=["outputs"],
+        )
+        s3_settings = JobAttachmentS3Settings(s3BucketName="bucket", rootPrefix="root")
+        asset_sync._record_attachment_mtimes({str(local_root): manifest})
+
+        # WHEN
+        (output_root / "unchanged.txt").write_text("unchanged.txt")
+        (output_root / "changed.txt").write_text("changed contents")
+        output_files = asset_sync._get_output_files(
+            manifest_properties, s3_settings, local_root, tmp_path
+        )
+
+        # THEN
+        assert [output_file.rel_path for output_file in output_files] == ["outputs/changed.txt"]
+        assert (
+            output_files[0].file_mtime == (output_root / "changed.txt").stat().st_mtime_ns // 1000
+        )
+        output_manifest = asset_sync._generate_output_manifest(output_files)
+        assert output_manifest.paths[0].mtime == output_files[0].file_mtime
+
+    def test_sync_step_outputs(self, asset_sync: AssetSync) -> None:
+        """
+        Tests that the output manifests of the tasks of a step are merged into one output manifest per
+        asset root, which is uploaded to the step's output prefix.
+        """
+        # GIVEN
+        s3_settings = JobAttachmentS3Settings(s3BucketName="bucket", rootPrefix="root")
+        task_manifests = [
+            AssetManifest(
+                hash_alg=HashAlgorithm.XXH128,
+                paths=[
+                    ManifestPath(path="a.txt", hash=f"a{i}", size=1, mtime=1),
+                    ManifestPath(path=f"task{i}.txt", hash=f"b{i}", size=1, mtime=1),
+                ],
+                total_size=2,
+            )
+            for i in range(3)
+        ]
+
+        # WHEN
+        with patch(
+            f"{deadline.__package__}.job_attachments.asset_sync.get_output_manifests_by_asset_root",
+            return_value={"/tmp/root": task_manifests},
+        ) as mock_get_output_manifests, patch.object(
+            asset_sync.s3_uploader, "upload_bytes_to_s3"
+        ) as mock_upload_bytes:
+            manifest_keys = asset_sync.sync_step_outputs(s3_settings, "queue-1", "job-1", "step-1")
+
+        # THEN
+        assert mock_get_output_manifests.call_args.kwargs["use_step_manifests"] is False
+        assert len(manifest_keys) == 1
+        assert manifest_keys[0].startswith(
+            f"root/Manifests/{asset_sync.farm_id}/queue-1/job-1/step-1/StepOutputs/"
+        )
+        manifest_bytes, bucket, key = mock_upload_bytes.call_args.args
+        assert (bucket, key) == ("bucket", manifest_keys[0])
+        assert (
+            mock_upload_bytes.call_args.kwargs["extra_args"]["Metadata"]["asset-root"]
+            == "/tmp/root"
+        )
+        merged_manifest = decode_manifest(manifest_bytes.getvalue().decode("utf-8"))
+        assert sorted((path.path, path.hash) for path in merged_manifest.paths) == [
+            ("a.txt", "a2"),
+            ("task0.txt", "b0"),
+            ("task1.txt", "b1"),
+            ("task2.txt", "b2"),
+        ]
+
+    def test_get_output_files_with_s3_check_cache(
+        self, tmp_path: Path, asset_sync: AssetSync, client: MagicMock
+    ) -> None:
+        """
+        Tests that output files found in the S3 check cache are not checked for in S3, and that output files
+        found in S3 are recorded in the S3 check cache.
+        """
+        # GIVEN
+        local_root = tmp_path / "assetroot"
+        output_root = local_root / "outputs"
+        output_root.mkdir(parents=True)
+        for name in ("cached", "in_s3", "not_in_s3"):
+            (output_root / f"{name}.txt").write_text(name)
+        manifest_properties = ManifestProperties(
+            rootPath=str(local_root),
+            rootPathFormat=PathFormat.get_host_path_format(),
+            outputRelativeDirectories=["outputs"],
+        )
+        s3_settings = JobAttachmentS3Settings(s3BucketName="bucket", rootPrefix="root")
+
+        def head_object(Bucket, Key):
+            if Key != "root/Data/hash_in_s3.xxh128":
+                raise ClientError({"ResponseMetadata": {"HTTPStatusCode": 404}}, "HeadObject")
+
+        client.head_object.side_effect = head_object
+
+        # WHEN
+        with S3CheckCache(str(tmp_path / "cache"), bulk_mode=True) as s3_check_cache, patch(
+            f"{deadline.__package__}.job_attachments.asset_sync.hash_file",
+            side_effect=lambda file_path, _: f"hash_{Path(file_path).stem}",
+        ):
+            s3_check_cache.put_entry(
+                S3CheckCacheEntry(
+                    s3_key="bucket/root/Data/hash_cached.xxh128",
+                    last_seen_time=str(time.time()),
+                )
+            )
+            output_files = asset_sync._get_output_files(
+                manifest_properties, s3_settings, local_root, tmp_path, s3_check_cache
+            )
+
+            # THEN
+            assert {output_file.rel_path: output_file.in_s3 for output_file in output_files} == {
+                "outputs/cached.txt": True,
+                "outputs/in_s3.txt": True,
+                "outputs/not_in_s3.txt": False,
+            }
+            assert sorted(call.kwargs["Key"] for call in client.head_object.call_args_list) == [
+                "root/Data/hash_in_s3.xxh128",
+                "root/Data/hash_not_in_s3.xxh128",
+            ]
+            assert s3_check_cache.get_entry("bucket/root/Data/hash_in_s3.xxh128") is not None
+            assert s3_check_cache.get_entry("bucket/root/Data/hash_not_in_s3.xxh128") is None
+
+    def test_upload_output_files_to_s3(self, tmp_path: Path, asset_sync: AssetSync) -> None:
+        """
+        Tests that output files not in S3 are uploaded once per CAS key, small files before large files, and
+        that the CAS keys of the uploaded files are recorded in the S3 check cache.
+        """
+        # GIVEN
+        s3_settings = JobAttachmentS3Settings(s3BucketName="bucket", rootPrefix="root")
+        asset_sync.s3_uploader.small_file_threshold = 10
+
+        def make_output_file(name: str, file_size: int, in_s3: bool = False) -> OutputFile:
+            return OutputFile(
+                file_size=file_size,
+                file_hash=name,
+                rel_path=f"{name}.txt",
+                full_path=str(tmp_path / f"{name}.txt"),
+                s3_key=f"root/Data/{name}.xxh128",
+                in_s3=in_s3,
+                base_dir=str(tmp_path),
+            )
+
+        output_files = [make_output_file("large", 100)]
+        output_files.extend(make_output_file(f"small{i}", i) for i in range(10))
+        output_files.append(make_output_file("in_s3", 1, in_s3=True))
+        output_files.append(make_output_file("small0", 0))
+        output_files.append(make_output_file("skipped", 1))
+        uploaded_s3_keys: list[str] = []
+
+        def upload_file_to_s3(
+            local_path, s3_bucket, s3_upload_key, progress_tracker, base_dir_path
+        ):
+            uploaded_s3_keys.append(s3_upload_key)
+            return s3_upload_key != "root/Data/skipped.xxh128"
+
+        # WHEN
+        with S3CheckCache(str(tmp_path / "cache"), bulk_mode=True) as s3_check_cache, patch.object(
+            asset_sync.s3_uploader, "upload_file_to_s3", side_effect=upload_file_to_s3
+        ):
+            summary_statistics = asset_sync._upload_output_files_to_s3(
+                s3_settings, output_files, None, s3_check_cache
+            )
+
+            # THEN
+            assert sorted(uploaded_s3_keys[:-1]) == sorted(
+                [f"root/Data/small{i}.xxh128" for i in range(10)] + ["root/Data/skipped.xxh128"]
+            )
+            assert uploaded_s3_keys[-1] == "root/Data/large.xxh128"
+            assert summary_statistics.skipped_files == 2
+            assert s3_check_cache.get_entry("bucket/root/Data/large.xxh128") is not None
+            assert s3_check_cache.get_entry("bucket/root/Data/small9.xxh128") is not None
+            assert s3_check_cache.get_entry("bucket/root/Data/in_s3.xxh128") is None
+            assert s3_check_cache.get_entry("bucket/root/Data/skipped.xxh128") is None
+
+    def test_upload_output_files_to_s3_cancelled(
+        self, tmp_path: Path, asset_sync: AssetSync
+    ) -> None:
+        """
+        Tests that uploading output files raises an AssetSyncCancelledError when the progress callback
+        cancels the upload.
+        """
+        # GIVEN
+        output_file = tmp_path / "output.txt"
+        output_file.write_text("output")
+        output_files = [
+            OutputFile(
+                file_size=output_file.stat().st_size,
+                file_hash="hash",
+                rel_path="output.txt",
+                full_path=str(output_file),
+                s3_key="root/Data/hash.xxh128",
+                in_s3=False,
+                base_dir=str(tmp_path),
+            )
+        ]
+        s3_settings = JobAttachmentS3Settings(s3BucketName="bucket", rootPrefix="root")
+
+        # WHEN
+        with patch.object(asset_sync.s3_uploader, "upload_file_to_s3", return_value=True):
+            with pytest.raises(AssetSyncCancelledError):
+                asset_sync._upload_output_files_to_s3(
+                    s3_settings, output_files, MagicMock(return_value=False)
+                )
+
+    def _make_watched_attachments(self, session_dir: Path) -> Tuple[Attachments, Path]:
+        """Returns attachments with a single output directory, and the path of that output directory."""
+        attachments = Attachments(
+            manifests=[
+                ManifestProperties(
+                    rootPath="/watched/root",
+                    rootPathFormat=PathFormat.get_host_path_format(),
+                    outputRelativeDirectories=["outputs"],
+                )
+            ]
+        )
+        output_root = session_dir / _get_unique_dest_dir_name("/watched/root") / "outputs"
+        output_root.mkdir(parents=True)
+        return (attachments, output_root)
+
+    def test_poll_outputs(self, tmp_path: Path, asset_sync: AssetSync) -> None:
+        """
+        Tests that the output watcher only considers the new or modified output files that had the same size
+        and modification time for the given number of consecutive polls complete, and doesn't consider files
+        it uploaded again.
+        """
+        # GIVEN
+        attachments, output_root = self._make_watched_attachments(tmp_path)
+        complete_file = output_root / "complete.txt"
+        complete_file.write_text("complete")
+        growing_file = output_root / "sub_dir" / "growing.txt"
+        growing_file.parent.mkdir()
+        growing_file.write_text("growing")
+        input_file = output_root / "input.txt"
+        input_file.write_text("input")
+        asset_sync.synced_assets_mtime.set(
+            str(output_root.parent), "outputs/input.txt", input_file.stat().st_mtime_ns
+        )
+        observed_outputs: Dict[str, Tuple[int, int, int]] = {}
+
+        def poll() -> list[str]:
+            complete_outputs = asset_sync._poll_outputs(
+                attachments, tmp_path, {}, 2, observed_outputs
+            )
+            for _, _, session_root in complete_outputs:
+                assert session_root == tmp_path
+            return sorted(file_path for file_path, _, _ in complete_outputs)
+
+        # WHEN
+        first_poll = poll()
+        with open(growing_file, "a") as file:
+            file.write(" more")
+        second_poll = poll()
+        third_poll = poll()
+        complete_stat = complete_file.stat()
+        asset_sync._watched_outputs_uploaded[str(complete_file)] = (
+            complete_stat.st_size,
+            complete_stat.st_mtime_ns,
+            "hash",
+            "key",
+        )
+        fourth_poll = poll()
+
+        # THEN
+        assert first_poll == []
+        assert second_poll == [str(complete_file)]
+        assert third_poll == sorted([str(complete_file), str(growing_file)])
+        assert fourth_poll == [str(growing_file)]
+        assert len(asset_sync.synced_assets_mtime) == 1
+
+    def test_output_watcher(self, tmp_path: Path, asset_sync: AssetSync, client: MagicMock) -> None:
+        """
+        Tests that the output watcher uploads complete output files while it's running, and that the output
+        files it uploaded are neither hashed nor checked for in S3 again by the final output sync, unless they
+        changed since.
+        """
+        # GIVEN
+        attachments, output_root = self._make_watched_attachments(tmp_path)
+        local_root = output_root.parent
+        for name in ("early", "changed"):
+            (output_root / f"{name}.txt").write_text(name)
+        s3_settings = JobAttachmentS3Settings(s3BucketName="bucket", rootPrefix="root")
+        client.head_object.side_effect = ClientError(
+            {"ResponseMetadata": {"HTTPStatusCode": 404}}, "HeadObject"
+        )
+        uploaded_paths: list[Path] = []
+
+        def upload_file_to_s3(
+            local_path, s3_bucket, s3_upload_key, progress_tracker, base_dir_path
+        ):
+            uploaded_paths.append(local_path)
+            return True
+
+        with patch(
+            f"{deadline.__package__}.job_attachments.asset_sync.hash_file",
+            side_effect=lambda file_path, _: f"hash_{Path(file_path).stem}",
+        ) as mock_hash_file, patch.object(
+            asset_sync.s3_uploader, "upload_file_to_s3", side_effect=upload_file_to_s3
+        ):
+            # WHEN
+            asset_sync.start_output_watcher(
+                s3_settings, attachments, tmp_path, poll_interval=0.01, stable_polls=2
+            )
+            try:
+                deadline_time = time.monotonic() + 10
+                while len(asset_sync._watched_outputs_uploaded) < 2:
+                    assert (
+                        time.monotonic() < deadline_time
+                    ), "Output watcher didn't upload the outputs"
+                    time.sleep(0.01)
+            finally:
+                asset_sync.stop_output_watcher()
+
+            # THEN
+            assert sorted(path.name for path in uploaded_paths) == ["changed.txt", "early.txt"]
+
+            # WHEN
+            (output_root / "changed.txt").write_text("changed later")
+            (output_root / "late.txt").write_text("late")
+            mock_hash_file.reset_mock()
+            client.head_object.reset_mock()
+            output_files = asset_sync._get_output_files(
+                attachments.manifests[0], s3_settings, local_root, tmp_path
+            )
+
+        # THEN
+        assert {output_file.rel_path: output_file.in_s3 for output_file in output_files} == {
+            "outputs/early.txt": True,
+            "outputs/changed.txt": False,
+            "outputs/late.txt": False,
+        }
+        assert sorted(Path(call.args[0]).name for call in mock_hash_file.call_args_list) == [
+            "changed.txt",
+            "late.txt",
+        ]
+        assert client.head_object.call_count == 2
+
+    def test_upload_watched_output_changed_while_uploading(
+        self, tmp_path: Path, asset_sync: AssetSync, client: MagicMock
+    ) -> None:
+        """
+        Tests that an output file that changes while the output watcher uploads it doesn't change the
+        uploaded contents, which are those of the snapshot that was hashed.
+        """
+        # GIVEN
+        output_file = tmp_path / "output.txt"
+        output_file.write_text("output")
+        output_stat = output_file.stat()
+        s3_settings = JobAttachmentS3Settings(s3BucketName="bucket", rootPrefix="root")
+        client.head_object.side_effect = ClientError(
+            {"ResponseMetadata": {"HTTPStatusCode": 404}}, "HeadObject"
+        )
+        uploaded_contents: Dict[str, str] = {}
+
+        def upload_file_to_s3(
+            local_path, s3_bucket, s3_upload_key, progress_tracker, base_dir_path
+        ):
+            output_file.write_text("output, still being written")
+            uploaded_contents[s3_upload_key] = local_path.read_text()
+            return True
+
+        # WHEN
+        with patch.object(
+            asset_sync.s3_uploader, "upload_file_to_s3", side_effect=upload_file_to_s3
+        ) as mock_upload_file_to_s3:
+            asset_sync._upload_watched_output(
+                str(output_file),
+                (output_stat.st_size, output_stat.st_mtime_ns),
+                tmp_path,
+                s3_settings,
+                None,
+            )
+
+        # THEN
+        mock_upload_file_to_s3.assert_called_once()
+        expected_hash = hash_data(b"output", asset_sync.hash_alg)
+        expected_key = f"root/Data/{expected_hash}.{asset_sync.hash_alg.value}"
+        assert uploaded_contents == {expected_key: "output"}
+        assert asset_sync._watched_outputs_uploaded == {
+            str(output_file): (
+                output_stat.st_size,
+                output_stat.st_mtime_ns,
+                expected_hash,
+                expected_key,
+            )
+        }
+
+    def test_upload_watched_output_changed_while_copying(
+        self, tmp_path: Path, asset_sync: AssetSync
+    ) -> None:
+        """
+        Tests that an output file that changes while the output watcher copies it to a snapshot is neither
+        uploaded nor recorded as uploaded.
+        """
+        # GIVEN
+        output_file = tmp_path / "output.txt"
+        output_file.write_text("output")
+        output_stat = output_file.stat()
+        s3_settings = JobAttachmentS3Settings(s3BucketName="bucket", rootPrefix="root")
+
+        real_copyfile = shutil.copyfile
+
+        def copyfile(source, destination):
+            real_copyfile(source, destination)
+            output_file.write_text("output, still being written")
+
+        # WHEN
+        with patch(
+            f"{deadline.__package__}.job_attachments.asset_sync._clone_file", return_value=False
+        ), patch(
+            f"{deadline.__package__}.job_attachments.asset_sync.shutil.copyfile",
+            side_effect=copyfile,
+        ), patch.object(
+            asset_sync.s3_uploader, "upload_file_to_s3"
+        ) as mock_upload_file_to_s3:
+            asset_sync._upload_watched_output(
+                str(output_file),
+                (output_stat.st_size, output_stat.st_mtime_ns),
+                tmp_path,
+                s3_settings,
+                None,
+            )
+
+        # THEN
+        mock_upload_file_to_s3.assert_not_called()
+        assert asset_sync._watched_outputs_uploaded == {}
+
     @pytest.mark.parametrize(
         ("job", "expected_settings"),
         [(Job(jobId="job-98765567890123456789012345678901"), None), (None, None)],
@@ -890,7 +1501,7 @@ class TestAssetSync:
             f"{deadline.__package__}.job_attachments.asset_sync._get_unique_dest_dir_name",
             side_effect=[dest_dir],
         ), patch.object(
-            Path, "stat", MagicMock(st_mtime_ns=1234512345123451)
+            Path, "stat", return_value=MagicMock(st_mtime_ns=1234512345123451)
         ):
             mock_on_downloading_files = MagicMock(return_value=True)
 
@@ -924,6 +1535,7 @@ class TestAssetSync:
                 session=ANY,
                 on_downloading_files=mock_on_downloading_files,
                 logger=getLogger("deadline.job_attachments"),
+                object_cache=None,
             )
 
     @pytest.mark.parametrize(
@@ -977,7 +1589,7 @@ class TestAssetSync:
         ) as mock_mount_vfs, patch(
             "sys.platform", "linux"
         ), patch.object(
-            Path, "stat", MagicMock(st_mtime_ns=1234512345123451)
+            Path, "stat", return_value=MagicMock(st_mtime_ns=1234512345123451)
         ):
             mock_on_downloading_files = MagicMock(return_value=True)
 
@@ -1154,7 +1766,7 @@ class TestAssetSync:
         ), patch(
             f"{deadline.__package__}.job_attachments.asset_sync.VFSProcessManager.find_vfs"
         ), patch.object(
-            Path, "stat", MagicMock(st_mtime_ns=1234512345123451)
+            Path, "stat", return_value=MagicMock(st_mtime_ns=1234512345123451)
         ):
             mock_on_downloading_files = MagicMock(return_value=True)
 
@@ -1182,6 +1794,105 @@ class TestAssetSync:
                 }
             ]
 
+    def test_attachment_sync_inputs_with_object_cache(
+        self,
+        tmp_path: Path,
+        default_queue: Queue,
+        default_job: Job,
+        default_job_attachment_s3_settings: JobAttachmentS3Settings,
+        test_manifest_one: dict,
+    ):
+        """
+        Asserts that the inputs are downloaded through the object cache of the AssetSync, which is
+        evicted from once the inputs are downloaded.
+        """
+        # GIVEN
+        object_cache = ObjectCache(str(tmp_path / "cache"))
+        asset_sync = AssetSync(
+            "farm-1234", boto3_session=boto3.Session(), object_cache=object_cache
+        )
+        test_manifest = decode_manifest(json.dumps(test_manifest_one))
+        assert default_job.attachments
+
+        # WHEN
+        with patch(
+            f"{deadline.__package__}.job_attachments.asset_sync.get_manifest_from_s3",
+            return_value=test_manifest,
+        ), patch(
+            f"{deadline.__package__}.job_attachments.asset_sync.download_files_from_manifests",
+            side_effect=[DownloadSummaryStatistics()],
+        ) as mock_download_files_from_manifests, patch.object(
+            object_cache, "evict"
+        ) as mock_evict, patch.object(
+            Path, "stat", return_value=MagicMock(st_mtime_ns=1234512345123451)
+        ):
+            asset_sync.attachment_sync_inputs(
+                default_job_attachment_s3_settings,
+                default_job.attachments,
+                default_queue.queueId,
+                default_job.jobId,
+                tmp_path,
+            )
+
+        # THEN
+        assert mock_download_files_from_manifests.call_args.kwargs["object_cache"] is object_cache
+        mock_evict.assert_called_once_with()
+
+    def test_attachment_sync_inputs_with_manifest_cache(
+        self,
+        tmp_path: Path,
+        default_queue: Queue,
+        default_job: Job,
+        default_job_attachment_s3_settings: JobAttachmentS3Settings,
+        test_manifest_one: dict,
+    ):
+        """
+        Asserts that the input manifests are fetched through the manifest cache in the manifest cache
+        directory of the AssetSync.
+        """
+        # GIVEN
+        asset_sync = AssetSync(
+            "farm-1234",
+            boto3_session=boto3.Session(),
+            manifest_cache_dir=str(tmp_path / "cache"),
+        )
+        test_manifest = decode_manifest(json.dumps(test_manifest_one))
+        assert default_job.attachments
+
+        # WHEN
+        with patch(
+            f"{deadline.__package__}.job_attachments.asset_sync.get_manifest_from_s3",
+            return_value=test_manifest,
+        ) as mock_get_manifest_from_s3, patch(
+            f"{deadline.__package__}.job_attachments.asset_sync.download_files_from_manifests",
+            side_effect=[DownloadSummaryStatistics()],
+        ), patch.object(
+            Path, "stat", return_value=MagicMock(st_mtime_ns=1234512345123451)
+        ):
+            asset_sync.attachment_sync_inputs(
+                default_job_attachment_s3_settings,
+                default_job.attachments,
+                default_queue.queueId,
+                default_job.jobId,
+                tmp_path,
+            )
+
+        # THEN
+        manifest_cache = mock_get_manifest_from_s3.call_args.kwargs["manifest_cache"]
+        assert isinstance(manifest_cache, ManifestCache)
+        assert manifest_cache.cache_dir == str(tmp_path / "cache" / "manifest_cache.db")
+
+    def test_init_cache_dirs_default_to_config(self, farm_id: str, fresh_deadline_config):
+        """
+        Asserts that the manifest cache and S3 check cache of an AssetSync are in the cache directory of
+        the configuration unless other directories are given, so that workers use them by default.
+        """
+        asset_sync = AssetSync(farm_id)
+
+        assert asset_sync.manifest_cache_dir == config_file.get_cache_directory()
+        assert asset_sync.s3_check_cache_dir == config_file.get_cache_directory()
+        assert asset_sync.manifest_cache_max_size_bytes == 256 * 1024 * 1024
+
     @pytest.mark.parametrize(
         ("job_fixture_name"),
         [
@@ -1282,7 +1993,7 @@ class TestAssetSync:
             f"{deadline.__package__}.job_attachments.asset_sync.get_output_manifests_by_asset_root",
             side_effect=[{step_output_root: {}}],
         ), patch.object(
-            Path, "stat", MagicMock(st_mtime_ns=1234512345123451)
+            Path, "stat", return_value=MagicMock(st_mtime_ns=1234512345123451)
         ):
             mock_on_downloading_files = MagicMock(return_value=True)
 
@@ -1347,7 +2058,7 @@ class TestAssetSync:
         # WHEN
         with patch(
             f"{deadline.__package__}.job_attachments.asset_sync.get_manifest_from_s3",
-            return_value=json.dumps(test_manifest_one),
+            return_value=decode_manifest(json.dumps(test_manifest_one)),
         ), patch(
             f"{deadline.__package__}.job_attachments.asset_sync.download_files_from_manifests",
             side_effect=[DownloadSummaryStatistics()],
@@ -1449,7 +2160,7 @@ class TestAssetSync:
             f"{deadline.__package__}.job_attachments.asset_sync._get_unique_dest_dir_name",
             side_effect=[dest_dir],
         ), patch.object(
-            Path, "stat", MagicMock(st_mtime_ns=1234512345123451)
+            Path, "stat", return_value=MagicMock(st_mtime_ns=1234512345123451)
         ):
             mock_on_downloading_files = MagicMock(return_value=True)
 
@@ -1596,7 +2307,7 @@ class TestAssetSync:
             f"{deadline.__package__}.job_attachments.asset_sync._get_unique_dest_dir_name",
             side_effect=[dest_dir],
         ), patch.object(
-            Path, "stat", MagicMock(st_mtime_ns=1234512345123451)
+            Path, "stat", return_value=MagicMock(st_mtime_ns=1234512345123451)
         ):
             mock_on_downloading_files = MagicMock(return_value=True)
 
@@ -1632,6 +2343,7 @@ class TestAssetSync:
                 session=ANY,
                 on_downloading_files=mock_on_downloading_files,
                 logger=getLogger("deadline.job_attachments"),
+                object_cache=None,
             )
 
     @pytest.mark.parametrize(
@@ -1685,7 +2397,7 @@ class TestAssetSync:
         ) as mock_mount_vfs, patch(
             "sys.platform", "linux"
         ), patch.object(
-            Path, "stat", MagicMock(st_mtime_ns=1234512345123451)
+            Path, "stat", return_value=MagicMock(st_mtime_ns=1234512345123451)
         ):
             mock_on_downloading_files = MagicMock(return_value=True)
 
@@ -3,11 +3,15 @@
 """Tests for downloading files from the Job Attachment CAS."""
 from __future__ import annotations
 
+import concurrent.futures
 import os
 import shutil
+import threading
+import time
 
 from collections import Counter
 from dataclasses import dataclass, fields
+from datetime import datetime, timedelta
 from io import BytesIO
 import json
 from pathlib import Path
@@ -24,16 +28,23 @@ import pytest
 from moto import mock_aws
 
 import deadline
-from deadline.job_attachments.asset_manifests import HashAlgorithm
+from deadline.job_attachments._aws.aws_clients import get_s3_client
+from deadline.job_attachments.asset_manifests import HashAlgorithm, hash_data
 from deadline.job_attachments.asset_manifests.base_manifest import (
     BaseAssetManifest,
     BaseManifestPath as BaseManifestPath,
 )
+from deadline.job_attachments.asset_manifests.compact_manifest import (
+    CompactManifestPaths,
+    compact_manifest,
+)
 from deadline.job_attachments.asset_manifests.v2023_03_03 import (
     ManifestPath as ManifestPathv2023_03_03,
 )
 from deadline.job_attachments.asset_manifests.versions import ManifestVersion
+from deadline.job_attachments.caches import ManifestCache, ObjectCache
 from deadline.job_attachments.download import (
+    S3_DOWNLOAD_SMALL_OBJECT_MAX_SIZE,
     OutputDownloader,
     download_file,
     download_files_from_manifests,
@@ -42,18 +53,26 @@ from deadline.job_attachments.download import (
     get_job_input_paths_by_asset_root,
     get_job_output_paths_by_asset_root,
     get_manifest_from_s3,
+    get_output_manifests_by_asset_root,
     handle_existing_vfs,
     mount_vfs_from_manifests,
     merge_asset_manifests,
+    _AdaptiveConcurrencyLimiter,
+    _batch_file_groups,
+    _download_file_group,
+    _download_files_parallel,
     _ensure_paths_within_directory,
-    _get_asset_root_from_s3,
+    _get_asset_root_from_metadata,
     _get_tasks_manifests_keys_from_s3,
+    _run_manifest_requests_concurrently,
+    _separate_file_groups_by_size,
     VFS_CACHE_REL_PATH_IN_SESSION,
     VFS_MANIFEST_FOLDER_IN_SESSION,
     VFS_MANIFEST_FOLDER_PERMISSIONS,
     VFS_LOGS_FOLDER_IN_SESSION,
 )
 from deadline.job_attachments.exceptions import (
+    AssetSyncCancelledError,
     AssetSyncError,
     JobAttachmentsError,
     JobAttachmentsS3ClientError,
@@ -62,6 +81,7 @@ from deadline.job_attachments.exceptions import (
 )
 from deadline.job_attachments.models import (
     Attachments,
+    DuplicateFileMode,
     FileConflictResolution,
     Job,
     JobAttachmentS3Settings,
@@ -72,8 +92,9 @@ from deadline.job_attachments.progress_tracker import (
     DownloadSummaryStatistics,
     ProgressReportMetadata,
     ProgressStatus,
+    ProgressTracker,
 )
-from deadline.job_attachments.asset_manifests.decode import decode_manifest
+from deadline.job_attachments.asset_manifests.decode import decode_manifest, validate_manifest
 
 from deadline.job_attachments.os_file_permission import (
     PosixFileSystemPermissionSettings,
@@ -92,6 +113,9 @@ class Manifest:
     manifests: bytes
 
 
+# The size of a file that is downloaded through the TransferManager, rather than with a single GetObject.
+LARGE_FILE_SIZE = S3_DOWNLOAD_SMALL_OBJECT_MAX_SIZE + 1
+
 MANIFESTS_v2022_03_03: List[Manifest] = [
     Manifest(
         "job-1/step-1/task-1-1/session-action-9/manifest1v2023-03-03_output",
@@ -197,7 +221,7 @@ def assert_download_task_output(
     Assert that the expected files are downloaded when download_job_output is called with a task id.
     """
     with patch(
-        f"{deadline.__package__}.job_attachments.download._get_asset_root_from_s3",
+        f"{deadline.__package__}.job_attachments.download._get_asset_root_from_metadata",
         return_value=str(tmp_path.resolve()),
     ):
         mock_on_downloading_files = MagicMock(return_value=True)
@@ -244,7 +268,7 @@ def assert_download_step_output(
     Assert that the expected files are downloaded when download_job_output is called with a step id.
     """
     with patch(
-        f"{deadline.__package__}.job_attachments.download._get_asset_root_from_s3",
+        f"{deadline.__package__}.job_attachments.download._get_asset_root_from_metadata",
         return_value=str(tmp_path.resolve()),
     ):
         mock_on_downloading_files = MagicMock(return_value=True)
@@ -291,7 +315,7 @@ def assert_download_job_output(
     Assert that the expected files are downloaded when download_job_output is called.
     """
     with patch(
-        f"{deadline.__package__}.job_attachments.download._get_asset_root_from_s3",
+        f"{deadline.__package__}.job_attachments.download._get_asset_root_from_metadata",
         return_value=str(tmp_path.resolve()),
     ):
         mock_on_downloading_files = MagicMock(return_value=True)
@@ -339,7 +363,7 @@ def assert_download_files_in_directory(
     Assert that the expected files are downloaded when download_files_in_directory is called.
     """
     with patch(
-        f"{deadline.__package__}.job_attachments.download._get_asset_root_from_s3",
+        f"{deadline.__package__}.job_attachments.download._get_asset_root_from_metadata",
         return_value=str(tmp_path.resolve()),
     ):
         mock_on_downloading_files = MagicMock(return_value=True)
@@ -498,7 +522,7 @@ def assert_get_job_output_paths_by_asset_root(
     Assert that get_job_output_paths_by_asset_root returns a list of (hash, path) pairs of all output files.
     """
     with patch(
-        f"{deadline.__package__}.job_attachments.download._get_asset_root_from_s3",
+        f"{deadline.__package__}.job_attachments.download._get_asset_root_from_metadata",
         return_value="/test",
     ):
         paths_by_root = get_job_output_paths_by_asset_root(
@@ -524,7 +548,7 @@ def assert_get_job_output_paths_by_asset_root_when_no_asset_root_throws_error(
     Assert that get_job_output_paths_by_asset_root raises MissingAssetRootError when fail to get manifest.
     """
     with patch(
-        f"{deadline.__package__}.job_attachments.download._get_asset_root_from_s3",
+        f"{deadline.__package__}.job_attachments.download._get_asset_root_from_metadata",
         return_value=None,
     ), pytest.raises(MissingAssetRootError) as raised_err:
         get_job_output_paths_by_asset_root(s3_settings, farm_id, queue_id, "job-1")
@@ -545,7 +569,7 @@ def assert_get_job_input_output_paths_by_asset_root(
     asset files and output files.
     """
     with patch(
-        f"{deadline.__package__}.job_attachments.download._get_asset_root_from_s3",
+        f"{deadline.__package__}.job_attachments.download._get_asset_root_from_metadata",
         return_value="/tmp",
     ):
         paths_by_root = get_job_input_output_paths_by_asset_root(
@@ -1169,7 +1193,7 @@ class TestFullDownload:
         tmp_path: Path,
     ):
         with patch(
-            f"{deadline.__package__}.job_attachments.download._get_asset_root_from_s3",
+            f"{deadline.__package__}.job_attachments.download._get_asset_root_from_metadata",
             return_value=str(tmp_path.resolve()),
         ):
             output_downloader = OutputDownloader(
@@ -1203,7 +1227,7 @@ class TestFullDownload:
     @mock_aws
     def test_OutputDownloader_set_root_path(self, farm_id, queue_id, tmp_path: Path):
         with patch(
-            f"{deadline.__package__}.job_attachments.download._get_asset_root_from_s3",
+            f"{deadline.__package__}.job_attachments.download._get_asset_root_from_metadata",
             return_value=str(tmp_path.resolve()),
         ):
             output_downloader = OutputDownloader(
@@ -1251,7 +1275,7 @@ class TestFullDownload:
         resolving the symlink target, the absolute path with ".." removed is stored.
         """
         with patch(
-            f"{deadline.__package__}.job_attachments.download._get_asset_root_from_s3",
+            f"{deadline.__package__}.job_attachments.download._get_asset_root_from_metadata",
             return_value=str(tmp_path.resolve()),
         ):
             output_downloader = OutputDownloader(
@@ -1289,7 +1313,7 @@ class TestFullDownload:
         Assert a ValueError is thrown when given a non-existent root path.
         """
         with patch(
-            f"{deadline.__package__}.job_attachments.download._get_asset_root_from_s3",
+            f"{deadline.__package__}.job_attachments.download._get_asset_root_from_metadata",
             return_value=str(tmp_path.resolve()),
         ):
             output_downloader = OutputDownloader(
@@ -1333,7 +1357,7 @@ class TestFullDownload:
         ]
 
         with patch(
-            f"{deadline.__package__}.job_attachments.download._get_asset_root_from_s3",
+            f"{deadline.__package__}.job_attachments.download._get_asset_root_from_metadata",
             return_value=str(tmp_path.resolve()),
         ):
             output_downloader = OutputDownloader(
@@ -1396,7 +1420,7 @@ class TestFullDownload:
         ]
 
         with patch(
-            f"{deadline.__package__}.job_attachments.download._get_asset_root_from_s3",
+            f"{deadline.__package__}.job_attachments.download._get_asset_root_from_metadata",
             return_value=str(tmp_path.resolve()),
         ):
             output_downloader = OutputDownloader(
@@ -1475,7 +1499,7 @@ class TestFullDownload:
         expected_files_after_create_copy.extend(expected_files)
 
         with patch(
-            f"{deadline.__package__}.job_attachments.download._get_asset_root_from_s3",
+            f"{deadline.__package__}.job_attachments.download._get_asset_root_from_metadata",
             return_value=str(tmp_path.resolve()),
         ):
             output_downloader = OutputDownloader(
@@ -1505,7 +1529,7 @@ class TestFullDownload:
         self, farm_id, queue_id, tmp_path: Path
     ):
         with patch(
-            f"{deadline.__package__}.job_attachments.download._get_asset_root_from_s3",
+            f"{deadline.__package__}.job_attachments.download._get_asset_root_from_metadata",
             return_value=str(tmp_path.resolve()),
         ):
             output_downloader = OutputDownloader(
@@ -1545,7 +1569,7 @@ class TestFullDownload:
         ]
 
         with patch(
-            f"{deadline.__package__}.job_attachments.download._get_asset_root_from_s3",
+            f"{deadline.__package__}.job_attachments.download._get_asset_root_from_metadata",
             return_value="/test_root",
         ):
             output_downloader = OutputDownloader(
@@ -1713,69 +1737,159 @@ class TestFullDownload:
         ), pytest.raises((PathOutsideDirectoryError, ValueError)):
             output_downloader.download_job_output()
 
+    @pytest.mark.parametrize(
+        ("metadata", "expected_asset_root"),
+        [
+            ({"asset-root": "/tmp/root"}, "/tmp/root"),
+            ({"asset-root-json": '"/tmp/r\\u00f6\\u00f6t"'}, "/tmp/r\u00f6\u00f6t"),
+            ({"file-system-location-name": "Location"}, None),
+        ],
+    )
+    def test_get_asset_root_from_metadata(self, metadata, expected_asset_root):
+        assert _get_asset_root_from_metadata(metadata) == expected_asset_root
+
     @mock_aws
-    def test_get_asset_root_from_s3_error_message_on_not_found(self):
+    def test_get_output_manifests_by_asset_root_gets_each_manifest_once(
+        self, farm_id: str, queue_id: str
+    ):
         """
-        Test if the function raises the expected exception with a proper error message
-        when S3 client's head_object returns a Not Found (404) error.
+        Test that the output manifests are each downloaded with a single GetObject request, which
+        also returns the asset root from their metadata, without any HeadObject requests.
         """
-        s3_client = boto3.client("s3")
-        stubber = Stubber(s3_client)
-        stubber.add_client_error(
-            "head_object",
-            service_error_code="NotFound",
-            service_message="Not Found",
-            http_status_code=404,
-        )
+        s3_client = get_s3_client(session=None)
+        manifest_prefix = (
+            f"{self.job_attachment_settings.rootPrefix}/Manifests/{farm_id}/{queue_id}/job-2/step-1"
+        )
+        asset_roots = ["/tmp/root", "/tmp/r\u00f6\u00f6t"]
+        for i in range(20):
+            asset_root = asset_roots[i % 2]
+            s3_client.put_object(
+                Bucket=self.job_attachment_settings.s3BucketName,
+                Key=f"{manifest_prefix}/task-{i}/session-action-1/manifest_output",
+                Body=(
+                    b'{"hashAlg":"xxh128","manifestVersion":"2023-03-03",'
+                    b'"paths":[{"hash":"test%d","mtime":1234000000,"path":"test%d.txt","size":1}],'
+                    b'"totalSize":1}' % (i, i)
+                ),
+                Metadata=(
+                    {"asset-root": asset_root}
+                    if asset_root.isascii()
+                    else {"asset-root-json": json.dumps(asset_root, ensure_ascii=True)}
+                ),
+            )
+        request_counts: Counter = Counter()
 
-        with stubber, patch(
-            f"{deadline.__package__}.job_attachments.download.get_s3_client", return_value=s3_client
-        ):
-            with pytest.raises(JobAttachmentsS3ClientError) as err:
-                _get_asset_root_from_s3("not/existed/test.txt", "test-bucket")
-            assert isinstance(err.value.__cause__, ClientError)
-            assert (
-                err.value.__cause__.response["ResponseMetadata"]["HTTPStatusCode"] == 404  # type: ignore[attr-defined]
+        def count_request(model, **kwargs):
+            request_counts[model.name] += 1
+
+        s3_client.meta.events.register("before-call.s3", count_request)
+        try:
+            outputs = get_output_manifests_by_asset_root(
+                self.job_attachment_settings, farm_id, queue_id, "job-2", step_id="step-1"
             )
-            assert (
-                "Error checking if object exists in bucket 'test-bucket', Target key or prefix: 'not/existed/test.txt', "
-                "HTTP Status Code: 404, Not found. "
-            ) in str(err.value)
+        finally:
+            s3_client.meta.events.unregister("before-call.s3", count_request)
+        assert request_counts == {"ListObjectsV2": 1, "GetObject": 20}
+        assert sorted(outputs.keys()) == sorted(asset_roots)
+        # The manifests are returned in the order of their keys.
+        assert [manifest.paths[0].path for manifest in outputs[asset_roots[0]]] == [
+            f"test{i}.txt" for i in sorted(range(0, 20, 2), key=lambda i: f"task-{i}/")
+        ]
 
     @mock_aws
-    def test_get_asset_root_from_s3_error_message_on_timeout(self):
+    def test_get_output_manifests_by_asset_root_with_manifest_cache(
+        self, farm_id: str, queue_id: str, tmp_path: Path
+    ):
         """
-        Test that the appropriate error is raised when a ReadTimeoutError occurs
-        during an S3 client's head_object call.
+        Test that the output manifests in the manifest cache aren't downloaded again, unless they
+        were overwritten since they were cached. The manifests downloaded from S3 are validated
+        against their schema, while the cached manifests aren't validated again.
         """
-        mock_s3_client = MagicMock()
-        mock_s3_client.head_object.side_effect = ReadTimeoutError(endpoint_url="test_url")
+        s3_client = get_s3_client(session=None)
+        manifest_prefix = (
+            f"{self.job_attachment_settings.rootPrefix}/Manifests/{farm_id}/{queue_id}/job-2/step-1"
+        )
+
+        def put_manifest(i: int, size: int) -> None:
+            s3_client.put_object(
+                Bucket=self.job_attachment_settings.s3BucketName,
+                Key=f"{manifest_prefix}/task-{i}/session-action-1/manifest_output",
+                Body=(
+                    b'{"hashAlg":"xxh128","manifestVersion":"2023-03-03",'
+                    b'"paths":[{"hash":"test%d","mtime":1234000000,"path":"test%d.txt","size":%d}],'
+                    b'"totalSize":%d}' % (i, i, size, size)
+                ),
+                Metadata={"asset-root": "/tmp/root"},
+            )
 
-        with patch(
-            f"{deadline.__package__}.job_attachments.download.get_s3_client",
-            return_value=mock_s3_client,
-        ):
-            with pytest.raises(AssetSyncError) as exc:
-                _get_asset_root_from_s3("test-key", "test-bucket")
-            assert isinstance(exc.value.__cause__, BotoCoreError)
-            assert (
-                "An issue occurred with AWS service request while checking for the existence of an object in the S3 bucket: "
-                'Read timeout on endpoint URL: "test_url"\n'
-                "This could be due to temporary issues with AWS, internet connection, or your AWS credentials. "
-                "Please verify your credentials and network connection. If the problem persists, try again later"
-                " or contact support for further assistance."
-            ) in str(exc.value)
+        for i in range(3):
+            put_manifest(i, size=1)
+        request_counts: Counter = Counter()
+
+        def count_request(model, **kwargs):
+            request_counts[model.name] += 1
+
+        def get_sizes() -> list[int]:
+            with ManifestCache(str(tmp_path)) as manifest_cache:
+                outputs = get_output_manifests_by_asset_root(
+                    self.job_attachment_settings,
+                    farm_id,
+                    queue_id,
+                    "job-2",
+                    step_id="step-1",
+                    manifest_cache=manifest_cache,
+                )
+            return [manifest.totalSize for manifest in outputs["/tmp/root"]]  # type: ignore[attr-defined]
+
+        s3_client.meta.events.register("before-call.s3", count_request)
+        try:
+            with patch(
+                f"{deadline.__package__}.job_attachments.asset_manifests.decode.validate_manifest",
+                wraps=validate_manifest,
+            ) as mock_validate_manifest:
+                assert get_sizes() == [1, 1, 1]
+                assert request_counts == {"ListObjectsV2": 1, "GetObject": 3}
+                assert mock_validate_manifest.call_count == 3
+
+                request_counts.clear()
+                mock_validate_manifest.reset_mock()
+                assert get_sizes() == [1, 1, 1]
+                assert request_counts == {"ListObjectsV2": 1}
+                mock_validate_manifest.assert_not_called()
+
+                put_manifest(1, size=5)
+                request_counts.clear()
+                assert get_sizes() == [1, 5, 1]
+                assert request_counts == {"ListObjectsV2": 1, "GetObject": 1}
+                assert mock_validate_manifest.call_count == 1
+        finally:
+            s3_client.meta.events.unregister("before-call.s3", count_request)
+
+    def test_run_manifest_requests_concurrently(self):
+        """
+        Test that the results are returned in the order of the keys, and that a failed request
+        raises its exception.
+        """
+        assert _run_manifest_requests_concurrently(str.upper, ["a", "b", "c"]) == ["A", "B", "C"]
+
+        def get_manifest(key: str) -> str:
+            if key == "b":
+                raise AssetSyncError("failed")
+            return key
+
+        with pytest.raises(AssetSyncError, match="failed"):
+            _run_manifest_requests_concurrently(get_manifest, ["a", "b", "c"])
 
     @mock_aws
     def test_get_manifest_from_s3_error_message_on_access_denied(self):
         """
         Test if the function raises the expected exception with a proper error message
-        when S3 client's download_fileobj returns an Access Denied (403) error.
+        when S3 client's get_object returns an Access Denied (403) error.
         """
         s3_client = boto3.client("s3")
         stubber = Stubber(s3_client)
         stubber.add_client_error(
-            "head_object",
+            "get_object",
             service_error_code="AccessDenied",
             service_message="Access Denied",
             http_status_code=403,
@@ -1799,10 +1913,10 @@ class TestFullDownload:
     def test_get_manifest_from_s3_error_message_on_timeout(self):
         """
         Test that the appropriate error is raised when a ReadTimeoutError occurs
-        during an S3 client's download_fileobj call.
+        during an S3 client's get_object call.
         """
         mock_s3_client = MagicMock()
-        mock_s3_client.download_fileobj.side_effect = ReadTimeoutError(endpoint_url="test_url")
+        mock_s3_client.get_object.side_effect = ReadTimeoutError(endpoint_url="test_url")
 
         with patch(
             f"{deadline.__package__}.job_attachments.download.get_s3_client",
@@ -1878,6 +1992,79 @@ class TestFullDownload:
                 " or contact support for further assistance."
             ) in str(exc.value)
 
+    @pytest.mark.parametrize(
+        ("step_manifest_minutes", "use_step_manifests", "expected_step_1_keys"),
+        [
+            pytest.param(
+                10,
+                True,
+                ["step-1/StepOutputs/a_output", "step-1/StepOutputs/b_output"],
+                id="up_to_date",
+            ),
+            pytest.param(
+                2,
+                True,
+                [
+                    "step-1/task-1/session-action-1/a_output",
+                    "step-1/task-2/session-action-2/a_output",
+                ],
+                id="outdated",
+            ),
+            pytest.param(
+                10,
+                False,
+                [
+                    "step-1/task-1/session-action-1/a_output",
+                    "step-1/task-2/session-action-2/a_output",
+                ],
+                id="not_used",
+            ),
+        ],
+    )
+    def test_get_tasks_manifests_keys_from_s3_with_step_manifests(
+        self,
+        step_manifest_minutes: int,
+        use_step_manifests: bool,
+        expected_step_1_keys: List[str],
+    ):
+        """
+        Test that the output manifests of the tasks of a step are replaced with the merged output manifests
+        of the step, only if those were written after all the output manifests of the step's tasks.
+        """
+        start_time = datetime(2025, 1, 1)
+        keys_and_minutes = [
+            ("step-1/StepOutputs/a_output", step_manifest_minutes),
+            ("step-1/StepOutputs/b_output", step_manifest_minutes),
+            ("step-1/task-1/session-action-1/a_output", 1),
+            ("step-1/task-2/session-action-1/a_output", 2),
+            ("step-1/task-2/session-action-2/a_output", 3),
+            ("step-2/task-1/session-action-1/a_output", 20),
+        ]
+        mock_s3_client = MagicMock()
+        mock_s3_client.get_paginator.return_value.paginate.return_value = [
+            {
+                "Contents": [
+                    {
+                        "Key": f"prefix/{key}",
+                        "ETag": f"etag-{key}",
+                        "LastModified": start_time + timedelta(minutes=minutes),
+                    }
+                    for key, minutes in keys_and_minutes
+                ]
+            }
+        ]
+
+        with patch(
+            f"{deadline.__package__}.job_attachments.download.get_s3_client",
+            return_value=mock_s3_client,
+        ):
+            manifests_keys = _get_tasks_manifests_keys_from_s3(
+                "prefix/", "test-bucket", use_step_manifests=use_step_manifests
+            )
+
+        expected_keys = expected_step_1_keys + ["step-2/task-1/session-action-1/a_output"]
+        assert manifests_keys == {f"prefix/{key}": f"etag-{key}" for key in expected_keys}
+
     @mock_aws
     def test_download_file_error_message_on_access_denied(self):
         """
@@ -1894,7 +2081,7 @@ class TestFullDownload:
         )
 
         file_path = ManifestPathv2023_03_03(
-            path="inputs/input1.txt", hash="input1", size=1, mtime=1234000000
+            path="inputs/input1.txt", hash="input1", size=LARGE_FILE_SIZE, mtime=1234000000
         )
 
         with stubber, patch(
@@ -1933,7 +2120,7 @@ class TestFullDownload:
         mock_future.result.side_effect = ReadTimeoutError(endpoint_url="test_url")
 
         file_path = ManifestPathv2023_03_03(
-            path="inputs/input1.txt", hash="input1", size=1, mtime=1234000000
+            path="inputs/input1.txt", hash="input1", size=LARGE_FILE_SIZE, mtime=1234000000
         )
 
         with patch(
@@ -1978,7 +2165,7 @@ class TestFullDownload:
         file_path = ManifestPathv2023_03_03(
             path="very/long/input/to/test/windows/max/file/path/for/error/handling/when/downloading/assest/from/job/attachment.txt",
             hash="path",
-            size=1,
+            size=LARGE_FILE_SIZE,
             mtime=1234000000,
         )
 
@@ -2021,7 +2208,7 @@ class TestFullDownload:
         file_path = ManifestPathv2023_03_03(
             path="very/long/input/to/test/windows/max/file/path/for/error/handling/when/downloading/assest/from/job/attachment.txt",
             hash="path",
-            size=1,
+            size=LARGE_FILE_SIZE,
             mtime=1234000000,
         )
 
@@ -2064,7 +2251,7 @@ class TestFullDownload:
         file_path = ManifestPathv2023_03_03(
             path="very/long/input/to/test/windows/max/file/path/for/error/handling/when/downloading/assest/from/job/attachment.txt",
             hash="path",
-            size=1,
+            size=LARGE_FILE_SIZE,
             mtime=1234000000,
         )
 
@@ -2110,7 +2297,7 @@ class TestFullDownload:
         file_path = ManifestPathv2023_03_03(
             path="very/long/input/to/test/windows/max/file/path/for/error/handling/when/downloading/assest/from/job/attachment.txt",
             hash="path",
-            size=1,
+            size=LARGE_FILE_SIZE,
             mtime=1234000000,
         )
 
@@ -2387,6 +2574,36 @@ def test_merge_asset_manifests(
     assert decode_manifest(json.dumps(merged_manifest)) == actual_merged_manifest
 
 
+@pytest.mark.parametrize(
+    "compact_indices",
+    [
+        pytest.param([0], id="first"),
+        pytest.param([1], id="second"),
+        pytest.param([0, 1], id="both"),
+    ],
+)
+def test_merge_asset_manifests_compact(
+    test_manifest_one: dict, test_manifest_two: dict, merged_manifest: dict, compact_indices: list
+):
+    """
+    Test that merging manifests with compact paths merges them as lists of paths are merged, into a
+    manifest with compact paths
+    """
+    manifests = [
+        decode_manifest(json.dumps(test_manifest_one)),
+        decode_manifest(json.dumps(test_manifest_two)),
+    ]
+    for index in compact_indices:
+        compact_manifest(manifests[index])
+
+    actual_merged_manifest = merge_asset_manifests(manifests)
+
+    assert actual_merged_manifest is not None
+    assert isinstance(actual_merged_manifest.paths, CompactManifestPaths)
+    assert decode_manifest(json.dumps(merged_manifest)) == actual_merged_manifest
+    assert actual_merged_manifest.totalSize == merged_manifest["totalSize"]  # type: ignore[attr-defined]
+
+
 def test_merge_asset_manifests_empty():
     """
     Test that merging an empty list returns None
@@ -2442,6 +2659,474 @@ def test_download_files_from_manifests(
     assert sorted(downloaded_files) == ["a.txt", "b.txt", "c.txt", "d.txt"]
 
 
+def _get_manifest_with_duplicate_hashes() -> BaseAssetManifest:
+    return decode_manifest(
+        json.dumps(
+            {
+                "hashAlg": "xxh128",
+                "manifestVersion": "2023-03-03",
+                "paths": [
+                    {"hash": "aaa", "mtime": 1111111111111111, "path": "frame1.exr", "size": 5},
+                    {"hash": "bbb", "mtime": 2222222222222222, "path": "frame2.exr", "size": 7},
+                    {"hash": "aaa", "mtime": 3333333333333333, "path": "frame3.exr", "size": 5},
+                    {"hash": "aaa", "mtime": 4444444444444444, "path": "sub/frame4.exr", "size": 5},
+                ],
+                "totalSize": 22,
+            }
+        )
+    )
+
+
+def _fake_download_file(downloaded_files: list[str]) -> Callable:
+    def download_file(file, hash_algorithm, local_download_dir, *args):
+        local_file_name = Path(local_download_dir) / file.path
+        if local_file_name.is_file() and FileConflictResolution.SKIP in args:
+            return (file.size, None)
+        downloaded_files.append(file.path)
+        local_file_name.parent.mkdir(parents=True, exist_ok=True)
+        local_file_name.write_bytes(file.hash.encode().ljust(file.size, b"-"))
+        return (file.size, local_file_name)
+
+    return download_file
+
+
+@pytest.mark.parametrize(
+    "duplicate_file_mode",
+    [DuplicateFileMode.COPY, DuplicateFileMode.HARDLINK],
+)
+def test_download_files_from_manifests_deduplicates_files(
+    tmp_path: Path, duplicate_file_mode: DuplicateFileMode
+):
+    """
+    Tests that the files with the same hash are downloaded once, and written from the downloaded file.
+    """
+    downloaded_files: list[str] = []
+
+    with patch(
+        f"{deadline.__package__}.job_attachments.download.download_file",
+        side_effect=_fake_download_file(downloaded_files),
+    ), patch(f"{deadline.__package__}.job_attachments.download.get_s3_client"):
+        summary = download_files_from_manifests(
+            s3_bucket="s3_settings.s3BucketName",
+            manifests_by_root={str(tmp_path): _get_manifest_with_duplicate_hashes()},
+            cas_prefix="s3_settings.full_cas_prefix()",
+            session=boto3.Session(region_name="us-west-2"),
+            on_downloading_files=on_downloading_files,
+            duplicate_file_mode=duplicate_file_mode,
+        )
+
+    assert sorted(downloaded_files) == ["frame1.exr", "frame2.exr"]
+    for path in ["frame1.exr", "frame3.exr", "sub/frame4.exr"]:
+        assert (tmp_path / path).read_bytes() == b"aaa--"
+    assert (tmp_path / "frame2.exr").read_bytes() == b"bbb----"
+    assert summary.processed_files == 4
+    assert summary.deduplicated_files == 2
+    assert summary.deduplicated_bytes == 10
+    assert summary.file_counts_by_root_directory == {str(tmp_path): 4}
+
+    if duplicate_file_mode == DuplicateFileMode.HARDLINK:
+        assert (tmp_path / "frame1.exr").stat().st_ino == (tmp_path / "frame3.exr").stat().st_ino
+    else:
+        assert (tmp_path / "frame1.exr").stat().st_ino != (tmp_path / "frame3.exr").stat().st_ino
+        assert (tmp_path / "frame3.exr").stat().st_mtime == 3333333333.333333
+        # The files get exactly the modification times of the manifest, in nanoseconds.
+        assert (tmp_path / "frame3.exr").stat().st_mtime_ns == 3333333333333333000
+
+
+def test_download_files_from_manifests_without_deduplication(tmp_path: Path):
+    """
+    Tests that every file is downloaded when the files with the same hash are not deduplicated.
+    """
+    downloaded_files: list[str] = []
+
+    with patch(
+        f"{deadline.__package__}.job_attachments.download.download_file",
+        side_effect=_fake_download_file(downloaded_files),
+    ), patch(f"{deadline.__package__}.job_attachments.download.get_s3_client"):
+        summary = download_files_from_manifests(
+            s3_bucket="s3_settings.s3BucketName",
+            manifests_by_root={str(tmp_path): _get_manifest_with_duplicate_hashes()},
+            cas_prefix="s3_settings.full_cas_prefix()",
+            session=boto3.Session(region_name="us-west-2"),
+            duplicate_file_mode=DuplicateFileMode.DOWNLOAD,
+        )
+
+    assert sorted(downloaded_files) == [
+        "frame1.exr",
+        "frame2.exr",
+        "frame3.exr",
+        "sub/frame4.exr",
+    ]
+    assert summary.deduplicated_files == 0
+    assert summary.deduplicated_bytes == 0
+
+
+def test_download_file_group_downloads_after_skipped_file(tmp_path: Path):
+    """
+    Tests that a group of files with the same hash is downloaded from the first file that isn't skipped,
+    since a skipped existing file may have other contents.
+    """
+    manifest = _get_manifest_with_duplicate_hashes()
+    files = [file for file in manifest.paths if file.hash == "aaa"]
+    (tmp_path / "frame1.exr").write_bytes(b"existing")
+    downloaded_files: list[str] = []
+
+    with patch(
+        f"{deadline.__package__}.job_attachments.download.download_file",
+        side_effect=_fake_download_file(downloaded_files),
+    ):
+        results = _download_file_group(
+            files,
+            HashAlgorithm.XXH128,
+            str(tmp_path),
+            "test-bucket",
+            None,
+            file_conflict_resolution=FileConflictResolution.SKIP,
+        )
+
+    assert downloaded_files == ["frame3.exr"]
+    assert results == [
+        (5, None, False),
+        (5, tmp_path / "frame3.exr", False),
+        (5, tmp_path / "sub" / "frame4.exr", True),
+    ]
+    assert (tmp_path / "frame1.exr").read_bytes() == b"existing"
+    assert (tmp_path / "sub" / "frame4.exr").read_bytes() == b"aaa--"
+
+
+@pytest.mark.parametrize(
+    ("use_fs_permission_settings", "expected_use_hardlinks"), [(False, True), (True, False)]
+)
+def test_download_files_from_manifests_copies_from_object_cache_with_fs_permissions(
+    tmp_path: Path, use_fs_permission_settings: bool, expected_use_hardlinks: bool
+):
+    """
+    Tests that the files aren't hard linked to the object cache when file system permission settings
+    are given, since setting the permissions of the linked files would set those of the cached objects.
+    """
+    object_cache = ObjectCache(str(tmp_path / "cache"), use_hardlinks=True)
+    manifest = decode_manifest(
+        '{"hashAlg":"xxh128","manifestVersion":"2023-03-03",'
+        '"paths":[{"hash":"a","mtime":1,"path":"a.txt","size":1}],"totalSize":1}'
+    )
+    fs_permission_settings = (
+        PosixFileSystemPermissionSettings("test-user", "test-group", 0o20, 0o20)
+        if use_fs_permission_settings
+        else None
+    )
+
+    with patch(f"{deadline.__package__}.job_attachments.download.get_s3_client"), patch(
+        f"{deadline.__package__}.job_attachments.download._download_files_parallel",
+        return_value=[],
+    ) as mock_download_files_parallel, patch(
+        f"{deadline.__package__}.job_attachments.download._set_fs_group"
+    ):
+        download_files_from_manifests(
+            "test-bucket",
+            {str(tmp_path / "root"): manifest},
+            fs_permission_settings=fs_permission_settings,
+            object_cache=object_cache,
+        )
+
+    used_object_cache = mock_download_files_parallel.call_args.kwargs["object_cache"]
+    assert used_object_cache.cache_dir == object_cache.cache_dir
+    assert used_object_cache.use_hardlinks == expected_use_hardlinks
+
+
+def test_download_file_with_object_cache(tmp_path: Path):
+    """
+    Tests that a file is added to the object cache once downloaded, and is then written from the cache
+    instead of being downloaded again.
+    """
+    object_cache = ObjectCache(str(tmp_path / "cache"))
+    file_hash = hash_data(b"contents", HashAlgorithm.XXH128)
+    file = ManifestPathv2023_03_03(
+        path="inputs/input1.txt", hash=file_hash, size=8, mtime=1234000000
+    )
+    mock_s3_client = MagicMock()
+    mock_s3_client.get_object.return_value = {
+        "Body": MagicMock(iter_chunks=lambda _: [b"contents"])
+    }
+
+    with patch(f"{deadline.__package__}.job_attachments.download.get_account_id"):
+        for session_dir in ["session1", "session2"]:
+            (file_bytes, local_file_name) = download_file(
+                file,
+                HashAlgorithm.XXH128,
+                str(tmp_path / session_dir),
+                "test-bucket",
+                "rootPrefix/Data",
+                mock_s3_client,
+                object_cache=object_cache,
+            )
+            assert file_bytes == 8
+            assert local_file_name == tmp_path / session_dir / "inputs" / "input1.txt"
+            assert local_file_name.read_bytes() == b"contents"
+            assert local_file_name.stat().st_mtime == 1234
+
+    mock_s3_client.get_object.assert_called_once()
+    assert object_cache.get_object_path(file_hash, HashAlgorithm.XXH128).read_bytes() == b"contents"
+
+
+def test_download_file_small_object_error_message_on_access_denied():
+    """
+    Tests that a small file downloaded with a single GetObject request raises the same error as the
+    files downloaded through the TransferManager.
+    """
+    s3_client = boto3.client("s3", region_name="us-west-2")
+    stubber = Stubber(s3_client)
+    stubber.add_client_error(
+        "get_object",
+        service_error_code="AccessDenied",
+        service_message="Access Denied",
+        http_status_code=403,
+    )
+    file = ManifestPathv2023_03_03(
+        path="inputs/input1.txt", hash="input1", size=1, mtime=1234000000
+    )
+
+    with stubber, patch(f"{deadline.__package__}.job_attachments.download.Path.mkdir"), patch(
+        f"{deadline.__package__}.job_attachments.download.get_account_id",
+        return_value="123456789012",
+    ):
+        with pytest.raises(JobAttachmentsS3ClientError) as exc:
+            download_file(
+                file,
+                HashAlgorithm.XXH128,
+                "/home/username/assets",
+                "test-bucket",
+                "rootPrefix/Data",
+                s3_client,
+            )
+    assert (
+        "Error downloading file in bucket 'test-bucket', Target key or prefix: 'rootPrefix/Data/input1.xxh128', "
+        "HTTP Status Code: 403, Forbidden or Access denied. "
+    ) in str(exc.value)
+
+
+def test_download_file_small_object_retries_streaming_errors(tmp_path: Path):
+    """
+    Tests that a small file is downloaded again after an error while streaming it, and that the bytes
+    of the failed attempt are removed from the progress.
+    """
+    file = ManifestPathv2023_03_03(path="input1.txt", hash="input1", size=8, mtime=1234000000)
+
+    def failing_chunks(_):
+        yield b"cont"
+        raise ReadTimeoutError(endpoint_url="test_url")
+
+    mock_s3_client = MagicMock()
+    mock_s3_client.get_object.side_effect = [
+        {"Body": MagicMock(iter_chunks=failing_chunks)},
+        {"Body": MagicMock(iter_chunks=lambda _: [b"cont", b"ents"])},
+    ]
+    progress_tracker = ProgressTracker(ProgressStatus.DOWNLOAD_IN_PROGRESS, 1, 8)
+
+    with patch(f"{deadline.__package__}.job_attachments.download.get_account_id"):
+        (file_bytes, local_file_name) = download_file(
+            file,
+            HashAlgorithm.XXH128,
+            str(tmp_path),
+            "test-bucket",
+            "rootPrefix/Data",
+            mock_s3_client,
+            progress_tracker=progress_tracker,
+        )
+
+    assert local_file_name == tmp_path / "input1.txt"
+    assert local_file_name.read_bytes() == b"contents"
+    assert progress_tracker.processed_bytes == 8
+    assert mock_s3_client.get_object.call_count == 2
+    assert list(tmp_path.iterdir()) == [local_file_name]
+
+
+def test_download_file_small_object_cancelled(tmp_path: Path):
+    """
+    Tests that cancelling the download of a small file leaves no partial file behind.
+    """
+    file = ManifestPathv2023_03_03(path="input1.txt", hash="input1", size=8, mtime=1234000000)
+    mock_s3_client = MagicMock()
+    mock_s3_client.get_object.return_value = {
+        "Body": MagicMock(iter_chunks=lambda _: [b"cont", b"ents"])
+    }
+    progress_tracker = ProgressTracker(
+        ProgressStatus.DOWNLOAD_IN_PROGRESS,
+        1,
+        8,
+        on_progress_callback=lambda _: False,
+        callback_interval=0,
+    )
+
+    with patch(f"{deadline.__package__}.job_attachments.download.get_account_id"):
+        with pytest.raises(AssetSyncCancelledError):
+            download_file(
+                file,
+                HashAlgorithm.XXH128,
+                str(tmp_path),
+                "test-bucket",
+                "rootPrefix/Data",
+                mock_s3_client,
+                progress_tracker=progress_tracker,
+            )
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_separate_file_groups_by_size():
+    """
+    Tests that the groups of files are split into small and large files, each ordered largest first.
+    """
+    groups: List[List[BaseManifestPath]] = [
+        [ManifestPathv2023_03_03(path=f"file{size}", hash=f"hash{size}", size=size, mtime=1)]
+        for size in [1, LARGE_FILE_SIZE, 3, LARGE_FILE_SIZE + 2, 2]
+    ]
+
+    (small_groups, large_groups) = _separate_file_groups_by_size(groups)
+
+    assert [group[0].size for group in small_groups] == [3, 2, 1]
+    assert [group[0].size for group in large_groups] == [LARGE_FILE_SIZE + 2, LARGE_FILE_SIZE]
+
+
+def test_batch_file_groups():
+    """
+    Tests that the small files are batched, with a few batches per worker.
+    """
+    small_groups: List[List[BaseManifestPath]] = [
+        [ManifestPathv2023_03_03(path=f"small{i}", hash=f"small{i}", size=1, mtime=1)]
+        for i in range(100)
+    ]
+
+    batches = _batch_file_groups(small_groups, num_download_workers=5)
+
+    assert [len(batch) for batch in batches] == [5] * 20
+    assert [group for batch in batches for group in batch] == small_groups
+    assert len(_batch_file_groups(small_groups * 100, num_download_workers=1)) == 10000 // 64 + 1
+
+
+def test_download_files_parallel_downloads_large_files_serially(tmp_path: Path):
+    """
+    Tests that the large files are downloaded one at a time, largest first, alongside the small files.
+    """
+    files: List[BaseManifestPath] = [
+        ManifestPathv2023_03_03(
+            path=f"large{i}", hash=f"large{i}", size=LARGE_FILE_SIZE + i, mtime=1
+        )
+        for i in range(3)
+    ]
+    files += [
+        ManifestPathv2023_03_03(path=f"small{i}", hash=f"small{i}", size=1, mtime=1)
+        for i in range(20)
+    ]
+    large_file_order: list[str] = []
+    active_large_files = 0
+    max_active_large_files = 0
+    lock = threading.Lock()
+
+    def download_file(file, hash_algorithm, local_download_dir, *args):
+        nonlocal active_large_files, max_active_large_files
+        if file.size > S3_DOWNLOAD_SMALL_OBJECT_MAX_SIZE:
+            with lock:
+                large_file_order.append(file.path)
+                active_large_files += 1
+                max_active_large_files = max(max_active_large_files, active_large_files)
+            time.sleep(0.01)
+            with lock:
+                active_large_files -= 1
+        return (file.size, Path(local_download_dir) / file.path)
+
+    with patch(
+        f"{deadline.__package__}.job_attachments.download.download_file", side_effect=download_file
+    ):
+        downloaded_files = _download_files_parallel(
+            files, HashAlgorithm.XXH128, 2, str(tmp_path), "test-bucket", None
+        )
+
+    assert len(downloaded_files) == 23
+    assert large_file_order == ["large2", "large1", "large0"]
+    assert max_active_large_files == 1
+
+
+class TestAdaptiveConcurrencyLimiter:
+    """
+    Tests for the limiter of the number of concurrent small file downloads.
+    """
+
+    def test_limit_is_bounded(self):
+        assert _AdaptiveConcurrencyLimiter(initial_limit=50, max_limit=10).limit == 10
+        assert _AdaptiveConcurrencyLimiter(initial_limit=0, max_limit=10).limit == 1
+
+    def test_limit_increases_while_throughput_increases(self):
+        now = 0.0
+        limiter = _AdaptiveConcurrencyLimiter(
+            initial_limit=4, max_limit=20, adjust_interval=1.0, clock=lambda: now
+        )
+        limits = []
+        for throughput in [100, 200, 300, 400]:
+            now += 1.0
+            limiter.record_bytes(throughput)
+            limits.append(limiter.limit)
+
+        assert limits == [5, 6, 7, 8]
+
+    def test_limit_reverses_when_throughput_drops(self):
+        now = 0.0
+        limiter = _AdaptiveConcurrencyLimiter(
+            initial_limit=8, max_limit=20, adjust_interval=1.0, clock=lambda: now
+        )
+        limits = []
+        for throughput in [100, 200, 100, 100, 150]:
+            now += 1.0
+            limiter.record_bytes(throughput)
+            limits.append(limiter.limit)
+
+        assert limits == [10, 12, 9, 7, 6]
+
+    def test_limit_not_adjusted_within_interval(self):
+        now = 0.0
+        limiter = _AdaptiveConcurrencyLimiter(
+            initial_limit=4, max_limit=20, adjust_interval=1.0, clock=lambda: now
+        )
+        now = 0.5
+        limiter.record_bytes(100)
+
+        assert limiter.limit == 4
+
+    def test_limit_turns_around_at_bound(self):
+        now = 0.0
+        limiter = _AdaptiveConcurrencyLimiter(
+            initial_limit=2, max_limit=3, adjust_interval=1.0, clock=lambda: now
+        )
+        limits = []
+        for _ in range(4):
+            now += 1.0
+            limiter.record_bytes(100)
+            limits.append(limiter.limit)
+
+        assert limits == [3, 3, 2, 1]
+
+    def test_acquire_limits_concurrency(self):
+        limiter = _AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=2)
+        active = 0
+        max_active = 0
+        lock = threading.Lock()
+
+        def task():
+            nonlocal active, max_active
+            with limiter.acquire():
+                with lock:
+                    active += 1
+                    max_active = max(max_active, active)
+                time.sleep(0.01)
+                with lock:
+                    active -= 1
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+            for future in [executor.submit(task) for _ in range(16)]:
+                future.result()
+
+        assert max_active == 2
+
+
 def test_handle_existing_vfs_no_mount_returns(test_manifest_one: dict):
     """
     Test that handling an existing manifest for a non existent mount returns the manifest
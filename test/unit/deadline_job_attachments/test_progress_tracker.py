@@ -33,6 +33,21 @@ class TestProgressTracker:
 
         assert progress_tracker.processed_files == N * K
 
+    def test_increase_deduplicated(self):
+        progress_tracker = ProgressTracker(ProgressStatus.DOWNLOAD_IN_PROGRESS, 3, 30)
+
+        progress_tracker.increase_processed(1, 10)
+        progress_tracker.increase_deduplicated(2, 20)
+
+        summary = progress_tracker.get_download_summary_statistics({"/root": ["a", "b", "c"]})
+        assert summary.processed_files == 3
+        assert summary.processed_bytes == 30
+        assert summary.deduplicated_files == 2
+        assert summary.deduplicated_bytes == 20
+        assert summary.convert_to_summary_statistics() == SummaryStatistics(
+            total_files=3, total_bytes=30, processed_files=3, processed_bytes=30
+        )
+
 
 class TestSummaryStatistics:
     """
@@ -155,6 +170,8 @@ class TestDownloadSummaryStatistics:
                 "/home/username/outputs2": 2,
                 "/home/username/outputs3": 4,
             },
+            deduplicated_files=2,
+            deduplicated_bytes=200,
         )
         summary2 = DownloadSummaryStatistics(
             total_time=10.0,
@@ -169,6 +186,8 @@ class TestDownloadSummaryStatistics:
                 "/home/username/outputs3": 5,
                 "/home/username/outputs4": 3,
             },
+            deduplicated_files=1,
+            deduplicated_bytes=100,
         )
 
         expected_aggregated_stats = DownloadSummaryStatistics(
@@ -186,6 +205,8 @@ class TestDownloadSummaryStatistics:
                 "/home/username/outputs3": 9,
                 "/home/username/outputs4": 3,
             },
+            deduplicated_files=3,
+            deduplicated_bytes=300,
         )
 
         aggregated = summary1.aggregate(summary2)
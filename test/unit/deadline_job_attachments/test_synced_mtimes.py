@@ -0,0 +1,91 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+
+""" Tests for the compact record of the modification times of the synced files """
+from __future__ import annotations
+
+from deadline.job_attachments._synced_mtimes import SyncedAssetMtimes
+from deadline.job_attachments.asset_manifests import HashAlgorithm
+from deadline.job_attachments.asset_manifests.compact_manifest import CompactManifestPaths
+from deadline.job_attachments.asset_manifests.v2023_03_03 import ManifestPath
+
+
+def _make_paths(num_paths: int, mtime_offset: int = 0) -> list[ManifestPath]:
+    return [
+        ManifestPath(
+            path=f"dir{i % 10}/file{i}.exr", hash=f"{i:032x}", size=i, mtime=1000 + i + mtime_offset
+        )
+        for i in range(num_paths)
+    ]
+
+
+class TestSyncedAssetMtimes:
+    """
+    Tests for the SyncedAssetMtimes class
+    """
+
+    def test_record_manifest_paths(self):
+        """
+        Tests that the files of manifest paths are recorded with the modification times of the manifest,
+        in nanoseconds, by local root and relative path.
+        """
+        synced_mtimes = SyncedAssetMtimes()
+        paths = _make_paths(1000)
+
+        synced_mtimes.record_manifest_paths("/session/root1", paths)
+        synced_mtimes.record_manifest_paths(
+            "/session/root2/",
+            CompactManifestPaths(ManifestPath, HashAlgorithm.XXH128, _make_paths(10, 500)),
+        )
+
+        assert len(synced_mtimes) == 1010
+        for path in paths:
+            assert synced_mtimes.get("/session/root1", path.path) == path.mtime * 1000
+        assert synced_mtimes.get("/session/root2", "dir1/file1.exr") == 1501000
+        assert synced_mtimes.get("/session/root2", "dir0/file10.exr") is None
+        assert synced_mtimes.get("/session/root3", "dir1/file1.exr") is None
+        assert synced_mtimes.get("/session/root1", "dir1/file1") is None
+
+    def test_record_manifest_paths_with_mtimes(self):
+        synced_mtimes = SyncedAssetMtimes()
+        paths = _make_paths(3)
+
+        synced_mtimes.record_manifest_paths("/root", paths, [5, 6, 7])
+
+        assert [synced_mtimes.get("/root", path.path) for path in paths] == [5, 6, 7]
+
+    def test_set(self):
+        """
+        Tests that files can be recorded one at a time, and that the latest record of a file is used.
+        """
+        synced_mtimes = SyncedAssetMtimes()
+        synced_mtimes.record_manifest_paths("/root", _make_paths(3))
+
+        synced_mtimes.set("/root", "dir0/file0.exr", 1)
+        synced_mtimes.set("/root", "new.exr", 2)
+
+        assert synced_mtimes.get("/root", "dir0/file0.exr") == 1
+        assert synced_mtimes.get("/root", "new.exr") == 2
+        assert synced_mtimes.get("/other_root", "new.exr") is None
+
+        synced_mtimes.record_manifest_paths("/root", _make_paths(3, 100))
+
+        assert synced_mtimes.get("/root", "dir0/file0.exr") == 1100000
+        assert synced_mtimes.get("/root", "new.exr") == 2
+
+    def test_has_hash(self):
+        """
+        Tests that only the files recorded from a manifest, and not recorded one at a time since, are
+        recorded with their hashes.
+        """
+        synced_mtimes = SyncedAssetMtimes()
+        paths = _make_paths(3)
+        synced_mtimes.record_manifest_paths(
+            "/root", CompactManifestPaths(ManifestPath, HashAlgorithm.XXH128, paths)
+        )
+        synced_mtimes.set("/root", "dir1/file1.exr", 1)
+
+        assert synced_mtimes.has_hash("/root", "dir0/file0.exr", paths[0].hash)
+        assert not synced_mtimes.has_hash("/root", "dir0/file0.exr", paths[2].hash)
+        assert not synced_mtimes.has_hash("/root", "dir1/file1.exr", paths[1].hash)
+        assert not synced_mtimes.has_hash("/other_root", "dir0/file0.exr", paths[0].hash)
+        assert not synced_mtimes.has_hash("/root", "new.exr", paths[0].hash)
@@ -4,14 +4,15 @@
 Tests related to the uploading of assets.
 """
 
+import concurrent.futures
 import os
 import sys
+import threading
 from copy import deepcopy
-from datetime import datetime
 from io import BytesIO
 from logging import DEBUG, INFO
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 from unittest.mock import MagicMock, patch
 
 import boto3
@@ -28,9 +29,23 @@ from deadline.job_attachments.asset_manifests import (
     BaseManifestPath,
     HashAlgorithm,
     ManifestVersion,
+    hash_data,
+    hash_file,
+)
+from deadline.job_attachments.asset_manifests.hash_algorithms import HashFileOptions
+from deadline.job_attachments.asset_manifests.hashing_engines import ProcessHashingEngine
+from deadline.job_attachments.asset_manifests.v2023_03_03 import (
+    AssetManifest as AssetManifest_v2023_03_03,
+    ManifestPath as ManifestPath_v2023_03_03,
+)
+from deadline.job_attachments.caches import (
+    HashCache,
+    HashCacheEntry,
+    S3CheckCache,
+    S3CheckCacheEntry,
 )
-from deadline.job_attachments.caches import HashCacheEntry, S3CheckCacheEntry
 from deadline.job_attachments.exceptions import (
+    AssetSyncCancelledError,
     AssetSyncError,
     JobAttachmentsS3ClientError,
     MisconfiguredInputsError,
@@ -50,9 +65,15 @@ from deadline.job_attachments.models import (
 )
 from deadline.job_attachments.progress_tracker import (
     ProgressStatus,
+    ProgressTracker,
     SummaryStatistics,
 )
-from deadline.job_attachments.upload import FileStatus, S3AssetManager, S3AssetUploader
+from deadline.job_attachments.upload import (
+    FileStatus,
+    S3AssetManager,
+    S3AssetUploader,
+    _InputFileUploadQueue,
+)
 from deadline.job_attachments._utils import _human_readable_file_size
 from ..conftest import is_windows_non_admin
 
@@ -149,12 +170,12 @@ class TestUpload:
             side_effect=["e", "manifesthash"],
         ), patch(
             f"{deadline.__package__}.job_attachments.upload.hash_file",
-            side_effect={
+            side_effect=lambda file_path, hash_alg, options=None: {
                 str(scene_file): "a",
                 str(texture_file): "b",
                 str(normal_file): "c",
                 str(meta_file): "d",
-            }.get,
+            }.get(file_path),
         ), patch(
             f"{deadline.__package__}.job_attachments.models._generate_random_guid",
             return_value="0000",
@@ -344,7 +365,9 @@ class TestUpload:
             side_effect=["b", "manifesthash"],
         ), patch(
             f"{deadline.__package__}.job_attachments.upload.hash_file",
-            side_effect={str(input_c): "a"}.get,
+            side_effect=lambda file_path, hash_alg, options=None: {str(input_c): "a"}.get(
+                file_path
+            ),
         ), patch(
             f"{deadline.__package__}.job_attachments.models._generate_random_guid",
             return_value="0000",
@@ -768,7 +791,9 @@ class TestUpload:
         expected_total_uploaded_bytes = not_yet_uploaded_file.size()
         expected_total_input_bytes = expected_total_skipped_bytes + expected_total_uploaded_bytes
 
-        def mock_hash_file(file_path: str, hash_alg: HashAlgorithm):
+        def mock_hash_file(
+            file_path: str, hash_alg: HashAlgorithm, options: Optional[HashFileOptions] = None
+        ):
             if file_path == already_uploaded_file:
                 return "existinghash"
             elif file_path == not_yet_uploaded_file:
@@ -1323,6 +1348,12 @@ class TestUpload:
                 "Failed to parse configuration settings. Please ensure that the following settings in the config file are integers",
                 id="small_file_threshold_multiplier value is not a number.",
             ),
+            pytest.param(
+                "s3_bulk_existence_check_threshold",
+                "0",
+                "'s3_bulk_existence_check_threshold' (0) must be positive integer.",
+                id="s3_bulk_existence_check_threshold value is 0.",
+            ),
         ],
     )
     def test_asset_uploader_constructor_with_nonvalid_config_settings(
@@ -1582,13 +1613,21 @@ class TestUpload:
         root_dir = tmpdir.mkdir("root")
         test_file = root_dir.join("test.txt")
         test_file.write("test")
-        file_time = os.stat(test_file).st_mtime
-        expected_entry = HashCacheEntry(
-            test_file, HashAlgorithm.XXH128, "b", str(datetime.fromtimestamp((file_time)))
+        stat_result = os.stat(test_file)
+        expected_entry = HashCacheEntry.from_stat(
+            str(test_file), HashAlgorithm.XXH128, "b", stat_result
         )
 
         # WHEN
-        test_entry = HashCacheEntry(test_file, HashAlgorithm.XXH128, "a", "123.45")
+        test_entry = HashCacheEntry(
+            str(test_file),
+            HashAlgorithm.XXH128,
+            "a",
+            stat_result.st_size,
+            stat_result.st_mtime_ns - 1000,
+            stat_result.st_ino,
+            stat_result.st_dev,
+        )
         hash_cache = MagicMock()
         hash_cache.get_entry.return_value = test_entry
 
@@ -1618,11 +1657,12 @@ class TestUpload:
         root_dir = tmpdir.mkdir("root")
         test_file = root_dir.join("test.txt")
         test_file.write("test")
-        file_time = str(datetime.fromtimestamp(os.stat(test_file).st_mtime))
         file_bytes = test_file.size()
 
         # WHEN
-        test_entry = HashCacheEntry(test_file, HashAlgorithm.XXH128, "a", file_time)
+        test_entry = HashCacheEntry.from_stat(
+            str(test_file), HashAlgorithm.XXH128, "a", os.stat(test_file)
+        )
         hash_cache = MagicMock()
         hash_cache.get_entry.return_value = test_entry
 
@@ -1648,6 +1688,268 @@ class TestUpload:
             assert man_path.hash == "a"
             hash_cache.put_entry.assert_not_called()
 
+    @pytest.mark.parametrize("hashing_engine", ["THREAD", "PROCESS"])
+    def test_create_manifest_file_with_hashing_engine(
+        self, farm_id, queue_id, tmpdir, fresh_deadline_config, hashing_engine: str
+    ):
+        """
+        Test that the files that are not in the hash cache are hashed with the configured hashing
+        engine, and that every file is counted once by the progress tracker.
+        """
+        # GIVEN
+        root_dir = tmpdir.mkdir("root")
+        input_paths = []
+        for i in range(5):
+            input_file = root_dir.join(f"input{i}.txt")
+            input_file.write(f"input{i}")
+            input_paths.append(Path(input_file))
+        cached_file = input_paths[0]
+        hash_cache = MagicMock()
+        hash_cache.get_entry.side_effect = lambda file_path, hash_alg: (
+            HashCacheEntry.from_stat(file_path, hash_alg, "cachedhash", cached_file.stat())
+            if file_path == str(cached_file.resolve())
+            else None
+        )
+        progress_tracker = ProgressTracker(
+            status=ProgressStatus.PREPARING_IN_PROGRESS, total_files=5, total_bytes=30
+        )
+        config.set_setting("settings.hashing_engine", hashing_engine)
+
+        # WHEN
+        with patch(f"{deadline.__package__}.job_attachments.upload.hash_file") as mock_hash_file:
+            asset_manager = S3AssetManager(
+                farm_id=farm_id,
+                queue_id=queue_id,
+                job_attachment_settings=self.job_attachment_s3_settings,
+            )
+            manifest = asset_manager._create_manifest_file(
+                input_paths, str(root_dir), hash_cache, progress_tracker
+            )
+
+        # THEN
+        expected_hashes = {
+            path.name: hash_data(path.read_bytes(), HashAlgorithm.XXH128) for path in input_paths
+        }
+        expected_hashes[cached_file.name] = "cachedhash"
+        if hashing_engine == "PROCESS":
+            mock_hash_file.assert_not_called()
+            assert {path.path: path.hash for path in manifest.paths} == expected_hashes
+        assert progress_tracker.processed_files == 4
+        assert progress_tracker.skipped_files == 1
+
+    def test_hash_file_options_from_config(self, farm_id, queue_id, tmpdir, fresh_deadline_config):
+        """
+        Test that the configured hash_file options are passed to each hashing call of the asset manager,
+        rather than being set for every caller of hash_file.
+        """
+        # GIVEN
+        input_file = tmpdir.join("input.txt")
+        input_file.write("input")
+        hash_cache = MagicMock()
+        hash_cache.get_entry.return_value = None
+        config.set_setting("settings.hashing_engine", "THREAD")
+        config.set_setting("settings.hash_file_buffer_size_kb", "4")
+        config.set_setting("settings.hash_file_mmap_threshold_mb", "256")
+
+        # WHEN
+        asset_manager = S3AssetManager(
+            farm_id=farm_id,
+            queue_id=queue_id,
+            job_attachment_settings=self.job_attachment_s3_settings,
+        )
+        with patch(
+            f"{deadline.__package__}.job_attachments.upload.hash_file", return_value="a"
+        ) as mock_hash_file:
+            asset_manager._create_manifest_file([Path(input_file)], str(tmpdir), hash_cache)
+
+        # THEN
+        expected_options = HashFileOptions(buffer_size=4 * 1024, mmap_threshold=256 * 1024**2)
+        assert asset_manager.hash_file_options == expected_options
+        mock_hash_file.assert_called_once_with(
+            str(Path(input_file).resolve()), HashAlgorithm.XXH128, options=expected_options
+        )
+
+    @pytest.mark.parametrize(
+        ("setting", "value"),
+        [("hash_file_buffer_size_kb", "0"), ("hash_file_mmap_threshold_mb", "-1")],
+    )
+    def test_hash_file_options_nonvalid(
+        self, farm_id, queue_id, fresh_deadline_config, setting: str, value: str
+    ):
+        config.set_setting(f"settings.{setting}", value)
+        with pytest.raises(AssetSyncError, match=setting):
+            S3AssetManager(
+                farm_id=farm_id,
+                queue_id=queue_id,
+                job_attachment_settings=self.job_attachment_s3_settings,
+            )
+
+    def test_hash_assets_and_create_manifest_starts_process_pool_once(
+        self, farm_id, queue_id, tmpdir, fresh_deadline_config
+    ):
+        """
+        Test that the process pool of the process hashing engine is started once for all the asset roots
+        of a submission, and shut down at the end.
+        """
+        # GIVEN
+        asset_groups = []
+        for root_name in ["root1", "root2"]:
+            root_dir = tmpdir.mkdir(root_name)
+            root_dir.join("input.txt").write(root_name)
+            asset_groups.append(
+                AssetRootGroup(root_path=str(root_dir), inputs={Path(root_dir.join("input.txt"))})
+            )
+        config.set_setting("settings.hashing_engine", "PROCESS")
+        asset_manager = S3AssetManager(
+            farm_id=farm_id,
+            queue_id=queue_id,
+            job_attachment_settings=self.job_attachment_s3_settings,
+        )
+
+        # WHEN
+        with patch(
+            f"{deadline.__package__}.job_attachments.asset_manifests.hashing_engines.concurrent.futures.ProcessPoolExecutor",
+            wraps=concurrent.futures.ProcessPoolExecutor,
+        ) as mock_executor, patch.object(
+            ProcessHashingEngine,
+            "shutdown",
+            autospec=True,
+            side_effect=ProcessHashingEngine.shutdown,
+        ) as mock_shutdown:
+            _, asset_root_manifests = asset_manager.hash_assets_and_create_manifest(
+                asset_groups=asset_groups,
+                total_input_files=2,
+                total_input_bytes=10,
+                hash_cache_dir=str(tmpdir.mkdir("cache")),
+            )
+
+        # THEN
+        mock_executor.assert_called_once()
+        mock_shutdown.assert_called_once()
+        assert asset_manager._hashing_engines is None
+        assert [
+            manifest.asset_manifest.paths[0].hash  # type: ignore[union-attr]
+            for manifest in asset_root_manifests
+        ] == [
+            hash_data(b"root1", HashAlgorithm.XXH128),
+            hash_data(b"root2", HashAlgorithm.XXH128),
+        ]
+
+    @pytest.mark.skipif(
+        is_windows_non_admin(),
+        reason="Windows requires Admin to create symlinks, skipping this test.",
+    )
+    def test_resolve_and_stat(self, tmpdir):
+        """
+        Test that files are resolved like Path.resolve, including symlinked files and directories.
+        """
+        # GIVEN
+        real_dir = tmpdir.mkdir("real")
+        real_file = real_dir.join("file.txt")
+        real_file.write("a")
+        linked_dir = tmpdir.join("linked")
+        linked_dir.mksymlinkto(real_dir)
+        linked_file = real_dir.join("link.txt")
+        linked_file.mksymlinkto(real_file)
+        resolved_directories: Dict[Path, str] = {}
+
+        for path in (
+            Path(real_file),
+            Path(linked_file),
+            Path(linked_dir.join("file.txt")),
+            Path(linked_dir.join("link.txt")),
+        ):
+            # WHEN
+            full_path, stat_result = S3AssetManager._resolve_and_stat(path, resolved_directories)
+
+            # THEN
+            assert full_path == str(path.resolve())
+            assert stat_result == os.stat(real_file)
+
+    @mock_aws
+    def test_open_cache_session_shares_caches(self, farm_id, queue_id, tmpdir):
+        """
+        Test that in a cache session, each cache is opened once for all the asset roots and across the
+        hashing and upload operations, and that the cache directories of the session are used.
+        """
+        # GIVEN
+        asset_groups = []
+        for root_name in ("root1", "root2", "root3"):
+            root = tmpdir.mkdir(root_name)
+            root.join("input.txt").write(root_name)
+            asset_groups.append(
+                AssetRootGroup(root_path=str(root), inputs={Path(root.join("input.txt"))})
+            )
+        cache_dir = tmpdir.mkdir("cache")
+        asset_manager = S3AssetManager(
+            farm_id=farm_id,
+            queue_id=queue_id,
+            job_attachment_settings=self.job_attachment_s3_settings,
+        )
+
+        # WHEN
+        with patch.object(
+            HashCache, "__enter__", autospec=True, side_effect=lambda self: self
+        ) as mock_hash_cache_enter, patch.object(
+            S3CheckCache, "__enter__", autospec=True, side_effect=lambda self: self
+        ) as mock_s3_check_cache_enter, patch.object(
+            HashCache, "__exit__"
+        ), patch.object(
+            S3CheckCache, "__exit__"
+        ) as mock_s3_check_cache_exit, patch.object(
+            HashCache, "get_entry", return_value=None
+        ), patch.object(
+            HashCache, "put_entry"
+        ), patch.object(
+            HashCache, "preload_entries"
+        ), patch.object(
+            S3CheckCache, "get_entry", return_value=None
+        ), patch.object(
+            S3CheckCache, "put_entry"
+        ), patch.object(
+            S3CheckCache, "preload_entries"
+        ):
+            with asset_manager.open_cache_session(
+                hash_cache_dir=str(cache_dir), s3_check_cache_dir=str(cache_dir)
+            ) as cache_session:
+                _, asset_root_manifests = asset_manager.hash_assets_and_create_manifest(
+                    asset_groups=asset_groups,
+                    total_input_files=3,
+                    total_input_bytes=15,
+                    hash_cache_dir=str(tmpdir.join("other_cache")),
+                )
+                asset_manager.upload_assets(
+                    manifests=asset_root_manifests,
+                    s3_check_cache_dir=str(tmpdir.join("other_cache")),
+                )
+                mock_s3_check_cache_exit.assert_not_called()
+
+            # THEN
+            mock_hash_cache_enter.assert_called_once()
+            mock_s3_check_cache_enter.assert_called_once()
+            mock_s3_check_cache_exit.assert_called_once()
+            assert cache_session.hash_cache_dir == str(cache_dir)
+            assert mock_hash_cache_enter.call_args.args[0].cache_dir == str(
+                cache_dir.join(f"{HashCache.CACHE_NAME}.db")
+            )
+            assert not os.path.exists(tmpdir.join("other_cache"))
+
+    def test_s3_asset_manager_nonvalid_hashing_engine(
+        self, farm_id, queue_id, fresh_deadline_config
+    ):
+        """
+        Test that a nonvalid hashing engine setting raises an error.
+        """
+        config.set_setting("settings.hashing_engine", "GPU")
+
+        with pytest.raises(AssetSyncError) as err:
+            S3AssetManager(
+                farm_id=farm_id,
+                queue_id=queue_id,
+                job_attachment_settings=self.job_attachment_s3_settings,
+            )
+        assert "'hashing_engine' (GPU) must be one of AUTO, THREAD, PROCESS" in str(err.value)
+
     @mock_aws
     def test_asset_management_misconfigured_inputs(self, farm_id, queue_id, tmpdir):
         """
@@ -2640,6 +2942,501 @@ class TestUpload:
                 expected_files={"prefix/test-hash.xxh128"},
             )
 
+    @mock_aws
+    def test_upload_input_files_with_bulk_existence_check(
+        self, tmpdir, fresh_deadline_config, assert_expected_files_on_s3
+    ):
+        """
+        Tests that when the number of files missing from the S3 check cache reaches the bulk existence
+        check threshold, the CAS prefix is listed instead of doing a head-object call per file, and only
+        the files that are not in S3 are uploaded.
+        """
+        # Given
+        config.set_setting("settings.s3_bulk_existence_check_threshold", "2")
+        asset_root = tmpdir.mkdir("test-root")
+        asset_root.join("a.txt").write("a")
+        asset_root.join("b.txt").write("b")
+        asset_root.join("c.txt").write("c")
+        manifest = AssetManifest_v2023_03_03(
+            hash_alg=HashAlgorithm.XXH128,
+            paths=[
+                ManifestPath_v2023_03_03(path=path, hash=file_hash, size=1, mtime=1)
+                for (path, file_hash) in [("a.txt", "aa01"), ("b.txt", "ab02"), ("c.txt", "cd03")]
+            ],
+            total_size=3,
+        )
+
+        s3 = boto3.Session(region_name="us-west-2").resource("s3")  # pylint: disable=invalid-name
+        bucket = s3.Bucket(self.job_attachment_s3_settings.s3BucketName)
+        bucket.put_object(Key="prefix/aa01.xxh128", Body=b"a")
+        # An object sharing the listed shard prefix, but not referenced by the manifest.
+        bucket.put_object(Key="prefix/ab01.xxh128", Body=b"x")
+
+        uploader = S3AssetUploader()
+
+        # When
+        with patch.object(
+            uploader, "file_already_uploaded", side_effect=AssertionError
+        ) as mock_file_already_uploaded, patch.object(
+            uploader, "_list_object_keys", wraps=uploader._list_object_keys
+        ) as mock_list_object_keys:
+            uploader.upload_input_files(
+                manifest=manifest,
+                s3_bucket=self.job_attachment_s3_settings.s3BucketName,
+                source_root=Path(asset_root),
+                s3_cas_prefix="prefix",
+                s3_check_cache_dir=str(tmpdir.mkdir("cache")),
+            )
+
+        # Then
+        mock_file_already_uploaded.assert_not_called()
+        assert sorted(call.args[1] for call in mock_list_object_keys.call_args_list) == [
+            "prefix/aa",
+            "prefix/ab",
+            "prefix/cd",
+        ]
+        assert_expected_files_on_s3(
+            bucket,
+            expected_files={
+                "prefix/aa01.xxh128",
+                "prefix/ab01.xxh128",
+                "prefix/ab02.xxh128",
+                "prefix/cd03.xxh128",
+            },
+        )
+
+    @mock_aws
+    def test_get_existing_cas_keys_below_threshold(self, fresh_deadline_config):
+        """
+        Tests that no listing is done when fewer files than the bulk existence check threshold
+        are missing from the S3 check cache.
+        """
+        # Given
+        config.set_setting("settings.s3_bulk_existence_check_threshold", "2")
+        uploader = S3AssetUploader()
+        s3_cache = MagicMock()
+        s3_cache.get_entry.side_effect = lambda s3_key: (
+            S3CheckCacheEntry(s3_key, "123.45") if s3_key.endswith("aa01.xxh128") else None
+        )
+
+        # When
+        with patch.object(uploader, "_list_object_keys") as mock_list_object_keys:
+            existing_s3_keys = uploader._get_existing_cas_keys(
+                files=[
+                    BaseManifestPath(path="a.txt", hash="aa01", size=1, mtime=1),
+                    BaseManifestPath(path="b.txt", hash="ab02", size=1, mtime=1),
+                ],
+                hash_algorithm=HashAlgorithm.XXH128,
+                s3_bucket=self.job_attachment_s3_settings.s3BucketName,
+                s3_cas_prefix="prefix",
+                s3_check_cache=s3_cache,
+            )
+
+        # Then
+        assert existing_s3_keys is None
+        mock_list_object_keys.assert_not_called()
+
+    @mock_aws
+    def test_get_existing_cas_keys_stops_listing_large_shards(self, fresh_deadline_config):
+        """
+        Tests that the listing of a shard stops once it has listed too many keys per file to look up in it,
+        and that the files of that shard are checked with a head-object call each instead.
+        """
+        # Given
+        config.set_setting("settings.s3_bulk_existence_check_threshold", "2")
+        uploader = S3AssetUploader()
+        s3_cache = MagicMock()
+        s3_cache.get_entry.return_value = None
+        pages_by_prefix = {
+            "prefix/aa": [{"Contents": [{"Key": "prefix/aa01.xxh128"}], "IsTruncated": False}],
+            "prefix/ab": [
+                {
+                    "Contents": [{"Key": f"prefix/ab{i:02}.xxh128"} for i in range(10, 20)],
+                    "IsTruncated": True,
+                },
+                {"Contents": [{"Key": "prefix/ab20.xxh128"}], "IsTruncated": False},
+            ],
+        }
+        listed_pages: list[str] = []
+
+        def paginate(Bucket, Prefix):
+            for page in pages_by_prefix[Prefix]:
+                listed_pages.append(Prefix)
+                yield page
+
+        mock_s3 = MagicMock()
+        mock_s3.get_paginator.return_value.paginate.side_effect = paginate
+        uploader._s3 = mock_s3
+
+        # When
+        with patch(
+            f"{deadline.__package__}.job_attachments.upload.S3_CAS_LIST_MAX_KEYS_PER_FILE", 4
+        ), patch.object(
+            uploader,
+            "file_already_uploaded",
+            side_effect=lambda bucket, key: key == "prefix/ab02.xxh128",
+        ) as mock_file_already_uploaded:
+            existing_s3_keys = uploader._get_existing_cas_keys(
+                files=[
+                    BaseManifestPath(path="a.txt", hash="aa01", size=1, mtime=1),
+                    BaseManifestPath(path="b.txt", hash="ab02", size=1, mtime=1),
+                    BaseManifestPath(path="c.txt", hash="ab20", size=1, mtime=1),
+                ],
+                hash_algorithm=HashAlgorithm.XXH128,
+                s3_bucket=self.job_attachment_s3_settings.s3BucketName,
+                s3_cas_prefix="prefix",
+                s3_check_cache=s3_cache,
+            )
+
+        # Then
+        assert existing_s3_keys == {"prefix/aa01.xxh128", "prefix/ab02.xxh128"}
+        assert sorted(listed_pages) == ["prefix/aa", "prefix/ab"]
+        assert sorted(call.args[1] for call in mock_file_already_uploaded.call_args_list) == [
+            "prefix/ab02.xxh128",
+            "prefix/ab20.xxh128",
+        ]
+
+    @mock_aws
+    def test_list_object_keys_bucket_in_different_account(self):
+        """
+        Test that the appropriate error is raised when listing the CAS prefix, but the bucket
+        is in an account that is different from the uploader's account.
+        """
+        s3 = boto3.client("s3")
+        stubber = Stubber(s3)
+        stubber.add_client_error(
+            "list_objects_v2",
+            service_error_code="AccessDenied",
+            service_message="Access Denied",
+            http_status_code=403,
+        )
+
+        uploader = S3AssetUploader()
+        uploader._s3 = s3
+
+        with stubber:
+            with pytest.raises(JobAttachmentsS3ClientError) as err:
+                uploader._list_object_keys(
+                    self.job_attachment_s3_settings.s3BucketName, "prefix/aa"
+                )
+            assert isinstance(err.value.__cause__, ClientError)
+            assert (
+                "Error listing bucket contents in bucket 'test-bucket', Target key or prefix: 'prefix/aa', "
+                "HTTP Status Code: 403, Access denied. Ensure that the bucket is in the account 123456789012, "
+                "and your AWS IAM Role or User has the 's3:ListBucket' permission for this bucket."
+            ) in str(err.value)
+
+    @mock_aws
+    def test_hash_and_upload_assets(
+        self,
+        tmpdir: py.path.local,
+        farm_id,
+        queue_id,
+        default_job_attachment_s3_settings,
+        assert_canonical_manifest,
+        assert_expected_files_on_s3,
+    ):
+        """
+        Test that pipelined hashing and upload uploads the same files and manifest as hashing
+        followed by upload, and that files with the same contents are only uploaded once.
+        """
+        # Given
+        asset_root = str(tmpdir)
+
+        scene_file = tmpdir.mkdir("scene").join("maya.ma")
+        scene_file.write("a")
+        os.utime(scene_file, (1234, 1234))
+
+        texture_file = tmpdir.mkdir("textures").join("texture.png")
+        texture_file.write("b")
+        os.utime(texture_file, (1234, 1234))
+
+        texture_copy_file = tmpdir.join("textures").join("texture_copy.png")
+        texture_copy_file.write("b")
+        os.utime(texture_copy_file, (1234, 1234))
+
+        cache_dir = tmpdir.mkdir("cache")
+        history_dir = tmpdir.join("history")
+        expected_manifest_file = history_dir.join("manifests").join("e_input")
+
+        with patch(
+            f"{deadline.__package__}.job_attachments.upload.PathFormat.get_host_path_format",
+            return_value=PathFormat.POSIX,
+        ), patch(
+            f"{deadline.__package__}.job_attachments.upload.hash_data",
+            side_effect=["e", "manifesthash"],
+        ), patch(
+            f"{deadline.__package__}.job_attachments.upload.hash_file",
+            side_effect=lambda file_path, hash_alg, options=None: {
+                str(scene_file): "a",
+                str(texture_file): "b",
+                str(texture_copy_file): "b",
+            }.get(file_path),
+        ), patch(
+            f"{deadline.__package__}.job_attachments.models._generate_random_guid",
+            return_value="0000",
+        ):
+            mock_on_preparing_to_submit = MagicMock(return_value=True)
+            mock_on_uploading_assets = MagicMock(return_value=True)
+
+            asset_manager = S3AssetManager(
+                farm_id=farm_id,
+                queue_id=queue_id,
+                job_attachment_settings=self.job_attachment_s3_settings,
+            )
+
+            # When
+            upload_group = asset_manager.prepare_paths_for_upload(
+                input_paths=[str(scene_file), str(texture_file), str(texture_copy_file)],
+                output_paths=[str(tmpdir.join("outputs"))],
+                referenced_paths=[],
+            )
+            (
+                hash_summary_statistics,
+                upload_summary_statistics,
+                asset_root_manifests,
+                attachments,
+            ) = asset_manager.hash_and_upload_assets(
+                asset_groups=upload_group.asset_groups,
+                total_input_files=upload_group.total_input_files,
+                total_input_bytes=upload_group.total_input_bytes,
+                hash_cache_dir=str(cache_dir),
+                s3_check_cache_dir=str(cache_dir),
+                manifest_write_dir=str(history_dir),
+                on_preparing_to_submit=mock_on_preparing_to_submit,
+                on_uploading_assets=mock_on_uploading_assets,
+            )
+
+            # Then
+            assert attachments == Attachments(
+                manifests=[
+                    ManifestProperties(
+                        rootPath=asset_root,
+                        rootPathFormat=PathFormat.POSIX,
+                        inputManifestPath=f"{farm_id}/{queue_id}/Inputs/0000/e_input",
+                        inputManifestHash="manifesthash",
+                        outputRelativeDirectories=["outputs"],
+                    )
+                ],
+            )
+            assert len(asset_root_manifests) == 1
+            assert asset_root_manifests[0].root_path == asset_root
+            assert os.path.isfile(expected_manifest_file)
+
+            assert_progress_report_last_callback(
+                num_input_files=3,
+                expected_total_input_bytes=3,
+                on_preparing_to_submit=mock_on_preparing_to_submit,
+                on_uploading_assets=mock_on_uploading_assets,
+            )
+            assert_progress_report_summary_statistics(
+                actual_summary_statistics=hash_summary_statistics,
+                processed_files=3,
+                processed_bytes=3,
+                skipped_files=0,
+                skipped_bytes=0,
+            )
+            assert_progress_report_summary_statistics(
+                actual_summary_statistics=upload_summary_statistics,
+                processed_files=2,
+                processed_bytes=2,
+                skipped_files=1,
+                skipped_bytes=1,
+            )
+
+            s3 = boto3.Session(region_name="us-west-2").resource(
+                "s3"
+            )  # pylint: disable=invalid-name
+            bucket = s3.Bucket(self.job_attachment_s3_settings.s3BucketName)
+
+            assert_expected_files_on_s3(
+                bucket,
+                expected_files={
+                    f"assetRoot/Manifests/{farm_id}/{queue_id}/Inputs/0000/e_input",
+                    f"{self.job_attachment_s3_settings.full_cas_prefix()}/a.xxh128",
+                    f"{self.job_attachment_s3_settings.full_cas_prefix()}/b.xxh128",
+                },
+            )
+            assert_canonical_manifest(
+                bucket,
+                f"assetRoot/Manifests/{farm_id}/{queue_id}/Inputs/0000/e_input",
+                expected_manifest='{"hashAlg":"xxh128","manifestVersion":"2023-03-03",'
+                '"paths":[{"hash":"a","mtime":1234000000,"path":"scene/maya.ma","size":1},'
+                '{"hash":"b","mtime":1234000000,"path":"textures/texture.png","size":1},'
+                '{"hash":"b","mtime":1234000000,"path":"textures/texture_copy.png","size":1}],'
+                '"totalSize":3}',
+            )
+
+    @mock_aws
+    def test_hash_and_upload_assets_single_read_upload(
+        self,
+        tmpdir: py.path.local,
+        farm_id,
+        queue_id,
+        assert_expected_files_on_s3,
+    ):
+        """
+        Test that with single-read upload, small files are hashed as they are uploaded rather than with
+        hash_file, that large files are hashed with hash_file and then uploaded, and that both end up at
+        their CAS keys, with no other objects in the bucket.
+        """
+        # Given
+        small_file = tmpdir.join("small.txt")
+        small_file.write("a")
+        large_file = tmpdir.join("large.txt")
+        large_file.write("bbbbbbbb")
+        large_copy_file = tmpdir.join("large_copy.txt")
+        large_copy_file.write("bbbbbbbb")
+
+        asset_manager = S3AssetManager(
+            farm_id=farm_id,
+            queue_id=queue_id,
+            job_attachment_settings=self.job_attachment_s3_settings,
+        )
+        upload_group = asset_manager.prepare_paths_for_upload(
+            input_paths=[str(small_file), str(large_file), str(large_copy_file)],
+            output_paths=[],
+            referenced_paths=[],
+        )
+
+        # When
+        with patch(
+            f"{deadline.__package__}.job_attachments.upload.S3_SINGLE_READ_UPLOAD_MAX_SIZE", 4
+        ), patch(
+            f"{deadline.__package__}.job_attachments.upload.hash_file", wraps=hash_file
+        ) as mock_hash_file:
+            (
+                hash_summary_statistics,
+                upload_summary_statistics,
+                asset_root_manifests,
+                _,
+            ) = asset_manager.hash_and_upload_assets(
+                asset_groups=upload_group.asset_groups,
+                total_input_files=upload_group.total_input_files,
+                total_input_bytes=upload_group.total_input_bytes,
+                hash_cache_dir=str(tmpdir.mkdir("cache")),
+                s3_check_cache_dir=str(tmpdir.join("cache")),
+                single_read_upload=True,
+            )
+
+        # Then
+        assert sorted(Path(call.args[0]).name for call in mock_hash_file.call_args_list) == [
+            "large.txt",
+            "large_copy.txt",
+        ]
+        small_hash = hash_data(b"a", HashAlgorithm.XXH128)
+        large_hash = hash_data(b"bbbbbbbb", HashAlgorithm.XXH128)
+        manifest = asset_root_manifests[0].asset_manifest
+        assert manifest is not None
+        assert {path.path: path.hash for path in manifest.paths} == {
+            "small.txt": small_hash,
+            "large.txt": large_hash,
+            "large_copy.txt": large_hash,
+        }
+        assert_progress_report_summary_statistics(
+            actual_summary_statistics=hash_summary_statistics,
+            processed_files=3,
+            processed_bytes=17,
+            skipped_files=0,
+            skipped_bytes=0,
+        )
+        assert (
+            upload_summary_statistics.processed_files + upload_summary_statistics.skipped_files == 3
+        )
+
+        s3 = boto3.Session(region_name="us-west-2").resource("s3")  # pylint: disable=invalid-name
+        bucket = s3.Bucket(self.job_attachment_s3_settings.s3BucketName)
+        cas_prefix = self.job_attachment_s3_settings.full_cas_prefix()
+        assert_expected_files_on_s3(
+            bucket,
+            expected_files={
+                f"{cas_prefix}/{small_hash}.xxh128",
+                f"{cas_prefix}/{large_hash}.xxh128",
+                *(
+                    bucket_object.key
+                    for bucket_object in bucket.objects.all()
+                    if bucket_object.key.startswith("assetRoot/Manifests/")
+                ),
+            },
+        )
+        assert bucket.Object(f"{cas_prefix}/{large_hash}.xxh128").get()["Body"].read() == (
+            b"bbbbbbbb"
+        )
+
+    def test_hash_and_upload_file_stops_when_cancelled(self, tmpdir):
+        """
+        Test that single-read upload doesn't upload any more files once the upload has been cancelled,
+        and that the uploads run on the upload workers rather than on the hashing threads.
+        """
+        # Given
+        input_file = tmpdir.join("input.txt")
+        input_file.write("a")
+        uploader = S3AssetUploader()
+        progress_tracker = MagicMock()
+        progress_tracker.continue_reporting = True
+        s3_check_cache = MagicMock()
+        s3_check_cache.get_entry.return_value = None
+        upload_threads: list[str] = []
+
+        # When
+        with patch.object(uploader, "file_already_uploaded", return_value=False), patch.object(
+            uploader,
+            "_upload_fileobj_to_s3",
+            side_effect=lambda *args: upload_threads.append(threading.current_thread().name),
+        ) as mock_upload_fileobj, _InputFileUploadQueue(
+            uploader, "bucket", "prefix", s3_check_cache, progress_tracker
+        ) as upload_queue:
+            upload_queue.hash_and_upload_file(str(input_file), HashAlgorithm.XXH128)
+            progress_tracker.continue_reporting = False
+            input_file.write("b")
+            with pytest.raises(AssetSyncCancelledError):
+                upload_queue.hash_and_upload_file(str(input_file), HashAlgorithm.XXH128)
+
+        # Then
+        mock_upload_fileobj.assert_called_once()
+        assert upload_threads != [threading.current_thread().name]
+
+    @mock_aws
+    def test_hash_and_upload_assets_cancelled_by_upload_callback(self, tmpdir, farm_id, queue_id):
+        """
+        Test that pipelined hashing and upload stops with an AssetSyncCancelledError when the
+        upload progress callback cancels, and that no manifest is uploaded.
+        """
+        # Given
+        input_files = []
+        for i in range(10):
+            input_file = tmpdir.join(f"input{i}.txt")
+            input_file.write(f"input{i}")
+            input_files.append(str(input_file))
+
+        asset_manager = S3AssetManager(
+            farm_id=farm_id,
+            queue_id=queue_id,
+            job_attachment_settings=self.job_attachment_s3_settings,
+        )
+        upload_group = asset_manager.prepare_paths_for_upload(
+            input_paths=input_files, output_paths=[], referenced_paths=[]
+        )
+
+        # When
+        with pytest.raises(AssetSyncCancelledError):
+            asset_manager.hash_and_upload_assets(
+                asset_groups=upload_group.asset_groups,
+                total_input_files=upload_group.total_input_files,
+                total_input_bytes=upload_group.total_input_bytes,
+                hash_cache_dir=str(tmpdir.mkdir("cache")),
+                s3_check_cache_dir=str(tmpdir.join("cache")),
+                on_uploading_assets=MagicMock(return_value=False),
+            )
+
+        # Then
+        s3 = boto3.Session(region_name="us-west-2").resource("s3")  # pylint: disable=invalid-name
+        bucket = s3.Bucket(self.job_attachment_s3_settings.s3BucketName)
+        assert not any(
+            bucket_object.key.startswith("assetRoot/Manifests/")
+            for bucket_object in bucket.objects.all()
+        )
+
 
 def assert_progress_report_last_callback(
     num_input_files: int,